@@ -323,6 +323,8 @@ void init_GateSPSPosDistribution(py::module &);
 
 void init_GateSPSVoxelsPosDistribution(py::module &);
 
+void init_GateVoxelAliasSampler(py::module &);
+
 void init_G4SPSAngDistribution(py::module &);
 
 void init_G4SPSRandomGenerator(py::module &);
@@ -405,6 +407,8 @@ void init_GateDoseActor(py::module &m);
 
 void init_GateDebugActor(py::module &m);
 
+void init_GateSparseHistogramImage(py::module &m);
+
 void init_GateVoxelizedPromptGammaTLEActor(py::module &m);
 
 void init_GateVoxelizedPromptGammaAnalogActor(py::module &m);
@@ -441,6 +445,8 @@ void init_GateImageNestedParameterisation(py::module &);
 
 void init_GateRepeatParameterisation(py::module &);
 
+void init_GateTransformsParameterisation(py::module &);
+
 void init_GateRunAction(py::module &);
 
 void init_GateEventAction(py::module &);
@@ -473,6 +479,8 @@ void init_GateSimulationStatisticsActor(py::module &);
 
 void init_GatePhaseSpaceActor(py::module &);
 
+void init_GateStepRecordActor(py::module &);
+
 // biasing
 void init_GateBOptrBremSplittingActor(py::module &m);
 
@@ -501,6 +509,8 @@ void init_GateDigitizerBlurringActor(py::module &m);
 
 void init_GateDigitizerEfficiencyActor(py::module &m);
 
+void init_GateDigitizerPipelineActor(py::module &m);
+
 void init_GateDigitizerSpatialBlurringActor(py::module &m);
 
 void init_GateDigitizerEnergyWindowsActor(py::module &m);
@@ -560,6 +570,8 @@ void init_GateHelpers(py::module &);
 
 void init_GateVolumeVoxelizer(py::module &);
 
+void init_GateDynamicGeometryOptimiser(py::module &);
+
 void init_GateImageBox(py::module &m);
 
 PYBIND11_MODULE(opengate_core, m) {
@@ -781,6 +793,7 @@ PYBIND11_MODULE(opengate_core, m) {
   init_itk_image(m);
   init_GateImageNestedParameterisation(m);
   init_GateRepeatParameterisation(m);
+  init_GateTransformsParameterisation(m);
   init_GateVSource(m);
   init_GateLastVertexSource(m);
   init_GateSourceManager(m);
@@ -796,6 +809,7 @@ PYBIND11_MODULE(opengate_core, m) {
   init_GateGANPairSource(m);
   init_GateSPSPosDistribution(m);
   init_GateSPSVoxelsPosDistribution(m);
+  init_GateVoxelAliasSampler(m);
   init_GateRunAction(m);
   init_GateEventAction(m);
   init_GateTrackingAction(m);
@@ -814,6 +828,7 @@ PYBIND11_MODULE(opengate_core, m) {
   init_GateDoseActor(m);
   init_GateDebugActor(m);
   init_GateTLEDoseActor(m);
+  init_GateSparseHistogramImage(m);
   init_GateVoxelizedPromptGammaTLEActor(m);
   init_GateVoxelizedPromptGammaAnalogActor(m);
   init_GateFluenceActor(m);
@@ -829,6 +844,7 @@ PYBIND11_MODULE(opengate_core, m) {
   init_GateScatterSplittingFreeFlightOptrActor(m);
 
   init_GatePhaseSpaceActor(m);
+  init_GateStepRecordActor(m);
   init_GateHitsCollectionActor(m);
   init_GateVDigitizerWithOutputActor(m);
   init_GateDigiAttributeManager(m);
@@ -838,6 +854,7 @@ PYBIND11_MODULE(opengate_core, m) {
   init_GateDigitizerReadoutActor(m);
   init_GateDigitizerBlurringActor(m);
   init_GateDigitizerEfficiencyActor(m);
+  init_GateDigitizerPipelineActor(m);
   init_GateDigitizerSpatialBlurringActor(m);
   init_GateDigitizerEnergyWindowsActor(m);
   init_GateDigitizerProjectionActor(m);
@@ -857,6 +874,7 @@ PYBIND11_MODULE(opengate_core, m) {
   init_GateNTuple(m);
   init_GateHelpers(m);
   init_GateVolumeVoxelizer(m);
+  init_GateDynamicGeometryOptimiser(m);
   init_GateUniqueVolumeIDManager(m);
   init_GateUniqueVolumeID(m);
   init_GateGeometryUtils(m);
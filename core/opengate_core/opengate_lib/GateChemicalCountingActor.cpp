@@ -28,6 +28,49 @@ namespace {
 G4Mutex GateChemicalCountingActorMutex = G4MUTEX_INITIALIZER;
 }
 
+void GateChemicalCountingActor::CountSeries::Add(double time,
+                                                 bool recordTimeSeries) {
+  totalCount++;
+  if (recordTimeSeries) {
+    if (!times.empty() && times.back() == time) {
+      counts.back() = totalCount;
+    } else {
+      times.push_back(time);
+      counts.push_back(totalCount);
+    }
+  } else {
+    times.back() = time;
+    counts.back() = totalCount;
+  }
+}
+
+void GateChemicalCountingActor::CountSeries::Merge(const CountSeries &other,
+                                                   bool recordTimeSeries) {
+  if (other.totalCount == 0) {
+    return;
+  }
+  const auto offset = totalCount;
+  if (recordTimeSeries) {
+    for (size_t i = 0; i < other.times.size(); i++) {
+      // skip the initial (0, 0) point of the other series
+      if (other.counts[i] == 0) {
+        continue;
+      }
+      const auto count = offset + other.counts[i];
+      if (!times.empty() && times.back() == other.times[i]) {
+        counts.back() = count;
+      } else {
+        times.push_back(other.times[i]);
+        counts.push_back(count);
+      }
+    }
+  } else {
+    times.back() = other.times.back();
+    counts.back() = offset + other.totalCount;
+  }
+  totalCount = offset + other.totalCount;
+}
+
 GateChemicalCountingActor::GateChemicalCountingActor(py::dict &user_info)
     : GateVChemistryActor(user_info, true) {}
 
@@ -45,6 +88,8 @@ void GateChemicalCountingActor::InitializeUserInfo(py::dict &user_info) {
   fTimesToRecord.erase(
       std::unique(fTimesToRecord.begin(), fTimesToRecord.end()),
       fTimesToRecord.end());
+  fTimesToRecordAreConfigured =
+      !fTimesToRecord.empty() || fNumberOfTimeBins <= 0;
 }
 
 void GateChemicalCountingActor::StartSimulationAction() {
@@ -72,33 +117,152 @@ void GateChemicalCountingActor::StartSimulationAction() {
       trackedSpeciesRecord.Reset();
     }
   }
+  UpdateAllConfiguredRecords();
+}
+
+void GateChemicalCountingActor::UpdateAllConfiguredRecords() {
+  fAllReactionRecords.clear();
+  for (auto &[counterName, trackedReactions] : fConfiguredReactionCounters) {
+    for (auto &trackedReaction : trackedReactions) {
+      fAllReactionRecords.push_back(&trackedReaction);
+    }
+  }
+  fAllSpeciesRecords.clear();
+  for (auto &[counterName, trackedSpecies] : fConfiguredSpeciesCounters) {
+    for (auto &trackedSpeciesRecord : trackedSpecies) {
+      fAllSpeciesRecords.push_back(&trackedSpeciesRecord);
+    }
+  }
+}
+
+void GateChemicalCountingActor::PrepareLocalData(threadLocalT &data) const {
+  data.fReactionSeries.assign(fAllReactionRecords.size(), CountSeries());
+  data.fSpeciesSeries.assign(fAllSpeciesRecords.size(), CountSeries());
+  data.fReactionMatches.clear();
+  data.fSpeciesMatches.clear();
+}
+
+void GateChemicalCountingActor::MergeLocalData(threadLocalT &data) {
+  G4AutoLock lock(&GateChemicalCountingActorMutex);
+  fAccumulatedELoss += data.fAccumulatedELoss;
+  fAccumulatedEdep += data.fAccumulatedEdep;
+  fAccumulatedLET += data.fAccumulatedLET;
+  fAccumulatedLET2 += data.fAccumulatedLET2;
+  fNbKilledParticles += data.fNbKilledParticles;
+  fNbAbortedEvents += data.fNbAbortedEvents;
+  fNbChemistryStarts += data.fNbChemistryStarts;
+  fNbChemistryStages += data.fNbChemistryStages;
+  fNbPreTimeStepCalls += data.fNbPreTimeStepCalls;
+  fNbPostTimeStepCalls += data.fNbPostTimeStepCalls;
+  fNbReactions += data.fNbReactions;
+  fNbRecordedEvents += data.fNbRecordedEvents;
+
+  // species at the recorded times, the names are only used here
+  for (size_t id = 0; id < data.fSpeciesPerTime.size(); id++) {
+    const auto &entries = data.fSpeciesPerTime[id];
+    for (size_t t = 0; t < entries.size(); t++) {
+      auto &entry =
+          fSpeciesInfoPerTime[fTimesToRecord[t]][data.fSpeciesNames[id]];
+      entry.number += entries[t].number;
+      entry.sumG += entries[t].sumG;
+      entry.sumG2 += entries[t].sumG2;
+    }
+  }
+
+  // configured counters: the series of this thread are appended
+  if (data.fReactionSeries.size() == fAllReactionRecords.size()) {
+    for (size_t i = 0; i < fAllReactionRecords.size(); i++) {
+      auto *record = fAllReactionRecords[i];
+      record->Merge(data.fReactionSeries[i], record->recordTimeSeries);
+    }
+  }
+  if (data.fSpeciesSeries.size() == fAllSpeciesRecords.size()) {
+    for (size_t i = 0; i < fAllSpeciesRecords.size(); i++) {
+      auto *record = fAllSpeciesRecords[i];
+      record->Merge(data.fSpeciesSeries[i], record->recordTimeSeries);
+    }
+  }
+
+  // reset (the event values are kept, the run may end during an event)
+  data.fAccumulatedELoss = 0.0;
+  data.fAccumulatedEdep = 0.0;
+  data.fAccumulatedLET = 0.0;
+  data.fAccumulatedLET2 = 0.0;
+  data.fNbKilledParticles = 0;
+  data.fNbAbortedEvents = 0;
+  data.fNbChemistryStarts = 0;
+  data.fNbChemistryStages = 0;
+  data.fNbPreTimeStepCalls = 0;
+  data.fNbPostTimeStepCalls = 0;
+  data.fNbReactions = 0;
+  data.fNbRecordedEvents = 0;
+  data.fSpeciesPerTime.clear();
+  data.fSpeciesNames.clear();
+  for (auto &series : data.fReactionSeries) {
+    series.Reset();
+  }
+  for (auto &series : data.fSpeciesSeries) {
+    series.Reset();
+  }
+}
+
+std::vector<size_t> GateChemicalCountingActor::FindReactionRecords(
+    const std::array<std::string, 2> &reactants,
+    const std::vector<std::string> &products) const {
+  std::vector<size_t> matches;
+  for (size_t i = 0; i < fAllReactionRecords.size(); i++) {
+    const auto *record = fAllReactionRecords[i];
+    if (record->reactants == reactants && record->products == products) {
+      matches.push_back(i);
+    }
+  }
+  return matches;
+}
+
+std::vector<size_t> GateChemicalCountingActor::FindSpeciesRecords(
+    const std::string &runtimeName) const {
+  const auto runtimeBaseName = StripChargeSuffix(runtimeName);
+  std::vector<size_t> matches;
+  for (size_t i = 0; i < fAllSpeciesRecords.size(); i++) {
+    const auto *record = fAllSpeciesRecords[i];
+    if (record->runtimeName == runtimeName ||
+        record->runtimeName == runtimeBaseName) {
+      matches.push_back(i);
+    }
+  }
+  return matches;
 }
 
 void GateChemicalCountingActor::BeginOfEventAction(const G4Event * /*event*/) {
-  fEventELoss = 0.0;
-  fEventEdep = 0.0;
-  fEventStepLength = 0.0;
-  fEventRestrictedLET = 0.0;
-  fLETTrackID = 1;
+  auto &l = fThreadLocalData.Get();
+  l.fEventELoss = 0.0;
+  l.fEventEdep = 0.0;
+  l.fEventStepLength = 0.0;
+  l.fEventRestrictedLET = 0.0;
+  l.fLETTrackID = 1;
 }
 
 void GateChemicalCountingActor::EndOfEventAction(const G4Event *event) {
+  auto &l = fThreadLocalData.Get();
   if (event->IsAborted()) {
-    fLETTrackID = 1;
-    fEventRestrictedLET = 0.0;
-    fEventStepLength = 0.0;
-    fEventEdep = 0.0;
+    l.fLETTrackID = 1;
+    l.fEventRestrictedLET = 0.0;
+    l.fEventStepLength = 0.0;
+    l.fEventEdep = 0.0;
     return;
   }
 
-  if (fEventStepLength > 0.0) {
-    fEventRestrictedLET = fEventEdep / fEventStepLength;
-    G4AutoLock lock(&GateChemicalCountingActorMutex);
-    fAccumulatedLET += fEventRestrictedLET;
-    fAccumulatedLET2 += fEventRestrictedLET * fEventRestrictedLET;
+  if (l.fEventStepLength > 0.0) {
+    l.fEventRestrictedLET = l.fEventEdep / l.fEventStepLength;
+    l.fAccumulatedLET += l.fEventRestrictedLET;
+    l.fAccumulatedLET2 += l.fEventRestrictedLET * l.fEventRestrictedLET;
   }
 
-  fLETTrackID = 1;
+  l.fLETTrackID = 1;
+}
+
+void GateChemicalCountingActor::EndOfRunAction(const G4Run * /*run*/) {
+  MergeLocalData(fThreadLocalData.Get());
 }
 
 bool GateChemicalCountingActor::ShouldApplyPrimaryLogic(
@@ -116,6 +280,7 @@ void GateChemicalCountingActor::SteppingAction(G4Step *step) {
   auto *track = step->GetTrack();
   const auto *preStepPoint = step->GetPreStepPoint();
   const auto *postStepPoint = step->GetPostStepPoint();
+  auto &l = fThreadLocalData.Get();
 
   if (!ShouldApplyPrimaryLogic(track)) {
     // chem6 LET scorer continues to follow charge-changed descendants
@@ -124,16 +289,16 @@ void GateChemicalCountingActor::SteppingAction(G4Step *step) {
         track->GetCreatorProcess() != nullptr) {
       const auto subType = track->GetCreatorProcess()->GetProcessSubType();
       if (subType == 56 || subType == 57) {
-        fLETTrackID = track->GetTrackID();
+        l.fLETTrackID = track->GetTrackID();
       }
     }
   } else {
-    fLETTrackID = track->GetTrackID();
+    l.fLETTrackID = track->GetTrackID();
   }
 
-  if (track->GetTrackID() == fLETTrackID) {
-    fEventStepLength += step->GetStepLength() / um;
-    fEventEdep += step->GetTotalEnergyDeposit() / keV;
+  if (track->GetTrackID() == l.fLETTrackID) {
+    l.fEventStepLength += step->GetStepLength() / um;
+    l.fEventEdep += step->GetTotalEnergyDeposit() / keV;
 
     if (postStepPoint->GetProcessDefinedStep() != nullptr) {
       const auto subType =
@@ -143,7 +308,7 @@ void GateChemicalCountingActor::SteppingAction(G4Step *step) {
         if (secondary != nullptr) {
           for (const auto *s : *secondary) {
             if (s->GetKineticEnergy() < fLETCutoff) {
-              fEventEdep += s->GetKineticEnergy() / keV;
+              l.fEventEdep += s->GetKineticEnergy() / keV;
             }
           }
         }
@@ -162,120 +327,139 @@ void GateChemicalCountingActor::SteppingAction(G4Step *step) {
     return;
   }
 
-  fEventELoss += eLoss;
-  {
-    G4AutoLock lock(&GateChemicalCountingActorMutex);
-    fAccumulatedELoss += eLoss;
-  }
+  l.fEventELoss += eLoss;
+  l.fAccumulatedELoss += eLoss;
 
-  if (fELossMax >= 0.0 && fEventELoss > fELossMax) {
+  if (fELossMax >= 0.0 && l.fEventELoss > fELossMax) {
     G4RunManager::GetRunManager()->AbortEvent();
-    G4AutoLock lock(&GateChemicalCountingActorMutex);
-    fNbAbortedEvents++;
+    l.fNbAbortedEvents++;
     return;
   }
 
-  if ((fELossMin >= 0.0 && fEventELoss >= fELossMin) ||
+  if ((fELossMin >= 0.0 && l.fEventELoss >= fELossMin) ||
       kineticE <= fKineticEMin) {
     track->SetTrackStatus(fStopAndKill);
-    G4AutoLock lock(&GateChemicalCountingActorMutex);
-    fNbKilledParticles++;
+    l.fNbKilledParticles++;
   }
 }
 
 void GateChemicalCountingActor::NewStage() {
-  G4AutoLock lock(&GateChemicalCountingActorMutex);
-  fNbChemistryStages++;
+  fThreadLocalData.Get().fNbChemistryStages++;
 }
 
 void GateChemicalCountingActor::StartChemistryTracking(G4Track *track) {
-  if (track == nullptr) {
+  if (track == nullptr || fConfiguredSpeciesCounters.empty()) {
     return;
   }
-  const auto runtimeName = ResolveRuntimeMoleculeName(*track);
-  const auto runtimeBaseName = StripChargeSuffix(runtimeName);
-  const auto trackTime = track->GetGlobalTime();
-  G4AutoLock lock(&GateChemicalCountingActorMutex);
-  for (auto &[counterName, trackedSpecies] : fConfiguredSpeciesCounters) {
-    for (auto &trackedSpeciesRecord : trackedSpecies) {
-      if (trackedSpeciesRecord.runtimeName != runtimeName &&
-          trackedSpeciesRecord.runtimeName != runtimeBaseName) {
-        continue;
-      }
-      trackedSpeciesRecord.totalCount++;
-      if (trackedSpeciesRecord.recordTimeSeries) {
-        if (!trackedSpeciesRecord.times.empty() &&
-            trackedSpeciesRecord.times.back() == trackTime) {
-          trackedSpeciesRecord.counts.back() = trackedSpeciesRecord.totalCount;
-        } else {
-          trackedSpeciesRecord.times.push_back(trackTime);
-          trackedSpeciesRecord.counts.push_back(
-              trackedSpeciesRecord.totalCount);
-        }
-      } else {
-        trackedSpeciesRecord.times.back() = trackTime;
-        trackedSpeciesRecord.counts.back() = trackedSpeciesRecord.totalCount;
-      }
+  auto &l = fThreadLocalData.Get();
+  if (l.fSpeciesSeries.size() != fAllSpeciesRecords.size()) {
+    PrepareLocalData(l);
+  }
+  const auto id = ResolveRuntimeMoleculeID(*track);
+  const std::vector<size_t> *matches;
+  std::vector<size_t> uncached;
+  if (id >= 0) {
+    auto it = l.fSpeciesMatches.find(id);
+    if (it == l.fSpeciesMatches.end()) {
+      // first time this molecule is seen in this thread: match the names
+      it = l.fSpeciesMatches
+               .emplace(id,
+                        FindSpeciesRecords(ResolveRuntimeMoleculeName(*track)))
+               .first;
     }
+    matches = &it->second;
+  } else {
+    uncached = FindSpeciesRecords(ResolveRuntimeMoleculeName(*track));
+    matches = &uncached;
+  }
+  if (matches->empty()) {
+    return;
+  }
+  const auto trackTime = track->GetGlobalTime();
+  for (const auto i : *matches) {
+    l.fSpeciesSeries[i].Add(trackTime, fAllSpeciesRecords[i]->recordTimeSeries);
   }
 }
 
 void GateChemicalCountingActor::StartChemistryProcessing() {
   ConfigureTimesToRecordIfNeeded();
-  G4AutoLock lock(&GateChemicalCountingActorMutex);
-  fNbChemistryStarts++;
+  fThreadLocalData.Get().fNbChemistryStarts++;
 }
 
 void GateChemicalCountingActor::PreChemistryTimeStepAction() {
-  G4AutoLock lock(&GateChemicalCountingActorMutex);
-  fNbPreTimeStepCalls++;
+  fThreadLocalData.Get().fNbPreTimeStepCalls++;
 }
 
 void GateChemicalCountingActor::PostChemistryTimeStepAction() {
-  G4AutoLock lock(&GateChemicalCountingActorMutex);
-  fNbPostTimeStepCalls++;
+  fThreadLocalData.Get().fNbPostTimeStepCalls++;
 }
 
 void GateChemicalCountingActor::ChemistryReactionAction(
     const G4Track &trackA, const G4Track &trackB,
     const std::vector<G4Track *> *products) {
-  const auto reactants = CanonicalizeReactants(
-      ResolveRuntimeMoleculeName(trackA), ResolveRuntimeMoleculeName(trackB));
-  std::vector<std::string> productNames;
+  auto &l = fThreadLocalData.Get();
+  l.fNbReactions++;
+  if (fConfiguredReactionCounters.empty()) {
+    return;
+  }
+  if (l.fReactionSeries.size() != fAllReactionRecords.size()) {
+    PrepareLocalData(l);
+  }
+
+  // integer key of the reaction: sorted reactant IDs then sorted product IDs
+  auto &key = l.fReactionKey;
+  key.clear();
+  const auto idA = ResolveRuntimeMoleculeID(trackA);
+  const auto idB = ResolveRuntimeMoleculeID(trackB);
+  key.push_back(std::min(idA, idB));
+  key.push_back(std::max(idA, idB));
+  auto cacheable = idA >= 0 && idB >= 0;
   if (products != nullptr) {
-    productNames.reserve(products->size());
     for (const auto *product : *products) {
       if (product != nullptr) {
-        productNames.push_back(ResolveRuntimeMoleculeName(*product));
+        const auto id = ResolveRuntimeMoleculeID(*product);
+        cacheable = cacheable && id >= 0;
+        key.push_back(id);
       }
     }
   }
-  const auto canonicalProducts = CanonicalizeProducts(productNames);
-  const auto reactionTime =
-      std::min(trackA.GetGlobalTime(), trackB.GetGlobalTime());
+  std::sort(key.begin() + 2, key.end());
 
-  G4AutoLock lock(&GateChemicalCountingActorMutex);
-  fNbReactions++;
-  for (auto &[counterName, trackedReactions] : fConfiguredReactionCounters) {
-    for (auto &trackedReaction : trackedReactions) {
-      if (trackedReaction.reactants != reactants ||
-          trackedReaction.products != canonicalProducts) {
-        continue;
-      }
-      trackedReaction.totalCount++;
-      if (trackedReaction.recordTimeSeries) {
-        if (!trackedReaction.times.empty() &&
-            trackedReaction.times.back() == reactionTime) {
-          trackedReaction.counts.back() = trackedReaction.totalCount;
-        } else {
-          trackedReaction.times.push_back(reactionTime);
-          trackedReaction.counts.push_back(trackedReaction.totalCount);
+  const std::vector<size_t> *matches;
+  std::vector<size_t> uncached;
+  auto it = cacheable ? l.fReactionMatches.find(key) : l.fReactionMatches.end();
+  if (it != l.fReactionMatches.end()) {
+    matches = &it->second;
+  } else {
+    // first time this reaction is seen in this thread: match the names
+    const auto reactants = CanonicalizeReactants(
+        ResolveRuntimeMoleculeName(trackA), ResolveRuntimeMoleculeName(trackB));
+    std::vector<std::string> productNames;
+    if (products != nullptr) {
+      productNames.reserve(products->size());
+      for (const auto *product : *products) {
+        if (product != nullptr) {
+          productNames.push_back(ResolveRuntimeMoleculeName(*product));
         }
-      } else {
-        trackedReaction.times.back() = reactionTime;
-        trackedReaction.counts.back() = trackedReaction.totalCount;
       }
     }
+    uncached =
+        FindReactionRecords(reactants, CanonicalizeProducts(productNames));
+    if (cacheable) {
+      matches = &l.fReactionMatches.emplace(key, uncached).first->second;
+    } else {
+      matches = &uncached;
+    }
+  }
+  if (matches->empty()) {
+    return;
+  }
+
+  const auto reactionTime =
+      std::min(trackA.GetGlobalTime(), trackB.GetGlobalTime());
+  for (const auto i : *matches) {
+    l.fReactionSeries[i].Add(reactionTime,
+                             fAllReactionRecords[i]->recordTimeSeries);
   }
 }
 
@@ -344,6 +528,7 @@ void GateChemicalCountingActor::RegisterConfiguredReactionCounter(
   }
   G4AutoLock lock(&GateChemicalCountingActorMutex);
   fConfiguredReactionCounters[counterName] = std::move(records);
+  UpdateAllConfiguredRecords();
 }
 
 py::dict GateChemicalCountingActor::GetConfiguredReactionCounterResults(
@@ -386,6 +571,7 @@ void GateChemicalCountingActor::RegisterConfiguredSpeciesCounter(
   }
   G4AutoLock lock(&GateChemicalCountingActorMutex);
   fConfiguredSpeciesCounters[counterName] = std::move(records);
+  UpdateAllConfiguredRecords();
 }
 
 py::dict GateChemicalCountingActor::GetConfiguredSpeciesCounterResults(
@@ -413,6 +599,15 @@ py::dict GateChemicalCountingActor::GetConfiguredSpeciesCounterResults(
 }
 
 void GateChemicalCountingActor::ConfigureTimesToRecordIfNeeded() {
+  // The times are computed once, by the first thread starting the chemistry
+  if (fTimesToRecordAreConfigured) {
+    return;
+  }
+  G4AutoLock lock(&GateChemicalCountingActorMutex);
+  if (fTimesToRecordAreConfigured) {
+    return;
+  }
+  fTimesToRecordAreConfigured = true;
   if (!fTimesToRecord.empty() || fNumberOfTimeBins <= 0) {
     return;
   }
@@ -457,29 +652,41 @@ void GateChemicalCountingActor::RecordSpeciesAtEndOfChemicalStage() {
 
   const auto indices = counter->GetMapIndices();
 
-  {
-    G4AutoLock lock(&GateChemicalCountingActorMutex);
-    fNbRecordedEvents++;
-    fAccumulatedEdep += fEventEdep;
-  }
+  auto &l = fThreadLocalData.Get();
+  l.fNbRecordedEvents++;
+  l.fAccumulatedEdep += l.fEventEdep;
 
   if (indices.empty()) {
     return;
   }
 
+  const auto nbOfTimes = fTimesToRecord.size();
   for (const auto &idx : indices) {
     const auto *molecule = idx.Molecule;
     if (molecule == nullptr) {
       continue;
     }
-    const auto speciesName = molecule->GetName();
-    for (const auto time : fTimesToRecord) {
-      const auto nMolecules = counter->GetNbMoleculesAtTime(idx, time);
-      G4AutoLock lock(&GateChemicalCountingActorMutex);
-      auto &entry = fSpeciesInfoPerTime[time][speciesName];
+    const auto id = molecule->GetMoleculeID();
+    if (id < 0) {
+      continue;
+    }
+    if (static_cast<size_t>(id) >= l.fSpeciesPerTime.size()) {
+      l.fSpeciesPerTime.resize(id + 1);
+      l.fSpeciesNames.resize(id + 1);
+    }
+    auto &entries = l.fSpeciesPerTime[id];
+    if (entries.empty()) {
+      // first time this species is recorded in this run
+      entries.resize(nbOfTimes);
+      l.fSpeciesNames[id] = molecule->GetName();
+    }
+    for (size_t t = 0; t < nbOfTimes; t++) {
+      const auto nMolecules =
+          counter->GetNbMoleculesAtTime(idx, fTimesToRecord[t]);
+      auto &entry = entries[t];
       entry.number += nMolecules;
-      if (fEventEdep > 0.0) {
-        const auto gValue = (nMolecules / (fEventEdep * keV / eV)) * 100.0;
+      if (l.fEventEdep > 0.0) {
+        const auto gValue = (nMolecules / (l.fEventEdep * keV / eV)) * 100.0;
         entry.sumG += gValue;
         entry.sumG2 += gValue * gValue;
       }
@@ -517,6 +724,17 @@ GateChemicalCountingActor::ResolveRuntimeMoleculeName(const G4Track &track) {
   return "";
 }
 
+int GateChemicalCountingActor::ResolveRuntimeMoleculeID(const G4Track &track) {
+  const auto *molecule = G4Molecule::GetMolecule(&track);
+  if (molecule != nullptr) {
+    const auto *configuration = molecule->GetMolecularConfiguration();
+    if (configuration != nullptr) {
+      return configuration->GetMoleculeID();
+    }
+  }
+  return -1;
+}
+
 std::string
 GateChemicalCountingActor::StripChargeSuffix(const std::string &moleculeName) {
   const auto caretPos = moleculeName.rfind('^');
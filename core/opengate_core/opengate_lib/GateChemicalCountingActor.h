@@ -9,11 +9,14 @@
 #define GateChemicalCountingActor_h
 
 #include "GateVChemistryActor.h"
+#include <G4Cache.hh>
 #include <array>
+#include <atomic>
 #include <cfloat>
 #include <map>
 #include <pybind11/stl.h>
 #include <string>
+#include <unordered_map>
 #include <vector>
 
 namespace py = pybind11;
@@ -27,11 +30,8 @@ public:
     double sumG2{0.0};
   };
 
-  struct TrackedReactionRecord {
-    std::string name;
-    std::array<std::string, 2> reactants;
-    std::vector<std::string> products;
-    bool recordTimeSeries{true};
+  // Cumulative count versus chemistry time
+  struct CountSeries {
     long totalCount{0};
     std::vector<double> times{0.0};
     std::vector<long> counts{0};
@@ -41,21 +41,24 @@ public:
       times = {0.0};
       counts = {0};
     }
+
+    void Add(double time, bool recordTimeSeries);
+
+    // Append the (thread) series other after this one
+    void Merge(const CountSeries &other, bool recordTimeSeries);
   };
 
-  struct TrackedSpeciesRecord {
+  struct TrackedReactionRecord : CountSeries {
     std::string name;
-    std::string runtimeName;
+    std::array<std::string, 2> reactants;
+    std::vector<std::string> products;
     bool recordTimeSeries{true};
-    long totalCount{0};
-    std::vector<double> times{0.0};
-    std::vector<long> counts{0};
+  };
 
-    void Reset() {
-      totalCount = 0;
-      times = {0.0};
-      counts = {0};
-    }
+  struct TrackedSpeciesRecord : CountSeries {
+    std::string name;
+    std::string runtimeName;
+    bool recordTimeSeries{true};
   };
 
 public:
@@ -66,6 +69,7 @@ public:
   void StartSimulationAction() override;
   void BeginOfEventAction(const G4Event *event) override;
   void EndOfEventAction(const G4Event *event) override;
+  void EndOfRunAction(const G4Run *run) override;
   void SteppingAction(G4Step *step) override;
   void NewStage() override;
   void StartChemistryTracking(G4Track *track) override;
@@ -103,6 +107,54 @@ public:
   GetConfiguredSpeciesCounterResults(const std::string &counterName) const;
 
 protected:
+  // Local data for the threads (each one has a copy), merged at the end of
+  // each run. Species and reactions are identified by the integer molecule
+  // IDs of their configurations, the names are only resolved once.
+  struct threadLocalT {
+    double fEventELoss{0.0};
+    double fEventEdep{0.0};
+    double fEventStepLength{0.0};
+    double fEventRestrictedLET{0.0};
+    int fLETTrackID{1};
+
+    double fAccumulatedELoss{0.0};
+    double fAccumulatedEdep{0.0};
+    double fAccumulatedLET{0.0};
+    double fAccumulatedLET2{0.0};
+    long fNbKilledParticles{0};
+    long fNbAbortedEvents{0};
+    long fNbChemistryStarts{0};
+    long fNbChemistryStages{0};
+    long fNbPreTimeStepCalls{0};
+    long fNbPostTimeStepCalls{0};
+    long fNbReactions{0};
+    long fNbRecordedEvents{0};
+
+    // species at the recorded times: [molecule ID][time bin]
+    std::vector<std::vector<SpeciesEntry>> fSpeciesPerTime;
+    std::vector<std::string> fSpeciesNames;
+
+    // configured counters, same order as fAllReactionRecords and
+    // fAllSpeciesRecords
+    std::vector<CountSeries> fReactionSeries;
+    std::vector<CountSeries> fSpeciesSeries;
+    // molecule ID -> indices of the tracked species records
+    std::unordered_map<int, std::vector<size_t>> fSpeciesMatches;
+    // (reactant IDs, sorted product IDs) -> indices of the reaction records
+    std::map<std::vector<int>, std::vector<size_t>> fReactionMatches;
+    std::vector<int> fReactionKey;
+  };
+  G4Cache<threadLocalT> fThreadLocalData;
+
+  void PrepareLocalData(threadLocalT &data) const;
+  void MergeLocalData(threadLocalT &data);
+  void UpdateAllConfiguredRecords();
+  std::vector<size_t>
+  FindReactionRecords(const std::array<std::string, 2> &reactants,
+                      const std::vector<std::string> &products) const;
+  std::vector<size_t> FindSpeciesRecords(const std::string &runtimeName) const;
+  static int ResolveRuntimeMoleculeID(const G4Track &track);
+
   bool ShouldApplyPrimaryLogic(const G4Track *track) const;
   void ConfigureTimesToRecordIfNeeded();
   void RecordSpeciesAtEndOfChemicalStage();
@@ -122,15 +174,12 @@ protected:
   double fLETCutoff{DBL_MAX};
   std::vector<double> fTimesToRecord;
   int fNumberOfTimeBins{0};
+  std::atomic<bool> fTimesToRecordAreConfigured{false};
   G4int fMoleculeCounterId{-1};
 
-  double fEventELoss{0.0};
+  // merged data (all threads)
   double fAccumulatedELoss{0.0};
-  double fEventEdep{0.0};
   double fAccumulatedEdep{0.0};
-  double fEventStepLength{0.0};
-  double fEventRestrictedLET{0.0};
-  int fLETTrackID{1};
   double fAccumulatedLET{0.0};
   double fAccumulatedLET2{0.0};
   long fNbKilledParticles{0};
@@ -146,6 +195,9 @@ protected:
       fConfiguredReactionCounters;
   std::map<std::string, std::vector<TrackedSpeciesRecord>>
       fConfiguredSpeciesCounters;
+  // all the records of the configured counters (flat)
+  std::vector<TrackedReactionRecord *> fAllReactionRecords;
+  std::vector<TrackedSpeciesRecord *> fAllSpeciesRecords;
 };
 
 #endif // GateChemicalCountingActor_h
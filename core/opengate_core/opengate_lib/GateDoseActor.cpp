@@ -396,6 +396,17 @@ void GateDoseActor::FlushSquaredValues(threadLocalT &data,
   PrepareLocalDataForRun(data, N_voxels);
 }
 
+void GateDoseActor::FlushLocalImage(std::vector<double> &flat_image,
+                                    const Image3DType::Pointer &cpp_image) {
+  G4AutoLock mutex(&SetPixelMutex);
+  // the flat index (see sub2ind) is the order of the itk buffer
+  auto *buffer = cpp_image->GetBufferPointer();
+  for (size_t i = 0; i < flat_image.size(); i++) {
+    buffer[i] += flat_image[i];
+  }
+  std::fill(flat_image.begin(), flat_image.end(), 0.0);
+}
+
 int GateDoseActor::EndOfRunActionMasterThread(int run_id) { return 0; }
 
 double GateDoseActor::GetMeanOfHighestNValues(Image3DType::Pointer imageP) {
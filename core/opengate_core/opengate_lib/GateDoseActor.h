@@ -126,6 +126,11 @@ public:
   static void PrepareLocalDataForRun(threadLocalT &data,
                                      unsigned int numberOfVoxels);
 
+  // Add a thread-local flat image to the shared image (thread-safe, same
+  // mutex as the other image writes), then reset it to zero
+  void FlushLocalImage(std::vector<double> &flat_image,
+                       const Image3DType::Pointer &cpp_image);
+
   void GetVoxelPosition(G4Step *step, G4ThreeVector &position, bool &isInside,
                         Image3DType::IndexType &index) const;
 
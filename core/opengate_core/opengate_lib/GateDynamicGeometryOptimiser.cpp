@@ -0,0 +1,114 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include "GateDynamicGeometryOptimiser.h"
+#include "G4GeometryManager.hh"
+#include "voxeldefs.hh"
+#include <algorithm>
+
+GateDynamicGeometryOptimiser::~GateDynamicGeometryOptimiser() { ClearCache(); }
+
+std::vector<G4LogicalVolume *> GateDynamicGeometryOptimiser::GetMothers(
+    const std::vector<G4VPhysicalVolume *> &moved) {
+  std::vector<G4LogicalVolume *> mothers;
+  for (auto *pv : moved) {
+    auto *mother = pv->GetMotherLogical();
+    if (mother == nullptr)
+      continue;
+    if (std::find(mothers.begin(), mothers.end(), mother) == mothers.end())
+      mothers.push_back(mother);
+  }
+  return mothers;
+}
+
+G4SmartVoxelHeader *
+GateDynamicGeometryOptimiser::BuildHeader(G4LogicalVolume *lv, bool optimise) {
+  // same conditions as G4GeometryManager::BuildOptimisations
+  const auto n = lv->GetNoDaughters();
+  if ((lv->IsToOptimise() && n >= kMinVoxelVolumesLevel1 && optimise) ||
+      (n == 1 && lv->GetDaughter(0)->IsReplicated() &&
+       lv->GetDaughter(0)->GetRegularStructureId() != 1)) {
+    return new G4SmartVoxelHeader(lv);
+  }
+  return nullptr;
+}
+
+void GateDynamicGeometryOptimiser::Reoptimise(
+    const std::vector<G4VPhysicalVolume *> &moved, bool optimise,
+    const std::string &key) {
+  const auto mothers = GetMothers(moved);
+
+  // No cache: let Geant4 open/close the geometry for each mother.
+  // OpenGeometry(pv) only deletes the voxels of the mother of pv (and of
+  // the first daughters chain below it), CloseGeometry(pv) rebuilds them.
+  if (fCacheSize == 0 || key.empty()) {
+    auto *gm = G4GeometryManager::GetInstance();
+    for (auto *mother : mothers) {
+      for (auto *pv : moved) {
+        if (pv->GetMotherLogical() != mother)
+          continue;
+        gm->OpenGeometry(pv);
+        gm->CloseGeometry(optimise, false, pv);
+        fNumberOfBuilds++;
+        break;
+      }
+    }
+    return;
+  }
+
+  // Store the voxels of the current configuration in the cache (the
+  // logical volumes do not own them anymore)
+  if (!fCurrentKey.empty()) {
+    Headers headers;
+    for (auto *lv : fCurrentMothers) {
+      headers[lv] = lv->GetVoxelHeader();
+      lv->SetVoxelHeader(nullptr);
+    }
+    fCache.emplace_front(fCurrentKey, headers);
+  }
+
+  // Look for the new configuration
+  auto it = std::find_if(fCache.begin(), fCache.end(),
+                         [&key](const auto &c) { return c.first == key; });
+  if (it != fCache.end() && it->second.size() == mothers.size()) {
+    for (auto *lv : mothers) {
+      auto *current = lv->GetVoxelHeader();
+      auto h = it->second.find(lv);
+      if (h == it->second.end())
+        continue;
+      if (current != h->second)
+        delete current;
+      lv->SetVoxelHeader(h->second);
+    }
+    fCache.erase(it);
+    fNumberOfCacheHits++;
+  } else {
+    for (auto *lv : mothers) {
+      delete lv->GetVoxelHeader();
+      lv->SetVoxelHeader(BuildHeader(lv, optimise));
+    }
+    fNumberOfBuilds++;
+  }
+  fCurrentKey = key;
+  fCurrentMothers = mothers;
+
+  // Limit the size of the cache (least recently used are deleted)
+  while (fCache.size() > fCacheSize) {
+    for (auto &h : fCache.back().second)
+      delete h.second;
+    fCache.pop_back();
+  }
+}
+
+void GateDynamicGeometryOptimiser::ClearCache() {
+  for (auto &c : fCache)
+    for (auto &h : c.second)
+      delete h.second;
+  fCache.clear();
+  fCurrentKey.clear();
+  fCurrentMothers.clear();
+}
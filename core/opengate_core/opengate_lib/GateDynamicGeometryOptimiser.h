@@ -0,0 +1,70 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#ifndef GateDynamicGeometryOptimiser_h
+#define GateDynamicGeometryOptimiser_h
+
+#include "G4LogicalVolume.hh"
+#include "G4SmartVoxelHeader.hh"
+#include "G4VPhysicalVolume.hh"
+#include <list>
+#include <map>
+#include <string>
+#include <vector>
+
+/*
+ * Re-optimise (voxelise for navigation) only the part of the geometry
+ * affected by moved volumes, instead of the whole world.
+ *
+ * When a volume moves, only the smart voxels of its mother logical volume
+ * must be rebuilt. Optionally, the voxel headers are kept in a cache keyed
+ * by a description of the geometry configuration (e.g. the positions of
+ * the moving volumes), so that a configuration seen before (repeated
+ * orbits, back and forth motions) does not need to be voxelised again.
+ *
+ * Must be used on the master thread, between runs.
+ */
+
+class GateDynamicGeometryOptimiser {
+public:
+  GateDynamicGeometryOptimiser() = default;
+
+  ~GateDynamicGeometryOptimiser();
+
+  // Rebuild the voxels of the mothers of the moved volumes.
+  // If the cache is enabled (fCacheSize > 0) and key is not empty, the
+  // voxels of a known configuration are reused.
+  void Reoptimise(const std::vector<G4VPhysicalVolume *> &moved, bool optimise,
+                  const std::string &key = "");
+
+  // Delete all the cached voxel headers
+  void ClearCache();
+
+  // Maximum number of configurations kept in the cache (0 = no cache)
+  size_t fCacheSize = 0;
+
+  // Statistics
+  size_t fNumberOfBuilds = 0;
+  size_t fNumberOfCacheHits = 0;
+
+protected:
+  static std::vector<G4LogicalVolume *>
+  GetMothers(const std::vector<G4VPhysicalVolume *> &moved);
+
+  static G4SmartVoxelHeader *BuildHeader(G4LogicalVolume *lv, bool optimise);
+
+  typedef std::map<G4LogicalVolume *, G4SmartVoxelHeader *> Headers;
+
+  // configurations, the most recently used first
+  std::list<std::pair<std::string, Headers>> fCache;
+
+  // key of the configuration currently installed in the logical volumes
+  std::string fCurrentKey;
+  std::vector<G4LogicalVolume *> fCurrentMothers;
+};
+
+#endif // GateDynamicGeometryOptimiser_h
@@ -9,8 +9,11 @@
 #include "GateActorManager.h"
 #include "GateHelpersDict.h"
 #include "GateHelpersImage.h"
+#include <G4ProcessTable.hh>
+#include <G4ProcessVector.hh>
 #include <G4RunManager.hh>
 #include <G4Threading.hh>
+#include <G4VProcess.hh>
 #include <itkAddImageFilter.h>
 #include <itkImageRegionIterator.h>
 
@@ -143,6 +146,15 @@ void GateFluenceActor::BeginOfEventAction(const G4Event *event) {
 
 void GateFluenceActor::BeginOfRunAction(const G4Run *run) {
   const auto N_voxels = size_region[0] * size_region[1] * size_region[2];
+  auto &l = fThreadLocalImages.Get();
+  const int n = fSecondaries ? kNumberOfComponents : 1;
+  for (int c = 0; c < n; c++) {
+    l.fCounts[c].assign(N_voxels, 0.0);
+    if (fEnergyFlag)
+      l.fEnergy[c].assign(N_voxels, 0.0);
+  }
+  if (fSecondaries)
+    PrepareProcessTags(l);
   if (fEnergySquaredFlag) {
     PrepareLocalDataForRun(fThreadLocalDataEnergy.Get(), N_voxels);
     if (fSecondaries) {
@@ -196,133 +208,168 @@ void GateFluenceActor::BeginOfRunActionMasterThread(int run_id) {
   size_region = region.GetSize();
 }
 
-void GateFluenceActor::ScoreCounts(const Image3DType::IndexType &index,
-                                   double w, int particleID,
-                                   const G4String &lastProcessName,
-                                   const G4String &creatorProcessName) {
-  ImageAddValue<Image3DType>(cpp_counts_image, index, w);
+int GateFluenceActor::ComputeProcessTag(const G4VProcess *process,
+                                        bool creator) {
+  if (process == nullptr)
+    return kNoProcessTag;
+  // The last process is the interaction itself, the creator process is only
+  // considered when the interaction is biased (the photon is a split copy)
+  const auto &name = process->GetProcessName();
+  if (name == (creator ? "biasWrapper(compt)" : "compt"))
+    return kComptonTag;
+  if (name == (creator ? "biasWrapper(Rayl)" : "Rayl"))
+    return kRayleighTag;
+  return kNoProcessTag;
+}
 
-  if ((fSecondaries) && (particleID == 22)) {
-    bool secondary = false;
-    if ((lastProcessName == "compt") ||
-        (creatorProcessName == "biasWrapper(compt)")) {
-      ImageAddValue<Image3DType>(cpp_counts_compton_image, index, w);
-      secondary = true;
-    }
-    if ((lastProcessName == "Rayl") ||
-        (creatorProcessName == "biasWrapper(Rayl)")) {
-      ImageAddValue<Image3DType>(cpp_counts_rayleigh_image, index, w);
-      secondary = true;
-    }
-    if (secondary) {
-      ImageAddValue<Image3DType>(cpp_counts_secondaries_image, index, w);
-    } else {
-      ImageAddValue<Image3DType>(cpp_counts_primaries_image, index, w);
-    }
+void GateFluenceActor::PrepareProcessTags(threadLocalImagesT &data) const {
+  // The processes are thread-local: their tags are computed once per thread
+  // from the process table, the names are not compared during the run
+  data.fLastProcessTags.clear();
+  data.fCreatorProcessTags.clear();
+  auto *processes = G4ProcessTable::GetProcessTable()->FindProcesses();
+  for (size_t i = 0; i < processes->size(); i++) {
+    const auto *p = (*processes)[i];
+    data.fLastProcessTags[p] = ComputeProcessTag(p, false);
+    data.fCreatorProcessTags[p] = ComputeProcessTag(p, true);
   }
+  delete processes;
 }
 
-void GateFluenceActor::ScoreEnergy(const Image3DType::IndexType &index,
-                                   double w, double energy, int particleID,
-                                   const G4String &lastProcessName,
-                                   const G4String &creatorProcessName) {
-  ImageAddValue<Image3DType>(cpp_energy_image, index, energy * w);
+int GateFluenceActor::GetProcessTag(
+    std::unordered_map<const G4VProcess *, int> &tags,
+    const G4VProcess *process, bool creator) const {
+  if (process == nullptr)
+    return kNoProcessTag;
+  const auto it = tags.find(process);
+  if (it != tags.end())
+    return it->second;
+  // process not in the table (should not happen): computed once
+  const auto tag = ComputeProcessTag(process, creator);
+  tags[process] = tag;
+  return tag;
+}
 
-  if ((fSecondaries) && (particleID == 22)) {
-    bool secondary = false;
-    if ((lastProcessName == "compt") ||
-        (creatorProcessName == "biasWrapper(compt)")) {
-      ImageAddValue<Image3DType>(cpp_energy_compton_image, index, energy * w);
-      secondary = true;
-    }
-    if ((lastProcessName == "Rayl") ||
-        (creatorProcessName == "biasWrapper(Rayl)")) {
-      ImageAddValue<Image3DType>(cpp_energy_rayleigh_image, index, energy * w);
-      secondary = true;
-    }
-    if (secondary) {
-      ImageAddValue<Image3DType>(cpp_energy_secondaries_image, index,
-                                 energy * w);
-    } else {
-      ImageAddValue<Image3DType>(cpp_energy_primaries_image, index, energy * w);
-    }
+int GateFluenceActor::GetComponents(threadLocalImagesT &data,
+                                    const G4Track *track) const {
+  int components = 1 << kAllComponent;
+  if (!fSecondaries || track->GetDynamicParticle()->GetPDGcode() != 22)
+    return components;
+  const auto tags =
+      GetProcessTag(data.fLastProcessTags,
+                    fLastProcessActor->GetLastProcessDefinedStep(), false) |
+      GetProcessTag(data.fCreatorProcessTags, track->GetCreatorProcess(), true);
+  if (tags & kComptonTag)
+    components |= 1 << kComptonComponent;
+  if (tags & kRayleighTag)
+    components |= 1 << kRayleighComponent;
+  if (tags != kNoProcessTag)
+    components |= 1 << kSecondariesComponent;
+  else
+    components |= 1 << kPrimariesComponent;
+  return components;
+}
+
+GateFluenceActor::Image3DType::Pointer
+GateFluenceActor::GetImage(ImageComponent c, bool energy, bool squared) const {
+  switch (c) {
+  case kComptonComponent:
+    if (squared)
+      return energy ? cpp_energy_squared_compton_image
+                    : cpp_counts_squared_compton_image;
+    return energy ? cpp_energy_compton_image : cpp_counts_compton_image;
+  case kRayleighComponent:
+    if (squared)
+      return energy ? cpp_energy_squared_rayleigh_image
+                    : cpp_counts_squared_rayleigh_image;
+    return energy ? cpp_energy_rayleigh_image : cpp_counts_rayleigh_image;
+  case kSecondariesComponent:
+    if (squared)
+      return energy ? cpp_energy_squared_secondaries_image
+                    : cpp_counts_squared_secondaries_image;
+    return energy ? cpp_energy_secondaries_image : cpp_counts_secondaries_image;
+  case kPrimariesComponent:
+    if (squared)
+      return energy ? cpp_energy_squared_primaries_image
+                    : cpp_counts_squared_primaries_image;
+    return energy ? cpp_energy_primaries_image : cpp_counts_primaries_image;
+  default:
+    if (squared)
+      return energy ? cpp_energy_squared_image : cpp_counts_squared_image;
+    return energy ? cpp_energy_image : cpp_counts_image;
+  }
+}
+
+GateFluenceActor::threadLocalT &
+GateFluenceActor::GetSquaredData(ImageComponent c, bool energy) {
+  switch (c) {
+  case kComptonComponent:
+    return energy ? fThreadLocalDataComptEnergy.Get()
+                  : fThreadLocalDataComptCounts.Get();
+  case kRayleighComponent:
+    return energy ? fThreadLocalDataRaylEnergy.Get()
+                  : fThreadLocalDataRaylCounts.Get();
+  case kSecondariesComponent:
+    return energy ? fThreadLocalDataSecEnergy.Get()
+                  : fThreadLocalDataSecCounts.Get();
+  case kPrimariesComponent:
+    return energy ? fThreadLocalDataPrimEnergy.Get()
+                  : fThreadLocalDataPrimCounts.Get();
+  default:
+    return energy ? fThreadLocalDataEnergy.Get() : fThreadLocalDataCounts.Get();
+  }
+}
+
+void GateFluenceActor::FlushLocalImage(std::vector<double> &data,
+                                       const Image3DType::Pointer &cpp_image) {
+  if (data.empty())
+    return;
+  {
+    // the flat index (sub2ind) follows the itk buffer layout
+    G4AutoLock mutex(&SetPixelFluenceMutex);
+    auto *buffer = cpp_image->GetBufferPointer();
+    for (size_t i = 0; i < data.size(); i++)
+      buffer[i] += data[i];
+  }
+  std::fill(data.begin(), data.end(), 0.0);
+}
+
+void GateFluenceActor::ScoreCounts(threadLocalImagesT &data, int index_flat,
+                                   double w, int components) {
+  for (int c = 0; c < kNumberOfComponents; c++) {
+    if (components & (1 << c))
+      data.fCounts[c][index_flat] += w;
+  }
+}
+
+void GateFluenceActor::ScoreEnergy(threadLocalImagesT &data, int index_flat,
+                                   double w, double energy, int components) {
+  for (int c = 0; c < kNumberOfComponents; c++) {
+    if (components & (1 << c))
+      data.fEnergy[c][index_flat] += energy * w;
   }
 }
 
 void GateFluenceActor::ScoreUncertainties(const Image3DType::IndexType &index,
                                           double w, double energy,
-                                          int particleID,
-                                          const G4String &lastProcessName,
-                                          const G4String &creatorProcessName,
-                                          int event_id) {
-  if (fEnergySquaredFlag) {
-    ScoreSquaredValue(fThreadLocalDataEnergy.Get(), cpp_energy_squared_image,
-                      energy * w, event_id, index);
-    if ((fSecondaries) && (particleID == 22)) {
-      bool secondary = false;
-      if ((lastProcessName == "compt") ||
-          (creatorProcessName == "biasWrapper(compt)")) {
-        ScoreSquaredValue(fThreadLocalDataComptEnergy.Get(),
-                          cpp_energy_squared_compton_image, energy * w,
-                          event_id, index);
-        secondary = true;
-      }
-      if ((lastProcessName == "Rayl") ||
-          (creatorProcessName == "biasWrapper(Rayl)")) {
-        ScoreSquaredValue(fThreadLocalDataRaylEnergy.Get(),
-                          cpp_energy_squared_rayleigh_image, energy * w,
-                          event_id, index);
-        secondary = true;
-      }
-      if (secondary) {
-        ScoreSquaredValue(fThreadLocalDataSecEnergy.Get(),
-                          cpp_energy_squared_secondaries_image, energy * w,
-                          event_id, index);
-      } else {
-        ScoreSquaredValue(fThreadLocalDataPrimEnergy.Get(),
-                          cpp_energy_squared_primaries_image, energy * w,
-                          event_id, index);
-      }
+                                          int components, int event_id) {
+  for (int i = 0; i < kNumberOfComponents; i++) {
+    if (!(components & (1 << i)))
+      continue;
+    const auto c = static_cast<ImageComponent>(i);
+    if (fEnergySquaredFlag) {
+      ScoreSquaredValue(GetSquaredData(c, true), GetImage(c, true, true),
+                        energy * w, event_id, index);
     }
-  }
-
-  if (fCountsSquaredFlag) {
-    ScoreSquaredValue(fThreadLocalDataCounts.Get(), cpp_counts_squared_image, w,
-                      event_id, index);
-    if ((fSecondaries) && (particleID == 22)) {
-      bool secondary = false;
-      if ((lastProcessName == "compt") ||
-          (creatorProcessName == "biasWrapper(compt)")) {
-        ScoreSquaredValue(fThreadLocalDataComptCounts.Get(),
-                          cpp_counts_squared_compton_image, w, event_id, index);
-        secondary = true;
-      }
-      if ((lastProcessName == "Rayl") ||
-          (creatorProcessName == "biasWrapper(Rayl)")) {
-        ScoreSquaredValue(fThreadLocalDataRaylCounts.Get(),
-                          cpp_counts_squared_rayleigh_image, w, event_id,
-                          index);
-        secondary = true;
-      }
-      if (secondary) {
-        ScoreSquaredValue(fThreadLocalDataSecCounts.Get(),
-                          cpp_counts_squared_secondaries_image, w, event_id,
-                          index);
-      } else {
-        ScoreSquaredValue(fThreadLocalDataPrimCounts.Get(),
-                          cpp_counts_squared_primaries_image, w, event_id,
-                          index);
-      }
+    if (fCountsSquaredFlag) {
+      ScoreSquaredValue(GetSquaredData(c, false), GetImage(c, false, true), w,
+                        event_id, index);
     }
   }
 }
 
 void GateFluenceActor::SteppingAction(G4Step *step) {
   if (step->GetPreStepPoint()->GetStepStatus() == fGeomBoundary) {
-    G4String lastProcessName;
-    if (fSecondaries)
-      lastProcessName = fLastProcessActor->GetLastProcess();
-
     const auto event_id =
         G4RunManager::GetRunManager()->GetCurrentEvent()->GetEventID();
     auto preGlobal = step->GetPreStepPoint()->GetPosition();
@@ -345,31 +392,31 @@ void GateFluenceActor::SteppingAction(G4Step *step) {
         cpp_counts_image->TransformPhysicalPointToIndex(point, index);
 
     if (isInside) {
-      G4String creatorProcessName = "None";
-      G4int particleID = step->GetTrack()->GetDynamicParticle()->GetPDGcode();
-      if (step->GetTrack()->GetCreatorProcess() != nullptr) {
-        creatorProcessName =
-            step->GetTrack()->GetCreatorProcess()->GetProcessName();
-      }
-
-      {
-        G4AutoLock FluenceMutex(&SetPixelFluenceMutex);
-        ScoreCounts(index, w, particleID, lastProcessName, creatorProcessName);
-        if (fEnergyFlag) {
-          ScoreEnergy(index, w, energy, particleID, lastProcessName,
-                      creatorProcessName);
-        }
+      // No lock: the values are stored in the images of this thread
+      auto &l = fThreadLocalImages.Get();
+      const auto components = GetComponents(l, step->GetTrack());
+      const auto index_flat = sub2ind(index);
+      ScoreCounts(l, index_flat, w, components);
+      if (fEnergyFlag) {
+        ScoreEnergy(l, index_flat, w, energy, components);
       }
 
       if (fCountsSquaredFlag || fEnergySquaredFlag) {
-        ScoreUncertainties(index, w, energy, particleID, lastProcessName,
-                           creatorProcessName, event_id);
+        ScoreUncertainties(index, w, energy, components, event_id);
       }
     }
   }
 }
 
 void GateFluenceActor::EndOfRunAction(const G4Run *run) {
+  auto &l = fThreadLocalImages.Get();
+  const int n = fSecondaries ? kNumberOfComponents : 1;
+  for (int i = 0; i < n; i++) {
+    const auto c = static_cast<ImageComponent>(i);
+    FlushLocalImage(l.fCounts[c], GetImage(c, false, false));
+    if (fEnergyFlag)
+      FlushLocalImage(l.fEnergy[c], GetImage(c, true, false));
+  }
   if (fCountsSquaredFlag) {
     FlushSquaredValues(fThreadLocalDataCounts.Get(), cpp_counts_squared_image);
     if (fSecondaries) {
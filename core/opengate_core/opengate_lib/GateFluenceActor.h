@@ -14,6 +14,7 @@
 #include <G4VPrimitiveScorer.hh>
 #include <itkImage.h>
 #include <pybind11/stl.h>
+#include <unordered_map>
 
 namespace py = pybind11;
 
@@ -76,6 +77,29 @@ public:
     std::vector<int> lastid_worker_flatimg;
   };
 
+  // Components of the images (all particles, then by process)
+  enum ImageComponent {
+    kAllComponent = 0,
+    kComptonComponent,
+    kRayleighComponent,
+    kSecondariesComponent,
+    kPrimariesComponent,
+    kNumberOfComponents
+  };
+
+  // Integer tags of the processes, computed once per process
+  enum ProcessTag { kNoProcessTag = 0, kComptonTag = 1, kRayleighTag = 2 };
+
+  // Counts/energy images of this thread (flat, one per component), merged
+  // into the shared images at the end of the run, and process tags
+  struct threadLocalImagesT {
+    std::vector<double> fCounts[kNumberOfComponents];
+    std::vector<double> fEnergy[kNumberOfComponents];
+    std::unordered_map<const G4VProcess *, int> fLastProcessTags;
+    std::unordered_map<const G4VProcess *, int> fCreatorProcessTags;
+  };
+  G4Cache<threadLocalImagesT> fThreadLocalImages;
+
   G4Cache<threadLocalT> fThreadLocalDataCounts;
   G4Cache<threadLocalT> fThreadLocalDataComptCounts;
   G4Cache<threadLocalT> fThreadLocalDataRaylCounts;
@@ -110,18 +134,27 @@ public:
   void SetCountsSquaredFlag(const bool b) { fCountsSquaredFlag = b; }
   bool GetCountsSquaredFlag() const { return fCountsSquaredFlag; }
 
-  void ScoreCounts(const Image3DType::IndexType &index, double w,
-                   int particleID, const G4String &lastProcessName,
-                   const G4String &creatorProcessName);
+  // Bit mask of the image components in which the track is scored
+  int GetComponents(threadLocalImagesT &data, const G4Track *track) const;
+  int GetProcessTag(std::unordered_map<const G4VProcess *, int> &tags,
+                    const G4VProcess *process, bool creator) const;
+  static int ComputeProcessTag(const G4VProcess *process, bool creator);
+  void PrepareProcessTags(threadLocalImagesT &data) const;
+
+  Image3DType::Pointer GetImage(ImageComponent c, bool energy,
+                                bool squared) const;
+  threadLocalT &GetSquaredData(ImageComponent c, bool energy);
+  void FlushLocalImage(std::vector<double> &data,
+                       const Image3DType::Pointer &cpp_image);
+
+  void ScoreCounts(threadLocalImagesT &data, int index_flat, double w,
+                   int components);
 
-  void ScoreEnergy(const Image3DType::IndexType &index, double w, double energy,
-                   int particleID, const G4String &lastProcessName,
-                   const G4String &creatorProcessName);
+  void ScoreEnergy(threadLocalImagesT &data, int index_flat, double w,
+                   double energy, int components);
 
   void ScoreUncertainties(const Image3DType::IndexType &index, double w,
-                          double energy, int particleID,
-                          const G4String &lastProcessName,
-                          const G4String &creatorProcessName, int event_id);
+                          double energy, int components, int event_id);
 
 protected:
   std::string fPhysicalVolumeName;
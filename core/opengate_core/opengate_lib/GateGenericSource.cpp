@@ -75,6 +75,17 @@ void GateGenericSource::SetTAC(const std::vector<double> &times,
   fTAC_Activities = activities;
 }
 
+void GateGenericSource::SetSpectrumLinesTAC(
+    const std::vector<double> &times, const std::vector<double> &energies,
+    const std::vector<double> &weights) {
+  // the SPS is created during InitializeUserInfo
+  if (fSPS == nullptr)
+    Fatal("SetSpectrumLinesTAC must be called after InitializeUserInfo for "
+          "the source " +
+          fName);
+  fSPS->GetEneDist()->SetSpectrumLinesTAC(times, energies, weights);
+}
+
 void GateGenericSource::InitializeUserInfo(py::dict &user_info) {
   GateVSource::InitializeUserInfo(user_info);
   CreateSPS();
@@ -229,6 +240,7 @@ void GateGenericSource::GeneratePrimaries(
   // sample the particle properties with SingleParticleSource
   // (the acceptance angle or forced direction is included)
   fSPS->SetParticleTime(current_simulation_time);
+  fSPS->GetEneDist()->fCurrentTime = current_simulation_time;
   fSPS->GeneratePrimaryVertex(event);
 
   // update the time according to skipped events
@@ -46,6 +46,10 @@ public:
   void SetTAC(const std::vector<double> &times,
               const std::vector<double> &activities);
 
+  void SetSpectrumLinesTAC(const std::vector<double> &times,
+                           const std::vector<double> &energies,
+                           const std::vector<double> &weights);
+
   void InitializeBackToBackMode(py::dict &user_info);
 
   unsigned long GetTotalSkippedEvents() const;
@@ -9,12 +9,18 @@
 #include "GateHelpers.h"
 #include "GateMuDatabase.h"
 #include "GateMuTables.h"
+#include <G4Exception.hh>
 #include <G4Gamma.hh>
 #include <G4ProcessManager.hh>
 #include <G4ProcessVector.hh>
 #include <G4ProductionCutsTable.hh>
 #include <G4VAtomDeexcitation.hh>
 #include <G4VEmProcess.hh>
+#include <G4Version.hh>
+#include <filesystem>
+#include <fstream>
+#include <iomanip>
+#include <random>
 
 // GateMaterialMuHandler *GateMaterialMuHandler::fSingletonMaterialMuHandler =
 // nullptr;
@@ -49,6 +55,8 @@ GateMaterialMuHandler::GateMaterialMuHandler() {
   fEnergyNumber = 40;
   fAtomicShellEnergyMin = 1. * CLHEP::keV;
   fPrecision = 0.01;
+  fNumberOfCachedTables = 0;
+  fNumberOfSimulatedTables = 0;
   fLastCouple = nullptr;
   fLastMuTable = nullptr;
 }
@@ -100,6 +108,18 @@ GateMaterialMuHandler::GetMuTable(const G4MaterialCutsCouple *couple) {
   return fLastMuTable;
 }
 
+GateMuTable *
+GateMaterialMuHandler::FindMuTable(const G4MaterialCutsCouple *couple) const {
+  auto it = fCoupleTable.find(couple);
+  if (it == fCoupleTable.end()) {
+    std::ostringstream oss;
+    oss << "GateMaterialMuHandler -- no mu/mu_en table for the material '"
+        << couple->GetMaterial()->GetName() << "'" << std::endl;
+    Fatal(oss.str());
+  }
+  return it->second;
+}
+
 inline double interpolation(double Xa, double Xb, double Ya, double Yb,
                             double x) {
   return exp(log(Ya) + log(Yb / Ya) / log(Xb / Xa) * log(x / Xa));
@@ -363,6 +383,21 @@ void GateMaterialMuHandler::SimulateMaterialTable() {
       double energyCutForGamma = productionCutList->ConvertRangeToEnergy(
           gamma, material,
           couple->GetProductionCuts()->GetProductionCut("gamma"));
+
+      // Load the table if it has already been simulated
+      std::string cacheKey;
+      if (!fCacheDirectory.empty()) {
+        cacheKey = GetCacheKey(couple, energyCutForGamma, isFluoActive);
+        auto *table = ReadCachedTable(couple, cacheKey);
+        if (table != nullptr) {
+          fCoupleTable.insert(
+              std::pair<const G4MaterialCutsCouple *, GateMuTable *>(couple,
+                                                                     table));
+          fNumberOfCachedTables++;
+          continue;
+        }
+      }
+
       // Construct energy list (energy, atomicShellEnergy)
       ConstructEnergyList(&muStorage, material);
 
@@ -544,10 +579,135 @@ void GateMaterialMuHandler::SimulateMaterialTable() {
       fCoupleTable.insert(
           std::pair<const G4MaterialCutsCouple *, GateMuTable *>(couple,
                                                                  table));
+      fNumberOfSimulatedTables++;
+      if (!fCacheDirectory.empty()) {
+        WriteCachedTable(cacheKey, muStorage);
+      }
     }
   }
 }
 
+std::string
+GateMaterialMuHandler::GetCacheKey(const G4MaterialCutsCouple *couple,
+                                   double energyCutForGamma,
+                                   bool isFluoActive) const {
+  // Everything the simulated table depends on: composition, density, energy
+  // grid, precision, gamma cut, gamma models, database and Geant4 version
+  const G4Material *material = couple->GetMaterial();
+  const double *fractions = material->GetFractionVector();
+  std::ostringstream oss;
+  oss << std::setprecision(17);
+  oss << "geant4=" << G4VERSION_NUMBER << ";database=" << fDatabaseName
+      << ";density=" << material->GetDensity() << ";elements=";
+  for (size_t i = 0; i < material->GetNumberOfElements(); i++) {
+    const G4Element *element = material->GetElement(i);
+    oss << element->GetZ() << "/" << element->GetA() << ":" << fractions[i]
+        << ",";
+  }
+  oss << ";emin=" << fEnergyMin << ";emax=" << fEnergyMax
+      << ";enumber=" << fEnergyNumber << ";shell_emin=" << fAtomicShellEnergyMin
+      << ";precision=" << fPrecision << ";gamma_cut=" << energyCutForGamma
+      << ";fluo=" << isFluoActive << ";models=" << GetGammaModelsKey();
+  return oss.str();
+}
+
+std::string GateMaterialMuHandler::GetGammaModelsKey() {
+  // same processes as the ones used in SimulateMaterialTable
+  G4ProcessVector *processListForGamma =
+      G4Gamma::Gamma()->GetProcessManager()->GetProcessList();
+  std::ostringstream oss;
+  oss << std::setprecision(17);
+  for (G4int i = 0; i < processListForGamma->size(); i++) {
+    const G4String processName = (*processListForGamma)[i]->GetProcessName();
+    if (processName != "PhotoElectric" && processName != "phot" &&
+        processName != "Compton" && processName != "compt" &&
+        processName != "RayleighScattering" && processName != "Rayl")
+      continue;
+    auto *process = dynamic_cast<G4VEmProcess *>((*processListForGamma)[i]);
+    if (process == nullptr)
+      continue;
+    oss << processName << "(";
+    for (G4int m = 0; m < process->NumberOfModels(); m++) {
+      const auto *model = process->GetModelByIndex(m);
+      if (model == nullptr)
+        continue;
+      oss << model->GetName() << "[" << model->LowEnergyLimit() << ","
+          << model->HighEnergyLimit() << "]";
+    }
+    oss << ")";
+  }
+  return oss.str();
+}
+
+std::string
+GateMaterialMuHandler::GetCacheFilename(const std::string &key) const {
+  std::ostringstream oss;
+  oss << "mu_" << std::hex << std::setw(16) << std::setfill('0')
+      << std::hash<std::string>{}(key) << ".txt";
+  return (std::filesystem::path(fCacheDirectory) / oss.str()).string();
+}
+
+GateMuTable *
+GateMaterialMuHandler::ReadCachedTable(const G4MaterialCutsCouple *couple,
+                                       const std::string &key) const {
+  // File format: the key on the first line (to detect hash collisions), the
+  // number of energies, then one line per energy: log(E) log(mu) log(mu_en)
+  std::ifstream is(GetCacheFilename(key));
+  if (!is)
+    return nullptr;
+  std::string line;
+  if (!std::getline(is, line) || line != key)
+    return nullptr;
+  int n = 0;
+  if (!(is >> n) || n <= 0)
+    return nullptr;
+  std::vector<double> values(3 * n);
+  std::string token;
+  for (auto &v : values) {
+    if (!(is >> token))
+      return nullptr;
+    // strtod also reads inf/nan
+    v = std::strtod(token.c_str(), nullptr);
+  }
+  auto *table = new GateMuTable(couple, n);
+  for (int e = 0; e < n; e++) {
+    table->PutValue(e, values[3 * e], values[3 * e + 1], values[3 * e + 2]);
+  }
+  return table;
+}
+
+void GateMaterialMuHandler::WriteCachedTable(
+    const std::string &key,
+    const std::vector<MuStorageStruct> &muStorage) const {
+  // The cache is a best effort: it is not an error if it cannot be written.
+  // The file is written under a temporary name then renamed, so that jobs
+  // sharing the same cache never read a partial file.
+  std::error_code ec;
+  std::filesystem::create_directories(fCacheDirectory, ec);
+  const auto filename = GetCacheFilename(key);
+  std::ostringstream tmp;
+  tmp << filename << ".tmp" << std::random_device{}();
+  {
+    std::ofstream os(tmp.str());
+    if (!os) {
+      G4ExceptionDescription ed;
+      ed << "Cannot write the mu/mu_en table in the cache directory '"
+         << fCacheDirectory << "'" << G4endl;
+      G4Exception("GateMaterialMuHandler::WriteCachedTable", "MuCache.W1",
+                  JustWarning, ed);
+      return;
+    }
+    os << key << "\n" << muStorage.size() << "\n" << std::setprecision(17);
+    for (const auto &e : muStorage) {
+      os << log(e.energy) << " " << log(e.mu) << " " << log(e.muen) << "\n";
+    }
+  }
+  std::filesystem::rename(tmp.str(), filename, ec);
+  if (ec) {
+    std::filesystem::remove(tmp.str(), ec);
+  }
+}
+
 double GateMaterialMuHandler::ProcessOneShot(
     G4VEmModel *model, std::vector<G4DynamicParticle *> *secondaries,
     const G4MaterialCutsCouple *couple, const G4DynamicParticle *primary) {
@@ -662,3 +822,11 @@ void GateMaterialMuHandler::SetAtomicShellEMin(double e) {
 }
 
 void GateMaterialMuHandler::SetPrecision(double p) { fPrecision = p; }
+
+void GateMaterialMuHandler::SetCacheDirectory(std::string dir) {
+  fCacheDirectory = std::move(dir);
+}
+
+std::string GateMaterialMuHandler::GetCacheDirectory() const {
+  return fCacheDirectory;
+}
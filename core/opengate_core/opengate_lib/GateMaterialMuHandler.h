@@ -13,7 +13,9 @@
 #include <G4MaterialCutsCouple.hh>
 #include <map>
 #include <memory>
+#include <string>
 #include <tuple>
+#include <vector>
 
 struct MuStorageStruct {
   double energy;
@@ -57,6 +59,10 @@ public:
 
   GateMuTable *GetMuTable(const G4MaterialCutsCouple *);
 
+  // Same as GetMuTable without the last call cache: safe to call concurrently
+  // once initialized
+  [[nodiscard]] GateMuTable *FindMuTable(const G4MaterialCutsCouple *) const;
+
   void SetDatabaseName(G4String name);
 
   void SetEMin(double e);
@@ -69,6 +75,12 @@ public:
 
   void SetPrecision(double p);
 
+  // Directory of the persistent cache of the simulated tables (empty: no
+  // cache)
+  void SetCacheDirectory(std::string dir);
+
+  [[nodiscard]] std::string GetCacheDirectory() const;
+
   GateMaterialMuHandler();
 
   // Initialization
@@ -92,6 +104,22 @@ public:
 
   static double SquaredSigmaOnMean(double, double, double);
 
+  // Persistent cache of the simulated tables
+  std::string GetCacheKey(const G4MaterialCutsCouple *,
+                          double energyCutForGamma, bool isFluoActive) const;
+
+  // Names and energy ranges of the photoelectric, Compton and Rayleigh models
+  // of the current physics list (the simulated tables depend on them)
+  static std::string GetGammaModelsKey();
+
+  std::string GetCacheFilename(const std::string &key) const;
+
+  GateMuTable *ReadCachedTable(const G4MaterialCutsCouple *,
+                               const std::string &key) const;
+
+  void WriteCachedTable(const std::string &key,
+                        const std::vector<MuStorageStruct> &) const;
+
   void CheckLastCall(const G4MaterialCutsCouple *);
 
   // static GateMaterialMuHandler *fSingletonMaterialMuHandler;
@@ -109,6 +137,9 @@ public:
   int fEnergyNumber;
   double fAtomicShellEnergyMin;
   double fPrecision;
+  std::string fCacheDirectory;
+  int fNumberOfCachedTables;
+  int fNumberOfSimulatedTables;
   const G4MaterialCutsCouple *fLastCouple;
   GateMuTable *fLastMuTable;
 };
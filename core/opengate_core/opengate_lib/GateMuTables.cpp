@@ -44,30 +44,40 @@ inline double interpol(double x1, double x, double x2, double y1, double y2) {
   //   storage
 }
 
+double GateMuTable::Interpolate(double energy, const double *table) const {
+  energy = log(energy);
+
+  int inf = 0;
+  int sup = fSize - 1;
+  while (sup - inf > 1) {
+    int tmp_bound = (inf + sup) / 2;
+    if (fEnergy[tmp_bound] > energy) {
+      sup = tmp_bound;
+    } else {
+      inf = tmp_bound;
+    }
+  }
+  double e_inf = fEnergy[inf];
+  double e_sup = fEnergy[sup];
+
+  if (energy > e_inf && energy < e_sup) {
+    return exp(interpol(e_inf, energy, e_sup, table[inf], table[sup]));
+  }
+  return exp(table[inf]);
+}
+
+double GateMuTable::ComputeMuEnOverRho(double energy) const {
+  return Interpolate(energy, fMuEn);
+}
+
+double GateMuTable::ComputeMuOverRho(double energy) const {
+  return Interpolate(energy, fMu);
+}
+
 double GateMuTable::GetMuEnOverRho(double energy) {
   if (energy != fLastEnergyMuEn) {
     fLastEnergyMuEn = energy;
-
-    energy = log(energy);
-
-    int inf = 0;
-    int sup = fSize - 1;
-    while (sup - inf > 1) {
-      int tmp_bound = (inf + sup) / 2;
-      if (fEnergy[tmp_bound] > energy) {
-        sup = tmp_bound;
-      } else {
-        inf = tmp_bound;
-      }
-    }
-    double e_inf = fEnergy[inf];
-    double e_sup = fEnergy[sup];
-
-    if (energy > e_inf && energy < e_sup) {
-      fLastMuEn = exp(interpol(e_inf, energy, e_sup, fMuEn[inf], fMuEn[sup]));
-    } else {
-      fLastMuEn = exp(fMuEn[inf]);
-    }
+    fLastMuEn = Interpolate(energy, fMuEn);
   }
 
   return fLastMuEn;
@@ -80,27 +90,7 @@ double GateMuTable::GetMuEn(double energy) {
 double GateMuTable::GetMuOverRho(double energy) {
   if (energy != fLastEnergyMu) {
     fLastEnergyMu = energy;
-
-    energy = log(energy);
-
-    int inf = 0;
-    int sup = fSize - 1;
-    while (sup - inf > 1) {
-      int tmp_bound = (inf + sup) / 2;
-      if (fEnergy[tmp_bound] > energy) {
-        sup = tmp_bound;
-      } else {
-        inf = tmp_bound;
-      }
-    }
-    double e_inf = fEnergy[inf];
-    double e_sup = fEnergy[sup];
-
-    if (energy > e_inf && energy < e_sup) {
-      fLastMu = exp(interpol(e_inf, energy, e_sup, fMu[inf], fMu[sup]));
-    } else {
-      fLastMu = exp(fMu[inf]);
-    }
+    fLastMu = Interpolate(energy, fMu);
   }
 
   return fLastMu;
@@ -28,6 +28,12 @@ public:
 
   double GetMuOverRho(double energy);
 
+  // Same as GetMuEnOverRho and GetMuOverRho but without the last value cache
+  // (shared by all threads): safe to call concurrently
+  [[nodiscard]] double ComputeMuEnOverRho(double energy) const;
+
+  [[nodiscard]] double ComputeMuOverRho(double energy) const;
+
   const G4MaterialCutsCouple *GetMaterialCutsCouple() const;
 
   const G4Material *GetMaterial() const;
@@ -42,6 +48,9 @@ public:
 
   double *GetMuTable() const;
 
+  // log-log interpolation of the table at this energy
+  [[nodiscard]] double Interpolate(double energy, const double *table) const;
+
   const G4MaterialCutsCouple *mCouple;
   const G4Material *mMaterial;
   double mDensity;
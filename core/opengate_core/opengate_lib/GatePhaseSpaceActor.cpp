@@ -6,6 +6,7 @@
    -------------------------------------------------- */
 
 #include "GatePhaseSpaceActor.h"
+#include "GateHelpers.h"
 #include "GateHelpersDict.h"
 #include "digitizer/GateDigiCollectionManager.h"
 #include "digitizer/GateHelpersDigitizer.h"
@@ -33,6 +34,7 @@ GatePhaseSpaceActor::GatePhaseSpaceActor(py::dict &user_info)
   fStoreAbsorbedEvent = false;
   fStoreAllSteps = false;
   fDebug = false;
+  fChunkSize = 100000;
 }
 
 GatePhaseSpaceActor::~GatePhaseSpaceActor() {
@@ -53,6 +55,23 @@ void GatePhaseSpaceActor::InitializeUserInfo(py::dict &user_info) {
   }
 }
 
+void GatePhaseSpaceActor::SetColumnarOutput(const std::string &mode,
+                                            const std::string &filename,
+                                            const int chunk_size) {
+  fColumns.reset();
+  fColumnsFilename = "";
+  if (mode == "root")
+    return;
+  if (mode != "memory" && mode != "binary")
+    Fatal("Unknown phase space output mode: " + mode);
+  if (chunk_size <= 0)
+    Fatal("The phase space chunk size must be positive");
+  fColumns = std::make_unique<GateDigiColumns>();
+  if (mode == "binary")
+    fColumnsFilename = filename;
+  fChunkSize = chunk_size;
+}
+
 void GatePhaseSpaceActor::InitializeCpp() {
   fHits = nullptr;
   fTotalNumberOfEntries = 0;
@@ -65,7 +84,7 @@ void GatePhaseSpaceActor::StartSimulationAction() {
       fDigiCollectionName);
 
   std::string outputPath;
-  if (!GetWriteToDisk(fOutputNameRoot)) {
+  if (!GetWriteToDisk(fOutputNameRoot) || fColumns != nullptr) {
     outputPath = "";
   } else {
     outputPath = GetOutputPath(fOutputNameRoot);
@@ -73,6 +92,11 @@ void GatePhaseSpaceActor::StartSimulationAction() {
   fHits->SetFilenameAndInitRoot(outputPath);
   fHits->InitDigiAttributesFromNames(fUserDigiAttributeNames);
   fHits->RootInitializeTupleForMaster();
+  if (fColumns != nullptr) {
+    fColumns->InitFromDigiCollection(fHits);
+    if (!fColumnsFilename.empty())
+      fColumns->Open(fColumnsFilename);
+  }
   if (fStoreAbsorbedEvent) {
     CheckRequiredAttribute(fHits, "EventID");
     CheckRequiredAttribute(fHits, "EventPosition");
@@ -236,6 +260,16 @@ void GatePhaseSpaceActor::EndOfEventAction(const G4Event *event) {
     // increase the number of absorbed events
     fNumberOfAbsorbedEvents++;
   }
+
+  // columnar output: move the digis of this thread by chunks
+  if (fColumns != nullptr && fHits->GetSize() >= fChunkSize) {
+    {
+      G4AutoLock mutex(&TotalEntriesMutex);
+      fTotalNumberOfEntries += static_cast<int>(fHits->GetSize());
+    }
+    fColumns->Append(fHits);
+    fHits->Clear();
+  }
 }
 
 // Called every time a Run ends
@@ -244,6 +278,8 @@ void GatePhaseSpaceActor::EndOfRunAction(const G4Run * /*unused*/) {
     G4AutoLock mutex(&TotalEntriesMutex);
     fTotalNumberOfEntries += static_cast<int>(fHits->GetSize());
   }
+  if (fColumns != nullptr)
+    fColumns->Append(fHits);
   fHits->FillToRootIfNeeded(true);
 }
 
@@ -257,6 +293,8 @@ void GatePhaseSpaceActor::EndOfSimulationWorkerAction(
 void GatePhaseSpaceActor::EndSimulationAction() {
   fHits->Write();
   fHits->Close();
+  if (fColumns != nullptr)
+    fColumns->Close();
 }
 
 int GatePhaseSpaceActor::GetNumberOfAbsorbedEvents() const {
@@ -10,6 +10,7 @@
 
 #include "GateVActor.h"
 #include "digitizer/GateDigiCollection.h"
+#include "digitizer/GateDigiColumns.h"
 #include <G4Cache.hh>
 #include <pybind11/stl.h>
 
@@ -65,6 +66,12 @@ public:
 
   void SetStoreAllStepsFlag(bool b) { fStoreAllSteps = true; }
 
+  // mode is "root", "memory" or "binary" (filename is only used for binary)
+  void SetColumnarOutput(const std::string &mode, const std::string &filename,
+                         int chunk_size);
+
+  GateDigiColumns *GetColumns() const { return fColumns.get(); }
+
 protected:
   // Local data for the threads (each one has a copy)
   struct threadLocalT {
@@ -83,6 +90,11 @@ protected:
   bool fStoreFirstStepInVolume;
   bool fStoreAllSteps;
 
+  // columnar output (instead of ROOT) if fColumns is set
+  std::unique_ptr<GateDigiColumns> fColumns;
+  std::string fColumnsFilename;
+  size_t fChunkSize;
+
   int fNumberOfAbsorbedEvents;
   int fTotalNumberOfEntries;
 };
@@ -6,10 +6,13 @@
    -------------------------------------------------- */
 
 #include "GateSPSEneDistribution.h"
+#include "GateHelpers.h"
 #include <Randomize.hh>
+#include <algorithm>
 #include <cstdlib>
 #include <fmt/core.h>
 #include <limits>
+#include <numeric>
 
 // Parts copied from GateSPSEneDistribution.cc
 
@@ -26,6 +29,8 @@ G4double GateSPSEneDistribution::VGenerateOne(G4ParticleDefinition *d) {
     GenerateRange();
   else if (GetEnergyDisType() == "spectrum_discrete")
     GenerateSpectrumLines();
+  else if (GetEnergyDisType() == "spectrum_discrete_tac")
+    GenerateSpectrumLinesTAC();
   else if (GetEnergyDisType() == "spectrum_histogram")
     GenerateSpectrumHistogram();
   else if (GetEnergyDisType() == "spectrum_histogram_linear")
@@ -148,6 +153,101 @@ void GateSPSEneDistribution::GenerateSpectrumHistogramInterpolated() {
   }
 }
 
+void GateSPSEneDistribution::SetSpectrumLinesTAC(
+    const std::vector<double> &times, const std::vector<double> &energies,
+    const std::vector<double> &weights) {
+  auto const n = energies.size();
+  auto const nb = times.size();
+  if (n == 0 || nb == 0 || weights.size() != n * nb) {
+    auto const errorMessage =
+        fmt::format("For spectrum_discrete_tac, the weights vector must have "
+                    "times x energies elements ({} ≠ {} x {})",
+                    weights.size(), nb, n);
+    Fatal(errorMessage);
+  }
+  fLinesTACTimes = times;
+  fLinesTACEnergies = energies;
+  fLinesTACBinWeights.assign(nb, 0.0);
+  fLinesTACAliasProbability.assign(nb * n, 1.0);
+  fLinesTACAliasIndex.resize(nb * n);
+
+  // Vose alias method, one table per time bin
+  std::vector<double> scaled(n);
+  std::vector<std::size_t> small;
+  std::vector<std::size_t> large;
+  for (std::size_t b = 0; b < nb; b++) {
+    auto const *w = &weights[b * n];
+    auto *prob = &fLinesTACAliasProbability[b * n];
+    auto *alias = &fLinesTACAliasIndex[b * n];
+    auto const total = std::accumulate(w, w + n, 0.0);
+    fLinesTACBinWeights[b] = total;
+    for (std::size_t i = 0; i < n; i++)
+      alias[i] = i;
+    if (total <= 0)
+      continue;
+    small.clear();
+    large.clear();
+    for (std::size_t i = 0; i < n; i++) {
+      scaled[i] = w[i] * n / total;
+      if (scaled[i] < 1.0)
+        small.push_back(i);
+      else
+        large.push_back(i);
+    }
+    while (!small.empty() && !large.empty()) {
+      auto const s = small.back();
+      small.pop_back();
+      auto const l = large.back();
+      prob[s] = scaled[s];
+      alias[s] = l;
+      scaled[l] = (scaled[l] + scaled[s]) - 1.0;
+      if (scaled[l] < 1.0) {
+        large.pop_back();
+        small.push_back(l);
+      }
+    }
+    // remaining entries (numerical round-off) keep a probability of 1
+  }
+
+  SetEnergyDisType("spectrum_discrete_tac");
+  auto const [emin, emax] =
+      std::minmax_element(energies.begin(), energies.end());
+  SetEmin(*emin);
+  SetEmax(*emax);
+}
+
+void GateSPSEneDistribution::GenerateSpectrumLinesTAC() {
+  auto const n = fLinesTACEnergies.size();
+  auto const k = TimeBinForLinesTAC() * n;
+  auto const i = std::min(static_cast<std::size_t>(G4UniformRand() * n), n - 1);
+  if (G4UniformRand() < fLinesTACAliasProbability[k + i])
+    fParticleEnergy = fLinesTACEnergies[i];
+  else
+    fParticleEnergy = fLinesTACEnergies[fLinesTACAliasIndex[k + i]];
+}
+
+std::size_t GateSPSEneDistribution::TimeBinForLinesTAC() const {
+  auto const nb = fLinesTACTimes.size();
+  if (nb == 1 || fCurrentTime <= fLinesTACTimes.front())
+    return 0;
+  if (fCurrentTime >= fLinesTACTimes.back())
+    return nb - 1;
+  auto const upper = std::upper_bound(fLinesTACTimes.begin(),
+                                      fLinesTACTimes.end(), fCurrentTime);
+  auto const i = std::distance(fLinesTACTimes.begin(), upper) - 1;
+  // The activity is linearly interpolated between two bins (see the TAC of
+  // GateGenericSource), so the lines are sampled from the mixture of the two
+  // bins with the same interpolation weights.
+  auto const bin_time = fLinesTACTimes[i + 1] - fLinesTACTimes[i];
+  auto const w1 = (fLinesTACTimes[i + 1] - fCurrentTime) / bin_time *
+                  fLinesTACBinWeights[i];
+  auto const w2 = (fCurrentTime - fLinesTACTimes[i]) / bin_time *
+                  fLinesTACBinWeights[i + 1];
+  if (w1 + w2 <= 0)
+    return i;
+  return G4UniformRand() * (w1 + w2) < w1 ? i : i + 1;
+}
+
 std::size_t GateSPSEneDistribution::IndexForProbability(double p) const {
   // p in ]0, 1[
   // see
@@ -31,6 +31,14 @@ public:
 
   void GenerateSpectrumHistogramInterpolated();
 
+  void GenerateSpectrumLinesTAC();
+
+  // Discrete lines whose weights change with time: one set of weights per
+  // time bin (weights are flattened, time bins first)
+  void SetSpectrumLinesTAC(const std::vector<double> &times,
+                           const std::vector<double> &energies,
+                           const std::vector<double> &weights);
+
   // Cannot inherit from GenerateOne
   virtual G4double VGenerateOne(G4ParticleDefinition *);
 
@@ -39,8 +47,20 @@ public:
   std::vector<double> fProbabilityCDF;
   std::vector<double> fEnergyCDF;
 
+  // current simulation time, used by time dependent spectra
+  double fCurrentTime = 0;
+
 private:
   std::size_t IndexForProbability(double p) const;
+
+  std::size_t TimeBinForLinesTAC() const;
+
+  // one alias table (probability + alias index) per time bin
+  std::vector<double> fLinesTACTimes;
+  std::vector<double> fLinesTACEnergies;
+  std::vector<double> fLinesTACBinWeights;
+  std::vector<double> fLinesTACAliasProbability;
+  std::vector<std::size_t> fLinesTACAliasIndex;
 };
 
 #endif // GateSPSEneDistribution_h
@@ -24,11 +24,29 @@ void GateSPSVoxelsPosDistribution::SetCumulativeDistributionFunction(
   fCDFZ = vz;
   fCDFY = vy;
   fCDFX = vx;
+  fAliasSampler = nullptr;
+}
+
+void GateSPSVoxelsPosDistribution::SetAliasSampler(
+    std::shared_ptr<const GateVoxelAliasSampler> sampler) {
+  fAliasSampler = std::move(sampler);
+  // the cumulative distribution functions are no longer needed
+  fCDFZ = VD();
+  fCDFY = VD2();
+  fCDFX = VD3();
 }
 
 G4ThreeVector GateSPSVoxelsPosDistribution::VGenerateOne() {
   // G4UniformRand: default boundaries ]0.1[ for operator()().
 
+  if (fAliasSampler) {
+    // O(1) sampling of the voxel with the alias table
+    size_t i, j, k;
+    fAliasSampler->GetVoxelIndex(fAliasSampler->Sample(G4UniformRand()), i, j,
+                                 k);
+    return GeneratePositionInVoxel(k, j, i);
+  }
+
   // Get Cumulative Distribution Function for Z
   auto i = 0;
   do {
@@ -54,9 +72,14 @@ G4ThreeVector GateSPSVoxelsPosDistribution::VGenerateOne() {
     k = std::distance(fCDFX[i][j].begin(), lower);
   } while (k >= (int)fCDFX[i][j].size());
 
-  // convert to physical coordinate
   // (warning to the numpy order Z Y X)
-  const itk::Index<3> index = {k, j, i};
+  return GeneratePositionInVoxel(k, j, i);
+}
+
+G4ThreeVector GateSPSVoxelsPosDistribution::GeneratePositionInVoxel(
+    const long x, const long y, const long z) const {
+  // convert to physical coordinate
+  const itk::Index<3> index = {x, y, z};
   itk::Point<double> point;
   cpp_image->TransformIndexToPhysicalPoint(index, point);
 
@@ -9,7 +9,9 @@
 #define GateSPSVoxelsPosDistribution_h
 
 #include "GateSPSPosDistribution.h"
+#include "GateVoxelAliasSampler.h"
 #include <itkImage.h>
+#include <memory>
 
 class GateSPSVoxelsPosDistribution : public GateSPSPosDistribution {
 
@@ -29,6 +31,10 @@ public:
   void SetCumulativeDistributionFunction(const VD &vz, const VD2 &vy,
                                          const VD3 &vx);
 
+  // Alias table sampler, shared (read-only) by all threads. If set, it is
+  // used instead of the cumulative distribution functions.
+  void SetAliasSampler(std::shared_ptr<const GateVoxelAliasSampler> sampler);
+
   // Image type is 3D float by default (the pixel data are not used
   // nor even allocated. Only useful to convert pixel coordinates
   // to physical coordinates.
@@ -42,9 +48,13 @@ public:
   G4RotationMatrix fGlobalRotation;
 
 protected:
+  // random position in the voxel (x, y, z), in the mother volume frame
+  G4ThreeVector GeneratePositionInVoxel(long x, long y, long z) const;
+
   VD3 fCDFX;
   VD2 fCDFY;
   VD fCDFZ;
+  std::shared_ptr<const GateVoxelAliasSampler> fAliasSampler;
 };
 
 #endif // GateSPSVoxelsPosDistribution_h
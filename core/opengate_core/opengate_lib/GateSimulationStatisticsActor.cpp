@@ -7,6 +7,8 @@
 
 #include "GateSimulationStatisticsActor.h"
 #include "GateHelpersDict.h"
+#include "GateSteppingAction.h"
+#include <G4RunManager.hh>
 #include <chrono>
 
 G4Mutex GateSimulationStatisticsActorMutex = G4MUTEX_INITIALIZER;
@@ -26,6 +28,7 @@ GateSimulationStatisticsActor::GateSimulationStatisticsActor(
   fActions.insert("EndSimulationAction");
   fDuration = 0;
   fTrackTypesFlag = false;
+  fGlobalStepCountFlag = false;
   fInitDuration = 0;
   fStartRunTimeIsSet = false;
 }
@@ -39,6 +42,23 @@ void GateSimulationStatisticsActor::InitializeUserInfo(py::dict &user_info) {
   fTrackTypesFlag = DictGetBool(user_info, "track_types_flag");
 }
 
+void GateSimulationStatisticsActor::SetGlobalStepCountFlag(bool b) {
+  fGlobalStepCountFlag = b;
+  if (b)
+    fActions.erase("SteppingAction");
+  else
+    fActions.insert("SteppingAction");
+}
+
+long int GateSimulationStatisticsActor::GetGlobalStepCount() {
+  // The stepping action of the current thread counts all its steps
+  const auto *sa = dynamic_cast<const GateSteppingAction *>(
+      G4RunManager::GetRunManager()->GetUserSteppingAction());
+  if (sa == nullptr)
+    return 0;
+  return sa->GetNumberOfSteps();
+}
+
 void GateSimulationStatisticsActor::StartSimulationAction() {
   // Called when the simulation start
 
@@ -90,6 +110,8 @@ void GateSimulationStatisticsActor::BeginOfRunAction(const G4Run *run) {
     data.fTrackCount = 0;
     data.fStepCount = 0;
   }
+  if (fGlobalStepCountFlag)
+    threadLocalData.Get().fGlobalStepCountAtBeginOfRun = GetGlobalStepCount();
 }
 
 void GateSimulationStatisticsActor::PreUserTrackingAction(
@@ -98,8 +120,7 @@ void GateSimulationStatisticsActor::PreUserTrackingAction(
   threadLocal_t &data = threadLocalData.Get();
   data.fTrackCount++;
   if (fTrackTypesFlag) {
-    auto p = track->GetParticleDefinition()->GetParticleName();
-    data.fTrackTypes[p]++;
+    data.fTrackTypes[track->GetParticleDefinition()]++;
   }
 }
 
@@ -113,6 +134,8 @@ void GateSimulationStatisticsActor::EndOfRunAction(const G4Run *run) {
   threadLocal_t &data = threadLocalData.Get();
   data.fRunCount++;
   data.fEventCount += run->GetNumberOfEvent();
+  if (fGlobalStepCountFlag)
+    data.fStepCount += GetGlobalStepCount() - data.fGlobalStepCountAtBeginOfRun;
 }
 
 void GateSimulationStatisticsActor::EndOfSimulationWorkerAction(
@@ -127,10 +150,8 @@ void GateSimulationStatisticsActor::EndOfSimulationWorkerAction(
   fCounts["tracks"] += data.fTrackCount;
   fCounts["steps"] += data.fStepCount;
   if (fTrackTypesFlag) {
-    for (auto v : data.fTrackTypes) {
-      if (fTrackTypes.count(v.first) == 0)
-        fTrackTypes[v.first] = 0;
-      fTrackTypes[v.first] = v.second + fTrackTypes[v.first];
+    for (const auto &v : data.fTrackTypes) {
+      fTrackTypes[v.first->GetParticleName()] += v.second;
     }
   }
 }
@@ -10,6 +10,9 @@
 
 #include "GateVActor.h"
 #include <pybind11/stl.h>
+#include <unordered_map>
+
+class G4ParticleDefinition;
 
 namespace py = pybind11;
 
@@ -46,6 +49,12 @@ public:
 
   py::dict GetCounts();
 
+  // If true, the steps are counted by the global stepping action of each
+  // thread instead of the SteppingAction of this actor (that is then not
+  // registered as a sensitive detector)
+  void SetGlobalStepCountFlag(bool b);
+  bool GetGlobalStepCountFlag() const { return fGlobalStepCountFlag; }
+
 protected:
   // Local data for the threads (each one has a copy)
   struct threadLocal_t {
@@ -53,7 +62,9 @@ protected:
     long int fEventCount;
     long int fTrackCount;
     long int fStepCount;
-    std::map<std::string, long int> fTrackTypes;
+    long int fGlobalStepCountAtBeginOfRun;
+    // track types by particle, names are only used when merging
+    std::unordered_map<const G4ParticleDefinition *, long int> fTrackTypes;
   };
   G4Cache<threadLocal_t> threadLocalData;
 
@@ -62,7 +73,10 @@ protected:
   std::map<std::string, double> fCountsD;
   std::map<std::string, std::string> fCountsStr;
 
+  static long int GetGlobalStepCount();
+
   bool fTrackTypesFlag;
+  bool fGlobalStepCountFlag;
   std::map<std::string, long int> fTrackTypes;
   double fDuration;
   double fInitDuration;
@@ -0,0 +1,50 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include "GateSparseHistogramImage.h"
+#include <algorithm>
+
+void GateSparseHistogramImage::Configure(const G4ThreeVector &size, int nbins) {
+  fSize[0] = static_cast<int64_t>(size[0]);
+  fSize[1] = static_cast<int64_t>(size[1]);
+  fSize[2] = static_cast<int64_t>(size[2]);
+  fNumberOfBins = nbins;
+  Clear();
+}
+
+void GateSparseHistogramImage::Merge(const GateSparseHistogramImage &other) {
+  for (const auto &[index, other_row] : other.fRows) {
+    const auto row = GetRow(index);
+    for (int b = 0; b < fNumberOfBins; b++)
+      fValues[row + b] += other.fValues[other_row + b];
+  }
+}
+
+void GateSparseHistogramImage::Scale(double factor) {
+  for (auto &v : fValues)
+    v *= factor;
+}
+
+void GateSparseHistogramImage::Clear() {
+  fRows.clear();
+  fValues.clear();
+}
+
+void GateSparseHistogramImage::GetSortedData(
+    std::vector<int64_t> &indices, std::vector<double> &values) const {
+  indices.clear();
+  indices.reserve(fRows.size());
+  for (const auto &r : fRows)
+    indices.push_back(r.first);
+  std::sort(indices.begin(), indices.end());
+  values.resize(indices.size() * fNumberOfBins);
+  auto out = values.begin();
+  for (const auto index : indices) {
+    const auto row = fRows.at(index);
+    out = std::copy_n(fValues.begin() + row, fNumberOfBins, out);
+  }
+}
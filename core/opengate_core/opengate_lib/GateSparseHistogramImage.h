@@ -0,0 +1,74 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#ifndef GateSparseHistogramImage_h
+#define GateSparseHistogramImage_h
+
+#include <G4ThreeVector.hh>
+#include <cstdint>
+#include <unordered_map>
+#include <vector>
+
+/*
+ * Sparse storage of a 3D image of histograms (e.g. voxel x energy bins).
+ *
+ * Only the voxels where a value was added own a histogram (a row of nbins
+ * values in a flat vector). Rows are keyed by the linear voxel index
+ * x + nx * (y + ny * z), i.e. the index in a dense 3D ITK image.
+ *
+ * Not thread safe: use one instance per thread and Merge() at the end of the
+ * run.
+ */
+
+class GateSparseHistogramImage {
+public:
+  void Configure(const G4ThreeVector &size, int nbins);
+
+  inline void AddValue(int64_t x, int64_t y, int64_t z, int bin, double value) {
+    const int64_t index = x + fSize[0] * (y + fSize[1] * z);
+    fValues[GetRow(index) + bin] += value;
+  }
+
+  void Merge(const GateSparseHistogramImage &other);
+
+  void Scale(double factor);
+
+  // Remove all histograms, keep the allocated memory
+  void Clear();
+
+  inline size_t GetNumberOfVoxels() const { return fRows.size(); }
+
+  inline int GetNumberOfBins() const { return fNumberOfBins; }
+
+  inline std::vector<int64_t> GetSize() const {
+    return {fSize[0], fSize[1], fSize[2]};
+  }
+
+  // Linear voxel indices (sorted) and corresponding histograms
+  // (one row of nbins values per voxel, same order)
+  void GetSortedData(std::vector<int64_t> &indices,
+                     std::vector<double> &values) const;
+
+protected:
+  inline size_t GetRow(int64_t index) {
+    const auto it = fRows.find(index);
+    if (it != fRows.end())
+      return it->second;
+    const auto row = fValues.size();
+    fValues.resize(row + fNumberOfBins, 0.0);
+    fRows.emplace(index, row);
+    return row;
+  }
+
+  int64_t fSize[3] = {0, 0, 0};
+  int fNumberOfBins = 0;
+  // linear voxel index -> offset of the histogram in fValues
+  std::unordered_map<int64_t, size_t> fRows;
+  std::vector<double> fValues;
+};
+
+#endif // GateSparseHistogramImage_h
@@ -0,0 +1,115 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include "GateStepRecordActor.h"
+#include "GateHelpers.h"
+#include "GateHelpersDict.h"
+#include "digitizer/GateDigiCollectionManager.h"
+
+G4Mutex StepRecordMutex = G4MUTEX_INITIALIZER;
+
+GateStepRecordActor::GateStepRecordActor(py::dict &user_info)
+    : GateVActor(user_info, true) {
+  fActions.insert("StartSimulationAction");
+  fActions.insert("BeginOfRunAction");
+  fActions.insert("SteppingAction");
+  fActions.insert("EndOfEventAction");
+  fActions.insert("EndOfRunAction");
+  fBatchSize = 100000;
+  fBatchPerEvent = false;
+  fTotalNumberOfSteps = 0;
+  fTotalNumberOfBatches = 0;
+}
+
+void GateStepRecordActor::InitializeUserInfo(py::dict &user_info) {
+  GateVActor::InitializeUserInfo(user_info);
+  fDigiCollectionName = DictGetStr(user_info, "name");
+  fUserDigiAttributeNames = DictGetVecStr(user_info, "attributes");
+  fBatchPerEvent = DictGetBool(user_info, "batch_per_event");
+  const auto batch_size = DictGetInt(user_info, "batch_size");
+  if (batch_size <= 0)
+    Fatal("The batch_size of the StepRecordActor must be positive");
+  fBatchSize = batch_size;
+}
+
+void GateStepRecordActor::SetStepRecordFunction(StepRecordFunctionType &f) {
+  fApply = f;
+}
+
+void GateStepRecordActor::InitializeCpp() {
+  fHits = nullptr;
+  fTotalNumberOfSteps = 0;
+  fTotalNumberOfBatches = 0;
+}
+
+void GateStepRecordActor::StartSimulationAction() {
+  // the steps are only kept in memory (no ROOT output)
+  fHits = GateDigiCollectionManager::GetInstance()->NewDigiCollection(
+      fDigiCollectionName);
+  fHits->SetFilenameAndInitRoot("");
+  fHits->InitDigiAttributesFromNames(fUserDigiAttributeNames);
+  fTotalNumberOfSteps = 0;
+  fTotalNumberOfBatches = 0;
+}
+
+void GateStepRecordActor::BeginOfRunAction(const G4Run *run) {
+  auto &l = fThreadLocalData.Get();
+  l.fCurrentRunId = run->GetRunID();
+  if (l.fColumns == nullptr) {
+    l.fColumns = std::make_unique<GateDigiColumns>();
+    l.fColumns->InitFromDigiCollection(fHits);
+  }
+}
+
+void GateStepRecordActor::SteppingAction(G4Step *step) {
+  fHits->FillHits(step);
+  if (!fBatchPerEvent && fHits->GetSize() >= fBatchSize)
+    ProcessBatch();
+}
+
+void GateStepRecordActor::EndOfEventAction(const G4Event * /*event*/) {
+  if (fBatchPerEvent)
+    ProcessBatch();
+}
+
+void GateStepRecordActor::EndOfRunAction(const G4Run * /*run*/) {
+  // When the run ends, the remaining steps are sent
+  ProcessBatch();
+}
+
+void GateStepRecordActor::ProcessBatch() {
+  const auto n = fHits->GetSize();
+  if (n == 0)
+    return;
+  // move the steps of this thread to the columns (the columns are taken by
+  // the apply function, so they only contain this batch)
+  auto &l = fThreadLocalData.Get();
+  l.fColumns->Append(fHits);
+  fHits->Clear();
+  {
+    G4AutoLock mutex(&StepRecordMutex);
+    fTotalNumberOfSteps += static_cast<int>(n);
+    fTotalNumberOfBatches++;
+  }
+  fApply(this);
+}
+
+GateDigiColumns *GateStepRecordActor::GetCurrentColumns() {
+  return fThreadLocalData.Get().fColumns.get();
+}
+
+int GateStepRecordActor::GetCurrentRunId() const {
+  return fThreadLocalData.Get().fCurrentRunId;
+}
+
+int GateStepRecordActor::GetTotalNumberOfSteps() const {
+  return fTotalNumberOfSteps;
+}
+
+int GateStepRecordActor::GetTotalNumberOfBatches() const {
+  return fTotalNumberOfBatches;
+}
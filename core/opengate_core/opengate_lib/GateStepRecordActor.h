@@ -0,0 +1,88 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#ifndef GateStepRecordActor_h
+#define GateStepRecordActor_h
+
+#include "GateVActor.h"
+#include "digitizer/GateDigiCollection.h"
+#include "digitizer/GateDigiColumns.h"
+#include <G4Cache.hh>
+#include <pybind11/stl.h>
+
+namespace py = pybind11;
+
+/*
+ * Record the attributes of all steps in the attached volume(s) in a per-thread
+ * buffer. Every batch_size steps (or at the end of every event), the buffer
+ * is moved to typed columns and the user "apply" function (python) is called,
+ * in the thread that recorded the steps. The python side gets the columns
+ * (numpy arrays, no copy) of the current thread with the python binding
+ * TakeCurrentBatch.
+ */
+
+class GateStepRecordActor : public GateVActor {
+
+public:
+  // Callback function
+  using StepRecordFunctionType = std::function<void(GateStepRecordActor *)>;
+
+  explicit GateStepRecordActor(py::dict &user_info);
+
+  void InitializeUserInfo(py::dict &user_info) override;
+
+  void InitializeCpp() override;
+
+  // Called when the simulation start (master thread only)
+  void StartSimulationAction() override;
+
+  // Called every time a Run starts (all threads)
+  void BeginOfRunAction(const G4Run *run) override;
+
+  // Called every time a batch of step must be processed
+  void SteppingAction(G4Step *) override;
+
+  // Called at the end of an event
+  void EndOfEventAction(const G4Event *event) override;
+
+  // Called every time a Run ends (all threads)
+  void EndOfRunAction(const G4Run *run) override;
+
+  // set the user "apply" function (python)
+  void SetStepRecordFunction(StepRecordFunctionType &f);
+
+  // columns of the current batch of the current thread
+  GateDigiColumns *GetCurrentColumns();
+
+  int GetCurrentRunId() const;
+
+  int GetTotalNumberOfSteps() const;
+
+  int GetTotalNumberOfBatches() const;
+
+protected:
+  void ProcessBatch();
+
+  std::string fDigiCollectionName;
+  std::vector<std::string> fUserDigiAttributeNames;
+  GateDigiCollection *fHits{};
+  size_t fBatchSize;
+  bool fBatchPerEvent;
+  StepRecordFunctionType fApply;
+
+  // For MT, all threads local variables are gathered here
+  struct threadLocalT {
+    std::unique_ptr<GateDigiColumns> fColumns;
+    int fCurrentRunId;
+  };
+  G4Cache<threadLocalT> fThreadLocalData;
+
+  int fTotalNumberOfSteps;
+  int fTotalNumberOfBatches;
+};
+
+#endif // GateStepRecordActor_h
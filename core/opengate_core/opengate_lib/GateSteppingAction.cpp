@@ -7,7 +7,9 @@
 
 #include "GateSteppingAction.h"
 
-GateSteppingAction::GateSteppingAction() : G4UserSteppingAction() {}
+GateSteppingAction::GateSteppingAction() : G4UserSteppingAction() {
+  fNumberOfSteps = 0;
+}
 
 void GateSteppingAction::RegisterAuxiliaryAttribute(
     GateVAuxiliaryAttribute *attribute) {
@@ -17,6 +19,7 @@ void GateSteppingAction::RegisterAuxiliaryAttribute(
 }
 
 void GateSteppingAction::UserSteppingAction(const G4Step *step) {
+  fNumberOfSteps++;
   for (auto attribute : fSteppingActionAttributes) {
     attribute->SteppingAction(step);
   }
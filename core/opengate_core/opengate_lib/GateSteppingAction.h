@@ -30,8 +30,12 @@ public:
 
   void UserSteppingAction(const G4Step *step) override;
 
+  // Number of steps processed by this thread (all volumes)
+  long int GetNumberOfSteps() const { return fNumberOfSteps; }
+
 protected:
   std::vector<GateVAuxiliaryAttribute *> fSteppingActionAttributes;
+  long int fNumberOfSteps;
 };
 
 #endif // GateSteppingAction_h
@@ -16,11 +16,12 @@
 #include <G4ParticleDefinition.hh>
 #include <G4RunManager.hh>
 #include <G4Threading.hh>
+#include <algorithm>
+#include <cmath>
 #include <iostream>
 #include <itkAddImageFilter.h>
 #include <vector>
 
-G4Mutex SetPixelTLEMutex = G4MUTEX_INITIALIZER;
 G4Mutex SetEkinMaxMutex = G4MUTEX_INITIALIZER;
 
 GateTLEDoseActor::GateTLEDoseActor(py::dict &user_info)
@@ -28,6 +29,11 @@ GateTLEDoseActor::GateTLEDoseActor(py::dict &user_info)
   fMultiThreadReady = true;
   fEnergyMin = 0;
   fTLEThreshold = 0;
+  fCSDAEnergyMin = 1 * CLHEP::keV;
+  fCSDAEnergyMax = 100 * CLHEP::MeV;
+  fCSDANumberOfBins = 1000;
+  fCSDABinsPerLogEnergy =
+      fCSDANumberOfBins / std::log(fCSDAEnergyMax / fCSDAEnergyMin);
 }
 
 void GateTLEDoseActor::InitializeUserInfo(py::dict &user_info) {
@@ -99,10 +105,90 @@ void GateTLEDoseActor::InitializeCSDAForNewGamma(G4bool isFirstStep,
     auto &l = fThreadLocalData.Get();
     G4StepPoint *pre_step = step->GetPreStepPoint();
     G4double energy = pre_step->GetKineticEnergy();
-    const G4Material *currentMat = pre_step->GetMaterial();
-    l.fCsda =
-        fEmCalc->GetCSDARange(energy, G4Electron::Definition(), currentMat);
-    l.fPreviousMatName = currentMat->GetName();
+    l.fCsda = GetCSDARange(l, energy, pre_step->GetMaterial());
+  }
+}
+
+G4double GateTLEDoseActor::GetCSDARange(threadLocalT &l, G4double energy,
+                                        const G4Material *material) const {
+  if (energy <= fCSDAEnergyMin || energy >= fCSDAEnergyMax) {
+    return l.fEmCalc->GetCSDARange(energy, G4Electron::Definition(), material);
+  }
+  const auto m = material->GetIndex();
+  if (m >= l.fCSDATables.size() || l.fCSDATables[m].empty()) {
+    BuildCSDATable(l, material);
+  }
+  const auto &table = l.fCSDATables[m];
+  const double x = std::log(energy / fCSDAEnergyMin) * fCSDABinsPerLogEnergy;
+  // the table has fCSDANumberOfBins + 1 values; just below fCSDAEnergyMax,
+  // the rounding of x may give the last value: interpolate in the last bin
+  const auto i = std::min(static_cast<size_t>(x),
+                          static_cast<size_t>(fCSDANumberOfBins - 1));
+  const double t = x - static_cast<double>(i);
+  return table[i] + t * (table[i + 1] - table[i]);
+}
+
+void GateTLEDoseActor::BuildCSDATable(threadLocalT &l,
+                                      const G4Material *material) const {
+  // CSDA ranges at fCSDANumberOfBins + 1 energies, log spaced
+  const auto m = material->GetIndex();
+  if (m >= l.fCSDATables.size()) {
+    l.fCSDATables.resize(G4Material::GetNumberOfMaterials());
+  }
+  auto &table = l.fCSDATables[m];
+  table.resize(fCSDANumberOfBins + 1);
+  const double ratio = fCSDAEnergyMax / fCSDAEnergyMin;
+  for (int i = 0; i <= fCSDANumberOfBins; i++) {
+    const double e =
+        fCSDAEnergyMin * std::pow(ratio, double(i) / fCSDANumberOfBins);
+    table[i] = l.fEmCalc->GetCSDARange(e, G4Electron::Definition(), material);
+  }
+}
+
+const GateMuTable *
+GateTLEDoseActor::GetMuTable(threadLocalT &l,
+                             const G4MaterialCutsCouple *couple) const {
+  const auto c = static_cast<size_t>(couple->GetIndex());
+  if (c >= l.fMuTables.size()) {
+    l.fMuTables.resize(c + 1, nullptr);
+  }
+  if (l.fMuTables[c] == nullptr) {
+    l.fMuTables[c] = fMaterialMuHandler->FindMuTable(couple);
+  }
+  return l.fMuTables[c];
+}
+
+G4double GateTLEDoseActor::GetMuEnOverRho(threadLocalT &l,
+                                          const G4MaterialCutsCouple *couple,
+                                          G4double energy) const {
+  if (couple != l.fLastCouple || energy != l.fLastEnergy) {
+    l.fLastCouple = couple;
+    l.fLastEnergy = energy;
+    l.fLastMuEnOverRho = GetMuTable(l, couple)->ComputeMuEnOverRho(energy);
+  }
+  return l.fLastMuEnOverRho;
+}
+
+void GateTLEDoseActor::BeginOfRunAction(const G4Run *run) {
+  GateDoseActor::BeginOfRunAction(run);
+  auto &l = fThreadLocalData.Get();
+  const auto N_voxels = size_edep[0] * size_edep[1] * size_edep[2];
+  l.fEdepBuffer.assign(N_voxels, 0.0);
+  if (fDoseFlag) {
+    l.fDoseBuffer.assign(N_voxels, 0.0);
+  }
+  if (!l.fEmCalc) {
+    l.fEmCalc = std::make_unique<G4EmCalculator>();
+  }
+}
+
+void GateTLEDoseActor::EndOfRunAction(const G4Run *run) {
+  GateDoseActor::EndOfRunAction(run);
+  // FlushLocalImage() is thread-safe because it contains a mutex
+  auto &l = fThreadLocalData.Get();
+  FlushLocalImage(l.fEdepBuffer, cpp_edep_image);
+  if (fDoseFlag) {
+    FlushLocalImage(l.fDoseBuffer, cpp_dose_image);
   }
 }
 
@@ -129,6 +215,9 @@ void GateTLEDoseActor::BeginOfEventAction(const G4Event *event) {
         fMaterialMuHandler =
             GateMaterialMuHandler::GetInstance(fDatabase, 5 * CLHEP::MeV);
       }
+      fMaterialMuHandler->SetCacheDirectory(fMuCacheDirectory);
+      // build the tables now, the threads then only read them
+      fMaterialMuHandler->Initialize();
     }
   }
 
@@ -137,6 +226,18 @@ void GateTLEDoseActor::BeginOfEventAction(const G4Event *event) {
   l.fSecWhichDeposit.clear();
   GateDoseActor::BeginOfEventAction(event);
 }
+int GateTLEDoseActor::GetNumberOfCachedMuTables() const {
+  if (fMaterialMuHandler == nullptr)
+    return 0;
+  return fMaterialMuHandler->fNumberOfCachedTables;
+}
+
+int GateTLEDoseActor::GetNumberOfSimulatedMuTables() const {
+  if (fMaterialMuHandler == nullptr)
+    return 0;
+  return fMaterialMuHandler->fNumberOfSimulatedTables;
+}
+
 void GateTLEDoseActor::PreUserTrackingAction(const G4Track *track) {
   auto &l = fThreadLocalData.Get();
   l.fIsFirstStep = true;
@@ -199,23 +300,13 @@ void GateTLEDoseActor::SteppingAction(G4Step *step) {
       if ((fTLEThresholdType == 0) || (fTLEThresholdType == 1)) {
         auto sec_ekin = energy;
         if (fTLEThresholdType == 1) {
-          mu_en_over_rho = fMaterialMuHandler->GetMuEnOverRho(
-              pre_step->GetMaterialCutsCouple(), energy);
-        }
-
-        if ((energy != l.fPreviousEnergy) ||
-            ((pre_step->GetStepStatus() == 1) &&
-             (currentMat->GetName() != l.fPreviousMatName))) {
-          if (fTLEThresholdType == 1) {
-            mu_over_rho = fMaterialMuHandler->GetMuOverRho(
-                pre_step->GetMaterialCutsCouple(), energy);
-            sec_ekin = energy * mu_en_over_rho / mu_over_rho;
-          }
-          l.fCsda = fEmCalc->GetCSDARange(sec_ekin, G4Electron::Definition(),
-                                          currentMat);
-          l.fPreviousMatName = currentMat->GetName();
-          l.fPreviousEnergy = energy;
+          const auto *couple = pre_step->GetMaterialCutsCouple();
+          mu_en_over_rho = GetMuEnOverRho(l, couple, energy);
+          mu_over_rho = GetMuTable(l, couple)->ComputeMuOverRho(energy);
+          sec_ekin = energy * mu_en_over_rho / mu_over_rho;
         }
+        // table lookup, cheap enough to be done at every step
+        l.fCsda = GetCSDARange(l, sec_ekin, currentMat);
         tleCondition = l.fCsda / CLHEP::mm <= fTLEThreshold;
       }
 
@@ -255,14 +346,9 @@ void GateTLEDoseActor::ScoreTLEDepositStep(G4Step *step) {
   auto weight = step->GetTrack()->GetWeight();
   auto step_length = step->GetStepLength();
   auto density = pre_step->GetMaterial()->GetDensity();
-  G4double mu_en_over_rho;
-  if (fTLEThresholdType != 1) {
-    mu_en_over_rho = fMaterialMuHandler->GetMuEnOverRho(
-        pre_step->GetMaterialCutsCouple(), energy);
-  } else {
-    mu_en_over_rho = fMaterialMuHandler->GetMuEnOverRho(
-        pre_step->GetMaterialCutsCouple(), energy);
-  }
+  auto &l = fThreadLocalData.Get();
+  const G4double mu_en_over_rho =
+      GetMuEnOverRho(l, pre_step->GetMaterialCutsCouple(), energy);
   auto edep = weight * 0.1 * energy * mu_en_over_rho * step_length * density /
               (CLHEP::g / CLHEP::cm3);
 
@@ -279,12 +365,14 @@ void GateTLEDoseActor::ScoreTLEDepositStep(G4Step *step) {
   const auto event_id =
       G4RunManager::GetRunManager()->GetCurrentEvent()->GetEventID();
   if (isInside) {
-    G4AutoLock mutex(&SetPixelTLEMutex); // mutex is bound to the if-scope
+    // thread-local deposits, no lock (merged in EndOfRunAction)
+    const auto index_flat = sub2ind(index);
     if (fDoseFlag) {
-      ImageAddValue<Image3DType>(cpp_dose_image, index, dose);
+      l.fDoseBuffer[index_flat] += dose;
     }
-    ImageAddValue<Image3DType>(cpp_edep_image, index, edep);
+    l.fEdepBuffer[index_flat] += edep;
 
+    // ScoreSquaredValue() is thread-safe because it contains a mutex
     if (fEdepSquaredFlag || fDoseSquaredFlag) {
       if (fEdepSquaredFlag) {
         ScoreSquaredValue(fThreadLocalDataEdep.Get(), cpp_edep_squared_image,
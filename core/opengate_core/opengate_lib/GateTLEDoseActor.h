@@ -12,6 +12,7 @@
 #include "GateMaterialMuHandler.h"
 #include <G4Cache.hh>
 #include <G4EmCalculator.hh>
+#include <memory>
 #include <pybind11/stl.h>
 
 namespace py = pybind11;
@@ -26,8 +27,12 @@ public:
   void InitializeUserInfo(py::dict &user_info) override;
   void InitializeCpp() override;
 
+  void BeginOfRunAction(const G4Run *run) override;
+
   void BeginOfEventAction(const G4Event *event) override;
 
+  void EndOfRunAction(const G4Run *run) override;
+
   void PreUserTrackingAction(const G4Track *track) override;
 
   void SetTLETrackInformationOnSecondaries(G4Step *step, G4bool info,
@@ -37,6 +42,17 @@ public:
 
   G4double FindEkinMaxForTLE();
 
+  inline std::string GetMuCacheDirectory() const { return fMuCacheDirectory; }
+
+  inline void SetMuCacheDirectory(const std::string &dir) {
+    fMuCacheDirectory = dir;
+  }
+
+  // number of mu/mu_en tables loaded from the cache or simulated
+  int GetNumberOfCachedMuTables() const;
+
+  int GetNumberOfSimulatedMuTables() const;
+
   // Main function called every step in attached volume
   void SteppingAction(G4Step *) override;
   void ScoreTLEDepositStep(G4Step *step);
@@ -50,6 +66,9 @@ public:
 
   std::string fDatabase;
 
+  // Persistent cache of the simulated mu/mu_en tables (empty: no cache)
+  std::string fMuCacheDirectory;
+
   G4EmCalculator *fEmCalc = nullptr;
   G4String fStrTLEThresholdType;
   G4int fTLEThresholdType;
@@ -60,12 +79,41 @@ public:
     bool fIsTLESecondary = false;
     bool fIsFirstStep = false;
     G4double fCsda = 0;
-    G4String fPreviousMatName;
-    G4double fPreviousEnergy;
     std::map<G4int, std::vector<G4bool>> fSecWhichDeposit;
+    // TLE deposits of this thread (flat images), merged at the end of run
+    std::vector<double> fEdepBuffer;
+    std::vector<double> fDoseBuffer;
+    // CSDA range of electrons, by material index and energy bin
+    std::unique_ptr<G4EmCalculator> fEmCalc;
+    std::vector<std::vector<double>> fCSDATables;
+    // mu/mu_en tables by material-cuts couple index, and last mu_en value
+    std::vector<const GateMuTable *> fMuTables;
+    const G4MaterialCutsCouple *fLastCouple = nullptr;
+    G4double fLastEnergy = -1;
+    G4double fLastMuEnOverRho = 0;
   };
   G4Cache<threadLocalT> fThreadLocalData;
 
+  // Electron CSDA range from the thread-local table (built on first use for
+  // each material), log-energy interpolation
+  G4double GetCSDARange(threadLocalT &l, G4double energy,
+                        const G4Material *material) const;
+
+  void BuildCSDATable(threadLocalT &l, const G4Material *material) const;
+
+  // mu/mu_en tables without the shared state of GateMaterialMuHandler
+  const GateMuTable *GetMuTable(threadLocalT &l,
+                                const G4MaterialCutsCouple *couple) const;
+
+  G4double GetMuEnOverRho(threadLocalT &l, const G4MaterialCutsCouple *couple,
+                          G4double energy) const;
+
+  // Energy grid of the CSDA tables
+  G4double fCSDAEnergyMin;
+  G4double fCSDAEnergyMax;
+  int fCSDANumberOfBins;
+  G4double fCSDABinsPerLogEnergy;
+
   // Database of mu
   std::shared_ptr<GateMaterialMuHandler> fMaterialMuHandler;
 };
@@ -0,0 +1,45 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include "GateTransformsParameterisation.h"
+#include "GateHelpers.h"
+
+void GateTransformsParameterisation::SetTransforms(
+    py::array_t<double, py::array::c_style | py::array::forcecast> translations,
+    py::array_t<double, py::array::c_style | py::array::forcecast> rotations) {
+  auto const n = translations.shape(0);
+  if (translations.ndim() != 2 || translations.shape(1) != 3)
+    Fatal("GateTransformsParameterisation: translations must be a (n, 3) "
+          "array");
+  if (rotations.ndim() != 3 || rotations.shape(0) != n ||
+      rotations.shape(1) != 3 || rotations.shape(2) != 3)
+    Fatal("GateTransformsParameterisation: rotations must be a (n, 3, 3) "
+          "array with the same n as the translations");
+  auto t = translations.unchecked<2>();
+  auto r = rotations.unchecked<3>();
+  fTranslations.resize(n);
+  fRotations.resize(n);
+  for (py::ssize_t i = 0; i < n; i++) {
+    fTranslations[i] = G4ThreeVector(t(i, 0), t(i, 1), t(i, 2));
+    G4ThreeVector colX(r(i, 0, 0), r(i, 1, 0), r(i, 2, 0));
+    G4ThreeVector colY(r(i, 0, 1), r(i, 1, 1), r(i, 2, 1));
+    G4ThreeVector colZ(r(i, 0, 2), r(i, 1, 2), r(i, 2, 2));
+    // same convention as G4PVPlacement with a G4Transform3D: the physical
+    // volume stores the inverse (frame) rotation
+    fRotations[i] = G4RotationMatrix(colX, colY, colZ).inverse();
+  }
+}
+
+void GateTransformsParameterisation::ComputeTransformation(
+    const G4int no, G4VPhysicalVolume *currentPV) const {
+  currentPV->SetTranslation(fTranslations[no]);
+  currentPV->SetRotation(&fRotations[no]);
+}
+
+std::size_t GateTransformsParameterisation::GetNumberOfTransforms() const {
+  return fTranslations.size();
+}
@@ -0,0 +1,45 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#ifndef GateTransformsParameterisation_h
+#define GateTransformsParameterisation_h
+
+#include <G4RotationMatrix.hh>
+#include <G4ThreeVector.hh>
+#include <G4VPVParameterisation.hh>
+#include <G4VPhysicalVolume.hh>
+#include <pybind11/numpy.h>
+#include <pybind11/pybind11.h>
+
+namespace py = pybind11;
+
+/*
+ * Place the copies of a volume with a list of transforms (one translation and
+ * one rotation per copy). The copy number is the index in the list, like for
+ * the repeated G4PVPlacement volumes.
+ */
+class GateTransformsParameterisation : public G4VPVParameterisation {
+
+public:
+  // translations: (n, 3) array, rotations: (n, 3, 3) array
+  void SetTransforms(
+      py::array_t<double, py::array::c_style | py::array::forcecast>
+          translations,
+      py::array_t<double, py::array::c_style | py::array::forcecast> rotations);
+
+  void ComputeTransformation(const G4int no,
+                             G4VPhysicalVolume *currentPV) const override;
+
+  std::size_t GetNumberOfTransforms() const;
+
+protected:
+  std::vector<G4ThreeVector> fTranslations;
+  // G4VPhysicalVolume::SetRotation requires a non-const pointer
+  mutable std::vector<G4RotationMatrix> fRotations;
+};
+
+#endif // GateTransformsParameterisation_h
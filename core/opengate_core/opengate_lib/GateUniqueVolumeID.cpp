@@ -7,6 +7,7 @@
 
 #include "GateUniqueVolumeID.h"
 #include "GateHelpers.h"
+#include "GateTransformsParameterisation.h"
 #include <G4NavigationHistory.hh>
 #include <G4VPhysicalVolume.hh>
 #include <sstream>
@@ -83,7 +84,9 @@ std::string GateUniqueVolumeID::GetIdUpToDepth(const int depth) const {
 
   // If not, build the string.
   std::ostringstream oss;
-  oss << fTouchable.GetVolume(depth)->GetName() << "-";
+  oss << GetPhysicalVolumeName(fTouchable.GetVolume(depth),
+                               fTouchable.GetReplicaNo(depth))
+      << "-";
   int i = 0;
   const auto id = fArrayID;
   bool appended = false;
@@ -152,5 +155,17 @@ G4VPhysicalVolume *GateUniqueVolumeID::GetTopPhysicalVolume() const {
 
 std::string GateUniqueVolumeID::ComputeStringID(const G4VTouchable *touchable) {
   const auto arrayID = ComputeArrayID(touchable);
-  return touchable->GetVolume()->GetName() + "-" + ArrayIDToStr(arrayID);
+  return GetPhysicalVolumeName(touchable->GetVolume(),
+                               touchable->GetCopyNumber()) +
+         "-" + ArrayIDToStr(arrayID);
+}
+
+std::string
+GateUniqueVolumeID::GetPhysicalVolumeName(const G4VPhysicalVolume *pv,
+                                          const int copy_number) {
+  if (pv->IsParameterised() &&
+      dynamic_cast<const GateTransformsParameterisation *>(
+          pv->GetParameterisation()) != nullptr)
+    return pv->GetName() + "_rep_" + std::to_string(copy_number);
+  return pv->GetName();
 }
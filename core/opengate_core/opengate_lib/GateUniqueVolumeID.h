@@ -57,6 +57,12 @@ public:
 
   static std::string ArrayIDToStr(const IDArrayType &id);
 
+  // Name of a physical volume at a given copy number. The repetitions of a
+  // parameterised repeated volume share one physical volume: they are named
+  // <name>_rep_<copy number>, as the repetitions placed with G4PVPlacement.
+  static std::string GetPhysicalVolumeName(const G4VPhysicalVolume *pv,
+                                           int copy_number);
+
   G4VPhysicalVolume *GetTopPhysicalVolume() const;
 
   // Get the string ID for a given depth (uses an internal cache)
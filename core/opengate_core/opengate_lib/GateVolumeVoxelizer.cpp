@@ -14,32 +14,111 @@
 #if defined(_MSC_VER)
 #pragma warning(pop)
 #endif
-#include <G4Navigator.hh>
+#include <G4AutoLock.hh>
 #include <G4PhysicalVolumeStore.hh>
-#include <itkImageRegionIteratorWithIndex.h>
+#include <G4WorkerThread.hh>
+#include <algorithm>
+#include <atomic>
+#include <mutex>
+#include <thread>
+
+G4Mutex GateVolumeVoxelizerMutex = G4MUTEX_INITIALIZER;
 
 GateVolumeVoxelizer::GateVolumeVoxelizer() { fImage = ImageType::New(); }
 
-void GateVolumeVoxelizer::Voxelize() {
-  // get navigator for world
-  auto pvs = G4PhysicalVolumeStore::GetInstance();
-  auto world = pvs->GetVolume("world");
-  auto nav = new G4Navigator();
-  nav->SetWorldVolume(world);
+G4Navigator *GateVolumeVoxelizer::GetNavigator(size_t thread_index) {
+  // navigators are not thread safe: one per thread, kept for the next calls
+  while (fNavigators.size() <= thread_index) {
+    auto pvs = G4PhysicalVolumeStore::GetInstance();
+    auto world = pvs->GetVolume("world");
+    auto nav = std::make_unique<G4Navigator>();
+    nav->SetWorldVolume(world);
+    fNavigators.push_back(std::move(nav));
+  }
+  return fNavigators[thread_index].get();
+}
+
+void GateVolumeVoxelizer::LocatePoints(
+    size_t n, const std::function<G4ThreeVector(size_t)> &get_point,
+    std::vector<const G4VPhysicalVolume *> &volumes,
+    const std::function<void()> &tick) {
+  volumes.resize(n);
+  const size_t nb_threads =
+      std::max<size_t>(1, std::min<size_t>(fNumberOfThreads, n));
+  // navigators are created before starting the threads
+  for (size_t t = 0; t < nb_threads; t++)
+    GetNavigator(t);
+
+  // contiguous blocks of points (slices for an image), so that consecutive
+  // points are close to each other and the navigator relative search is fast
+  const size_t block = 4096;
+  std::atomic<size_t> next_block{0};
+  auto work = [&](size_t t) {
+    auto nav = fNavigators[t].get();
+    while (true) {
+      const size_t begin = next_block.fetch_add(block);
+      if (begin >= n)
+        break;
+      const size_t end = std::min(n, begin + block);
+      for (size_t i = begin; i < end; i++)
+        volumes[i] = nav->LocateGlobalPointAndSetup(get_point(i));
+      if (tick)
+        tick();
+    }
+  };
+  if (nb_threads == 1) {
+    work(0);
+    return;
+  }
+  // the geometry (logical volumes, replicas, ...) has per thread data that
+  // must be set up for each new thread, as done for the G4 worker threads
+  auto thread_work = [&](size_t t) {
+    {
+      G4AutoLock mutex(&GateVolumeVoxelizerMutex);
+      G4WorkerThread::BuildGeometryAndPhysicsVector();
+    }
+    work(t);
+    {
+      G4AutoLock mutex(&GateVolumeVoxelizerMutex);
+      G4WorkerThread::DestroyGeometryAndPhysicsVector();
+    }
+  };
+  std::vector<std::thread> threads;
+  for (size_t t = 0; t < nb_threads; t++)
+    threads.emplace_back(thread_work, t);
+  for (auto &th : threads)
+    th.join();
+}
 
+int GateVolumeVoxelizer::GetLabel(const G4VPhysicalVolume *phys) {
+  if (phys == nullptr)
+    return 0;
+  const auto it = fVolumeLabels.find(phys);
+  if (it != fVolumeLabels.end())
+    return it->second;
+  const auto &name = phys->GetName();
+  if (fLabels.count(name) == 0) {
+    fLabels[name] = fLabels.size();
+  }
+  const int l = fLabels[name];
+  fVolumeLabels[phys] = l;
+  return l;
+}
+
+void GateVolumeVoxelizer::Voxelize() {
   // init to loop the image
   fImage->FillBuffer(0);
-  auto index = ImageType::IndexType();
   auto point = ImageType::PointType();
 
   // init labels
   fLabels.clear();
+  fVolumeLabels.clear();
   fLabels["world"] = 0;
 
-  // progress bar
+  // progress bar (one tick per block of points)
   using namespace indicators;
-  int interval = 1000;
-  auto n = fImage->GetLargestPossibleRegion().GetNumberOfPixels() / interval;
+  const auto region = fImage->GetLargestPossibleRegion();
+  const size_t n = region.GetNumberOfPixels();
   ProgressBar bar{option::BarWidth{50},
                   option::Start{""},
                   option::Fill{"■"},
@@ -47,40 +126,57 @@ void GateVolumeVoxelizer::Voxelize() {
                   option::End{""},
                   option::ShowElapsedTime{true},
                   option::ShowRemainingTime{true},
-                  option::MaxProgress{n}};
+                  option::MaxProgress{n / 4096 + 1}};
+  std::mutex bar_mutex;
+  std::function<void()> tick;
+  if (fProgressBar) {
+    tick = [&]() {
+      std::lock_guard<std::mutex> lock(bar_mutex);
+      bar.tick();
+    };
+  }
 
   // Find isocenter
   fIndexIsoCenter = GateVolumeVoxelizer::ContinuousIndexType();
   point[0] = 0;
   point[1] = 0;
-  point[3] = 0;
+  point[2] = 0;
   fImage->TransformPhysicalPointToContinuousIndex(point, fIndexIsoCenter);
 
-  // main loop
-  using IteratorType = itk::ImageRegionIteratorWithIndex<ImageType>;
-  IteratorType outputIt(fImage, fImage->GetRequestedRegion());
-  outputIt.GoToBegin();
-  int i = 0;
-  indicators::show_console_cursor(false);
-  while (!outputIt.IsAtEnd()) {
-    index = outputIt.GetIndex();
-    fImage->TransformIndexToPhysicalPoint(index, point);
-    G4ThreeVector p = {point[0], point[1], point[2]};
-    auto phys = nav->LocateGlobalPointAndSetup(p);
-    if (phys != nullptr) {
-      auto name = phys->GetName();
-      if (fLabels.count(name) == 0) {
-        fLabels[name] = fLabels.size();
-      }
-      ImageType::PixelType l = fLabels[name];
-      outputIt.Set(l);
-    }
-    ++outputIt;
-    ++i;
-    if (i == interval) {
-      bar.tick(); // very slow if too often
-      i = 0;
-    }
-  }
-  indicators::show_console_cursor(true);
+  // locate all the voxel centers (in parallel)
+  const auto size = region.GetSize();
+  const auto start = region.GetIndex();
+  auto get_point = [&](size_t i) {
+    ImageType::IndexType index;
+    index[0] = start[0] + i % size[0];
+    index[1] = start[1] + (i / size[0]) % size[1];
+    index[2] = start[2] + i / (size[0] * size[1]);
+    ImageType::PointType p;
+    fImage->TransformIndexToPhysicalPoint(index, p);
+    return G4ThreeVector(p[0], p[1], p[2]);
+  };
+  std::vector<const G4VPhysicalVolume *> volumes;
+  if (fProgressBar)
+    indicators::show_console_cursor(false);
+  LocatePoints(n, get_point, volumes, tick);
+  if (fProgressBar)
+    indicators::show_console_cursor(true);
+
+  // labels, in the order of the voxels (independent of the threads)
+  auto buffer = fImage->GetBufferPointer();
+  for (size_t i = 0; i < n; i++)
+    buffer[i] = static_cast<ImageType::PixelType>(GetLabel(volumes[i]));
+}
+
+std::vector<int>
+GateVolumeVoxelizer::ClassifyPoints(const std::vector<G4ThreeVector> &points) {
+  if (fLabels.empty())
+    fLabels["world"] = 0;
+  std::vector<const G4VPhysicalVolume *> volumes;
+  LocatePoints(
+      points.size(), [&](size_t i) { return points[i]; }, volumes, nullptr);
+  std::vector<int> labels(points.size());
+  for (size_t i = 0; i < points.size(); i++)
+    labels[i] = GetLabel(volumes[i]);
+  return labels;
 }
@@ -8,7 +8,25 @@
 #ifndef GateVolumeVoxelizer_h
 #define GateVolumeVoxelizer_h
 
+#include <G4Navigator.hh>
+#include <G4ThreeVector.hh>
+#include <functional>
 #include <itkImage.h>
+#include <map>
+#include <memory>
+#include <vector>
+
+/*
+ * Label the voxels of an image (or a list of points) with the physical
+ * volume found at their position in the (initialized) geometry.
+ *
+ * The navigators (one per thread) are created on first use and reused for
+ * all the following calls, so several images (spacing, extent) or batches
+ * of points can be processed with the same instance. The image is split in
+ * slices processed by fNumberOfThreads threads. Labels are assigned in the
+ * order of the voxels, like with a single thread, so the result does not
+ * depend on the number of threads.
+ */
 
 class GateVolumeVoxelizer {
 public:
@@ -20,8 +38,28 @@ public:
 
   void Voxelize();
 
+  // Label of the volume at each point (labels are added to fLabels)
+  std::vector<int> ClassifyPoints(const std::vector<G4ThreeVector> &points);
+
   std::map<std::string, unsigned char> fLabels;
   ContinuousIndexType fIndexIsoCenter;
+  int fNumberOfThreads = 1;
+  bool fProgressBar = true;
+
+protected:
+  G4Navigator *GetNavigator(size_t thread_index);
+
+  // find the physical volume at each point, in parallel
+  void LocatePoints(size_t n,
+                    const std::function<G4ThreeVector(size_t)> &get_point,
+                    std::vector<const G4VPhysicalVolume *> &volumes,
+                    const std::function<void()> &tick);
+
+  int GetLabel(const G4VPhysicalVolume *phys);
+
+  std::vector<std::unique_ptr<G4Navigator>> fNavigators;
+  // cache of the label of each physical volume
+  std::map<const G4VPhysicalVolume *, int> fVolumeLabels;
 };
 
 #endif // GateVolumeVoxelizer_h
@@ -0,0 +1,76 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include "GateVoxelAliasSampler.h"
+#include "GateHelpers.h"
+#include <limits>
+
+template <class T>
+void GateVoxelAliasSampler::Build(const T *weights, size_t nz, size_t ny,
+                                  size_t nx) {
+  fSize[0] = nz;
+  fSize[1] = ny;
+  fSize[2] = nx;
+  const size_t n = nz * ny * nx;
+  if (n > std::numeric_limits<uint32_t>::max()) {
+    Fatal("GateVoxelAliasSampler: the image has too many voxels (max 2^32)");
+  }
+
+  // non-zero voxels and total weight
+  fVoxelIndices.clear();
+  fTotalWeight = 0;
+  for (size_t v = 0; v < n; v++) {
+    if (weights[v] < 0) {
+      Fatal("GateVoxelAliasSampler: negative value in the image");
+    }
+    if (weights[v] > 0) {
+      fVoxelIndices.push_back(static_cast<uint32_t>(v));
+      fTotalWeight += static_cast<double>(weights[v]);
+    }
+  }
+  fVoxelIndices.shrink_to_fit();
+  const size_t m = fVoxelIndices.size();
+  if (m == 0) {
+    Fatal("GateVoxelAliasSampler: the image only contains zeros");
+  }
+
+  // Vose alias method: scaled probabilities (mean is 1), then each 'small'
+  // entry is completed by one 'large' entry (its alias)
+  std::vector<double> p(m);
+  std::vector<uint32_t> small;
+  std::vector<uint32_t> large;
+  for (size_t i = 0; i < m; i++) {
+    p[i] = static_cast<double>(weights[fVoxelIndices[i]]) *
+           static_cast<double>(m) / fTotalWeight;
+    if (p[i] < 1.0)
+      small.push_back(static_cast<uint32_t>(i));
+    else
+      large.push_back(static_cast<uint32_t>(i));
+  }
+  fProbabilities.assign(m, 1.0f);
+  fAliases.resize(m);
+  for (size_t i = 0; i < m; i++)
+    fAliases[i] = static_cast<uint32_t>(i);
+  while (!small.empty() && !large.empty()) {
+    const auto s = small.back();
+    small.pop_back();
+    const auto l = large.back();
+    fProbabilities[s] = static_cast<float>(p[s]);
+    fAliases[s] = l;
+    p[l] = (p[l] + p[s]) - 1.0;
+    if (p[l] < 1.0) {
+      large.pop_back();
+      small.push_back(l);
+    }
+  }
+  // remaining entries (numerical rounding) keep a probability of 1
+}
+
+template void GateVoxelAliasSampler::Build<float>(const float *, size_t, size_t,
+                                                  size_t);
+template void GateVoxelAliasSampler::Build<double>(const double *, size_t,
+                                                   size_t, size_t);
@@ -0,0 +1,77 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#ifndef GateVoxelAliasSampler_h
+#define GateVoxelAliasSampler_h
+
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+/*
+ * Walker alias table over the non-zero voxels of a 3D weight image
+ * (e.g. an activity map), to sample a voxel in O(1) with a single random
+ * number.
+ *
+ * - flat contiguous storage: 12 bytes per non-zero voxel, zero voxels are not
+ *   stored at all
+ * - built once (Vose algorithm, O(n)), then read-only: the same sampler is
+ *   shared by all the threads
+ * - the weights are in numpy order (Z, Y, X), the voxel index returned is the
+ *   flat index k + nx * (j + ny * i)
+ */
+
+class GateVoxelAliasSampler {
+public:
+  GateVoxelAliasSampler() = default;
+
+  template <class T>
+  void Build(const T *weights, size_t nz, size_t ny, size_t nx);
+
+  // u in [0, 1[, return the flat index of the voxel
+  inline size_t Sample(double u) const {
+    const double x = u * static_cast<double>(fProbabilities.size());
+    auto i = static_cast<size_t>(x);
+    if (i >= fProbabilities.size()) // u == 1 in floating point
+      i = fProbabilities.size() - 1;
+    if (x - static_cast<double>(i) >= fProbabilities[i])
+      i = fAliases[i];
+    return fVoxelIndices[i];
+  }
+
+  // flat index to (i, j, k) = (z, y, x) voxel index
+  inline void GetVoxelIndex(size_t index, size_t &i, size_t &j,
+                            size_t &k) const {
+    k = index % fSize[2];
+    index /= fSize[2];
+    j = index % fSize[1];
+    i = index / fSize[1];
+  }
+
+  size_t GetNumberOfNonZeroVoxels() const { return fVoxelIndices.size(); }
+
+  size_t GetNumberOfVoxels() const { return fSize[0] * fSize[1] * fSize[2]; }
+
+  // total weight of the image
+  double GetTotalWeight() const { return fTotalWeight; }
+
+  // memory used by the table (bytes)
+  size_t GetMemorySize() const {
+    return fVoxelIndices.size() * sizeof(uint32_t) +
+           fAliases.size() * sizeof(uint32_t) +
+           fProbabilities.size() * sizeof(float);
+  }
+
+protected:
+  size_t fSize[3] = {0, 0, 0};
+  double fTotalWeight = 0;
+  std::vector<uint32_t> fVoxelIndices;
+  std::vector<uint32_t> fAliases;
+  std::vector<float> fProbabilities;
+};
+
+#endif // GateVoxelAliasSampler_h
@@ -23,6 +23,8 @@
 #include <itkCastImageFilter.h>
 #include <itkImageRegionIterator.h>
 
+G4Mutex GateVoxelizedPromptGammaAnalogActorMutex = G4MUTEX_INITIALIZER;
+
 // #include <G4ProtonInelasticProcess.hh>
 
 GateVoxelizedPromptGammaAnalogActor::GateVoxelizedPromptGammaAnalogActor(
@@ -56,23 +58,29 @@ void GateVoxelizedPromptGammaAnalogActor::InitializeUserInfo(
   fTranslation = DictGetG4ThreeVector(user_info, "translation");
   fsize = DictGetG4ThreeVector(user_info, "size");
   fspacing = DictGetG4ThreeVector(user_info, "spacing");
+  fSparseOutput = DictGetBool(user_info, "sparse_output");
 }
 
 void GateVoxelizedPromptGammaAnalogActor::InitializeCpp() {
   GateVActor::InitializeCpp();
   // Create the image pointers
   // (the size and allocation will be performed on the py side)
-  if (fProtonTimeFlag) {
-    cpp_tof_proton_image = ImageType::New();
-  }
-  if (fProtonEnergyFlag) {
-    cpp_E_proton_image = ImageType::New();
-  }
-  if (fNeutronEnergyFlag) {
-    cpp_E_neutron_image = ImageType::New();
-  }
-  if (fNeutronTimeFlag) {
-    cpp_tof_neutron_image = ImageType::New();
+  if (fSparseOutput) {
+    ConfigureSparse(cpp_tof_proton_sparse, cpp_E_proton_sparse,
+                    cpp_E_neutron_sparse, cpp_tof_neutron_sparse);
+  } else {
+    if (fProtonTimeFlag) {
+      cpp_tof_proton_image = ImageType::New();
+    }
+    if (fProtonEnergyFlag) {
+      cpp_E_proton_image = ImageType::New();
+    }
+    if (fNeutronEnergyFlag) {
+      cpp_E_neutron_image = ImageType::New();
+    }
+    if (fNeutronTimeFlag) {
+      cpp_tof_neutron_image = ImageType::New();
+    }
   }
 
   // Construction of the 3D image with the same shape/mat that the voxel of the
@@ -105,27 +113,53 @@ void GateVoxelizedPromptGammaAnalogActor::BeginOfRunActionMasterThread(
     int run_id) {
   // Attach the 3D volume used to
   // Fill the 4D volume of interest with 0 to ensure that it is well initiated
-  if (fProtonTimeFlag) {
-    cpp_tof_proton_image->FillBuffer(0);
-  }
-  if (fProtonEnergyFlag) {
-    cpp_E_proton_image->FillBuffer(0);
-  }
-  if (fNeutronEnergyFlag) {
-    cpp_E_neutron_image->FillBuffer(0);
-  }
-  if (fNeutronTimeFlag) {
-    cpp_tof_neutron_image->FillBuffer(0);
+  if (fSparseOutput) {
+    cpp_tof_proton_sparse.Clear();
+    cpp_E_proton_sparse.Clear();
+    cpp_E_neutron_sparse.Clear();
+    cpp_tof_neutron_sparse.Clear();
+  } else {
+    if (fProtonTimeFlag) {
+      cpp_tof_proton_image->FillBuffer(0);
+    }
+    if (fProtonEnergyFlag) {
+      cpp_E_proton_image->FillBuffer(0);
+    }
+    if (fNeutronEnergyFlag) {
+      cpp_E_neutron_image->FillBuffer(0);
+    }
+    if (fNeutronTimeFlag) {
+      cpp_tof_neutron_image->FillBuffer(0);
+    }
   }
+  incidentParticles = 0;
   AttachImageToVolume<Image3DType>(volume, fPhysicalVolumeName, fTranslation);
 }
 
-void GateVoxelizedPromptGammaAnalogActor::BeginOfRunAction(const G4Run *run) {}
+void GateVoxelizedPromptGammaAnalogActor::BeginOfRunAction(const G4Run *run) {
+  auto &l = fThreadLocalData.Get();
+  l.fNumberOfEvents = 0;
+  if (fSparseOutput) {
+    ConfigureSparse(l.fTofProton, l.fEProton, l.fENeutron, l.fTofNeutron);
+    return;
+  }
+  // the dense images are filled per thread, without lock, and added to the
+  // shared images at the end of the run
+  if (fProtonTimeFlag)
+    l.fTofProtonImage = CreateThreadLocalImage(cpp_tof_proton_image);
+  if (fProtonEnergyFlag)
+    l.fEProtonImage = CreateThreadLocalImage(cpp_E_proton_image);
+  if (fNeutronEnergyFlag)
+    l.fENeutronImage = CreateThreadLocalImage(cpp_E_neutron_image);
+  if (fNeutronTimeFlag)
+    l.fTofNeutronImage = CreateThreadLocalImage(cpp_tof_neutron_image);
+}
 
 void GateVoxelizedPromptGammaAnalogActor::BeginOfEventAction(
     const G4Event *event) {
-  T0 = event->GetPrimaryVertex()->GetT0();
-  incidentParticles++;
+  auto &l = fThreadLocalData.Get();
+  l.fT0 = event->GetPrimaryVertex()->GetT0();
+  l.fNumberOfEvents++;
 }
 
 void GateVoxelizedPromptGammaAnalogActor::SteppingAction(G4Step *step) {
@@ -187,7 +221,8 @@ void GateVoxelizedPromptGammaAnalogActor::SteppingAction(G4Step *step) {
       // G4double randomtime = G4UniformRand();
       // G4double pretime = step->GetPreStepPoint()->GetGlobalTime()- T0; //ns
       // G4double posttime = step->GetPostStepPoint()->GetGlobalTime()- T0;//ns
-      G4double time = secondary->GetGlobalTime() - T0; // ns
+      G4double time =
+          secondary->GetGlobalTime() - fThreadLocalData.Get().fT0; // ns
 
       // Get the voxel index (fourth dim) corresponding to the time of flight
       G4int bin = static_cast<int>(
@@ -201,12 +236,14 @@ void GateVoxelizedPromptGammaAnalogActor::SteppingAction(G4Step *step) {
       if (fProtonTimeFlag &&
           step->GetTrack()->GetParticleDefinition()->GetParticleName() ==
               "proton") {
-        ImageAddValue<ImageType>(cpp_tof_proton_image, ind, 1);
+        AddValue(&threadLocalT::fTofProtonImage, &threadLocalT::fTofProton, ind,
+                 1);
       }
       if (fNeutronTimeFlag &&
           step->GetTrack()->GetParticleDefinition()->GetParticleName() ==
               "neutron") {
-        ImageAddValue<ImageType>(cpp_tof_neutron_image, ind, 1);
+        AddValue(&threadLocalT::fTofNeutronImage, &threadLocalT::fTofNeutron,
+                 ind, 1);
       }
     }
     if (fProtonEnergyFlag ||
@@ -226,57 +263,127 @@ void GateVoxelizedPromptGammaAnalogActor::SteppingAction(G4Step *step) {
       if (fProtonEnergyFlag &&
           step->GetTrack()->GetParticleDefinition()->GetParticleName() ==
               "proton") {
-        ImageAddValue<ImageType>(cpp_E_proton_image, ind, 1);
+        AddValue(&threadLocalT::fEProtonImage, &threadLocalT::fEProton, ind, 1);
       }
       if (fNeutronEnergyFlag &&
           step->GetTrack()->GetParticleDefinition()->GetParticleName() ==
               "neutron") {
-        ImageAddValue<ImageType>(cpp_E_neutron_image, ind, 1);
+        AddValue(&threadLocalT::fENeutronImage, &threadLocalT::fENeutron, ind,
+                 1);
       }
     }
   }
 }
 
 void GateVoxelizedPromptGammaAnalogActor::EndOfRunAction(const G4Run *run) {
+  // merge the thread local histograms and number of events, the scaling is
+  // done by the master once all threads are merged
+  G4AutoLock mutex(&GateVoxelizedPromptGammaAnalogActorMutex);
+  auto &l = fThreadLocalData.Get();
+  incidentParticles += l.fNumberOfEvents;
+  if (fSparseOutput) {
+    cpp_tof_proton_sparse.Merge(l.fTofProton);
+    cpp_E_proton_sparse.Merge(l.fEProton);
+    cpp_E_neutron_sparse.Merge(l.fENeutron);
+    cpp_tof_neutron_sparse.Merge(l.fTofNeutron);
+  } else {
+    if (fProtonTimeFlag)
+      MergeImage(cpp_tof_proton_image, l.fTofProtonImage);
+    if (fProtonEnergyFlag)
+      MergeImage(cpp_E_proton_image, l.fEProtonImage);
+    if (fNeutronEnergyFlag)
+      MergeImage(cpp_E_neutron_image, l.fENeutronImage);
+    if (fNeutronTimeFlag)
+      MergeImage(cpp_tof_neutron_image, l.fTofNeutronImage);
+  }
+}
+
+int GateVoxelizedPromptGammaAnalogActor::EndOfRunActionMasterThread(
+    int run_id) {
+  // scale the histograms with the number of incident particles (= number of
+  // events of the run, all threads), the same way for the dense and sparse
+  // outputs
   if (incidentParticles == 0) {
     std::cerr << "Error: incidentParticles is zero. Skipping scaling."
               << std::endl;
-    return;
+    return 0;
   }
-  // scaling all the 4D voxels with th enumber of incident protons (= number of
-  // event)
-  if (fProtonTimeFlag) {
-    itk::ImageRegionIterator<ImageType> it(
-        cpp_tof_proton_image, cpp_tof_proton_image->GetLargestPossibleRegion());
-    for (it.GoToBegin(); !it.IsAtEnd(); ++it) {
-      it.Set(it.Get() / incidentParticles);
-    }
-  }
-  if (fProtonEnergyFlag) {
-    itk::ImageRegionIterator<ImageType> it(
-        cpp_E_proton_image, cpp_E_proton_image->GetLargestPossibleRegion());
-    for (it.GoToBegin(); !it.IsAtEnd(); ++it) {
-      it.Set(it.Get() / incidentParticles);
-    }
+  const double f = 1.0 / static_cast<double>(incidentParticles);
+  if (fSparseOutput) {
+    cpp_tof_proton_sparse.Scale(f);
+    cpp_E_proton_sparse.Scale(f);
+    cpp_E_neutron_sparse.Scale(f);
+    cpp_tof_neutron_sparse.Scale(f);
+    return 0;
   }
-  if (fNeutronEnergyFlag) {
-    itk::ImageRegionIterator<ImageType> it(
-        cpp_E_neutron_image, cpp_E_neutron_image->GetLargestPossibleRegion());
-    for (it.GoToBegin(); !it.IsAtEnd(); ++it) {
-      it.Set(it.Get() / incidentParticles);
-    }
+  if (fProtonTimeFlag)
+    ScaleImage(cpp_tof_proton_image, f);
+  if (fProtonEnergyFlag)
+    ScaleImage(cpp_E_proton_image, f);
+  if (fNeutronEnergyFlag)
+    ScaleImage(cpp_E_neutron_image, f);
+  if (fNeutronTimeFlag)
+    ScaleImage(cpp_tof_neutron_image, f);
+  return 0;
+}
+
+void GateVoxelizedPromptGammaAnalogActor::ScaleImage(ImageType::Pointer &image,
+                                                     double f) {
+  itk::ImageRegionIterator<ImageType> it(image,
+                                         image->GetLargestPossibleRegion());
+  for (it.GoToBegin(); !it.IsAtEnd(); ++it) {
+    it.Set(it.Get() * f);
   }
-  if (fNeutronTimeFlag) {
-    itk::ImageRegionIterator<ImageType> it(
-        cpp_tof_neutron_image,
-        cpp_tof_neutron_image->GetLargestPossibleRegion());
-    for (it.GoToBegin(); !it.IsAtEnd(); ++it) {
-      it.Set(it.Get() / incidentParticles);
-    }
+}
+
+GateVoxelizedPromptGammaAnalogActor::ImageType::Pointer
+GateVoxelizedPromptGammaAnalogActor::CreateThreadLocalImage(
+    ImageType::Pointer &image) {
+  if (!G4Threading::IsMultithreadedApplication())
+    return image;
+  auto local_image = ImageType::New();
+  local_image->SetRegions(image->GetLargestPossibleRegion());
+  local_image->SetSpacing(image->GetSpacing());
+  local_image->SetOrigin(image->GetOrigin());
+  local_image->SetDirection(image->GetDirection());
+  local_image->Allocate();
+  local_image->FillBuffer(0);
+  return local_image;
+}
+
+void GateVoxelizedPromptGammaAnalogActor::MergeImage(
+    ImageType::Pointer &image, ImageType::Pointer &local_image) {
+  if (local_image == image)
+    return;
+  itk::ImageRegionIterator<ImageType> it(image,
+                                         image->GetLargestPossibleRegion());
+  itk::ImageRegionConstIterator<ImageType> lit(
+      local_image, local_image->GetLargestPossibleRegion());
+  for (it.GoToBegin(), lit.GoToBegin(); !it.IsAtEnd(); ++it, ++lit) {
+    it.Set(it.Get() + lit.Get());
   }
+  local_image = nullptr;
 }
 
-int GateVoxelizedPromptGammaAnalogActor::EndOfRunActionMasterThread(
-    int run_id) {
-  return 0;
+void GateVoxelizedPromptGammaAnalogActor::AddValue(
+    ImageType::Pointer threadLocalT::*dense,
+    GateSparseHistogramImage threadLocalT::*sparse,
+    const ImageType::IndexType &ind, double value) {
+  auto &l = fThreadLocalData.Get();
+  if (fSparseOutput)
+    (l.*sparse).AddValue(ind[0], ind[1], ind[2], static_cast<int>(ind[3]),
+                         value);
+  else
+    ImageAddValue<ImageType>(l.*dense, ind, value);
+}
+
+void GateVoxelizedPromptGammaAnalogActor::ConfigureSparse(
+    GateSparseHistogramImage &tof_proton, GateSparseHistogramImage &E_proton,
+    GateSparseHistogramImage &E_neutron,
+    GateSparseHistogramImage &tof_neutron) const {
+  // one more bin for the overflow, as for the dense images
+  tof_proton.Configure(fsize, timebins + 1);
+  E_proton.Configure(fsize, energybins + 1);
+  E_neutron.Configure(fsize, energybins + 1);
+  tof_neutron.Configure(fsize, timebins + 1);
 }
@@ -19,6 +19,8 @@
 #include <itkImageRegionIterator.h>
 #include <vector>
 
+G4Mutex GateVoxelizedPromptGammaTLEActorMutex = G4MUTEX_INITIALIZER;
+
 GateVoxelizedPromptGammaTLEActor::GateVoxelizedPromptGammaTLEActor(
     py::dict &user_info)
     : GateVActor(user_info, true) {
@@ -42,23 +44,29 @@ void GateVoxelizedPromptGammaTLEActor::InitializeUserInfo(py::dict &user_info) {
   fTranslation = DictGetG4ThreeVector(user_info, "translation");
   fsize = DictGetG4ThreeVector(user_info, "size");
   fspacing = DictGetG4ThreeVector(user_info, "spacing");
+  fSparseOutput = DictGetBool(user_info, "sparse_output");
 }
 
 void GateVoxelizedPromptGammaTLEActor::InitializeCpp() {
   GateVActor::InitializeCpp();
   // Create the image pointers
   // (the size and allocation will be performed on the py side)
-  if (fProtonTimeFlag) {
-    cpp_tof_proton_image = ImageType::New();
-  }
-  if (fProtonEnergyFlag) {
-    cpp_E_proton_image = ImageType::New();
-  }
-  if (fNeutronEnergyFlag) {
-    cpp_E_neutron_image = ImageType::New();
-  }
-  if (fNeutronTimeFlag) {
-    cpp_tof_neutron_image = ImageType::New();
+  if (fSparseOutput) {
+    ConfigureSparse(cpp_tof_proton_sparse, cpp_E_proton_sparse,
+                    cpp_E_neutron_sparse, cpp_tof_neutron_sparse);
+  } else {
+    if (fProtonTimeFlag) {
+      cpp_tof_proton_image = ImageType::New();
+    }
+    if (fProtonEnergyFlag) {
+      cpp_E_proton_image = ImageType::New();
+    }
+    if (fNeutronEnergyFlag) {
+      cpp_E_neutron_image = ImageType::New();
+    }
+    if (fNeutronTimeFlag) {
+      cpp_tof_neutron_image = ImageType::New();
+    }
   }
 
   // Construction of the 3D image with the same shape/mat that the voxel of the
@@ -92,28 +100,54 @@ void GateVoxelizedPromptGammaTLEActor::BeginOfRunActionMasterThread(
   // Attach the 3D volume used to
 
   // Fill the 4D volume of interest with 0 to ensure that it is well initiated
-  if (fProtonTimeFlag) {
-    cpp_tof_proton_image->FillBuffer(0);
-  }
-  if (fProtonEnergyFlag) {
-    cpp_E_proton_image->FillBuffer(0);
-  }
-  if (fNeutronEnergyFlag) {
-    cpp_E_neutron_image->FillBuffer(0);
-  }
-  if (fNeutronTimeFlag) {
-    cpp_tof_neutron_image->FillBuffer(0);
+  if (fSparseOutput) {
+    cpp_tof_proton_sparse.Clear();
+    cpp_E_proton_sparse.Clear();
+    cpp_E_neutron_sparse.Clear();
+    cpp_tof_neutron_sparse.Clear();
+  } else {
+    if (fProtonTimeFlag) {
+      cpp_tof_proton_image->FillBuffer(0);
+    }
+    if (fProtonEnergyFlag) {
+      cpp_E_proton_image->FillBuffer(0);
+    }
+    if (fNeutronEnergyFlag) {
+      cpp_E_neutron_image->FillBuffer(0);
+    }
+    if (fNeutronTimeFlag) {
+      cpp_tof_neutron_image->FillBuffer(0);
+    }
   }
+  incidentParticles = 0;
   AttachImageToVolume<Image3DType>(volume, fPhysicalVolumeName, fTranslation);
 }
 
-void GateVoxelizedPromptGammaTLEActor::BeginOfRunAction(const G4Run *run) {}
+void GateVoxelizedPromptGammaTLEActor::BeginOfRunAction(const G4Run *run) {
+  auto &l = fThreadLocalData.Get();
+  l.fNumberOfEvents = 0;
+  if (fSparseOutput) {
+    ConfigureSparse(l.fTofProton, l.fEProton, l.fENeutron, l.fTofNeutron);
+    return;
+  }
+  // the dense images are filled per thread, without lock, and added to the
+  // shared images at the end of the run
+  if (fProtonTimeFlag)
+    l.fTofProtonImage = CreateThreadLocalImage(cpp_tof_proton_image);
+  if (fProtonEnergyFlag)
+    l.fEProtonImage = CreateThreadLocalImage(cpp_E_proton_image);
+  if (fNeutronEnergyFlag)
+    l.fENeutronImage = CreateThreadLocalImage(cpp_E_neutron_image);
+  if (fNeutronTimeFlag)
+    l.fTofNeutronImage = CreateThreadLocalImage(cpp_tof_neutron_image);
+}
 
 void GateVoxelizedPromptGammaTLEActor::BeginOfEventAction(
 
     const G4Event *event) {
-  T0 = event->GetPrimaryVertex()->GetT0();
-  incidentParticles++;
+  auto &l = fThreadLocalData.Get();
+  l.fT0 = event->GetPrimaryVertex()->GetT0();
+  l.fNumberOfEvents++;
 }
 
 void GateVoxelizedPromptGammaTLEActor::SteppingAction(G4Step *step) {
@@ -177,6 +211,7 @@ void GateVoxelizedPromptGammaTLEActor::SteppingAction(G4Step *step) {
   if ((fProtonTimeFlag) ||
       (fNeutronTimeFlag)) { // If the quantity of interest is the time of flight
     // Get the time of flight
+    const G4double T0 = fThreadLocalData.Get().fT0;
     const G4double &randomtime = G4UniformRand();
     const G4double &pretime =
         step->GetPreStepPoint()->GetGlobalTime() - T0; // ns
@@ -198,14 +233,15 @@ void GateVoxelizedPromptGammaTLEActor::SteppingAction(G4Step *step) {
       if (weight) {
         pg_sum = fProtonVector[binE];
       }
-      ImageAddValue<ImageType>(cpp_tof_proton_image, ind, pg_sum * l * rho * w);
+      AddValue(&threadLocalT::fTofProtonImage, &threadLocalT::fTofProton, ind,
+               pg_sum * l * rho * w);
     }
     if (fNeutronTimeFlag && particle == G4Neutron::Neutron()) {
       if (weight) {
         pg_sum = fProtonVector[binE];
       }
-      ImageAddValue<ImageType>(cpp_tof_neutron_image, ind,
-                               pg_sum * l * rho * w);
+      AddValue(&threadLocalT::fTofNeutronImage, &threadLocalT::fTofNeutron, ind,
+               pg_sum * l * rho * w);
     }
   }
   if (fProtonEnergyFlag ||
@@ -213,56 +249,126 @@ void GateVoxelizedPromptGammaTLEActor::SteppingAction(G4Step *step) {
     ind[3] = binE;
     // Store the value in the volume for neutrons OR protons -> LEFT BINNING
     if (fProtonEnergyFlag && particle == G4Proton::Proton()) {
-      ImageAddValue<ImageType>(cpp_E_proton_image, ind, l * rho * w);
+      AddValue(&threadLocalT::fEProtonImage, &threadLocalT::fEProton, ind,
+               l * rho * w);
     }
     if (fNeutronEnergyFlag && particle == G4Neutron::Neutron()) {
-      ImageAddValue<ImageType>(cpp_E_neutron_image, ind, l * rho * w);
+      AddValue(&threadLocalT::fENeutronImage, &threadLocalT::fENeutron, ind,
+               l * rho * w);
     }
   }
 }
 
 void GateVoxelizedPromptGammaTLEActor::EndOfRunAction(const G4Run *run) {
-  // std::cout << "incident particles : " << incidentParticles << std::endl;
+  // merge the thread local histograms and number of events, the scaling is
+  // done by the master once all threads are merged
+  G4AutoLock mutex(&GateVoxelizedPromptGammaTLEActorMutex);
+  auto &l = fThreadLocalData.Get();
+  incidentParticles += l.fNumberOfEvents;
+  if (fSparseOutput) {
+    cpp_tof_proton_sparse.Merge(l.fTofProton);
+    cpp_E_proton_sparse.Merge(l.fEProton);
+    cpp_E_neutron_sparse.Merge(l.fENeutron);
+    cpp_tof_neutron_sparse.Merge(l.fTofNeutron);
+  } else {
+    if (fProtonTimeFlag)
+      MergeImage(cpp_tof_proton_image, l.fTofProtonImage);
+    if (fProtonEnergyFlag)
+      MergeImage(cpp_E_proton_image, l.fEProtonImage);
+    if (fNeutronEnergyFlag)
+      MergeImage(cpp_E_neutron_image, l.fENeutronImage);
+    if (fNeutronTimeFlag)
+      MergeImage(cpp_tof_neutron_image, l.fTofNeutronImage);
+  }
+}
+
+int GateVoxelizedPromptGammaTLEActor::EndOfRunActionMasterThread(int run_id) {
+  // scale the histograms with the number of incident particles (= number of
+  // events of the run, all threads), the same way for the dense and sparse
+  // outputs
   if (incidentParticles == 0) {
     std::cerr << "Error: incidentParticles is zero. Skipping scaling."
               << std::endl;
-    return;
-  }
-  // scaling all the 4D voxels with th enumber of incident protons (= number of
-  // event)
-  if (fProtonTimeFlag) {
-    itk::ImageRegionIterator<ImageType> it(
-        cpp_tof_proton_image, cpp_tof_proton_image->GetLargestPossibleRegion());
-    for (it.GoToBegin(); !it.IsAtEnd(); ++it) {
-      it.Set(it.Get() / incidentParticles);
-    }
+    return 0;
   }
-  if (fProtonEnergyFlag) {
-    itk::ImageRegionIterator<ImageType> it(
-        cpp_E_proton_image, cpp_E_proton_image->GetLargestPossibleRegion());
-    for (it.GoToBegin(); !it.IsAtEnd(); ++it) {
-      it.Set(it.Get() / incidentParticles);
-    }
+  const double f = 1.0 / static_cast<double>(incidentParticles);
+  if (fSparseOutput) {
+    cpp_tof_proton_sparse.Scale(f);
+    cpp_E_proton_sparse.Scale(f);
+    cpp_E_neutron_sparse.Scale(f);
+    cpp_tof_neutron_sparse.Scale(f);
+    return 0;
   }
-  if (fNeutronEnergyFlag) {
-    itk::ImageRegionIterator<ImageType> it(
-        cpp_E_neutron_image, cpp_E_neutron_image->GetLargestPossibleRegion());
-    for (it.GoToBegin(); !it.IsAtEnd(); ++it) {
-      it.Set(it.Get() / incidentParticles);
-    }
+  if (fProtonTimeFlag)
+    ScaleImage(cpp_tof_proton_image, f);
+  if (fProtonEnergyFlag)
+    ScaleImage(cpp_E_proton_image, f);
+  if (fNeutronEnergyFlag)
+    ScaleImage(cpp_E_neutron_image, f);
+  if (fNeutronTimeFlag)
+    ScaleImage(cpp_tof_neutron_image, f);
+  return 0;
+}
+
+void GateVoxelizedPromptGammaTLEActor::ScaleImage(ImageType::Pointer &image,
+                                                  double f) {
+  itk::ImageRegionIterator<ImageType> it(image,
+                                         image->GetLargestPossibleRegion());
+  for (it.GoToBegin(); !it.IsAtEnd(); ++it) {
+    it.Set(it.Get() * f);
   }
-  if (fNeutronTimeFlag) {
-    itk::ImageRegionIterator<ImageType> it(
-        cpp_tof_neutron_image,
-        cpp_tof_neutron_image->GetLargestPossibleRegion());
-    for (it.GoToBegin(); !it.IsAtEnd(); ++it) {
-      it.Set(it.Get() / incidentParticles);
-    }
+}
+
+GateVoxelizedPromptGammaTLEActor::ImageType::Pointer
+GateVoxelizedPromptGammaTLEActor::CreateThreadLocalImage(
+    ImageType::Pointer &image) {
+  if (!G4Threading::IsMultithreadedApplication())
+    return image;
+  auto local_image = ImageType::New();
+  local_image->SetRegions(image->GetLargestPossibleRegion());
+  local_image->SetSpacing(image->GetSpacing());
+  local_image->SetOrigin(image->GetOrigin());
+  local_image->SetDirection(image->GetDirection());
+  local_image->Allocate();
+  local_image->FillBuffer(0);
+  return local_image;
+}
+
+void GateVoxelizedPromptGammaTLEActor::MergeImage(
+    ImageType::Pointer &image, ImageType::Pointer &local_image) {
+  if (local_image == image)
+    return;
+  itk::ImageRegionIterator<ImageType> it(image,
+                                         image->GetLargestPossibleRegion());
+  itk::ImageRegionConstIterator<ImageType> lit(
+      local_image, local_image->GetLargestPossibleRegion());
+  for (it.GoToBegin(), lit.GoToBegin(); !it.IsAtEnd(); ++it, ++lit) {
+    it.Set(it.Get() + lit.Get());
   }
+  local_image = nullptr;
 }
 
-int GateVoxelizedPromptGammaTLEActor::EndOfRunActionMasterThread(int run_id) {
-  return 0;
+void GateVoxelizedPromptGammaTLEActor::AddValue(
+    ImageType::Pointer threadLocalT::*dense,
+    GateSparseHistogramImage threadLocalT::*sparse,
+    const ImageType::IndexType &ind, double value) {
+  auto &l = fThreadLocalData.Get();
+  if (fSparseOutput)
+    (l.*sparse).AddValue(ind[0], ind[1], ind[2], static_cast<int>(ind[3]),
+                         value);
+  else
+    ImageAddValue<ImageType>(l.*dense, ind, value);
+}
+
+void GateVoxelizedPromptGammaTLEActor::ConfigureSparse(
+    GateSparseHistogramImage &tof_proton, GateSparseHistogramImage &E_proton,
+    GateSparseHistogramImage &E_neutron,
+    GateSparseHistogramImage &tof_neutron) const {
+  // one more bin for the overflow, as for the dense images
+  tof_proton.Configure(fsize, timebins + 1);
+  E_proton.Configure(fsize, energybins + 1);
+  E_neutron.Configure(fsize, energybins + 1);
+  tof_neutron.Configure(fsize, timebins + 1);
 }
 
 void GateVoxelizedPromptGammaTLEActor::SetVector(py::array_t<double> vect_p,
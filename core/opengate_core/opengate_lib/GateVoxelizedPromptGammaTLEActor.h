@@ -8,7 +8,9 @@
 #ifndef GateVoxelizedPromptGammaTLEActor_h
 #define GateVoxelizedPromptGammaTLEActor_h
 
+#include "GateSparseHistogramImage.h"
 #include "GateVActor.h"
+#include <G4Cache.hh>
 #include <G4VPrimitiveScorer.hh>
 #include <G4VProcess.hh>
 #include <itkImage.h>
@@ -80,8 +82,48 @@ public:
   typedef itk::Image<double, 3> Image3DType;
   Image3DType::Pointer volume;
 
-  G4double T0;
-  G4int incidentParticles;
+  // Sparse output: only the voxels reached by the particles own a histogram.
+  // Filled per thread during the run, merged at the end of the run.
+  G4bool fSparseOutput{};
+  GateSparseHistogramImage cpp_tof_neutron_sparse;
+  GateSparseHistogramImage cpp_tof_proton_sparse;
+  GateSparseHistogramImage cpp_E_proton_sparse;
+  GateSparseHistogramImage cpp_E_neutron_sparse;
+
+  struct threadLocalT {
+    GateSparseHistogramImage fTofNeutron;
+    GateSparseHistogramImage fTofProton;
+    GateSparseHistogramImage fEProton;
+    GateSparseHistogramImage fENeutron;
+    // dense output: images of the thread, added to the shared images at the
+    // end of the run (in single thread, the shared images themselves)
+    ImageType::Pointer fTofNeutronImage;
+    ImageType::Pointer fTofProtonImage;
+    ImageType::Pointer fEProtonImage;
+    ImageType::Pointer fENeutronImage;
+    long fNumberOfEvents = 0;
+    G4double fT0 = 0;
+  };
+  G4Cache<threadLocalT> fThreadLocalData;
+
+  void AddValue(ImageType::Pointer threadLocalT::*dense,
+                GateSparseHistogramImage threadLocalT::*sparse,
+                const ImageType::IndexType &ind, double value);
+
+  void ConfigureSparse(GateSparseHistogramImage &tof_proton,
+                       GateSparseHistogramImage &E_proton,
+                       GateSparseHistogramImage &E_neutron,
+                       GateSparseHistogramImage &tof_neutron) const;
+
+  static void ScaleImage(ImageType::Pointer &image, double f);
+
+  static ImageType::Pointer CreateThreadLocalImage(ImageType::Pointer &image);
+
+  static void MergeImage(ImageType::Pointer &image,
+                         ImageType::Pointer &local_image);
+
+  // number of events of the run (all threads), used to scale the outputs
+  long incidentParticles;
 
   G4int timebins;
   G4double timerange;
@@ -26,6 +26,24 @@ GateDigiAdderInVolume::GateDigiAdderInVolume(
   fNumberOfHitsFlag = numberOfHitsFlag;
 }
 
+void GateDigiAdderInVolume::Reset(GateDigitizerAdderActor::AdderPolicy policy,
+                                  bool timeDifferenceFlag,
+                                  bool numberOfHitsFlag) {
+  // same state as a newly constructed object
+  fPolicy = policy;
+  fTimeDifferenceFlag = timeDifferenceFlag;
+  fNumberOfHitsFlag = numberOfHitsFlag;
+  fFinalEdep = 0.0;
+  fMaxEdep = 0;
+  fFinalTime = DBL_MAX;
+  fFinalPosition = G4ThreeVector();
+  fFinalIndex = 0;
+  fNumberOfHits = 0;
+  fEarliestTime = MAXFLOAT;
+  fLatestTime = 0;
+  fDifferenceTime = 0;
+}
+
 void GateDigiAdderInVolume::Update(size_t i, double edep,
                                    const G4ThreeVector &pos, double time) {
   /*
@@ -36,6 +36,10 @@ public:
   double fLatestTime = 0;
   double fDifferenceTime = 0;
 
+  // Restore the initial state, used to reuse the object for another group
+  void Reset(GateDigitizerAdderActor::AdderPolicy policy,
+             bool timeDifferenceFlag, bool numberOfHitsFlag);
+
   void Update(size_t i, double edep, const G4ThreeVector &pos, double time);
 
   void Terminate();
@@ -26,12 +26,20 @@ void GateDigiAttributeLastProcessDefinedStepInVolumeActor::InitializeUserInfo(
 
 void GateDigiAttributeLastProcessDefinedStepInVolumeActor::BeginOfEventAction(
     const G4Event *event) {
-  fLastProcess = "Transportation";
+  fThreadLocalData.Get().fLastProcess = nullptr;
+}
+
+const G4VProcess *GateDigiAttributeLastProcessDefinedStepInVolumeActor::
+    GetLastProcessDefinedStep() const {
+  return fThreadLocalData.Get().fLastProcess;
 }
 
 std::string
 GateDigiAttributeLastProcessDefinedStepInVolumeActor::GetLastProcess() const {
-  return fLastProcess;
+  const auto *p = fThreadLocalData.Get().fLastProcess;
+  if (p == nullptr)
+    return "Transportation";
+  return p->GetProcessName();
 }
 
 void GateDigiAttributeLastProcessDefinedStepInVolumeActor::SteppingAction(
@@ -40,8 +48,14 @@ void GateDigiAttributeLastProcessDefinedStepInVolumeActor::SteppingAction(
   const auto *p = step->GetPreStepPoint()->GetProcessDefinedStep();
   if (p == nullptr)
     return;
-  // Store the interaction
-  if (p->GetProcessName() != "Transportation") {
-    fLastProcess = p->GetProcessName();
+  // Store the interaction (only the pointer, the name is retrieved on demand).
+  // The name is only compared to "Transportation" when the process changes.
+  auto &l = fThreadLocalData.Get();
+  if (p == l.fLastProcess || p == l.fTransportationProcess)
+    return;
+  if (p->GetProcessName() == "Transportation") {
+    l.fTransportationProcess = p;
+    return;
   }
+  l.fLastProcess = p;
 }
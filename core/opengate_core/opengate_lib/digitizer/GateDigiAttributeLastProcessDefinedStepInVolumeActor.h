@@ -9,9 +9,11 @@
 #define GateDigiAttributeLastProcessDefinedStepInVolumeActor_h
 
 #include "../GateVActor.h"
+#include <G4Cache.hh>
 #include <pybind11/stl.h>
 
 class GateDigiAttributeLastProcessDefinedStepInVolume;
+class G4VProcess;
 
 class GateDigiAttributeLastProcessDefinedStepInVolumeActor : public GateVActor {
 public:
@@ -24,7 +26,18 @@ public:
   void BeginOfEventAction(const G4Event *event) override;
 
   std::string GetLastProcess() const;
-  std::string fLastProcess;
+
+  // Last non-transportation process of the current event in this thread
+  // (nullptr if none)
+  const G4VProcess *GetLastProcessDefinedStep() const;
+
+  struct threadLocalT {
+    const G4VProcess *fLastProcess = nullptr;
+    // the Transportation process of this thread, once found
+    const G4VProcess *fTransportationProcess = nullptr;
+  };
+  G4Cache<threadLocalT> fThreadLocalData;
+
   GateDigiAttributeLastProcessDefinedStepInVolume *fAttribute;
 };
 
@@ -171,8 +171,11 @@ void GateDigiAttributeManager::InitializeAllDigiAttributes() {
             step->GetTrack()->GetParticleDefinition()->GetParticleType());
       });
   DefineDigiAttribute(
-      "TrackVolumeName", 'S',
-      FILLF { att->FillSValue(step->GetTrack()->GetVolume()->GetName()); });
+      "TrackVolumeName", 'S', FILLF {
+        const auto *touchable = step->GetTrack()->GetTouchable();
+        att->FillSValue(GateUniqueVolumeID::GetPhysicalVolumeName(
+            touchable->GetVolume(), touchable->GetCopyNumber()));
+      });
   DefineDigiAttribute(
       "TrackVolumeCopyNo", 'I',
       FILLF { att->FillIValue(step->GetTrack()->GetVolume()->GetCopyNo()); });
@@ -0,0 +1,219 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include "GateDigiColumns.h"
+#include "../GateHelpers.h"
+#include <G4AutoLock.hh>
+
+namespace {
+
+template <typename T> void WriteRaw(std::ofstream &f, const T &v) {
+  f.write(reinterpret_cast<const char *>(&v), sizeof(T));
+}
+
+template <typename T> void WriteRaw(std::ofstream &f, const std::vector<T> &v) {
+  f.write(reinterpret_cast<const char *>(v.data()),
+          static_cast<std::streamsize>(v.size() * sizeof(T)));
+}
+
+void WriteString(std::ofstream &f, const std::string &s) {
+  WriteRaw(f, static_cast<uint32_t>(s.size()));
+  f.write(s.data(), static_cast<std::streamsize>(s.size()));
+}
+
+} // namespace
+
+GateDigiColumns::GateDigiColumns() { fNumberOfRows = 0; }
+
+GateDigiColumns::~GateDigiColumns() { Close(); }
+
+void GateDigiColumns::InitFromDigiCollection(GateDigiCollection *hc) {
+  fColumns.clear();
+  fNumberOfRows = 0;
+  const auto &atts = hc->GetDigiAttributes();
+  for (size_t i = 0; i < atts.size(); i++) {
+    const auto *att = atts[i];
+    const auto name = att->GetDigiAttributeName();
+    Column c;
+    c.fAttributeIndex = i;
+    c.fComponent = 0;
+    c.fName = name;
+    switch (att->GetDigiAttributeType()) {
+    case 'D':
+      c.fType = 'd';
+      break;
+    case 'I':
+      c.fType = 'i';
+      break;
+    case 'L':
+      c.fType = 'l';
+      break;
+    case 'S':
+    case 'U':
+      c.fType = 's';
+      break;
+    case '3':
+      c.fType = 'd';
+      for (const auto *s : {"_X", "_Y", "_Z"}) {
+        c.fName = name + s;
+        fColumns.push_back(c);
+        c.fComponent++;
+      }
+      continue;
+    default:
+      Fatal("Unknown type for the digi attribute " + name);
+    }
+    fColumns.push_back(c);
+  }
+}
+
+void GateDigiColumns::Open(const std::string &filename) {
+  fFile.open(filename, std::ios::binary | std::ios::trunc);
+  if (!fFile.is_open()) {
+    Fatal("Cannot open the file " + filename);
+  }
+  fFile.write("GPHSP001", 8);
+  WriteRaw(fFile, static_cast<uint32_t>(fColumns.size()));
+  for (const auto &c : fColumns) {
+    WriteString(fFile, c.fName);
+    WriteRaw(fFile, c.fType);
+  }
+}
+
+int GateDigiColumns::Encode(Column &c, const std::string &s) {
+  const auto it = c.fCodes.find(s);
+  if (it != c.fCodes.end())
+    return it->second;
+  const int code = static_cast<int>(c.fDictionary.size());
+  c.fDictionary.push_back(s);
+  c.fCodes[s] = code;
+  return code;
+}
+
+void GateDigiColumns::Append(GateDigiCollection *hc) {
+  const auto n = hc->GetSize();
+  if (n == 0)
+    return;
+  G4AutoLock mutex(&fMutex);
+  const auto &atts = hc->GetDigiAttributes();
+  for (auto &c : fColumns) {
+    auto *att = atts[c.fAttributeIndex];
+    switch (att->GetDigiAttributeType()) {
+    case 'D': {
+      const auto &v = att->GetDValues();
+      c.fDValues.insert(c.fDValues.end(), v.begin(), v.end());
+      break;
+    }
+    case 'I': {
+      const auto &v = att->GetIValues();
+      c.fIValues.insert(c.fIValues.end(), v.begin(), v.end());
+      break;
+    }
+    case 'L': {
+      const auto &v = att->GetLValues();
+      c.fLValues.insert(c.fLValues.end(), v.begin(), v.end());
+      break;
+    }
+    case 'S':
+      for (const auto &s : att->GetSValues())
+        c.fIValues.push_back(Encode(c, s));
+      break;
+    case 'U':
+      for (const auto &u : att->GetUValues())
+        c.fIValues.push_back(Encode(c, u->fID));
+      break;
+    case '3':
+      for (const auto &v : att->Get3Values())
+        c.fDValues.push_back(v[c.fComponent]);
+      break;
+    default:
+      break;
+    }
+  }
+  fNumberOfRows += n;
+  if (fFile.is_open())
+    WriteChunk(static_cast<int64_t>(n));
+}
+
+void GateDigiColumns::WriteChunk(const int64_t n) {
+  // the values are written and removed, only the dictionaries are kept
+  WriteRaw(fFile, n);
+  for (auto &c : fColumns) {
+    WriteRaw(fFile, c.fDValues);
+    WriteRaw(fFile, c.fIValues);
+    WriteRaw(fFile, c.fLValues);
+    c.fDValues.clear();
+    c.fIValues.clear();
+    c.fLValues.clear();
+  }
+}
+
+void GateDigiColumns::Close() {
+  G4AutoLock mutex(&fMutex);
+  if (!fFile.is_open())
+    return;
+  WriteRaw(fFile, static_cast<int64_t>(-1));
+  for (const auto &c : fColumns) {
+    if (c.fType != 's')
+      continue;
+    WriteRaw(fFile, static_cast<uint32_t>(c.fDictionary.size()));
+    for (const auto &s : c.fDictionary)
+      WriteString(fFile, s);
+  }
+  fFile.close();
+}
+
+std::vector<std::string> GateDigiColumns::GetColumnNames() const {
+  std::vector<std::string> names;
+  for (const auto &c : fColumns)
+    names.push_back(c.fName);
+  return names;
+}
+
+char GateDigiColumns::GetColumnType(const std::string &name) const {
+  return GetColumn(name).fType;
+}
+
+std::vector<double> GateDigiColumns::TakeDValues(const std::string &name) {
+  std::vector<double> v;
+  v.swap(GetColumn(name).fDValues);
+  return v;
+}
+
+std::vector<int> GateDigiColumns::TakeIValues(const std::string &name) {
+  std::vector<int> v;
+  v.swap(GetColumn(name).fIValues);
+  return v;
+}
+
+std::vector<int64_t> GateDigiColumns::TakeLValues(const std::string &name) {
+  std::vector<int64_t> v;
+  v.swap(GetColumn(name).fLValues);
+  return v;
+}
+
+const std::vector<std::string> &
+GateDigiColumns::GetDictionary(const std::string &name) const {
+  return GetColumn(name).fDictionary;
+}
+
+GateDigiColumns::Column &GateDigiColumns::GetColumn(const std::string &name) {
+  for (auto &c : fColumns)
+    if (c.fName == name)
+      return c;
+  Fatal("No column named " + name);
+  return fColumns.front(); // never here
+}
+
+const GateDigiColumns::Column &
+GateDigiColumns::GetColumn(const std::string &name) const {
+  for (const auto &c : fColumns)
+    if (c.fName == name)
+      return c;
+  Fatal("No column named " + name);
+  return fColumns.front(); // never here
+}
@@ -0,0 +1,92 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#ifndef GateDigiColumns_h
+#define GateDigiColumns_h
+
+#include "GateDigiCollection.h"
+#include <G4Threading.hh>
+#include <fstream>
+#include <unordered_map>
+
+/*
+ * Typed columnar copy of a DigiCollection, shared by all threads.
+ *
+ * - one column per attribute, 3-vectors are split into name_X, name_Y, name_Z
+ *   (same as the ROOT output)
+ * - column types: 'd' (double), 'i' (int32), 'l' (int64) and 's' (strings,
+ *   dictionary-encoded: the column stores int32 codes, the strings are stored
+ *   once in the dictionary of the column). The 'U' (volume id) attributes are
+ *   stored as strings.
+ * - Append (thread safe) copies the digis of the current thread at the end of
+ *   the columns. The DigiCollection must be cleared by the caller.
+ * - If a filename is given, the columns are not kept in memory but streamed
+ *   to a binary file, one chunk per Append:
+ *     header : "GPHSP001", uint32 ncols, then for each column
+ *              uint32 name length, name, char type
+ *     chunks : int64 nrows, then the raw values of each column
+ *     end    : int64 -1, then for each 's' column the dictionary
+ *              uint32 nstrings, then uint32 length + chars for each string
+ */
+
+class GateDigiColumns {
+public:
+  GateDigiColumns();
+
+  ~GateDigiColumns();
+
+  void InitFromDigiCollection(GateDigiCollection *hc);
+
+  void Open(const std::string &filename);
+
+  void Append(GateDigiCollection *hc);
+
+  void Close();
+
+  size_t GetNumberOfRows() const { return fNumberOfRows; }
+
+  std::vector<std::string> GetColumnNames() const;
+
+  char GetColumnType(const std::string &name) const;
+
+  // Columns are moved out (the store is empty for this column after the call)
+  std::vector<double> TakeDValues(const std::string &name);
+
+  std::vector<int> TakeIValues(const std::string &name);
+
+  std::vector<int64_t> TakeLValues(const std::string &name);
+
+  const std::vector<std::string> &GetDictionary(const std::string &name) const;
+
+protected:
+  struct Column {
+    std::string fName;
+    char fType;
+    size_t fAttributeIndex;
+    int fComponent;
+    std::vector<double> fDValues;
+    std::vector<int> fIValues;
+    std::vector<int64_t> fLValues;
+    std::vector<std::string> fDictionary;
+    std::unordered_map<std::string, int> fCodes;
+  };
+
+  Column &GetColumn(const std::string &name);
+
+  const Column &GetColumn(const std::string &name) const;
+
+  static int Encode(Column &c, const std::string &s);
+
+  void WriteChunk(int64_t n);
+
+  std::vector<Column> fColumns;
+  size_t fNumberOfRows;
+  std::ofstream fFile;
+  G4Mutex fMutex;
+};
+
+#endif // GateDigiColumns_h
@@ -0,0 +1,111 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#ifndef GateDigiFlatHashIndex_h
+#define GateDigiFlatHashIndex_h
+
+#include <cstdint>
+#include <functional>
+#include <vector>
+
+/*
+ * Open addressing hash table (linear probing) mapping a key to an index in a
+ * storage owned by the caller (e.g. a pool of objects reused for every event).
+ *
+ * - slots are stored in a single flat vector, no allocation per insertion
+ * - Clear() only resets the slots used since the last Clear, so the memory is
+ *   kept and reused (no allocation in steady state)
+ * - elements cannot be removed individually
+ *
+ * Used by the digitizer modules that group digis (Adder, Pileup).
+ */
+
+template <class Key, class Hash = std::hash<Key>> class GateDigiFlatHashIndex {
+public:
+  explicit GateDigiFlatHashIndex(size_t capacity = 64) { Rehash(capacity); }
+
+  // Return the index associated with the key. If the key is not found,
+  // new_index is associated with it and returned.
+  size_t FindOrInsert(const Key &key, size_t new_index) {
+    if (2 * (fUsedSlots.size() + 1) > fSlots.size())
+      Rehash(2 * fSlots.size());
+    auto s = Probe(key);
+    if (!fSlots[s].used) {
+      fSlots[s].used = true;
+      fSlots[s].key = key;
+      fSlots[s].index = new_index;
+      fUsedSlots.push_back(s);
+    }
+    return fSlots[s].index;
+  }
+
+  // Return the index associated with the key, or npos if not found.
+  size_t Find(const Key &key) const {
+    const auto s = Probe(key);
+    return fSlots[s].used ? fSlots[s].index : npos;
+  }
+
+  size_t Size() const { return fUsedSlots.size(); }
+
+  // Remove all keys, keep the allocated memory.
+  void Clear() {
+    for (const auto s : fUsedSlots)
+      fSlots[s].used = false;
+    fUsedSlots.clear();
+  }
+
+  static constexpr size_t npos = static_cast<size_t>(-1);
+
+protected:
+  struct Slot {
+    Key key{};
+    size_t index = 0;
+    bool used = false;
+  };
+
+  std::vector<Slot> fSlots;
+  std::vector<size_t> fUsedSlots;
+  size_t fMask = 0;
+  Hash fHash;
+
+  static uint64_t Mix(uint64_t h) {
+    // finalizer of splitmix64: spread the bits before masking
+    h ^= h >> 30;
+    h *= 0xbf58476d1ce4e5b9ULL;
+    h ^= h >> 27;
+    h *= 0x94d049bb133111ebULL;
+    h ^= h >> 31;
+    return h;
+  }
+
+  size_t Probe(const Key &key) const {
+    auto s = static_cast<size_t>(Mix(fHash(key))) & fMask;
+    while (fSlots[s].used && !(fSlots[s].key == key))
+      s = (s + 1) & fMask;
+    return s;
+  }
+
+  void Rehash(size_t capacity) {
+    // capacity is a power of two
+    size_t n = 1;
+    while (n < capacity)
+      n <<= 1;
+    auto old = std::move(fSlots);
+    fSlots.assign(n, Slot());
+    fMask = n - 1;
+    fUsedSlots.clear();
+    for (const auto &slot : old) {
+      if (!slot.used)
+        continue;
+      const auto s = Probe(slot.key);
+      fSlots[s] = slot;
+      fUsedSlots.push_back(s);
+    }
+  }
+};
+
+#endif // GateDigiFlatHashIndex_h
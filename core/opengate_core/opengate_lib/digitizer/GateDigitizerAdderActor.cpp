@@ -10,6 +10,8 @@
 #include "../GateHelpersDict.h"
 #include "GateDigiAdderInVolume.h"
 #include "GateTDigiAttribute.h"
+#include <algorithm>
+#include <numeric>
 #include <sstream>
 
 GateDigitizerAdderActor::threadLocalT::~threadLocalT() = default;
@@ -139,8 +141,9 @@ void GateDigitizerAdderActor::EndOfEventAction(const G4Event *event) {
   // create the output hits collection for grouped hits
   auto &l = fThreadLocalData.Get();
 
-  for (auto &h : l.fMapOfDigiInVolume) {
-    const auto &hit = h.second;
+  // The groups are output in the order of their keys
+  for (const auto index : GetSortedAdders()) {
+    const auto &hit = l.fAdderPool[index];
     // terminate the merge
     hit->Terminate();
     // Don't store anything if edep is zero
@@ -157,7 +160,26 @@ void GateDigitizerAdderActor::EndOfEventAction(const G4Event *event) {
   }
 
   // reset the structure of hits
-  l.fMapOfDigiInVolume.clear();
+  ClearAdders();
+}
+
+const std::vector<size_t> &GateDigitizerAdderActor::GetSortedAdders() const {
+  auto &l = fThreadLocalData.Get();
+  // same order as the previous std::map, so the output is unchanged
+  auto &order = l.fSortedAdders;
+  order.resize(l.fNumberOfAdders);
+  std::iota(order.begin(), order.end(), 0);
+  std::sort(order.begin(), order.end(), [&l](const size_t a, const size_t b) {
+    return l.fAdderKeys[a] < l.fAdderKeys[b];
+  });
+  return order;
+}
+
+void GateDigitizerAdderActor::ClearAdders() const {
+  auto &l = fThreadLocalData.Get();
+  // the memory is kept for the next event
+  l.fNumberOfAdders = 0;
+  l.fAdderIndex.Clear();
 }
 
 void GateDigitizerAdderActor::AddDigiPerVolume() const {
@@ -185,13 +207,19 @@ void GateDigitizerAdderActor::AddDigiPerVolume() const {
     std::memcpy(&key.weightBits, l.weight, sizeof(double));
   }
 
-  // Find or create an entry in the map for this unique key.
-  if (l.fMapOfDigiInVolume.find(key) == l.fMapOfDigiInVolume.end()) {
-    // If no entry exists, create a new one.
-    l.fMapOfDigiInVolume[key] = std::make_unique<GateDigiAdderInVolume>(
-        fPolicy, fTimeDifferenceFlag, fNumberOfHitsFlag);
+  // Find or take an adder from the pool for this unique key.
+  const auto index = l.fAdderIndex.FindOrInsert(key, l.fNumberOfAdders);
+  if (index == l.fNumberOfAdders) {
+    // If no entry exists, reuse (or create) the next adder of the pool.
+    if (index == l.fAdderPool.size()) {
+      l.fAdderPool.push_back(std::make_unique<GateDigiAdderInVolume>());
+      l.fAdderKeys.emplace_back();
+    }
+    l.fAdderPool[index]->Reset(fPolicy, fTimeDifferenceFlag, fNumberOfHitsFlag);
+    l.fAdderKeys[index] = key;
+    l.fNumberOfAdders++;
   }
 
   // Update the adder (either newly created or pre-existing).
-  l.fMapOfDigiInVolume[key]->Update(i, *l.edep, *l.pos, *l.time);
+  l.fAdderPool[index]->Update(i, *l.edep, *l.pos, *l.time);
 }
@@ -8,6 +8,7 @@
 #ifndef GateDigitizerAdderActor_h
 #define GateDigitizerAdderActor_h
 
+#include "GateDigiFlatHashIndex.h"
 #include "GateVDigitizerWithOutputActor.h"
 #include <G4Cache.hh>
 #include <cstdint> // Required for uint64_t
@@ -77,6 +78,16 @@ protected:
       }
       return weightBits < other.weightBits;
     }
+
+    bool operator==(const DigiKey &other) const {
+      return volumeID == other.volumeID && weightBits == other.weightBits;
+    }
+  };
+
+  struct DigiKeyHash {
+    uint64_t operator()(const DigiKey &key) const {
+      return key.volumeID ^ (key.weightBits * 0x9e3779b97f4a7c15ULL);
+    }
   };
 
   int fGroupVolumeDepth;
@@ -96,10 +107,21 @@ protected:
 
   void AddDigiPerVolume() const;
 
+  // Indices (in the pool) of the adders of the current event, sorted by key
+  const std::vector<size_t> &GetSortedAdders() const;
+
+  // Release the adders of the current event (the pool is kept)
+  void ClearAdders() const;
+
   // During computation (thread local)
+  // The adders are kept in a pool reused for every event (no allocation once
+  // the pool is large enough), the flat index maps a key to a pool element.
   struct threadLocalT {
-    std::map<DigiKey, std::unique_ptr<GateDigiAdderInVolume>>
-        fMapOfDigiInVolume;
+    std::vector<std::unique_ptr<GateDigiAdderInVolume>> fAdderPool;
+    std::vector<DigiKey> fAdderKeys;
+    size_t fNumberOfAdders = 0;
+    GateDigiFlatHashIndex<DigiKey, DigiKeyHash> fAdderIndex;
+    std::vector<size_t> fSortedAdders;
 
     double *edep;
     G4ThreeVector *pos;
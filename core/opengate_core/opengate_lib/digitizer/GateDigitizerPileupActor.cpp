@@ -83,6 +83,7 @@ void GateDigitizerPileupActor::BeginOfRunActionMasterThread(int run_id) {
   outputIter.TrackAttribute("PreStepUniqueVolumeID", &fTimeSorterOutputVolID);
 
   fVolumePileupWindows.clear();
+  fVolumePileupWindowIndex.Clear();
   fWindowExpiry = std::queue<volumeWindowExpiry>();
 }
 
@@ -100,6 +101,11 @@ void GateDigitizerPileupActor::DigitInitialize(
   GateVDigitizerWithOutputActor::DigitInitialize(a);
 
   fOutputDigiCollection->RootInitializeTupleForWorker();
+
+  // Get output attribute pointers.
+  fOutputEdepAttribute =
+      fOutputDigiCollection->GetDigiAttribute("TotalEnergyDeposit");
+  fOutputPosAttribute = fOutputDigiCollection->GetDigiAttribute("PostPosition");
 }
 
 void GateDigitizerPileupActor::EndOfEventAction(const G4Event *) {
@@ -116,7 +122,7 @@ void GateDigitizerPileupActor::EndOfRunAction(const G4Run *) {
         // Process all pile-up windows which still have an expiry item.
         while (fWindowExpiry.size() > 0) {
           auto &window =
-              fVolumePileupWindows.at(fWindowExpiry.front().volumeHash);
+              fVolumePileupWindows[fWindowExpiry.front().windowIndex];
           ProcessPileupWindow(window);
           fWindowExpiry.pop();
         }
@@ -125,22 +131,23 @@ void GateDigitizerPileupActor::EndOfRunAction(const G4Run *) {
 
 GateDigitizerPileupActor::PileupWindow &
 GateDigitizerPileupActor::GetPileupWindowForCurrentVolume(
-    GateUniqueVolumeID::Pointer *volume,
-    std::map<uint64_t, PileupWindow> &windows) {
+    GateUniqueVolumeID::Pointer *volume) {
   // This function looks up the PileupWindow object for the given volume. If it
   // does not yet exist for the volume, it creates a PileupWindow.
 
   const auto vol_hash = volume->get()->GetIdUpToDepthAsHash(fGroupVolumeDepth);
 
   // Look up the window based on volume hash.
-  auto it = windows.find(vol_hash);
-  if (it != windows.end()) {
+  const auto index = fVolumePileupWindowIndex.FindOrInsert(
+      vol_hash, fVolumePileupWindows.size());
+  if (index < fVolumePileupWindows.size()) {
     // Return a reference to the existing PileupWindow object for the volume.
-    return it->second;
+    return fVolumePileupWindows[index];
   } else {
     // A PileupWindow object does not yet exist for this volume: create one.
-    PileupWindow window;
+    auto &window = fVolumePileupWindows.emplace_back();
     window.hash = vol_hash;
+    window.index = index;
     const auto vol_id = volume->get()->GetIdUpToDepth(fGroupVolumeDepth);
     // Create a GateDigiCollection for this volume, as a temporary storage for
     // digis that belong to the same time window (the name must be unique).
@@ -168,9 +175,8 @@ GateDigitizerPileupActor::GetPileupWindowForCurrentVolume(
     window.fillerOut = std::make_unique<GateDigiAttributesFiller>(
         window.digis, fOutputDigiCollection, filler_out_attributes);
 
-    // Store the PileupWindow in the map and return a reference.
-    windows[vol_hash] = std::move(window);
-    return windows[vol_hash];
+    // Return a reference to the PileupWindow stored in the deque.
+    return window;
   }
 }
 
@@ -181,8 +187,7 @@ void GateDigitizerPileupActor::ProcessTimeSortedDigis() {
   while (!iter.IsAtEnd()) {
     // Look up or create the pile-up window object for the volume to which the
     // current digi belongs.
-    auto &window = GetPileupWindowForCurrentVolume(fTimeSorterOutputVolID,
-                                                   fVolumePileupWindows);
+    auto &window = GetPileupWindowForCurrentVolume(fTimeSorterOutputVolID);
 
     const auto current_time = *fTimeSorterOutputTime;
     const auto current_edep = *fTimeSorterOutputEdep;
@@ -195,7 +200,7 @@ void GateDigitizerPileupActor::ProcessTimeSortedDigis() {
     if (window.digis->GetSize() == 0) {
       // The window was empty: the newly arrived digi will open it.
       window.startTime = current_time;
-      fWindowExpiry.push({window.hash, window.startTime + fTimeWindow});
+      fWindowExpiry.push({window.index, window.startTime + fTimeWindow});
       window.highestEdep = current_edep;
     } else {
       // The window was already opened: update the window depending on the
@@ -207,14 +212,14 @@ void GateDigitizerPileupActor::ProcessTimeSortedDigis() {
       case TimeWindowPolicy::Paralyzable:
         // The current digi moves the start time forward.
         window.startTime = current_time;
-        fWindowExpiry.push({window.hash, window.startTime + fTimeWindow});
+        fWindowExpiry.push({window.index, window.startTime + fTimeWindow});
         break;
       case TimeWindowPolicy::EnergyWinnerParalyzable:
         // The current digi moves the start time forward if its energy is higher
         // than previous energies.
         if (current_edep > window.highestEdep) {
           window.startTime = current_time;
-          fWindowExpiry.push({window.hash, window.startTime + fTimeWindow});
+          fWindowExpiry.push({window.index, window.startTime + fTimeWindow});
           window.highestEdep = current_edep;
         }
         break;
@@ -279,21 +284,15 @@ void GateDigitizerPileupActor::ProcessPileupWindow(PileupWindow &window) {
     weighted_position /= total_edep;
   }
 
-  // Get output attribute pointer.
-  auto outputEdepAttribute =
-      fOutputDigiCollection->GetDigiAttribute("TotalEnergyDeposit");
-  auto outputPosAttribute =
-      fOutputDigiCollection->GetDigiAttribute("PostPosition");
-
   // The resulting pile-up digi gets:
   // - the total edep value.
-  outputEdepAttribute->FillDValue(total_edep);
+  fOutputEdepAttribute->FillDValue(total_edep);
   // - the position according to the position attribute policy.
   if (fPositionAttributePolicy == PositionAttributePolicy::EnergyWinner) {
-    outputPosAttribute->Fill3Value(highest_edep_position);
+    fOutputPosAttribute->Fill3Value(highest_edep_position);
   } else if (fPositionAttributePolicy ==
              PositionAttributePolicy::EnergyWeightedCentroid) {
-    outputPosAttribute->Fill3Value(weighted_position);
+    fOutputPosAttribute->Fill3Value(weighted_position);
   }
   // All the other attribute values are according to the attribute policy.
   if (fAttributePolicy == AttributePolicy::First) {
@@ -312,7 +311,7 @@ void GateDigitizerPileupActor::ProcessPileupWindows(double currentTime) {
   // Process the expiry items for which the expiry time is before currentTime.
   while (fWindowExpiry.size() > 0 &&
          currentTime > fWindowExpiry.front().expiryTime) {
-    auto &window = fVolumePileupWindows.at(fWindowExpiry.front().volumeHash);
+    auto &window = fVolumePileupWindows[fWindowExpiry.front().windowIndex];
     // Check again whether the window is actually expired, because its expiry
     // time may have been updated in a later expiry item.
     if (currentTime > window.startTime + fTimeWindow) {
@@ -11,11 +11,12 @@
 #include "../GateUniqueVolumeID.h"
 #include "GateDigiCollection.h"
 #include "GateDigiCollectionIterator.h"
+#include "GateDigiFlatHashIndex.h"
 #include "GateTimeSorter.h"
 #include "GateVDigitizerWithOutputActor.h"
 #include <G4Cache.hh>
 #include <G4Navigator.hh>
-#include <map>
+#include <deque>
 #include <memory>
 #include <pybind11/stl.h>
 #include <queue>
@@ -68,6 +69,8 @@ protected:
   struct PileupWindow {
     // Hash of the corresponding volume.
     uint64_t hash{};
+    // Index of the window in fVolumePileupWindows.
+    size_t index{};
     // Time at which the time window opens.
     double startTime{};
     // Higehst energy deposit in the window.
@@ -86,14 +89,23 @@ protected:
 
   // Struct that represents when a pile-up window expires.
   struct volumeWindowExpiry {
-    uint64_t volumeHash;
+    // Index of the window in fVolumePileupWindows.
+    size_t windowIndex;
     double expiryTime;
   };
 
   std::unique_ptr<GateTimeSorter> fTimeSorter;
-  std::map<uint64_t, PileupWindow> fVolumePileupWindows;
+  // The windows are created once per volume and reused for the whole run.
+  // A deque keeps the references valid when new windows are added, the flat
+  // index maps the volume hash to the position of the window in the deque.
+  std::deque<PileupWindow> fVolumePileupWindows;
+  GateDigiFlatHashIndex<uint64_t> fVolumePileupWindowIndex;
   std::queue<volumeWindowExpiry> fWindowExpiry;
 
+  // Output attributes computed by the pile-up.
+  GateVDigiAttribute *fOutputEdepAttribute{};
+  GateVDigiAttribute *fOutputPosAttribute{};
+
   // Tracking pointers used by GateTimeSorter output iterator.
   GateUniqueVolumeID::Pointer *fTimeSorterOutputVolID{};
   double *fTimeSorterOutputTime{};
@@ -104,8 +116,7 @@ protected:
   G4ThreeVector *fPileupWindowPos{};
 
   PileupWindow &
-  GetPileupWindowForCurrentVolume(GateUniqueVolumeID::Pointer *volume,
-                                  std::map<uint64_t, PileupWindow> &windows);
+  GetPileupWindowForCurrentVolume(GateUniqueVolumeID::Pointer *volume);
 
   void ProcessTimeSortedDigis();
   void ProcessPileupWindow(PileupWindow &window);
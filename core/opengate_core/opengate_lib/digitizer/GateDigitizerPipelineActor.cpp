@@ -0,0 +1,406 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include "GateDigitizerPipelineActor.h"
+#include "../GateHelpers.h"
+#include "../GateHelpersDict.h"
+#include "GateDigiCollectionManager.h"
+#include <G4AutoLock.hh>
+#include <G4VoxelLimits.hh>
+#include <Randomize.hh>
+#include <algorithm>
+
+G4Mutex DigitizerPipelineActorMutex = G4MUTEX_INITIALIZER;
+
+GateDigitizerPipelineActor::GateDigitizerPipelineActor(py::dict &user_info)
+    : GateVDigitizerWithOutputActor(user_info, true) {
+  // actions
+  fActions.insert("EndOfEventAction");
+  fNeedVolumeId = false;
+}
+
+GateDigitizerPipelineActor::~GateDigitizerPipelineActor() = default;
+
+void GateDigitizerPipelineActor::InitializeUserInfo(py::dict &user_info) {
+  GateVDigitizerWithOutputActor::InitializeUserInfo(user_info);
+  fStages.clear();
+  fDColumnNames.clear();
+  f3ColumnNames.clear();
+  fNeedVolumeId = false;
+
+  // Get information for all stages (parameters are checked on python side)
+  const auto dv = DictGetVecDict(user_info, "stages");
+  for (auto d : dv) {
+    Stage s;
+    s.fName = DictGetStr(d, "name");
+    s.fWrite = DictGetBool(d, "write");
+    const auto type = DictGetStr(d, "type");
+    if (type == "blurring") {
+      s.fType = Blurring;
+      s.fColumn = AddDColumn(DictGetStr(d, "blur_attribute"));
+      s.fBlurMethod = DictGetStr(d, "blur_method");
+      s.fBlurSigma = DictGetDouble(d, "blur_sigma");
+      s.fBlurReferenceValue = DictGetDouble(d, "blur_reference_value");
+      s.fBlurResolution = DictGetDouble(d, "blur_resolution");
+      s.fBlurSlope = DictGetDouble(d, "blur_slope");
+    } else if (type == "spatial_blurring") {
+      s.fType = SpatialBlurring;
+      s.fColumn = Add3Column(DictGetStr(d, "blur_attribute"));
+      s.fBlurSigma3 = DictGetG4ThreeVector(d, "blur_sigma");
+      s.fKeepInSolidLimits = DictGetBool(d, "keep_in_solid_limits");
+      fNeedVolumeId = true;
+    } else if (type == "energy_window") {
+      s.fType = EnergyWindow;
+      s.fColumn = AddDColumn("TotalEnergyDeposit");
+      s.fMin = DictGetDouble(d, "min");
+      s.fMax = DictGetDouble(d, "max");
+    } else if (type == "efficiency") {
+      s.fType = Efficiency;
+      s.fEfficiency = DictGetDouble(d, "efficiency");
+    } else {
+      Fatal("Unknown digitizer pipeline stage type '" + type +
+            "' in the actor " + fActorName);
+    }
+    fStages.push_back(s);
+  }
+  fRejectedPerStage.assign(fStages.size(), 0);
+}
+
+size_t GateDigitizerPipelineActor::AddDColumn(const std::string &name) {
+  const auto it = std::find(fDColumnNames.begin(), fDColumnNames.end(), name);
+  if (it != fDColumnNames.end())
+    return std::distance(fDColumnNames.begin(), it);
+  fDColumnNames.push_back(name);
+  return fDColumnNames.size() - 1;
+}
+
+size_t GateDigitizerPipelineActor::Add3Column(const std::string &name) {
+  const auto it = std::find(f3ColumnNames.begin(), f3ColumnNames.end(), name);
+  if (it != f3ColumnNames.end())
+    return std::distance(f3ColumnNames.begin(), it);
+  f3ColumnNames.push_back(name);
+  return f3ColumnNames.size() - 1;
+}
+
+void GateDigitizerPipelineActor::StartSimulationAction() {
+  GateVDigitizerWithOutputActor::StartSimulationAction();
+
+  // check the attributes needed for computation
+  for (const auto &name : fDColumnNames)
+    CheckRequiredAttribute(fInputDigiCollection, name);
+  for (const auto &name : f3ColumnNames)
+    CheckRequiredAttribute(fInputDigiCollection, name);
+  // The unique vol id is required to compute the transform of the volume
+  if (fNeedVolumeId)
+    CheckRequiredAttribute(fInputDigiCollection, "PreStepUniqueVolumeID");
+
+  GetBufferedAttributes(fOutputDigiCollection, fOutputDAttributes,
+                        fOutput3Attributes);
+
+  // Create one output collection for each stage that must be written
+  auto *hcm = GateDigiCollectionManager::GetInstance();
+  for (auto &s : fStages) {
+    if (!s.fWrite)
+      continue;
+    auto *hc =
+        hcm->NewDigiCollection(fOutputDigiCollectionName + "_" + s.fName);
+    std::string outputPath;
+    if (!GetWriteToDisk(fOutputNameRoot)) {
+      outputPath = "";
+    } else {
+      outputPath = GetOutputPath(fOutputNameRoot);
+    }
+    hc->SetFilenameAndInitRoot(outputPath);
+    hc->InitDigiAttributesFromCopy(fInputDigiCollection,
+                                   fUserSkipDigiAttributeNames);
+    hc->RootInitializeTupleForMaster();
+    s.fDigiCollection = hc;
+    GetBufferedAttributes(hc, s.fOutputDAttributes, s.fOutput3Attributes);
+  }
+}
+
+void GateDigitizerPipelineActor::GetBufferedAttributes(
+    GateDigiCollection *hc, std::vector<GateVDigiAttribute *> &d_attributes,
+    std::vector<GateVDigiAttribute *> &t_attributes) {
+  d_attributes.clear();
+  for (const auto &name : fDColumnNames)
+    d_attributes.push_back(hc->GetDigiAttribute(name));
+  t_attributes.clear();
+  for (const auto &name : f3ColumnNames)
+    t_attributes.push_back(hc->GetDigiAttribute(name));
+}
+
+void GateDigitizerPipelineActor::DigitInitialize(
+    const std::vector<std::string> &attributes_not_in_filler) {
+  // the buffered attributes are not copied by the filler
+  auto a = attributes_not_in_filler;
+  a.insert(a.end(), fDColumnNames.begin(), fDColumnNames.end());
+  a.insert(a.end(), f3ColumnNames.begin(), f3ColumnNames.end());
+  GateVDigitizerWithOutputActor::DigitInitialize(a);
+
+  // set input pointers to the attributes needed for computation
+  auto &l = fThreadLocalData.Get();
+  l.fInputDColumns.clear();
+  for (const auto &name : fDColumnNames)
+    l.fInputDColumns.push_back(
+        &fInputDigiCollection->GetDigiAttribute(name)->GetDValues());
+  l.fInput3Columns.clear();
+  for (const auto &name : f3ColumnNames)
+    l.fInput3Columns.push_back(
+        &fInputDigiCollection->GetDigiAttribute(name)->Get3Values());
+  if (fNeedVolumeId)
+    l.fInputVolumeIds =
+        &fInputDigiCollection->GetDigiAttribute("PreStepUniqueVolumeID")
+             ->GetUValues();
+  l.fDColumns.resize(fDColumnNames.size());
+  l.f3Columns.resize(f3ColumnNames.size());
+
+  // fillers for the stages that are written
+  l.fStageFillers.assign(fStages.size(), nullptr);
+  for (size_t i = 0; i < fStages.size(); i++) {
+    auto *hc = fStages[i].fDigiCollection;
+    if (hc == nullptr)
+      continue;
+    hc->RootInitializeTupleForWorker();
+    auto names = hc->GetDigiAttributeNames();
+    for (const auto &name : a)
+      names.erase(name);
+    l.fStageFillers[i] =
+        new GateDigiAttributesFiller(fInputDigiCollection, hc, names);
+  }
+
+  l.fSolidExtentIsUpdated.assign(fStages.size(), false);
+  l.fSolidMin.resize(fStages.size());
+  l.fSolidMax.resize(fStages.size());
+  l.fRejectedPerStage.assign(fStages.size(), 0);
+}
+
+void GateDigitizerPipelineActor::BeginOfRunAction(const G4Run *run) {
+  GateVDigitizerWithOutputActor::BeginOfRunAction(run);
+  auto &l = fThreadLocalData.Get();
+  // the extent of the solids is computed only once per run
+  l.fSolidExtentIsUpdated.assign(fStages.size(), false);
+}
+
+void GateDigitizerPipelineActor::BeginOfEventAction(const G4Event *event) {
+  GateVDigitizerWithOutputActor::BeginOfEventAction(event);
+  const bool must_clear = event->GetEventID() % fClearEveryNEvents == 0;
+  for (const auto &s : fStages) {
+    if (s.fDigiCollection != nullptr)
+      s.fDigiCollection->FillToRootIfNeeded(must_clear);
+  }
+}
+
+void GateDigitizerPipelineActor::EndOfEventAction(const G4Event * /*unused*/) {
+  const auto begin = fInputDigiCollection->GetBeginOfEventIndex();
+  const auto end = fInputDigiCollection->GetSize();
+  // If no new digi, do nothing
+  if (end <= begin)
+    return;
+
+  // copy the buffered attributes of this event, all digis are selected
+  auto &l = fThreadLocalData.Get();
+  auto &lr = fThreadLocalVDigitizerData.Get();
+  l.fMask.assign(end - begin, 1);
+  for (size_t k = 0; k < l.fDColumns.size(); k++) {
+    const auto &input = *l.fInputDColumns[k];
+    l.fDColumns[k].assign(input.begin() + begin, input.begin() + end);
+  }
+  for (size_t k = 0; k < l.f3Columns.size(); k++) {
+    const auto &input = *l.fInput3Columns[k];
+    l.f3Columns[k].assign(input.begin() + begin, input.begin() + end);
+  }
+
+  // apply all stages in order on the same buffer
+  for (size_t i = 0; i < fStages.size(); i++) {
+    const auto &s = fStages[i];
+    switch (s.fType) {
+    case Blurring:
+      ApplyBlurring(s);
+      break;
+    case SpatialBlurring:
+      ApplySpatialBlurring(i);
+      break;
+    case EnergyWindow:
+      ApplyEnergyWindow(i);
+      break;
+    case Efficiency:
+      ApplyEfficiency(i);
+      break;
+    }
+    if (s.fDigiCollection != nullptr)
+      FillOutput(s.fOutputDAttributes, s.fOutput3Attributes,
+                 l.fStageFillers[i]);
+  }
+
+  // only the surviving digis are copied in the output
+  FillOutput(fOutputDAttributes, fOutput3Attributes, lr.fDigiAttributeFiller);
+}
+
+void GateDigitizerPipelineActor::FillOutput(
+    const std::vector<GateVDigiAttribute *> &d_attributes,
+    const std::vector<GateVDigiAttribute *> &t_attributes,
+    const GateDigiAttributesFiller *filler) const {
+  auto &l = fThreadLocalData.Get();
+  const auto begin = fInputDigiCollection->GetBeginOfEventIndex();
+  for (size_t i = 0; i < l.fMask.size(); i++) {
+    if (!l.fMask[i])
+      continue;
+    // buffered values first, then the other attributes are copied
+    for (size_t k = 0; k < d_attributes.size(); k++)
+      d_attributes[k]->FillDValue(l.fDColumns[k][i]);
+    for (size_t k = 0; k < t_attributes.size(); k++)
+      t_attributes[k]->Fill3Value(l.f3Columns[k][i]);
+    filler->Fill(begin + i);
+  }
+}
+
+void GateDigitizerPipelineActor::ApplyBlurring(const Stage &stage) const {
+  auto &l = fThreadLocalData.Get();
+  auto &values = l.fDColumns[stage.fColumn];
+  for (size_t i = 0; i < l.fMask.size(); i++) {
+    if (l.fMask[i])
+      values[i] = BlurValue(stage, values[i]);
+  }
+}
+
+double GateDigitizerPipelineActor::BlurValue(const Stage &stage,
+                                             const double value) const {
+  // same laws as GateDigitizerBlurringActor
+  if (stage.fBlurMethod == "InverseSquare") {
+    const auto v =
+        stage.fBlurResolution * (sqrt(stage.fBlurReferenceValue) / sqrt(value));
+    return G4RandGauss::shoot(value, (v * value) * fwhm_to_sigma);
+  }
+  if (stage.fBlurMethod == "Linear") {
+    const auto v = stage.fBlurSlope * (value - stage.fBlurReferenceValue) +
+                   stage.fBlurResolution;
+    return G4RandGauss::shoot(value, (v * value) * fwhm_to_sigma);
+  }
+  return G4RandGauss::shoot(value, stage.fBlurSigma);
+}
+
+void GateDigitizerPipelineActor::ApplySpatialBlurring(
+    const size_t stage_index) const {
+  auto &l = fThreadLocalData.Get();
+  const auto &stage = fStages[stage_index];
+  const auto begin = fInputDigiCollection->GetBeginOfEventIndex();
+  auto &positions = l.f3Columns[stage.fColumn];
+  const auto &sigma = stage.fBlurSigma3;
+  for (size_t i = 0; i < l.fMask.size(); i++) {
+    if (!l.fMask[i])
+      continue;
+    // Compute the position (in the world volume) in the local volume
+    const auto &vol_uid = (*l.fInputVolumeIds)[begin + i];
+    const auto &transform = vol_uid->fTouchable.GetTopTransform();
+    const auto local_position = transform.TransformPoint(positions[i]);
+    G4ThreeVector p(G4RandGauss::shoot(local_position.getX(), sigma.getX()),
+                    G4RandGauss::shoot(local_position.getY(), sigma.getY()),
+                    G4RandGauss::shoot(local_position.getZ(), sigma.getZ()));
+
+    if (stage.fKeepInSolidLimits) {
+      // the extent is computed only once per run
+      if (!l.fSolidExtentIsUpdated[stage_index]) {
+        const G4VoxelLimits limits;
+        const G4AffineTransform at;
+        const auto *solid =
+            vol_uid->GetTopPhysicalVolume()->GetLogicalVolume()->GetSolid();
+        double min, max;
+        solid->CalculateExtent(kXAxis, limits, at, min, max);
+        l.fSolidMin[stage_index].setX(min);
+        l.fSolidMax[stage_index].setX(max);
+        solid->CalculateExtent(kYAxis, limits, at, min, max);
+        l.fSolidMin[stage_index].setY(min);
+        l.fSolidMax[stage_index].setY(max);
+        solid->CalculateExtent(kZAxis, limits, at, min, max);
+        l.fSolidMin[stage_index].setZ(min);
+        l.fSolidMax[stage_index].setZ(max);
+        l.fSolidExtentIsUpdated[stage_index] = true;
+      }
+      static const double tiny = 1 * CLHEP::nm;
+      const auto &pmin = l.fSolidMin[stage_index];
+      const auto &pmax = l.fSolidMax[stage_index];
+      for (int axis = 0; axis < 3; axis++) {
+        if (p[axis] < pmin[axis])
+          p[axis] = pmin[axis] + tiny;
+        if (p[axis] > pmax[axis])
+          p[axis] = pmax[axis] - tiny;
+      }
+    }
+
+    // convert back the point to the world coordinate
+    positions[i] = transform.InverseTransformPoint(p);
+  }
+}
+
+void GateDigitizerPipelineActor::ApplyEnergyWindow(
+    const size_t stage_index) const {
+  auto &l = fThreadLocalData.Get();
+  const auto &stage = fStages[stage_index];
+  const auto &edep = l.fDColumns[stage.fColumn];
+  for (size_t i = 0; i < l.fMask.size(); i++) {
+    if (!l.fMask[i])
+      continue;
+    // same convention as GateDigitizerEnergyWindowsActor
+    if (edep[i] < stage.fMin || edep[i] >= stage.fMax) {
+      l.fMask[i] = 0;
+      l.fRejectedPerStage[stage_index]++;
+    }
+  }
+}
+
+void GateDigitizerPipelineActor::ApplyEfficiency(
+    const size_t stage_index) const {
+  auto &l = fThreadLocalData.Get();
+  const auto efficiency = fStages[stage_index].fEfficiency;
+  for (size_t i = 0; i < l.fMask.size(); i++) {
+    if (!l.fMask[i])
+      continue;
+    if (G4UniformRand() >= efficiency) {
+      l.fMask[i] = 0;
+      l.fRejectedPerStage[stage_index]++;
+    }
+  }
+}
+
+void GateDigitizerPipelineActor::EndOfRunAction(const G4Run *run) {
+  GateVDigitizerWithOutputActor::EndOfRunAction(run);
+  for (const auto &s : fStages) {
+    if (s.fDigiCollection != nullptr)
+      s.fDigiCollection->FillToRootIfNeeded(true);
+  }
+  // merge the rejected counters of this thread
+  auto &l = fThreadLocalData.Get();
+  G4AutoLock mutex(&DigitizerPipelineActorMutex);
+  for (size_t i = 0; i < l.fRejectedPerStage.size(); i++) {
+    fRejectedPerStage[i] += l.fRejectedPerStage[i];
+    l.fRejectedPerStage[i] = 0;
+  }
+}
+
+void GateDigitizerPipelineActor::EndOfSimulationWorkerAction(const G4Run *run) {
+  GateVDigitizerWithOutputActor::EndOfSimulationWorkerAction(run);
+  for (const auto &s : fStages) {
+    if (s.fDigiCollection != nullptr)
+      s.fDigiCollection->Write();
+  }
+}
+
+void GateDigitizerPipelineActor::EndSimulationAction() {
+  GateVDigitizerWithOutputActor::EndSimulationAction();
+  for (const auto &s : fStages) {
+    if (s.fDigiCollection != nullptr) {
+      s.fDigiCollection->Write();
+      s.fDigiCollection->Close();
+    }
+  }
+}
+
+std::vector<long>
+GateDigitizerPipelineActor::GetNumberOfRejectedDigisPerStage() const {
+  return fRejectedPerStage;
+}
@@ -0,0 +1,154 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#ifndef GateDigitizerPipelineActor_h
+#define GateDigitizerPipelineActor_h
+
+#include "../GateUniqueVolumeID.h"
+#include "GateVDigitizerWithOutputActor.h"
+#include <G4Cache.hh>
+#include <pybind11/stl.h>
+
+namespace py = pybind11;
+
+/*
+ * Digitizer module that chains several per-digi modules (blurring, spatial
+ * blurring, energy window, efficiency) in a single pass per event.
+ *
+ * The digis of the current event are copied once into a thread local
+ * columnar buffer (only the attributes modified or read by a stage). Each
+ * stage updates the buffer in place and/or clears entries of a selection
+ * mask. Only the surviving digis are copied to the output collection at the
+ * end of the event. Intermediate stages with the 'write' flag have their own
+ * output collection.
+ */
+
+class GateDigitizerPipelineActor : public GateVDigitizerWithOutputActor {
+
+public:
+  // constructor
+  explicit GateDigitizerPipelineActor(py::dict &user_info);
+
+  // destructor
+  ~GateDigitizerPipelineActor() override;
+
+  void InitializeUserInfo(py::dict &user_info) override;
+
+  // Called when the simulation start (master thread only)
+  void StartSimulationAction() override;
+
+  // Called when the simulation end (master thread only)
+  void EndSimulationAction() override;
+
+  // Called every time a Run starts (all threads)
+  void BeginOfRunAction(const G4Run *run) override;
+
+  // Called every time an Event starts
+  void BeginOfEventAction(const G4Event *event) override;
+
+  // Called every time an Event ends (all threads)
+  void EndOfEventAction(const G4Event *event) override;
+
+  // Called every time a Run ends (all threads)
+  void EndOfRunAction(const G4Run *run) override;
+
+  void EndOfSimulationWorkerAction(const G4Run *run) override;
+
+  // Number of digis removed by each stage (all threads, for tests/debug)
+  std::vector<long> GetNumberOfRejectedDigisPerStage() const;
+
+  enum StageType { Blurring, SpatialBlurring, EnergyWindow, Efficiency };
+
+  struct Stage {
+    std::string fName;
+    StageType fType;
+    bool fWrite = false;
+    // index of the column in the buffer (D or 3 depending on the type)
+    size_t fColumn = 0;
+    // blurring
+    std::string fBlurMethod;
+    double fBlurSigma = 0;
+    double fBlurReferenceValue = 0;
+    double fBlurResolution = 0;
+    double fBlurSlope = 0;
+    // spatial blurring
+    G4ThreeVector fBlurSigma3;
+    bool fKeepInSolidLimits = false;
+    // energy window
+    double fMin = 0;
+    double fMax = 0;
+    // efficiency
+    double fEfficiency = 1.0;
+    // output (only when fWrite is true)
+    GateDigiCollection *fDigiCollection = nullptr;
+    std::vector<GateVDigiAttribute *> fOutputDAttributes;
+    std::vector<GateVDigiAttribute *> fOutput3Attributes;
+  };
+
+protected:
+  void DigitInitialize(
+      const std::vector<std::string> &attributes_not_in_filler) override;
+
+  size_t AddDColumn(const std::string &name);
+
+  size_t Add3Column(const std::string &name);
+
+  void ApplyBlurring(const Stage &stage) const;
+
+  void ApplySpatialBlurring(size_t stage_index) const;
+
+  void ApplyEnergyWindow(size_t stage_index) const;
+
+  void ApplyEfficiency(size_t stage_index) const;
+
+  void GetBufferedAttributes(GateDigiCollection *hc,
+                             std::vector<GateVDigiAttribute *> &d_attributes,
+                             std::vector<GateVDigiAttribute *> &t_attributes);
+
+  void FillOutput(const std::vector<GateVDigiAttribute *> &d_attributes,
+                  const std::vector<GateVDigiAttribute *> &t_attributes,
+                  const GateDigiAttributesFiller *filler) const;
+
+  double BlurValue(const Stage &stage, double value) const;
+
+  std::vector<Stage> fStages;
+
+  // names of the attributes copied in the buffer
+  std::vector<std::string> fDColumnNames;
+  std::vector<std::string> f3ColumnNames;
+  bool fNeedVolumeId;
+
+  // output attributes of the buffered columns (final output)
+  std::vector<GateVDigiAttribute *> fOutputDAttributes;
+  std::vector<GateVDigiAttribute *> fOutput3Attributes;
+
+  // Rejected counters, merged from all threads at the end of each run
+  std::vector<long> fRejectedPerStage;
+
+  // During computation (thread local)
+  struct threadLocalT {
+    // selection mask for the digis of the current event
+    std::vector<char> fMask;
+    // columnar buffer of the current event
+    std::vector<std::vector<double>> fDColumns;
+    std::vector<std::vector<G4ThreeVector>> f3Columns;
+    // pointers to the input values
+    std::vector<std::vector<double> *> fInputDColumns;
+    std::vector<std::vector<G4ThreeVector> *> fInput3Columns;
+    std::vector<GateUniqueVolumeID::Pointer> *fInputVolumeIds{};
+    // fillers for the remaining attributes of the written stages
+    std::vector<GateDigiAttributesFiller *> fStageFillers;
+    // solid extent (per spatial blurring stage), computed once per run
+    std::vector<bool> fSolidExtentIsUpdated;
+    std::vector<G4ThreeVector> fSolidMin;
+    std::vector<G4ThreeVector> fSolidMax;
+    std::vector<long> fRejectedPerStage;
+  };
+  G4Cache<threadLocalT> fThreadLocalData;
+};
+
+#endif // GateDigitizerPipelineActor_h
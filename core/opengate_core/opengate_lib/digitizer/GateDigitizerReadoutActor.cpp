@@ -65,8 +65,8 @@ void GateDigitizerReadoutActor::EndOfEventAction(const G4Event * /*unused*/) {
   }
 
   // create the output digi collection for grouped digi
-  for (auto &h : l.fMapOfDigiInVolume) {
-    const auto &digi = h.second;
+  for (const auto index : GetSortedAdders()) {
+    const auto &digi = l.fAdderPool[index];
     // terminate the merge
     digi->Terminate();
 
@@ -99,7 +99,7 @@ void GateDigitizerReadoutActor::EndOfEventAction(const G4Event * /*unused*/) {
   }
 
   // reset the structure of digi
-  l.fMapOfDigiInVolume.clear();
+  ClearAdders();
 }
 
 void GateDigitizerReadoutActor::EndOfSimulationWorkerAction(
@@ -0,0 +1,48 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#ifndef helpers_digi_columns_py_h
+#define helpers_digi_columns_py_h
+
+#include "GateDigiColumns.h"
+#include <pybind11/numpy.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+namespace py = pybind11;
+
+// numpy array owning the vector (no copy)
+template <typename T> py::array_t<T> MoveToArray(std::vector<T> &&v) {
+  auto *p = new std::vector<T>(std::move(v));
+  py::capsule owner(p,
+                    [](void *f) { delete static_cast<std::vector<T> *>(f); });
+  return py::array_t<T>(static_cast<py::ssize_t>(p->size()), p->data(), owner);
+}
+
+// return (columns, dictionaries): the columns are moved out as numpy
+// arrays, the string columns hold the codes in their dictionary
+inline py::tuple TakeColumnsAsArrays(GateDigiColumns *c) {
+  py::dict columns;
+  py::dict dictionaries;
+  if (c == nullptr)
+    return py::make_tuple(columns, dictionaries);
+  for (const auto &name : c->GetColumnNames()) {
+    const auto t = c->GetColumnType(name);
+    const auto key = py::str(name);
+    if (t == 'd')
+      columns[key] = MoveToArray(c->TakeDValues(name));
+    if (t == 'i' || t == 's')
+      columns[key] = MoveToArray(c->TakeIValues(name));
+    if (t == 'l')
+      columns[key] = MoveToArray(c->TakeLValues(name));
+    if (t == 's')
+      dictionaries[key] = py::cast(c->GetDictionary(name));
+  }
+  return py::make_tuple(columns, dictionaries);
+}
+
+#endif // helpers_digi_columns_py_h
@@ -0,0 +1,20 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include "GateDigitizerPipelineActor.h"
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+void init_GateDigitizerPipelineActor(py::module &m) {
+
+  py::class_<GateDigitizerPipelineActor,
+             std::unique_ptr<GateDigitizerPipelineActor, py::nodelete>,
+             GateVDigitizerWithOutputActor>(m, "GateDigitizerPipelineActor")
+      .def(py::init<py::dict &>())
+      .def("GetNumberOfRejectedDigisPerStage",
+           &GateDigitizerPipelineActor::GetNumberOfRejectedDigisPerStage);
+}
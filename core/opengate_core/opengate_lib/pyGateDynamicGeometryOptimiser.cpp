@@ -0,0 +1,27 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+namespace py = pybind11;
+
+#include "GateDynamicGeometryOptimiser.h"
+
+void init_GateDynamicGeometryOptimiser(py::module &m) {
+
+  py::class_<GateDynamicGeometryOptimiser>(m, "GateDynamicGeometryOptimiser")
+      .def(py::init<>())
+      .def("Reoptimise", &GateDynamicGeometryOptimiser::Reoptimise,
+           py::arg("moved"), py::arg("optimise"), py::arg("key") = "")
+      .def("ClearCache", &GateDynamicGeometryOptimiser::ClearCache)
+      .def_readwrite("fCacheSize", &GateDynamicGeometryOptimiser::fCacheSize)
+      .def_readonly("fNumberOfBuilds",
+                    &GateDynamicGeometryOptimiser::fNumberOfBuilds)
+      .def_readonly("fNumberOfCacheHits",
+                    &GateDynamicGeometryOptimiser::fNumberOfCacheHits);
+}
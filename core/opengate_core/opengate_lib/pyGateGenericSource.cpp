@@ -19,5 +19,6 @@ void init_GateGenericSource(py::module &m) {
       .def("SetProbabilityCDF", &GateGenericSource::SetProbabilityCDF)
       .def("GetTotalSkippedEvents", &GateGenericSource::GetTotalSkippedEvents)
       .def("GetTotalZeroEvents", &GateGenericSource::GetTotalZeroEvents)
-      .def("SetTAC", &GateGenericSource::SetTAC);
+      .def("SetTAC", &GateGenericSource::SetTAC)
+      .def("SetSpectrumLinesTAC", &GateGenericSource::SetSpectrumLinesTAC);
 }
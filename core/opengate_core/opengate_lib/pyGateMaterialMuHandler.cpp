@@ -15,5 +15,11 @@ void init_GateMaterialMuHandler(py::module &m) {
              std::unique_ptr<GateMaterialMuHandler, py::nodelete>>(
       m, "GateMaterialMuHandler")
       .def("GetInstance", &GateMaterialMuHandler::GetInstance)
-      .def("GetMu", &GateMaterialMuHandler::GetMu);
+      .def("GetMu", &GateMaterialMuHandler::GetMu)
+      .def("SetCacheDirectory", &GateMaterialMuHandler::SetCacheDirectory)
+      .def("GetCacheDirectory", &GateMaterialMuHandler::GetCacheDirectory)
+      .def_readonly("fNumberOfCachedTables",
+                    &GateMaterialMuHandler::fNumberOfCachedTables)
+      .def_readonly("fNumberOfSimulatedTables",
+                    &GateMaterialMuHandler::fNumberOfSimulatedTables);
 }
@@ -6,7 +6,7 @@
    -------------------------------------------------- */
 
 #include "GatePhaseSpaceActor.h"
-#include <pybind11/pybind11.h>
+#include "digitizer/helpers_digi_columns_py.h"
 
 void init_GatePhaseSpaceActor(py::module &m) {
 
@@ -22,5 +22,9 @@ void init_GatePhaseSpaceActor(py::module &m) {
            &GatePhaseSpaceActor::SetStoreExitingStepFlag)
       .def("SetStoreAllStepsFlag", &GatePhaseSpaceActor::SetStoreAllStepsFlag)
       .def("SetStoreFirstStepInVolumeFlag",
-           &GatePhaseSpaceActor::SetStoreFirstStepInVolumeFlag);
+           &GatePhaseSpaceActor::SetStoreFirstStepInVolumeFlag)
+      .def("SetColumnarOutput", &GatePhaseSpaceActor::SetColumnarOutput)
+      .def("TakeColumns", [](const GatePhaseSpaceActor &a) {
+        return TakeColumnsAsArrays(a.GetColumns());
+      });
 }
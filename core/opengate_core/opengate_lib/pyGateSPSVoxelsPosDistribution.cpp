@@ -19,6 +19,11 @@ void init_GateSPSVoxelsPosDistribution(py::module &m) {
       .def(py::init())
       .def("SetCumulativeDistributionFunction",
            &GateSPSVoxelsPosDistribution::SetCumulativeDistributionFunction)
+      .def("SetAliasSampler",
+           [](GateSPSVoxelsPosDistribution &self,
+              std::shared_ptr<GateVoxelAliasSampler> sampler) {
+             self.SetAliasSampler(sampler);
+           })
       .def("VGenerateOne", &GateSPSVoxelsPosDistribution::VGenerateOne)
       .def_readwrite("cpp_edep_image",
                      &GateSPSVoxelsPosDistribution::cpp_image);
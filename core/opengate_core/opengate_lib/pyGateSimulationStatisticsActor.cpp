@@ -71,5 +71,9 @@ void init_GateSimulationStatisticsActor(py::module &m) {
       .def(py::init<py::dict &>())
       .def("InitializeUserInfo",
            &GateSimulationStatisticsActor::InitializeUserInfo)
-      .def("GetCounts", &GateSimulationStatisticsActor::GetCounts);
+      .def("GetCounts", &GateSimulationStatisticsActor::GetCounts)
+      .def("SetGlobalStepCountFlag",
+           &GateSimulationStatisticsActor::SetGlobalStepCountFlag)
+      .def("GetGlobalStepCountFlag",
+           &GateSimulationStatisticsActor::GetGlobalStepCountFlag);
 }
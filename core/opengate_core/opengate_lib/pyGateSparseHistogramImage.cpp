@@ -0,0 +1,35 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include <pybind11/numpy.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+namespace py = pybind11;
+
+#include "GateSparseHistogramImage.h"
+
+void init_GateSparseHistogramImage(py::module &m) {
+  py::class_<GateSparseHistogramImage>(m, "GateSparseHistogramImage")
+      .def(py::init())
+      .def("GetNumberOfVoxels", &GateSparseHistogramImage::GetNumberOfVoxels)
+      .def("GetNumberOfBins", &GateSparseHistogramImage::GetNumberOfBins)
+      .def("GetSize", &GateSparseHistogramImage::GetSize)
+      .def("GetSortedData", [](const GateSparseHistogramImage &s) {
+        // return (indices, values) as numpy arrays, values is (n, nbins)
+        std::vector<int64_t> indices;
+        std::vector<double> values;
+        s.GetSortedData(indices, values);
+        const auto n = static_cast<py::ssize_t>(indices.size());
+        const auto nb = static_cast<py::ssize_t>(s.GetNumberOfBins());
+        py::array_t<int64_t> py_indices(n);
+        std::copy(indices.begin(), indices.end(), py_indices.mutable_data());
+        py::array_t<double> py_values({n, nb});
+        std::copy(values.begin(), values.end(), py_values.mutable_data());
+        return py::make_tuple(py_indices, py_values);
+      });
+}
@@ -0,0 +1,26 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include "GateStepRecordActor.h"
+#include "digitizer/helpers_digi_columns_py.h"
+#include <pybind11/functional.h>
+
+void init_GateStepRecordActor(py::module &m) {
+  py::class_<GateStepRecordActor,
+             std::unique_ptr<GateStepRecordActor, py::nodelete>, GateVActor>(
+      m, "GateStepRecordActor")
+      .def(py::init<py::dict &>())
+      .def("SetStepRecordFunction", &GateStepRecordActor::SetStepRecordFunction)
+      .def("GetCurrentRunId", &GateStepRecordActor::GetCurrentRunId)
+      .def("GetTotalNumberOfSteps", &GateStepRecordActor::GetTotalNumberOfSteps)
+      .def("GetTotalNumberOfBatches",
+           &GateStepRecordActor::GetTotalNumberOfBatches)
+      .def("TakeCurrentBatch", [](GateStepRecordActor &a) {
+        // must be called by the apply function (same thread as the steps)
+        return TakeColumnsAsArrays(a.GetCurrentColumns());
+      });
+}
@@ -15,5 +15,6 @@ void init_GateSteppingAction(py::module &m) {
       m, "GateSteppingAction")
       .def(py::init())
       .def("RegisterAuxiliaryAttribute",
-           &GateSteppingAction::RegisterAuxiliaryAttribute);
+           &GateSteppingAction::RegisterAuxiliaryAttribute)
+      .def("GetNumberOfSteps", &GateSteppingAction::GetNumberOfSteps);
 }
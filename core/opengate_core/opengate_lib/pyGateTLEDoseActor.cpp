@@ -52,6 +52,12 @@ void init_GateTLEDoseActor(py::module &m) {
       .def("SetReferenceEnergySPR", &GateTLEDoseActor::SetReferenceEnergySPR)
       .def("GetTransitionEnergySPR", &GateTLEDoseActor::GetTransitionEnergySPR)
       .def("SetTransitionEnergySPR", &GateTLEDoseActor::SetTransitionEnergySPR)
+      .def("GetMuCacheDirectory", &GateTLEDoseActor::GetMuCacheDirectory)
+      .def("SetMuCacheDirectory", &GateTLEDoseActor::SetMuCacheDirectory)
+      .def("GetNumberOfCachedMuTables",
+           &GateTLEDoseActor::GetNumberOfCachedMuTables)
+      .def("GetNumberOfSimulatedMuTables",
+           &GateTLEDoseActor::GetNumberOfSimulatedMuTables)
       .def("GetCountsFlag", &GateTLEDoseActor::GetCountsFlag)
       .def("SetCountsFlag", &GateTLEDoseActor::SetCountsFlag)
       .def("GetPhysicalVolumeName", &GateTLEDoseActor::GetPhysicalVolumeName)
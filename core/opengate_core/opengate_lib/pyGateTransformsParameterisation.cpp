@@ -0,0 +1,22 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include "GateTransformsParameterisation.h"
+#include <G4VPVParameterisation.hh>
+#include <pybind11/pybind11.h>
+
+void init_GateTransformsParameterisation(py::module &m) {
+
+  py::class_<GateTransformsParameterisation, G4VPVParameterisation>(
+      m, "GateTransformsParameterisation")
+      .def(py::init<>())
+      .def("SetTransforms", &GateTransformsParameterisation::SetTransforms)
+      .def("GetNumberOfTransforms",
+           &GateTransformsParameterisation::GetNumberOfTransforms)
+      .def("ComputeTransformation",
+           &GateTransformsParameterisation::ComputeTransformation);
+}
@@ -6,6 +6,7 @@
    -------------------------------------------------- */
 
 #include "GateVolumeVoxelizer.h"
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
@@ -17,6 +18,8 @@ void init_GateVolumeVoxelizer(py::module &m) {
       .def(py::init<>())
       .def_readwrite("fImage", &GateVolumeVoxelizer::fImage)
       .def_readonly("fLabels", &GateVolumeVoxelizer::fLabels)
+      .def_readwrite("fNumberOfThreads", &GateVolumeVoxelizer::fNumberOfThreads)
+      .def_readwrite("fProgressBar", &GateVolumeVoxelizer::fProgressBar)
       .def("GetIndexIsoCenter",
            [](const GateVolumeVoxelizer &self) -> std::vector<float> {
              std::vector<float> c = {self.fIndexIsoCenter[0],
@@ -24,5 +27,27 @@ void init_GateVolumeVoxelizer(py::module &m) {
                                      self.fIndexIsoCenter[2]};
              return c;
            })
-      .def("Voxelize", &GateVolumeVoxelizer::Voxelize);
+      .def("Voxelize", &GateVolumeVoxelizer::Voxelize,
+           py::call_guard<py::gil_scoped_release>())
+      .def("ClassifyPoints",
+           [](GateVolumeVoxelizer &self,
+              py::array_t<double, py::array::c_style | py::array::forcecast>
+                  points) {
+             // points: (n, 3) array, returns the (n,) array of labels
+             if (points.ndim() != 2 || points.shape(1) != 3)
+               throw std::runtime_error("points must be a (n, 3) array");
+             const auto n = static_cast<size_t>(points.shape(0));
+             auto p = points.unchecked<2>();
+             std::vector<G4ThreeVector> v(n);
+             for (size_t i = 0; i < n; i++)
+               v[i] = G4ThreeVector(p(i, 0), p(i, 1), p(i, 2));
+             std::vector<int> labels;
+             {
+               py::gil_scoped_release release;
+               labels = self.ClassifyPoints(v);
+             }
+             py::array_t<int> result(n);
+             std::copy(labels.begin(), labels.end(), result.mutable_data());
+             return result;
+           });
 }
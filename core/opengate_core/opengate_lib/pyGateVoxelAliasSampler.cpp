@@ -0,0 +1,51 @@
+/* --------------------------------------------------
+   Copyright (C): OpenGATE Collaboration
+   This software is distributed under the terms
+   of the GNU Lesser General  Public Licence (LGPL)
+   See LICENSE.md for further details
+   -------------------------------------------------- */
+
+#include "GateVoxelAliasSampler.h"
+#include <pybind11/numpy.h>
+#include <pybind11/pybind11.h>
+
+namespace py = pybind11;
+
+template <class T>
+std::shared_ptr<GateVoxelAliasSampler>
+BuildVoxelAliasSampler(const py::array_t<T, py::array::c_style> &weights) {
+  // weights: 3D (Z, Y, X) array, read in place (no copy)
+  if (weights.ndim() != 3)
+    throw std::runtime_error("the weights must be a 3D array");
+  auto sampler = std::make_shared<GateVoxelAliasSampler>();
+  const auto *data = weights.data();
+  const auto nz = static_cast<size_t>(weights.shape(0));
+  const auto ny = static_cast<size_t>(weights.shape(1));
+  const auto nx = static_cast<size_t>(weights.shape(2));
+  {
+    py::gil_scoped_release release;
+    sampler->Build(data, nz, ny, nx);
+  }
+  return sampler;
+}
+
+void init_GateVoxelAliasSampler(py::module &m) {
+  py::class_<GateVoxelAliasSampler, std::shared_ptr<GateVoxelAliasSampler>>(
+      m, "GateVoxelAliasSampler")
+      // float32 and float64 arrays are used without copy, other types are
+      // converted to float64
+      .def(py::init(&BuildVoxelAliasSampler<float>), py::arg("weights"))
+      .def(
+          py::init(
+              [](const py::array_t<double, py::array::c_style |
+                                               py::array::forcecast> &weights) {
+                return BuildVoxelAliasSampler<double>(weights);
+              }),
+          py::arg("weights"))
+      .def("Sample", &GateVoxelAliasSampler::Sample)
+      .def("GetNumberOfNonZeroVoxels",
+           &GateVoxelAliasSampler::GetNumberOfNonZeroVoxels)
+      .def("GetNumberOfVoxels", &GateVoxelAliasSampler::GetNumberOfVoxels)
+      .def("GetTotalWeight", &GateVoxelAliasSampler::GetTotalWeight)
+      .def("GetMemorySize", &GateVoxelAliasSampler::GetMemorySize);
+}
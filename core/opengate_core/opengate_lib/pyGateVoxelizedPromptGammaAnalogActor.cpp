@@ -74,5 +74,14 @@ void init_GateVoxelizedPromptGammaAnalogActor(py::module &m) {
       .def_readwrite("cpp_E_neutron_image",
                      &GateVoxelizedPromptGammaAnalogActor::cpp_E_neutron_image)
       .def_readwrite("cpp_E_proton_image",
-                     &GateVoxelizedPromptGammaAnalogActor::cpp_E_proton_image);
+                     &GateVoxelizedPromptGammaAnalogActor::cpp_E_proton_image)
+      .def_readonly(
+          "cpp_tof_neutron_sparse",
+          &GateVoxelizedPromptGammaAnalogActor::cpp_tof_neutron_sparse)
+      .def_readonly("cpp_tof_proton_sparse",
+                    &GateVoxelizedPromptGammaAnalogActor::cpp_tof_proton_sparse)
+      .def_readonly("cpp_E_neutron_sparse",
+                    &GateVoxelizedPromptGammaAnalogActor::cpp_E_neutron_sparse)
+      .def_readonly("cpp_E_proton_sparse",
+                    &GateVoxelizedPromptGammaAnalogActor::cpp_E_proton_sparse);
 }
@@ -72,5 +72,13 @@ void init_GateVoxelizedPromptGammaTLEActor(py::module &m) {
       .def_readwrite("cpp_E_neutron_image",
                      &GateVoxelizedPromptGammaTLEActor::cpp_E_neutron_image)
       .def_readwrite("cpp_E_proton_image",
-                     &GateVoxelizedPromptGammaTLEActor::cpp_E_proton_image);
+                     &GateVoxelizedPromptGammaTLEActor::cpp_E_proton_image)
+      .def_readonly("cpp_tof_neutron_sparse",
+                    &GateVoxelizedPromptGammaTLEActor::cpp_tof_neutron_sparse)
+      .def_readonly("cpp_tof_proton_sparse",
+                    &GateVoxelizedPromptGammaTLEActor::cpp_tof_proton_sparse)
+      .def_readonly("cpp_E_neutron_sparse",
+                    &GateVoxelizedPromptGammaTLEActor::cpp_E_neutron_sparse)
+      .def_readonly("cpp_E_proton_sparse",
+                    &GateVoxelizedPromptGammaTLEActor::cpp_E_proton_sparse);
 }
@@ -137,7 +137,6 @@ import opengate.geometry.utility
 import opengate.geometry.volumes
 import opengate.geometry.fields
 import opengate.actors
-import opengate.contrib
 
 # modules directly under /opengate/
 import opengate.managers
@@ -159,6 +158,19 @@ import opengate.numerical
 # because users will frequently use them
 from opengate.managers import Simulation
 from opengate.managers import create_sim_from_json
+from opengate.processing import SimulationWorkerPool
 from opengate.chemistry import TrackedChemicalReaction
 from opengate.utility import g4_units
 from opengate.base import help_on_user_info
+
+# These subpackages are only imported on first access (PEP 562) because they
+# are not needed by most simulations and may import heavy modules
+_lazy_subpackages = ("contrib",)
+
+
+def __getattr__(name):
+    if name in _lazy_subpackages:
+        import importlib
+
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
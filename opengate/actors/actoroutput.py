@@ -1,21 +1,33 @@
 import copy
 import inspect
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import opengate_core as g4
 from box import Box
 
 from ..base import GateObject, process_cls
 from ..exception import GateImplementationError, fatal, warning
-from ..image import create_3d_image_of_histogram
-from ..utility import ensure_filename_is_str, insert_suffix_before_extension
+from ..image import (
+    create_3d_image_of_histogram,
+    chunked_image_suffix,
+    ChunkedImageReader,
+)
+from ..utility import (
+    ensure_filename_is_str,
+    insert_suffix_before_extension,
+    replace_extension,
+)
 from .dataitems import (
     QuotientItkImage,
     QuotientMeanItkImage,
     SingleItkImage,
     SingleItkImageWithVariance,
     SingleMeanItkImage,
+    SingleSparseImageOfHistograms,
     merge_data,
 )
 
@@ -262,6 +274,7 @@ class UserInterfaceToActorOutputImage(UserInterfaceToActorOutputUsingDataItemCon
     def __get_docstring_attributes__(cls):
         docstring = super().__get_docstring_attributes__()
         docstring += get_formatted_docstring_rst(cls, "image")
+        docstring += get_formatted_docstring_rst(cls, "output_format")
         return docstring
 
     @property
@@ -273,6 +286,48 @@ class UserInterfaceToActorOutputImage(UserInterfaceToActorOutputUsingDataItemCon
         """
         return self._user_output.get_data(**self._kwargs_for_interface_calls)
 
+    @property
+    def output_format(self):
+        """Format of the image files: 'mhd' (default) or 'chunked'.
+        'chunked' writes a directory with the extension .zarr containing the image
+        split into compressed chunks (zarr v2 layout), written in parallel.
+        Such images can be read lazily with opengate.image.ChunkedImageReader.
+        """
+        return self._user_output.output_format
+
+    @output_format.setter
+    def output_format(self, value):
+        self._user_output.output_format = value
+
+    @property
+    def compression_level(self):
+        """zlib compression level (0-9) of the chunks when output_format='chunked'."""
+        return self._user_output.compression_level
+
+    @compression_level.setter
+    def compression_level(self, value):
+        self._user_output.compression_level = value
+
+    @property
+    def chunk_shape(self):
+        """Shape of the chunks (numpy order, i.e. z, y, x) when output_format='chunked'.
+        If None, chunks of about 1 MB are used.
+        """
+        return self._user_output.chunk_shape
+
+    @chunk_shape.setter
+    def chunk_shape(self, value):
+        self._user_output.chunk_shape = value
+
+    @property
+    def number_of_writer_threads(self):
+        """Number of threads writing the chunks in parallel when output_format='chunked'."""
+        return self._user_output.number_of_writer_threads
+
+    @number_of_writer_threads.setter
+    def number_of_writer_threads(self, value):
+        self._user_output.number_of_writer_threads = value
+
 
 def _setter_hook_belongs_to(self, belongs_to):
     if belongs_to is None:
@@ -811,10 +866,105 @@ class ActorOutputUsingDataItemContainer(ActorOutputBase):
 class ActorOutputImage(ActorOutputUsingDataItemContainer):
     _default_interface_class = UserInterfaceToActorOutputImage
 
+    # hints for IDE
+    output_format: str
+    compression_level: int
+    chunk_shape: Optional[tuple]
+    number_of_writer_threads: int
+
+    user_info_defaults = {
+        "output_format": (
+            "mhd",
+            {
+                "doc": "Format of the image files. "
+                "'mhd': one mhd/raw file per image. "
+                "'chunked': one directory (extension .zarr) per image with the image "
+                "split into compressed chunks, written in parallel, "
+                "that can be read lazily (see ChunkedImageReader). ",
+                "allowed_values": ("mhd", "chunked"),
+            },
+        ),
+        "compression_level": (
+            4,
+            {
+                "doc": "zlib compression level (0: no compression, 9: maximum) "
+                "of the chunks when output_format='chunked'. ",
+            },
+        ),
+        "chunk_shape": (
+            None,
+            {
+                "doc": "Shape of the chunks in numpy order (z, y, x) "
+                "when output_format='chunked'. If None, chunks of about 1 MB are used. ",
+            },
+        ),
+        "number_of_writer_threads": (
+            4,
+            {
+                "doc": "Number of threads used to write the images "
+                "(and the chunks of each image) when output_format='chunked'. ",
+            },
+        ),
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.default_suffix = "mhd"
 
+    def get_output_path(self, *args, **kwargs):
+        path = super().get_output_path(*args, **kwargs)
+        if self.output_format != "chunked" or path is None:
+            return path
+        if isinstance(path, dict):
+            return {
+                k: replace_extension(p, chunked_image_suffix) for k, p in path.items()
+            }
+        return replace_extension(path, chunked_image_suffix)
+
+    def get_data(self, which="merged", item=0):
+        data = super().get_data(which=which, item=item)
+        if data is None and self.output_format == "chunked":
+            # data not in memory anymore: read lazily from disk, if available
+            path = self.get_output_path(which=which, item=item)
+            if path is not None and Path(path).exists():
+                return ChunkedImageReader(path)
+        return data
+
+    def write_data(self, which="all", item="all", **kwargs):
+        if self.output_format != "chunked":
+            return super().write_data(which=which, item=item, **kwargs)
+        if which == "all_runs":
+            whiches = list(self.data_per_run.keys())
+        elif which == "all":
+            whiches = list(self.data_per_run.keys()) + ["merged"]
+        else:
+            whiches = [which]
+        tasks = []
+        for w in whiches:
+            data = self.get_data_container(w)
+            if data is not None:
+                for i in self._collect_item_identifiers(item):
+                    tasks.append((data, self.get_output_path(which=w, item=i), i))
+        if len(tasks) == 0:
+            return
+        # images are written concurrently; the threads are shared between
+        # the images and the chunks of each image
+        n_threads = max(1, self.number_of_writer_threads)
+        options = {
+            "output_format": "chunked",
+            "chunk_shape": self.chunk_shape,
+            "compression_level": self.compression_level,
+            "number_of_threads": max(1, n_threads // len(tasks)),
+        }
+
+        def write_task(task):
+            data, path, i = task
+            data.write(path, item=i, **options)
+
+        with ThreadPoolExecutor(max_workers=min(n_threads, len(tasks))) as executor:
+            # list() to raise the exceptions of the threads, if any
+            list(executor.map(write_task, tasks))
+
     def set_image_properties(self, which, **kwargs):
         for image_data in self.collect_data(which):
             if image_data is not None:
@@ -847,7 +997,41 @@ class ActorOutputImage(ActorOutputUsingDataItemContainer):
         )
 
 
+def _setter_hook_sparse(self, value):
+    # sparse images of histograms are held by a dedicated data container
+    if value is True:
+        self.data_container_class = SingleSparseImageOfHistograms
+    else:
+        self.data_container_class = type(self).data_container_class
+    return value
+
+
 class ActorOutputImageOfHistogram(ActorOutputImage):
+    # hints for IDE
+    sparse: bool
+
+    user_info_defaults = {
+        "sparse": (
+            False,
+            {
+                "doc": "If True, the image of histograms is stored sparsely: "
+                "only the histograms of the non-empty voxels are kept in memory "
+                "and written (compressed numpy file .npz). "
+                "The data is a SparseImageOfHistograms object, "
+                "use its to_itk_image() method to get the dense 4D image. ",
+                "setter_hook": _setter_hook_sparse,
+            },
+        ),
+    }
+
+    def get_output_path(self, *args, **kwargs):
+        path = super().get_output_path(*args, **kwargs)
+        if self.sparse is not True or path is None:
+            return path
+        if isinstance(path, dict):
+            return {k: replace_extension(p, "npz") for k, p in path.items()}
+        return replace_extension(path, "npz")
+
     def create_image_of_histograms(
         self, run_index, size, spacing, bins, origin=None, **kwargs
     ):
@@ -919,6 +1103,13 @@ class ActorOutputRoot(ActorOutputBase):
 
     default_suffix = "root"
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # columnar data (dict of numpy arrays), filled instead of the ROOT file
+        # by the PhaseSpaceActor when output_mode is 'memory'
+        self.columns = None
+        self.dictionaries = None
+
     @classmethod
     def get_user_info_default_values_interface(cls, **kwargs):
         defaults = super().get_user_info_default_values_interface(**kwargs)
@@ -945,6 +1136,29 @@ class ActorOutputRoot(ActorOutputBase):
             )
         return super().get_output_path(which="merged")
 
+    def store_columns(self, columns, dictionaries):
+        self.columns = columns
+        self.dictionaries = dictionaries
+
+    def get_data(self, which="merged", decode_strings=True, **kwargs):
+        """Columnar data as a dict of numpy arrays (one per ROOT branch).
+        String columns are dictionary-encoded: if decode_strings is False,
+        they hold int32 codes into self.dictionaries[name].
+        """
+        if self.columns is None:
+            fatal(
+                f"No data in memory for the output '{self.name}' "
+                f"of actor '{self.belongs_to}'. "
+                f"ROOT data are only stored on disk, use e.g. uproot to read "
+                f"{self.get_output_path()}. "
+            )
+        if not decode_strings:
+            return self.columns
+        data = dict(self.columns)
+        for k, d in self.dictionaries.items():
+            data[k] = np.asarray(d, dtype=str)[data[k]]
+        return data
+
     def initialize(self):
         # Warning, for the moment, MT and root output does not work on windows machine
         if sys.platform.startswith("nt"):
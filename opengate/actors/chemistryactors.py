@@ -425,6 +425,7 @@ class ChemicalCountingActor(ChemistryActorBase, g4.GateChemicalCountingActor):
                 "PostChemistryTimeStepAction",
                 "ChemistryReactionAction",
                 "EndOfEventAction",
+                "EndOfRunAction",
                 "EndChemistryProcessing",
                 "EndSimulationAction",
             }
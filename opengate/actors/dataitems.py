@@ -13,9 +13,11 @@ from ..image import (
     copy_itk_image,
     create_3d_image,
     write_itk_image,
+    write_itk_image_chunked,
     get_info_from_image,
     itk_image_from_array,
     add_constant_to_itk_image,
+    SparseImageOfHistograms,
 )
 
 
@@ -406,8 +408,11 @@ class ItkImageDataItem(DataItem):
             create_3d_image(size, spacing, origin, pixel_type, allocate, fill_value)
         )
 
-    def write(self, path):
-        write_itk_image(self.data, ensure_filename_is_str(path))
+    def write(self, path, output_format="mhd", **kwargs):
+        if output_format == "chunked":
+            write_itk_image_chunked(self.data, ensure_filename_is_str(path), **kwargs)
+        else:
+            write_itk_image(self.data, ensure_filename_is_str(path))
 
 
 class MeanItkImageDataItem(MeanValueDataItemMixin, ItkImageDataItem):
@@ -416,6 +421,63 @@ class MeanItkImageDataItem(MeanValueDataItemMixin, ItkImageDataItem):
     """
 
 
+class SparseImageOfHistogramsDataItem(DataItem):
+    """Holds a SparseImageOfHistograms, i.e. a 3D image of histograms
+    where only the non-empty voxels are stored."""
+
+    @property
+    def image(self):
+        return self.data
+
+    def inplace_merge_with(self, other):
+        if other.data is None:
+            return self
+        if self.data is None:
+            self.set_data(other.data.copy())
+            self.number_of_samples = other.number_of_samples
+        else:
+            self.data.add(other.data)
+            self.number_of_samples += other.number_of_samples
+        return self
+
+    def merge_with(self, other):
+        merged = type(self)(data=self.data.copy(), meta_data=self.meta_data)
+        return merged.inplace_merge_with(other)
+
+    def __iadd__(self, other):
+        self._assert_data_is_not_none()
+        self.data.add(other.data)
+        return self
+
+    def __imul__(self, other):
+        self._assert_data_is_not_none()
+        if isinstance(other, (float, int)):
+            self.data.scale(other)
+            return self
+        return NotImplemented
+
+    def set_image_properties(self, **properties):
+        if not self.data_is_none:
+            if "spacing" in properties and properties["spacing"] is not None:
+                self.data.spacing = [float(s) for s in properties["spacing"][:3]]
+            if "origin" in properties and properties["origin"] is not None:
+                self.data.origin = [float(o) for o in properties["origin"][:3]]
+            if "rotation" in properties and properties["rotation"] is not None:
+                self.data.direction = np.asarray(properties["rotation"])[:3, :3]
+
+    def get_image_properties(self):
+        info = Box()
+        info.size = np.array(self.data.size + [self.data.bins]).astype(int)
+        info.spacing = np.array(self.data.spacing + [1.0])
+        info.origin = np.array(self.data.origin + [0.0])
+        info.dir = self.data.direction
+        return info
+
+    def write(self, path, **kwargs):
+        # the sparse image has its own format, other options (e.g. chunked) are ignored
+        self.data.write(ensure_filename_is_str(path))
+
+
 class DataContainer:
     """Common base class for all containers. Nothing implemented here for now."""
 
@@ -645,7 +707,7 @@ class DataItemContainer(DataContainer):
     def write(self, path, item, **kwargs):
         data_item = self.get_data_item_object(item)
         if data_item is not None:
-            data_item.write(path)
+            data_item.write(path, **kwargs)
         else:
             warning(f"Cannot write item {item} because it does not exist (=None).")
 
@@ -714,6 +776,15 @@ class SingleItkImage(DataItemContainer):
         return self.data[0].image
 
 
+class SingleSparseImageOfHistograms(DataItemContainer):
+
+    _data_item_classes = (SparseImageOfHistogramsDataItem,)
+
+    @property
+    def image(self):
+        return self.data[0].image
+
+
 class SingleMeanItkImage(DataItemContainer):
 
     _data_item_classes = (MeanItkImageDataItem,)
@@ -855,4 +926,5 @@ available_data_container_classes = {
     "SingleArray": SingleArray,
     "DoubleArray": DoubleArray,
     "SingleItkImageWithVariance": SingleItkImageWithVariance,
+    "SingleSparseImageOfHistograms": SingleSparseImageOfHistograms,
 }
@@ -6,7 +6,7 @@ from ..base import process_cls
 from .base import ActorBase
 from ..exception import fatal
 from ..definitions import fwhm_to_sigma
-from ..utility import g4_units
+from ..utility import g4_units, replace_extension
 from ..image import (
     align_image_with_physical_volume,
     update_image_py_to_cpp,
@@ -896,6 +896,215 @@ class DigitizerEnergyWindowsActor(
         g4.GateDigitizerEnergyWindowsActor.EndSimulationAction(self)
 
 
+class DigitizerPipelineActor(DigitizerWithRootOutput, g4.GateDigitizerPipelineActor):
+    """
+    Chain of per-digi digitizer modules (blurring, spatial blurring, energy window,
+    efficiency) executed in a single pass per event.
+    The digis of the event are copied once into a columnar buffer; each stage modifies
+    the buffer in place or removes digis from a selection mask. Only the final result is
+    stored in the output collection, plus the stages with the 'write' flag (stored in a
+    collection named '<actor name>_<stage name>').
+    Grouping modules (Adder, Readout, Pileup) change the number of digis and are not
+    stages: use them as input of the pipeline.
+    """
+
+    # default parameters of each type of stage
+    stage_defaults = {
+        "blurring": {
+            "blur_attribute": None,
+            "blur_method": "Gaussian",
+            "blur_sigma": None,
+            "blur_fwhm": None,
+            "blur_reference_value": 0,
+            "blur_resolution": 0,
+            "blur_slope": 0,
+        },
+        "spatial_blurring": {
+            "blur_attribute": None,
+            "blur_sigma": None,
+            "keep_in_solid_limits": False,
+        },
+        "energy_window": {
+            "min": None,
+            "max": None,
+        },
+        "efficiency": {
+            "efficiency": 1.0,
+        },
+    }
+
+    user_info_defaults = {
+        "input_digi_collection": (
+            "Hits",
+            {
+                "doc": "Digi collection to be used as input. ",
+            },
+        ),
+        "skip_attributes": (
+            [],
+            {
+                "doc": "Attributes of the input that are not copied in the output. ",
+            },
+        ),
+        "clear_every": (
+            1e5,
+            {
+                "doc": "FIXME",
+            },
+        ),
+        "stages": (
+            [],
+            {
+                "doc": "List of stages (dict with 'type', 'name', 'write' and the "
+                "parameters of the stage), applied in this order. "
+                "Use add_stage() to create them. ",
+            },
+        ),
+    }
+
+    def __init__(self, *args, **kwargs):
+        DigitizerBase.__init__(self, *args, **kwargs)
+        self.__initcpp__()
+
+    def __initcpp__(self):
+        g4.GateDigitizerPipelineActor.__init__(self, self.user_info)
+        self.AddActions({"StartSimulationAction", "EndSimulationAction"})
+
+    def add_stage(self, stage_type, name=None, write=False, **kwargs):
+        """
+        Append a stage to the pipeline and return its (dict) parameters.
+        stage_type is one of 'blurring', 'spatial_blurring', 'energy_window' or
+        'efficiency'; the other keyword arguments are the stage parameters.
+        """
+        if stage_type not in self.stage_defaults:
+            fatal(
+                f"Unknown stage type '{stage_type}' in the digitizer pipeline "
+                f"'{self.name}'. Available types are: {list(self.stage_defaults)}"
+            )
+        if name is None:
+            name = f"{stage_type}_{len(self.stages)}"
+        stage = {"type": stage_type, "name": name, "write": write}
+        stage.update(self.stage_defaults[stage_type])
+        for key, value in kwargs.items():
+            if key not in stage:
+                fatal(
+                    f"Unknown parameter '{key}' for the stage '{name}' "
+                    f"({stage_type}) of the digitizer pipeline '{self.name}'"
+                )
+            stage[key] = value
+        self.stages.append(stage)
+        return stage
+
+    def initialize(self):
+        self.initialize_stages()
+        DigitizerBase.initialize(self)
+        self.InitializeUserInfo(self.user_info)
+        self.InitializeCpp()
+
+    def initialize_stages(self):
+        names = []
+        for stage in self.stages:
+            stage_type = stage.get("type", None)
+            if stage_type not in self.stage_defaults:
+                fatal(
+                    f"Unknown stage type '{stage_type}' in the digitizer pipeline "
+                    f"'{self.name}'. Available types are: {list(self.stage_defaults)}"
+                )
+            for key, value in self.stage_defaults[stage_type].items():
+                stage.setdefault(key, value)
+            stage.setdefault("write", False)
+            stage.setdefault("name", f"{stage_type}_{len(names)}")
+            if stage["name"] in names:
+                fatal(
+                    f"The stage name '{stage['name']}' is used twice in the "
+                    f"digitizer pipeline '{self.name}'"
+                )
+            names.append(stage["name"])
+            if stage_type == "energy_window":
+                attribute = "TotalEnergyDeposit"
+            else:
+                attribute = stage.get("blur_attribute", None)
+            if attribute is not None and attribute in self.skip_attributes:
+                fatal(
+                    f"The attribute '{attribute}' is needed by the stage "
+                    f"'{stage['name']}' of the digitizer pipeline '{self.name}' "
+                    f"and cannot be in skip_attributes"
+                )
+            getattr(self, f"_initialize_{stage_type}_stage")(stage)
+
+    def _initialize_blurring_stage(self, stage):
+        if stage["blur_attribute"] is None:
+            fatal(f"Error, the stage '{stage['name']}' needs a blur_attribute")
+        if stage["blur_method"] == "Gaussian":
+            if stage["blur_fwhm"] is not None and stage["blur_sigma"] is not None:
+                fatal(
+                    f"Error, use blur_sigma or blur_fwhm, not both, "
+                    f"in the stage '{stage['name']}'"
+                )
+            if stage["blur_fwhm"] is not None:
+                stage["blur_sigma"] = stage["blur_fwhm"] * fwhm_to_sigma
+            if stage["blur_sigma"] is None:
+                fatal(
+                    f"Error, use blur_sigma or blur_fwhm in the stage '{stage['name']}'"
+                )
+        elif stage["blur_method"] in ("InverseSquare", "Linear"):
+            if (
+                stage["blur_reference_value"] is None
+                or stage["blur_reference_value"] < 0
+            ):
+                fatal(
+                    f"Error, use positive blur_reference_value in the stage '{stage['name']}'"
+                )
+            if stage["blur_resolution"] is None or stage["blur_resolution"] < 0:
+                fatal(
+                    f"Error, use positive blur_resolution in the stage '{stage['name']}'"
+                )
+            if stage["blur_slope"] is None:
+                stage["blur_slope"] = 0
+            stage["blur_sigma"] = -1
+        else:
+            fatal(
+                f"Unknown blur_method '{stage['blur_method']}' in the stage "
+                f"'{stage['name']}', use Gaussian, InverseSquare or Linear"
+            )
+
+    def _initialize_spatial_blurring_stage(self, stage):
+        if stage["blur_attribute"] is None:
+            fatal(f"Error, the stage '{stage['name']}' needs a blur_attribute")
+        if stage["blur_sigma"] is None or len(stage["blur_sigma"]) != 3:
+            fatal(
+                f"Error, the stage '{stage['name']}' needs a blur_sigma with 3 values"
+            )
+
+    def _initialize_energy_window_stage(self, stage):
+        if stage["min"] is None or stage["max"] is None:
+            fatal(f"Error, the stage '{stage['name']}' needs min and max energies")
+        if stage["min"] > stage["max"]:
+            fatal(
+                f"Error, min is larger than max in the stage '{stage['name']}': "
+                f"{stage['min']} > {stage['max']}"
+            )
+
+    def _initialize_efficiency_stage(self, stage):
+        if not (0.0 <= stage["efficiency"] <= 1.0):
+            self.warn_user(
+                f"Efficiency set to {stage['efficiency']} in the stage "
+                f"'{stage['name']}', which is not in [0;1]."
+            )
+
+    def get_number_of_rejected_digis(self):
+        """Return a dict with the number of digis removed by each stage."""
+        counts = self.GetNumberOfRejectedDigisPerStage()
+        return {stage["name"]: n for stage, n in zip(self.stages, counts)}
+
+    def StartSimulationAction(self):
+        DigitizerBase.StartSimulationAction(self)
+        g4.GateDigitizerPipelineActor.StartSimulationAction(self)
+
+    def EndSimulationAction(self):
+        g4.GateDigitizerPipelineActor.EndSimulationAction(self)
+
+
 class DigitizerHitsCollectionActor(
     DigitizerWithRootOutput, g4.GateDigitizerHitsCollectionActor
 ):
@@ -1130,15 +1339,7 @@ class DigitizerProjectionActor(DigitizerBase, g4.GateDigitizerProjectionActor):
             self.physical_volume_index = 0
 
         # initial position (will be anyway updated in BeginOfRunSimulation)
-        try:
-            pv = self.attached_to_volume.g4_physical_volumes[self.physical_volume_index]
-        except KeyError:
-            fatal(
-                f"Error in the DigitizerProjectionActor {self.name}. "
-                f"No physical volume found for index {self.physical_volume_index} "
-                f"in volume {self.attached_to_volume.name}"
-            )
-            pv = None  # avoid warning from IDE
+        pv = self.attached_to_volume.get_g4_physical_volume(self.physical_volume_index)
         align_image_with_physical_volume(
             self.attached_to_volume, self.user_output.counts.data_per_run[0].image
         )
@@ -1403,6 +1604,27 @@ class PhaseSpaceActor(DigitizerWithRootOutput, g4.GatePhaseSpaceActor):
                 # "allowed_values": ["entering", "exiting", "first", "all"], # can be multiple
             },
         ),
+        "output_mode": (
+            "root",
+            {
+                "doc": "'root': the phsp is written in a ROOT file. "
+                "'memory': the phsp is kept in memory as typed columns (strings are "
+                "dictionary-encoded) and returned as numpy arrays with "
+                "root_output.get_data(). "
+                "'binary': the columns are streamed by chunks in a compact binary file "
+                "(same name as the ROOT file with the '.phsp' extension), "
+                "see read_phsp_binary(). ",
+                "allowed_values": ("root", "memory", "binary"),
+            },
+        ),
+        "chunk_size": (
+            100000,
+            {
+                "doc": "Number of entries per thread accumulated before being moved "
+                "to the columns (output_mode 'memory' or 'binary'). "
+                "In 'binary' mode, this is the maximum number of rows of a chunk. ",
+            },
+        ),
     }
 
     def __init__(self, *args, **kwargs):
@@ -1432,6 +1654,19 @@ class PhaseSpaceActor(DigitizerWithRootOutput, g4.GatePhaseSpaceActor):
             self.SetStoreAllStepsFlag(True)
         self.InitializeUserInfo(self.user_info)
         self.InitializeCpp()
+        self.SetColumnarOutput(
+            self.output_mode, self.get_binary_output_path(), int(self.chunk_size)
+        )
+
+    def get_binary_output_path(self):
+        if self.output_mode != "binary":
+            return ""
+        if not self.user_output.root_output.write_to_disk:
+            fatal(
+                f"The PhaseSpaceActor '{self.name}' has output_mode 'binary' "
+                f"but its output is not written to disk. "
+            )
+        return str(replace_extension(self.get_output_path(), "phsp"))
 
     def StartSimulationAction(self):
         DigitizerBase.StartSimulationAction(self)
@@ -1441,10 +1676,62 @@ class PhaseSpaceActor(DigitizerWithRootOutput, g4.GatePhaseSpaceActor):
         self.number_of_absorbed_events = self.GetNumberOfAbsorbedEvents()
         self.total_number_of_entries = self.GetTotalNumberOfEntries()
         if self.total_number_of_entries == 0:
-            self.warn_user(
-                f"Empty output, no particles stored in {self.get_output_path()}"
-            )
+            if self.output_mode == "memory":
+                self.warn_user("Empty output, no particles stored")
+            else:
+                self.warn_user(
+                    f"Empty output, no particles stored in {self.get_output_path()}"
+                )
         g4.GatePhaseSpaceActor.EndSimulationAction(self)
+        if self.output_mode == "memory":
+            self.user_output.root_output.store_columns(*self.TakeColumns())
+
+
+def read_phsp_binary(path, decode_strings=True):
+    """Read a phsp written by the PhaseSpaceActor with output_mode 'binary'.
+    Return a dict of numpy arrays, one per column. String columns are
+    dictionary-encoded in the file; if decode_strings is False, the dict also
+    contains the dictionaries as name -> list of str, under the key
+    'dictionaries', and the string columns hold the int32 codes.
+    """
+    dtypes = {b"d": np.float64, b"i": np.int32, b"l": np.int64, b"s": np.int32}
+    with open(path, "rb") as f:
+        if f.read(8) != b"GPHSP001":
+            fatal(f"The file {path} is not a GATE binary phsp")
+        ncols = int(np.fromfile(f, np.uint32, 1)[0])
+        names = []
+        types = []
+        for _ in range(ncols):
+            n = int(np.fromfile(f, np.uint32, 1)[0])
+            names.append(f.read(n).decode())
+            types.append(f.read(1))
+        chunks = {name: [] for name in names}
+        while True:
+            nrows = int(np.fromfile(f, np.int64, 1)[0])
+            if nrows < 0:
+                break
+            for name, t in zip(names, types):
+                chunks[name].append(np.fromfile(f, dtypes[t], nrows))
+        dictionaries = {}
+        for name, t in zip(names, types):
+            if t != b"s":
+                continue
+            n = int(np.fromfile(f, np.uint32, 1)[0])
+            d = []
+            for _ in range(n):
+                length = int(np.fromfile(f, np.uint32, 1)[0])
+                d.append(f.read(length).decode())
+            dictionaries[name] = d
+    data = {}
+    for name, t in zip(names, types):
+        c = chunks[name]
+        data[name] = np.concatenate(c) if len(c) > 0 else np.empty(0, dtypes[t])
+    if decode_strings:
+        for name, d in dictionaries.items():
+            data[name] = np.asarray(d, dtype=str)[data[name]]
+    else:
+        data["dictionaries"] = dictionaries
+    return data
 
 
 class DigiAttributeProcessDefinedStepInVolumeActor(
@@ -1585,6 +1872,7 @@ process_cls(DigitizerPileupActor)
 process_cls(DigitizerSpatialBlurringActor)
 process_cls(DigitizerEfficiencyActor)
 process_cls(DigitizerEnergyWindowsActor)
+process_cls(DigitizerPipelineActor)
 process_cls(DigitizerHitsCollectionActor)
 process_cls(DigitizerProjectionActor)
 process_cls(CoincidenceSorterActor)
@@ -1,5 +1,4 @@
 import numpy as np
-import pandas as pd
 import os
 from scipy.spatial.transform import Rotation
 from pathlib import Path
@@ -7,7 +6,7 @@ from pathlib import Path
 import opengate_core as g4
 from .base import ActorBase
 from ..exception import fatal
-from ..utility import g4_units
+from ..utility import g4_units, LazyModuleLoader
 from ..image import (
     update_image_py_to_cpp,
     get_py_image_from_cpp_image,
@@ -30,6 +29,9 @@ from .dataitems import (
     ItkImageDataItem,
 )
 
+# only needed to read the lookup tables, loaded on first use
+pd = LazyModuleLoader("pandas")
+
 
 class VoxelDepositActor(ActorBase):
     """Base class which holds user input parameters common to all actors
@@ -154,16 +156,9 @@ class VoxelDepositActor(ActorBase):
             repeated_volume_index = 0
         else:
             repeated_volume_index = self.repeated_volume_index
-        try:
-            g4_phys_volume = self.attached_to_volume.g4_physical_volumes[
-                repeated_volume_index
-            ]
-        except IndexError:
-            fatal(
-                f"Error in the actor {self.type_name} named {self.name}. "
-                f"Could not find the physical volume with index {repeated_volume_index} "
-                f"in volume '{self.attached_to}' to which this actor is attached. "
-            )
+        g4_phys_volume = self.attached_to_volume.get_g4_physical_volume(
+            repeated_volume_index
+        )
         # Return the real physical volume name
         return str(g4_phys_volume.GetName())
 
@@ -715,6 +710,16 @@ class DoseActor(VoxelDepositActor, g4.GateDoseActor):
         VoxelDepositActor.EndSimulationAction(self)
 
 
+def get_default_mu_cache_directory():
+    """Directory of the persistent cache of the simulated mu/mu_en tables:
+    the OPENGATE_MU_CACHE_DIR environment variable if set, otherwise
+    ~/.cache/opengate/mu_tables.
+    """
+    if "OPENGATE_MU_CACHE_DIR" in os.environ:
+        return Path(os.environ["OPENGATE_MU_CACHE_DIR"]).expanduser()
+    return Path.home() / ".cache" / "opengate" / "mu_tables"
+
+
 class TLEDoseActor(DoseActor, g4.GateTLEDoseActor):
     """
     TLE = Track Length Estimator.
@@ -724,6 +729,7 @@ class TLEDoseActor(DoseActor, g4.GateTLEDoseActor):
     range_type: str
     max_range: float
     database: str
+    mu_cache_directory: str
 
     user_info_defaults = {
         "energy_min": (
@@ -746,7 +752,19 @@ class TLEDoseActor(DoseActor, g4.GateTLEDoseActor):
             "EPDL",
             {
                 "doc": "which database to use",
-                "allowed_values": ("EPDL", "NIST"),  # "simulated" does not work
+                "allowed_values": ("EPDL", "NIST", "simulated"),
+            },
+        ),
+        "mu_cache_directory": (
+            None,
+            {
+                "doc": "Only used with the 'simulated' database: directory where the "
+                "simulated mu/mu_en tables are stored, so that the next simulations "
+                "with the same materials, cuts, gamma models and Geant4 version load "
+                "them instead "
+                "of simulating them again. If None, the OPENGATE_MU_CACHE_DIR "
+                "environment variable is used, or ~/.cache/opengate/mu_tables. "
+                "Set to False to disable the cache.",
             },
         ),
     }
@@ -769,6 +787,16 @@ class TLEDoseActor(DoseActor, g4.GateTLEDoseActor):
                 f"TLEDoseActor cannot score in {self.score_in}, only 'material' is allowed."
             )
         super().initialize(args)
+        self.SetMuCacheDirectory(self.get_mu_cache_directory())
+
+    def get_mu_cache_directory(self):
+        """Return the cache directory of the simulated mu/mu_en tables as a
+        string, empty if the cache is not used."""
+        if self.database != "simulated" or self.mu_cache_directory is False:
+            return ""
+        if self.mu_cache_directory is None:
+            return str(get_default_mu_cache_directory())
+        return str(Path(self.mu_cache_directory).expanduser())
 
 
 def _setter_hook_score_in_let_actor(self, value):
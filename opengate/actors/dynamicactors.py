@@ -1,5 +1,7 @@
 from typing import Optional
 
+import numpy as np
+
 import opengate_core as g4
 from ..definitions import __world_name__
 from ..base import GateObject, process_cls
@@ -40,25 +42,78 @@ class DynamicActorBase(ActorBase, g4.GateVActor):
 
 class DynamicGeometryActor(DynamicActorBase, g4.GateVActor):
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.g4_geometry_optimiser = None
+
+    def close(self):
+        if self.g4_geometry_optimiser is not None:
+            self.g4_geometry_optimiser.ClearCache()
+        self.g4_geometry_optimiser = None
+        super().close()
+
+    def __getstate__(self):
+        return_dict = super().__getstate__()
+        return_dict["g4_geometry_optimiser"] = None
+        return return_dict
+
     def initialize(self):
         ActorBase.initialize(self)
         for c in self.changers:
             if c.volume_manager is None:
                 c.volume_manager = self.simulation.volume_manager
             c.initialize()
+        self.g4_geometry_optimiser = g4.GateDynamicGeometryOptimiser()
+        self.g4_geometry_optimiser.fCacheSize = self.simulation.dyn_geom_cache_size
+
+    def get_moved_g4_physical_volumes(self):
+        """List of the G4 physical volumes moved by the changers,
+        or None if one of the changers cannot tell (e.g. a changed image)."""
+        moved = []
+        for c in self.changers:
+            pvs = c.get_moved_g4_physical_volumes()
+            if pvs is None:
+                return None
+            moved.extend(pvs)
+        return moved
+
+    def get_configuration_key(self, run_id):
+        """A string describing the geometry at this run, used to reuse the
+        voxels of a configuration already seen. Empty if unknown."""
+        keys = [c.get_configuration_key(run_id) for c in self.changers]
+        if any(k is None for k in keys):
+            return ""
+        return repr(keys)
 
     def BeginOfRunActionMasterThread(self, run_id):
-        if self.simulation.dyn_geom_open_close:
-            gm = g4.G4GeometryManager.GetInstance()
-            # MultiRun + MultiThread + Dynamic Geometry = issues when the parallel optimisation is requested
-            gm.RequestParallelOptimisation(False, False)
+        if not self.simulation.dyn_geom_open_close:
+            for c in self.changers:
+                c.apply_change(run_id)
+            self._refresh_field_transforms(run_id)
+            return
+
+        gm = g4.G4GeometryManager.GetInstance()
+        # MultiRun + MultiThread + Dynamic Geometry = issues when the parallel optimisation is requested
+        gm.RequestParallelOptimisation(False, False)
+        moved = None
+        if self.simulation.dyn_geom_incremental:
+            moved = self.get_moved_g4_physical_volumes()
+        if moved is None:
             # OpenGeometry (G4VPhysicalVolume *vol=0)
             gm.OpenGeometry(None)
-        for c in self.changers:
-            c.apply_change(run_id)
-        if self.simulation.dyn_geom_open_close:
+            for c in self.changers:
+                c.apply_change(run_id)
             # CloseGeometry: pOptimise=true, verbose=false, G4VPhysicalVolume *vol=0
             gm.CloseGeometry(self.simulation.dyn_geom_optimise, False, None)
+        else:
+            # only the mothers of the moved volumes are optimised again
+            for c in self.changers:
+                c.apply_change(run_id)
+            self.g4_geometry_optimiser.Reoptimise(
+                moved,
+                self.simulation.dyn_geom_optimise,
+                self.get_configuration_key(run_id),
+            )
 
         # Refresh field transforms after geometry changes
         # This ensures fields attached to moving volumes use the updated transforms
@@ -166,6 +221,15 @@ class ChangerBase(GateObject):
 
 class GeometryChanger(ChangerBase):
 
+    def get_moved_g4_physical_volumes(self):
+        """The G4 physical volumes moved by this changer. None means that the
+        whole geometry must be optimised again after the change."""
+        return None
+
+    def get_configuration_key(self, run_id):
+        """Hashable description of the change applied at this run (None if unknown)."""
+        return None
+
     @property
     def volume_manager(self):
         if self.simulation is not None:
@@ -271,6 +335,20 @@ class VolumeTranslationChanger(GeometryChanger):
             )
         self.g4_physical_volume.SetTranslation(self.g4_translations[run_id])
 
+    def get_moved_g4_physical_volumes(self):
+        if self.g4_physical_volume is None:
+            self.g4_physical_volume = self.attached_to_volume.get_g4_physical_volume(
+                self.repetition_index
+            )
+        return [self.g4_physical_volume]
+
+    def get_configuration_key(self, run_id):
+        return (
+            self.attached_to,
+            self.repetition_index,
+            tuple(np.asarray(self.translations[run_id], dtype=float).ravel()),
+        )
+
 
 class VolumeRotationChanger(GeometryChanger):
 
@@ -324,6 +402,20 @@ class VolumeRotationChanger(GeometryChanger):
             )
         self.g4_physical_volume.SetRotationHepRep3x3(self.g4_rotations[run_id])
 
+    def get_moved_g4_physical_volumes(self):
+        if self.g4_physical_volume is None:
+            self.g4_physical_volume = self.attached_to_volume.get_g4_physical_volume(
+                self.repetition_index
+            )
+        return [self.g4_physical_volume]
+
+    def get_configuration_key(self, run_id):
+        return (
+            self.attached_to,
+            self.repetition_index,
+            tuple(np.asarray(self.rotations[run_id], dtype=float).ravel()),
+        )
+
 
 class SourceActivityImageChanger(SourceChanger):
 
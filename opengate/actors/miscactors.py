@@ -1,10 +1,13 @@
 import platform
+import threading
 
+import numpy as np
 import opengate_core as g4
 from anytree import Node, RenderTree
 from box import Box
 
 from ..base import process_cls
+from ..definitions import __world_name__
 from ..exception import fatal, warning
 from ..serialization import dump_json
 from ..utility import g4_best_unit_tuple, g4_units
@@ -22,6 +25,10 @@ from .base import ActorBase
     def SteppingAction(self, step, touchable):
         g4.GateSimulationStatisticsActor.SteppingAction(self, step, touchable)
         do_something()
+
+    For prototyping a scorer, prefer the StepRecordActor: the steps are
+    recorded on the cpp side and the python callback is called once per batch
+    of steps, with numpy arrays.
 """
 
 
@@ -210,6 +217,7 @@ class SimulationStatisticsActor(ActorBase, g4.GateSimulationStatisticsActor):
 
     # hints for IDE
     track_types_flag: bool
+    fast_step_count: bool
 
     user_info_defaults = {
         "track_types_flag": (
@@ -218,6 +226,15 @@ class SimulationStatisticsActor(ActorBase, g4.GateSimulationStatisticsActor):
                 "doc": "Should the type of tracks be counted?",
             },
         ),
+        "fast_step_count": (
+            True,
+            {
+                "doc": "Count the steps with the global stepping action of each thread "
+                "instead of calling the actor at every step. Only used when the actor "
+                "is attached to the world without filter, otherwise the steps are "
+                "counted by the actor in its volume.",
+            },
+        ),
     }
 
     user_output_config = {
@@ -249,8 +266,18 @@ class SimulationStatisticsActor(ActorBase, g4.GateSimulationStatisticsActor):
     def initialize(self):
         ActorBase.initialize(self)
         self.InitializeUserInfo(self.user_info)
+        self.SetGlobalStepCountFlag(self.use_global_step_count())
         self.InitializeCpp()
 
+    def use_global_step_count(self):
+        """The global step count is equivalent to the actor step count only if
+        all the steps of the world are considered."""
+        return (
+            self.fast_step_count
+            and self.attached_to == __world_name__
+            and self.filter is None
+        )
+
     def StartSimulationAction(self):
         g4.GateSimulationStatisticsActor.StartSimulationAction(self)
         self.user_output.stats.merged_data.nb_threads = (
@@ -636,6 +663,146 @@ class AttenuationImageActor(ActorBase, g4.GateAttenuationImageActor):
         self.user_output.attenuation_image.end_of_simulation()
 
 
+class StepRecordActor(ActorBase, g4.GateStepRecordActor):
+    """
+    Record some attributes of all steps in the attached volume(s) and call a
+    python function for every batch of steps, with the attributes as numpy
+    arrays. This allows custom (vectorized) scoring in python without a
+    python call at every step.
+
+    The steps are accumulated in a per-thread buffer on the cpp side. The
+    callback is called with (actor, batch), where batch is a dict of numpy
+    arrays (one per attribute, 3-vectors are split in name_X, name_Y, name_Z),
+    every batch_size steps (or at the end of every event if batch_per_event is
+    True) and at the end of every run. It is called in the thread that recorded
+    the steps, but never by two threads at the same time.
+
+    Example usage in Python:
+      histogram = np.zeros(100)
+
+      def score(actor, batch):
+          h, _ = np.histogram(batch["PostPosition_Z"], bins=100, range=(-50, 50),
+                              weights=batch["TotalEnergyDeposit"])
+          histogram[:] += h
+
+      rec = sim.add_actor("StepRecordActor", "rec")
+      rec.attached_to = "waterbox"
+      rec.attributes = ["TotalEnergyDeposit", "PostPosition"]
+      rec.callback = score
+
+    The callback runs in the process of the simulation: with
+    start_new_process=True, what it accumulates stays in the subprocess.
+    """
+
+    # hints for IDE
+    attributes: list
+    callback: callable
+    batch_size: int
+    batch_per_event: bool
+    decode_strings: bool
+
+    user_info_defaults = {
+        "attributes": (
+            [],
+            {
+                "doc": "List of the step attributes to record (same names as for the "
+                "PhaseSpaceActor, e.g. 'KineticEnergy', 'PrePosition', 'ParticleName'). ",
+            },
+        ),
+        "callback": (
+            None,
+            {
+                "doc": "Python function called with (actor, batch) for every batch of "
+                "steps, batch being a dict of numpy arrays. To be used with "
+                "start_new_process=True, the function must be picklable "
+                "(e.g. defined at the module level, not a lambda). ",
+            },
+        ),
+        "batch_size": (
+            100000,
+            {
+                "doc": "Number of steps (per thread) recorded before the callback is called. ",
+            },
+        ),
+        "batch_per_event": (
+            False,
+            {
+                "doc": "If True, the callback is called at the end of every event "
+                "(with all the steps of the event) instead of every batch_size steps. ",
+            },
+        ),
+        "decode_strings": (
+            True,
+            {
+                "doc": "String attributes are dictionary-encoded in the cpp buffer. "
+                "If True, they are decoded to numpy string arrays before the callback, "
+                "otherwise batch[name] holds int32 codes into batch['dictionaries'][name]. ",
+            },
+        ),
+    }
+
+    def __init__(self, *args, **kwargs):
+        ActorBase.__init__(self, *args, **kwargs)
+        self.number_of_steps = 0
+        self.number_of_batches = 0
+        # the callbacks are serialized
+        self.lock = None
+        self.__initcpp__()
+
+    def __initcpp__(self):
+        g4.GateStepRecordActor.__init__(self, self.user_info)
+        self.AddActions(
+            {
+                "StartSimulationAction",
+                "BeginOfRunAction",
+                "SteppingAction",
+                "EndOfEventAction",
+                "EndOfRunAction",
+                "EndSimulationAction",
+            }
+        )
+
+    def __getstate__(self):
+        return_dict = super().__getstate__()
+        return_dict["lock"] = None
+        return return_dict
+
+    def initialize(self):
+        ActorBase.initialize(self)
+        if not callable(self.callback):
+            fatal(
+                f"The StepRecordActor '{self.name}' needs a callback function, "
+                f"but callback is {self.callback}."
+            )
+        if len(self.attributes) == 0:
+            fatal(f"The StepRecordActor '{self.name}' needs at least one attribute.")
+        self.lock = threading.Lock()
+        self.InitializeUserInfo(self.user_info)
+        self.InitializeCpp()
+        self.SetStepRecordFunction(self.apply)
+
+    def apply(self, actor):
+        # called by the cpp side, in the thread that recorded the steps
+        columns, dictionaries = self.TakeCurrentBatch()
+        if self.decode_strings:
+            for k, d in dictionaries.items():
+                columns[k] = np.asarray(d, dtype=str)[columns[k]]
+        else:
+            columns["dictionaries"] = dictionaries
+        with self.lock:
+            self.callback(self, columns)
+
+    def EndSimulationAction(self):
+        self.number_of_steps = self.GetTotalNumberOfSteps()
+        self.number_of_batches = self.GetTotalNumberOfBatches()
+
+    def __str__(self):
+        return (
+            f"StepRecordActor {self.name}: {self.number_of_steps} steps "
+            f"in {self.number_of_batches} batches"
+        )
+
+
 class DebugActor(ActorBase, g4.GateDebugActor):
     """
     Process tracking for debugging and education purposes.
@@ -703,4 +870,5 @@ process_cls(KillAccordingParticleNameActor)
 process_cls(ActorOutputKillNonInteractingParticleActor)
 process_cls(KillNonInteractingParticleActor)
 process_cls(AttenuationImageActor)
+process_cls(StepRecordActor)
 process_cls(DebugActor)
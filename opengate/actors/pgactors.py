@@ -2,6 +2,7 @@ import opengate_core as g4
 from ..exception import fatal
 from ..utility import g4_units
 from ..base import process_cls
+from ..image import SparseImageOfHistograms
 from .actoroutput import (
     ActorOutputSingleImageOfHistogram,
     UserInterfaceToActorOutputImage,
@@ -9,6 +10,27 @@ from .actoroutput import (
 
 from .doseactors import VoxelDepositActor
 
+_sparse_output_doc = (
+    "If True, only the histograms of the voxels reached by the particles are stored "
+    "(per-voxel spectra keyed by linear voxel index) instead of the dense 4D images. "
+    "The outputs are SparseImageOfHistograms objects written as .npz files; "
+    "use their to_itk_image() method to get the dense image on request. "
+)
+
+
+def fetch_sparse_histograms(actor, output_name, run_index, cpp_sparse):
+    """Store the (C++) sparse histograms of the run in the actor output."""
+    indices, values = cpp_sparse.GetSortedData()
+    sparse_image = SparseImageOfHistograms(
+        cpp_sparse.GetSize(),
+        cpp_sparse.GetNumberOfBins(),
+        actor.spacing,
+        origin=actor.translation,
+        indices=indices,
+        values=values,
+    )
+    actor.user_output[output_name].store_data(run_index, sparse_image)
+
 
 class VoxelizedPromptGammaTLEActor(
     VoxelDepositActor, g4.GateVoxelizedPromptGammaTLEActor
@@ -62,6 +84,12 @@ class VoxelizedPromptGammaTLEActor(
                 "doc": "Vector of weights for neutron ToF deposition.",
             },
         ),
+        "sparse_output": (
+            False,
+            {
+                "doc": _sparse_output_doc,
+            },
+        ),
     }
 
     user_output_config = {
@@ -140,6 +168,9 @@ class VoxelizedPromptGammaTLEActor(
         if not (self.user_output.n_tof.get_active(item=0)):
             self.user_output.n_tof.set_write_to_disk(False, item=0)
 
+        for output_name in ("p_E", "p_tof", "n_E", "n_tof"):
+            self.user_output[output_name].sparse = self.sparse_output
+
         self.InitializeUserInfo(self.user_info)
 
         self.SetProtonEnergyFlag(self.user_output.p_E.get_active(item=0))
@@ -174,51 +205,68 @@ class VoxelizedPromptGammaTLEActor(
             )
 
     def BeginOfRunActionMasterThread(self, run_index):
-        if self.user_output.p_E.get_active(item=0):
-            self.prepare_output_for_run("p_E", run_index)
-            self.push_to_cpp_image(
-                "p_E",
-                run_index,
-                self.cpp_E_proton_image,
-            )
-        if self.user_output.p_tof.get_active(item=0):
-            self.prepare_output_for_run("p_tof", run_index)
-            self.push_to_cpp_image(
-                "p_tof",
-                run_index,
-                self.cpp_tof_proton_image,
-            )
-        if self.user_output.n_E.get_active(item=0):
-            self.prepare_output_for_run("n_E", run_index)
-            self.push_to_cpp_image(
-                "n_E",
-                run_index,
-                self.cpp_E_neutron_image,
-            )
-        if self.user_output.n_tof.get_active(item=0):
-            self.prepare_output_for_run("n_tof", run_index)
-            self.push_to_cpp_image(
-                "n_tof",
-                run_index,
-                self.cpp_tof_neutron_image,
-            )
+        if self.sparse_output is False:
+            if self.user_output.p_E.get_active(item=0):
+                self.prepare_output_for_run("p_E", run_index)
+                self.push_to_cpp_image(
+                    "p_E",
+                    run_index,
+                    self.cpp_E_proton_image,
+                )
+            if self.user_output.p_tof.get_active(item=0):
+                self.prepare_output_for_run("p_tof", run_index)
+                self.push_to_cpp_image(
+                    "p_tof",
+                    run_index,
+                    self.cpp_tof_proton_image,
+                )
+            if self.user_output.n_E.get_active(item=0):
+                self.prepare_output_for_run("n_E", run_index)
+                self.push_to_cpp_image(
+                    "n_E",
+                    run_index,
+                    self.cpp_E_neutron_image,
+                )
+            if self.user_output.n_tof.get_active(item=0):
+                self.prepare_output_for_run("n_tof", run_index)
+                self.push_to_cpp_image(
+                    "n_tof",
+                    run_index,
+                    self.cpp_tof_neutron_image,
+                )
         g4.GateVoxelizedPromptGammaTLEActor.BeginOfRunActionMasterThread(
             self, run_index
         )
 
     def EndOfRunActionMasterThread(self, run_index):
-        if self.user_output.p_E.get_active(item=0):
-            self.fetch_from_cpp_image("p_E", run_index, self.cpp_E_proton_image)
-            self._update_output_coordinate_system("p_E", run_index)
-        if self.user_output.p_tof.get_active(item=0):
-            self.fetch_from_cpp_image("p_tof", run_index, self.cpp_tof_proton_image)
-            self._update_output_coordinate_system("p_tof", run_index)
-        if self.user_output.n_E.get_active(item=0):
-            self.fetch_from_cpp_image("n_E", run_index, self.cpp_E_neutron_image)
-            self._update_output_coordinate_system("n_E", run_index)
-        if self.user_output.n_tof.get_active(item=0):
-            self.fetch_from_cpp_image("n_tof", run_index, self.cpp_tof_neutron_image)
-            self._update_output_coordinate_system("n_tof", run_index)
+        # the C++ side scales the histograms (dense or sparse) by the number
+        # of events of the run
+        g4.GateVoxelizedPromptGammaTLEActor.EndOfRunActionMasterThread(self, run_index)
+        if self.sparse_output is True:
+            for output_name, cpp_sparse in (
+                ("p_E", self.cpp_E_proton_sparse),
+                ("p_tof", self.cpp_tof_proton_sparse),
+                ("n_E", self.cpp_E_neutron_sparse),
+                ("n_tof", self.cpp_tof_neutron_sparse),
+            ):
+                if self.user_output[output_name].get_active(item=0):
+                    fetch_sparse_histograms(self, output_name, run_index, cpp_sparse)
+                    self._update_output_coordinate_system(output_name, run_index)
+        else:
+            if self.user_output.p_E.get_active(item=0):
+                self.fetch_from_cpp_image("p_E", run_index, self.cpp_E_proton_image)
+                self._update_output_coordinate_system("p_E", run_index)
+            if self.user_output.p_tof.get_active(item=0):
+                self.fetch_from_cpp_image("p_tof", run_index, self.cpp_tof_proton_image)
+                self._update_output_coordinate_system("p_tof", run_index)
+            if self.user_output.n_E.get_active(item=0):
+                self.fetch_from_cpp_image("n_E", run_index, self.cpp_E_neutron_image)
+                self._update_output_coordinate_system("n_E", run_index)
+            if self.user_output.n_tof.get_active(item=0):
+                self.fetch_from_cpp_image(
+                    "n_tof", run_index, self.cpp_tof_neutron_image
+                )
+                self._update_output_coordinate_system("n_tof", run_index)
         VoxelDepositActor.EndOfRunActionMasterThread(self, run_index)
         return 0
 
@@ -261,6 +309,12 @@ class VoxelizedPromptGammaAnalogActor(
                 "doc": "Range of the histogram in MeV",
             },
         ),
+        "sparse_output": (
+            False,
+            {
+                "doc": _sparse_output_doc,
+            },
+        ),
     }
 
     user_output_config = {
@@ -338,6 +392,9 @@ class VoxelizedPromptGammaAnalogActor(
         if not (self.user_output.n_tof.get_active(item=0)):
             self.user_output.n_tof.set_write_to_disk(False, item=0)
 
+        for output_name in ("p_E", "p_tof", "n_E", "n_tof"):
+            self.user_output[output_name].sparse = self.sparse_output
+
         self.InitializeUserInfo(self.user_info)
 
         self.SetProtonEnergyFlag(self.user_output.p_E.get_active(item=0))
@@ -371,35 +428,54 @@ class VoxelizedPromptGammaAnalogActor(
 
     def BeginOfRunActionMasterThread(self, run_index):
 
-        if self.user_output.p_E.get_active(item=0):
-            self.prepare_output_for_run("p_E", run_index)
-            self.push_to_cpp_image("p_E", run_index, self.cpp_E_proton_image)
-        if self.user_output.p_tof.get_active(item=0):
-            self.prepare_output_for_run("p_tof", run_index)
-            self.push_to_cpp_image("p_tof", run_index, self.cpp_tof_proton_image)
-        if self.user_output.n_E.get_active(item=0):
-            self.prepare_output_for_run("n_E", run_index)
-            self.push_to_cpp_image("n_E", run_index, self.cpp_E_neutron_image)
-        if self.user_output.n_tof.get_active(item=0):
-            self.prepare_output_for_run("n_tof", run_index)
-            self.push_to_cpp_image("n_tof", run_index, self.cpp_tof_neutron_image)
+        if self.sparse_output is False:
+            if self.user_output.p_E.get_active(item=0):
+                self.prepare_output_for_run("p_E", run_index)
+                self.push_to_cpp_image("p_E", run_index, self.cpp_E_proton_image)
+            if self.user_output.p_tof.get_active(item=0):
+                self.prepare_output_for_run("p_tof", run_index)
+                self.push_to_cpp_image("p_tof", run_index, self.cpp_tof_proton_image)
+            if self.user_output.n_E.get_active(item=0):
+                self.prepare_output_for_run("n_E", run_index)
+                self.push_to_cpp_image("n_E", run_index, self.cpp_E_neutron_image)
+            if self.user_output.n_tof.get_active(item=0):
+                self.prepare_output_for_run("n_tof", run_index)
+                self.push_to_cpp_image("n_tof", run_index, self.cpp_tof_neutron_image)
         g4.GateVoxelizedPromptGammaAnalogActor.BeginOfRunActionMasterThread(
             self, run_index
         )
 
     def EndOfRunActionMasterThread(self, run_index):
-        if self.user_output.p_E.get_active(item=0):
-            self.fetch_from_cpp_image("p_E", run_index, self.cpp_E_proton_image)
-            self._update_output_coordinate_system("p_E", run_index)
-        if self.user_output.p_tof.get_active(item=0):
-            self.fetch_from_cpp_image("p_tof", run_index, self.cpp_tof_proton_image)
-            self._update_output_coordinate_system("p_tof", run_index)
-        if self.user_output.n_E.get_active(item=0):
-            self.fetch_from_cpp_image("n_E", run_index, self.cpp_E_neutron_image)
-            self._update_output_coordinate_system("n_E", run_index)
-        if self.user_output.n_tof.get_active(item=0):
-            self.fetch_from_cpp_image("n_tof", run_index, self.cpp_tof_neutron_image)
-            self._update_output_coordinate_system("n_tof", run_index)
+        # the C++ side scales the histograms (dense or sparse) by the number
+        # of events of the run
+        g4.GateVoxelizedPromptGammaAnalogActor.EndOfRunActionMasterThread(
+            self, run_index
+        )
+        if self.sparse_output is True:
+            for output_name, cpp_sparse in (
+                ("p_E", self.cpp_E_proton_sparse),
+                ("p_tof", self.cpp_tof_proton_sparse),
+                ("n_E", self.cpp_E_neutron_sparse),
+                ("n_tof", self.cpp_tof_neutron_sparse),
+            ):
+                if self.user_output[output_name].get_active(item=0):
+                    fetch_sparse_histograms(self, output_name, run_index, cpp_sparse)
+                    self._update_output_coordinate_system(output_name, run_index)
+        else:
+            if self.user_output.p_E.get_active(item=0):
+                self.fetch_from_cpp_image("p_E", run_index, self.cpp_E_proton_image)
+                self._update_output_coordinate_system("p_E", run_index)
+            if self.user_output.p_tof.get_active(item=0):
+                self.fetch_from_cpp_image("p_tof", run_index, self.cpp_tof_proton_image)
+                self._update_output_coordinate_system("p_tof", run_index)
+            if self.user_output.n_E.get_active(item=0):
+                self.fetch_from_cpp_image("n_E", run_index, self.cpp_E_neutron_image)
+                self._update_output_coordinate_system("n_E", run_index)
+            if self.user_output.n_tof.get_active(item=0):
+                self.fetch_from_cpp_image(
+                    "n_tof", run_index, self.cpp_tof_neutron_image
+                )
+                self._update_output_coordinate_system("n_tof", run_index)
         VoxelDepositActor.EndOfRunActionMasterThread(self, run_index)
         return 0
 
@@ -0,0 +1,7 @@
+"""
+Performance benchmarks: fixed-seed representative workloads, run with
+several numbers of threads. See opengate/bin/opengate_benchmarks.py.
+"""
+
+from .workloads import available_workloads
+from .runner import run_benchmarks, compare_to_baseline
@@ -0,0 +1,210 @@
+"""
+Run the benchmark workloads and compare the results with a baseline.
+
+Each (workload, number of threads) is run in a separate process, because
+Geant4 can only be initialized once per process.
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from importlib.metadata import version, PackageNotFoundError
+from pathlib import Path
+
+import opengate as gate
+from opengate.exception import fatal
+from opengate.processing import dispatch_to_subprocess
+from .workloads import available_workloads
+
+benchmark_format_version = 1
+
+
+def get_default_numbers_of_threads():
+    """1, 4, 16 and all the cores of the machine (without duplicates)."""
+    n = os.cpu_count() or 1
+    return sorted(set([t for t in (1, 4, 16) if t < n] + [n]))
+
+
+def is_torch_available():
+    try:
+        import torch  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_peak_rss_mb():
+    """Peak resident set size of the current process in MB (0 if unknown)."""
+    try:
+        import resource
+    except ImportError:
+        # not available on Windows
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kB on Linux
+    if sys.platform == "darwin":
+        return rss / 1024**2
+    return rss / 1024
+
+
+def run_one_workload(name, number_of_threads, primaries, output_dir, seed=123456):
+    """Configure and run one workload in the current process, return the measures."""
+    workload = available_workloads[name]
+    sim = gate.Simulation()
+    sim.verbose_level = gate.logger.NONE
+    sim.progress_bar = False
+    sim.random_seed = seed
+    sim.number_of_threads = number_of_threads
+    sim.output_dir = Path(output_dir) / f"{name}_{number_of_threads}"
+    workload.create(sim, primaries)
+    stats = sim.add_actor("SimulationStatisticsActor", "benchmark_stats")
+
+    t = time.perf_counter()
+    sim.run(start_new_process=False)
+    wall_time = time.perf_counter() - t
+
+    s = gate.g4_units.s
+    counts = stats.counts
+    duration = counts.duration / s
+    return {
+        "workload": name,
+        "threads": number_of_threads,
+        "primaries": int(counts.events),
+        "tracks": int(counts.tracks),
+        "steps": int(counts.steps),
+        "init_time_s": counts.init / s,
+        "run_time_s": duration,
+        "wall_time_s": wall_time,
+        "primaries_per_s": counts.events / duration if duration > 0 else 0,
+        "peak_rss_mb": get_peak_rss_mb(),
+    }
+
+
+def get_machine_info():
+    try:
+        opengate_version = version("opengate")
+    except PackageNotFoundError:
+        opengate_version = "unknown"
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "opengate_version": opengate_version,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "hostname": platform.node(),
+    }
+
+
+def run_benchmarks(
+    workloads=None,
+    numbers_of_threads=None,
+    scale=1.0,
+    output_dir="benchmarks_output",
+    verbose=True,
+):
+    """Run the workloads for each number of threads.
+
+    The number of primaries of each workload is its default value multiplied by
+    'scale', and is the same for all numbers of threads (split between threads).
+    Return a dict with the machine information and the list of results.
+    """
+    if workloads is None:
+        workloads = list(available_workloads.keys())
+    if numbers_of_threads is None:
+        numbers_of_threads = get_default_numbers_of_threads()
+    torch_ok = is_torch_available()
+
+    results = []
+    for name in workloads:
+        if name not in available_workloads:
+            fatal(
+                f"Unknown benchmark workload '{name}', "
+                f"available: {list(available_workloads.keys())}"
+            )
+        workload = available_workloads[name]
+        if workload.torch and not torch_ok:
+            verbose and print(f"{name:<16} skipped (torch is not available)")
+            continue
+        primaries = int(workload.primaries * scale)
+        for n in numbers_of_threads:
+            r = dispatch_to_subprocess(run_one_workload, name, n, primaries, output_dir)
+            results.append(r)
+            verbose and print(format_result(r))
+
+    # scaling: throughput relative to the single thread run of the same workload
+    for r in results:
+        ref = [
+            x for x in results if x["workload"] == r["workload"] and x["threads"] == 1
+        ]
+        if len(ref) > 0 and ref[0]["primaries_per_s"] > 0:
+            r["speedup"] = r["primaries_per_s"] / ref[0]["primaries_per_s"]
+
+    return {
+        "format_version": benchmark_format_version,
+        "machine": get_machine_info(),
+        "scale": scale,
+        "results": results,
+    }
+
+
+def format_result(r):
+    return (
+        f"{r['workload']:<16} {r['threads']:>3} threads  "
+        f"{r['primaries_per_s']:12.1f} primaries/s  "
+        f"init {r['init_time_s']:6.2f} s  "
+        f"run {r['run_time_s']:8.2f} s  "
+        f"peak RSS {r['peak_rss_mb']:8.1f} MB"
+    )
+
+
+def compare_to_baseline(results, baseline, tolerance=10.0):
+    """Compare the results with a baseline (both as returned by run_benchmarks).
+
+    A regression is a throughput (primaries/s) lower than the baseline by more
+    than 'tolerance' percent. The init time and peak RSS are also compared
+    and reported, with the same tolerance.
+    Return the list of comparisons and the list of regressions.
+    """
+    base = {(r["workload"], r["threads"]): r for r in baseline["results"]}
+    comparisons = []
+    regressions = []
+    for r in results["results"]:
+        key = (r["workload"], r["threads"])
+        if key not in base:
+            continue
+        b = base[key]
+        c = {"workload": r["workload"], "threads": r["threads"]}
+        for k, higher_is_better in [
+            ("primaries_per_s", True),
+            ("init_time_s", False),
+            ("peak_rss_mb", False),
+        ]:
+            if b[k] == 0:
+                continue
+            diff = (r[k] - b[k]) / b[k] * 100
+            c[k] = {"baseline": b[k], "value": r[k], "diff_percent": diff}
+            worse = -diff if higher_is_better else diff
+            if worse > tolerance:
+                regressions.append((key, k, diff))
+        comparisons.append(c)
+    return comparisons, regressions
+
+
+def write_results(results, filename):
+    with open(filename, "w") as f:
+        json.dump(results, f, indent=4)
+
+
+def read_results(filename):
+    with open(filename, "r") as f:
+        results = json.load(f)
+    if results.get("format_version", None) != benchmark_format_version:
+        fatal(
+            f"The benchmark file {filename} has format version "
+            f"{results.get('format_version', None)}, expected {benchmark_format_version}"
+        )
+    return results
@@ -0,0 +1,301 @@
+"""
+Representative workloads for the benchmarks.
+
+Each workload is a function that configures a Simulation for a given total
+number of primaries (split between the threads). The seed is fixed. Some
+workloads need the test data (opengate_tests downloads them) or torch.
+"""
+
+from box import Box
+
+import opengate as gate
+from opengate.bin.opengate_library_path import return_tests_path
+
+m = gate.g4_units.m
+cm = gate.g4_units.cm
+mm = gate.g4_units.mm
+nm = gate.g4_units.nm
+mrad = gate.g4_units.mrad
+keV = gate.g4_units.keV
+MeV = gate.g4_units.MeV
+Bq = gate.g4_units.Bq
+sec = gate.g4_units.second
+gcm3 = gate.g4_units.g_cm3
+
+
+def get_data_path():
+    return return_tests_path().parent / "data"
+
+
+def n_per_thread(sim, n):
+    return max(1, int(n / sim.number_of_threads))
+
+
+def ct_dose(sim, n):
+    """Proton beam in a CT image (Schneider materials), dose with uncertainty."""
+    data = get_data_path()
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+    sim.world.material = "G4_AIR"
+
+    ct = sim.add_volume("Image", "ct")
+    ct.image = data / "patient-4mm.mhd"
+    ct.material = "G4_AIR"
+    f1 = gate.utility.get_data_folder() / "Schneider2000MaterialsTable.txt"
+    f2 = gate.utility.get_data_folder() / "Schneider2000DensitiesTable.txt"
+    ct.voxel_materials, _ = gate.geometry.materials.HounsfieldUnit_to_material(
+        sim, 0.1 * gcm3, f1, f2
+    )
+
+    sim.physics_manager.physics_list_name = "QGSP_BIC_EMZ"
+    sim.physics_manager.set_production_cut("world", "all", 1 * mm)
+
+    source = sim.add_source("GenericSource", "beam")
+    source.particle = "proton"
+    source.energy.mono = 150 * MeV
+    source.position.type = "disc"
+    source.position.radius = 5 * mm
+    source.position.translation = [0, 0, -40 * cm]
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.n = n_per_thread(sim, n)
+
+    dose = sim.add_actor("DoseActor", "dose")
+    dose.attached_to = ct
+    dose.size = [100, 100, 100]
+    dose.spacing = [2 * mm, 2 * mm, 2 * mm]
+    dose.edep_uncertainty.active = True
+    dose.dose.active = True
+    dose.output_filename = "benchmark_ct_dose.mhd"
+
+
+def proton_pbs_let(sim, n):
+    """Pencil beam of protons in water, dose and LET (dose and track averaged)."""
+    sim.world.size = [2 * m, 2 * m, 2 * m]
+    phantom = sim.add_volume("Box", "phantom")
+    phantom.size = [20 * cm, 20 * cm, 30 * cm]
+    phantom.translation = [0, 0, 15 * cm]
+    phantom.material = "G4_WATER"
+
+    sim.physics_manager.physics_list_name = "QGSP_BIC_EMZ"
+
+    source = sim.add_source("IonPencilBeamSource", "pbs")
+    source.energy.mono = 150 * MeV
+    source.particle = "proton"
+    source.position.type = "disc"
+    source.direction.partPhSp_x = [2.5 * mm, 2.5 * mrad, 0.001 * mm * mrad, 0]
+    source.direction.partPhSp_y = [2.5 * mm, 2.5 * mrad, 0.001 * mm * mrad, 0]
+    source.n = n_per_thread(sim, n)
+
+    dose = sim.add_actor("DoseActor", "dose")
+    dose.attached_to = phantom
+    dose.size = [50, 50, 150]
+    dose.spacing = [2 * mm, 2 * mm, 2 * mm]
+    dose.output_filename = "benchmark_pbs_dose.mhd"
+    for method in ["dose_average", "track_average"]:
+        let = sim.add_actor("LETActor", f"let_{method}")
+        let.attached_to = phantom
+        let.size = [50, 50, 150]
+        let.spacing = [2 * mm, 2 * mm, 2 * mm]
+        let.averaging_method = method
+        let.output_filename = f"benchmark_pbs_let_{method}.mhd"
+
+
+def spect_arf(sim, n):
+    """Tc99m spheres in water, SPECT head modelled by an ARF (neural network)."""
+    import opengate.contrib.spect.ge_discovery_nm670 as gate_spect
+
+    data = get_data_path()
+    sim.world.size = [1.5 * m, 1.5 * m, 1.5 * m]
+    sim.world.material = "G4_AIR"
+
+    phantom = sim.add_volume("Box", "phantom")
+    phantom.size = [30 * cm, 30 * cm, 20 * cm]
+    phantom.material = "G4_WATER"
+
+    head = sim.add_volume("Box", "spect_head")
+    head.size = [60 * cm, 50 * cm, 10 * cm]
+    head.translation = [0, 0, -30 * cm]
+    head.material = "G4_AIR"
+    pos, crystal_dist, _ = gate_spect.get_plane_position_and_distance_to_crystal("lehr")
+    plane = sim.add_volume("Box", "arf_plane")
+    plane.mother = head
+    plane.size = [57.6 * cm, 44.6 * cm, 1 * nm]
+    plane.translation = [0, 0, pos + 1 * nm]
+    plane.material = "G4_AIR"
+
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
+    sim.physics_manager.set_production_cut("world", "all", 1 * m)
+
+    source = sim.add_source("GenericSource", "tc99m")
+    source.particle = "gamma"
+    source.energy.mono = 140.5 * keV
+    source.position.type = "sphere"
+    source.position.radius = 5 * cm
+    source.direction.type = "iso"
+    source.n = n_per_thread(sim, n)
+
+    arf = sim.add_actor("ARFActor", "arf")
+    arf.attached_to = plane
+    arf.output_filename = "benchmark_spect_arf.mhd"
+    arf.batch_size = 2e5
+    arf.image_size = [128, 128]
+    arf.image_spacing = [4.41806 * mm, 4.41806 * mm]
+    arf.distance_to_crystal = crystal_dist
+    arf.pth_filename = (
+        data / "gate" / "gate_test043_garf" / "data" / "pth" / "arf_Tc99m_v034.pth"
+    )
+    arf.flip_plane = True
+    arf.gpu_mode = "auto"
+
+
+def pet_digitizer(sim, n):
+    """Back-to-back source in the Vereos PET: hits, singles, blurring,
+    energy window and coincidence sorting."""
+    import opengate.contrib.pet.philipsvereos as vereos
+
+    sim.world.size = [1.5 * m, 1.5 * m, 1.5 * m]
+    sim.world.material = "G4_AIR"
+    vereos.add_pet(sim, "pet")
+    crystal = sim.volume_manager.get_volume("pet_crystal")
+
+    phantom = sim.add_volume("Tubs", "phantom")
+    phantom.rmax = 10 * cm
+    phantom.dz = 35 * cm
+    phantom.material = "G4_WATER"
+
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
+    sim.physics_manager.set_production_cut("world", "all", 1 * m)
+
+    source = sim.add_source("GenericSource", "b2b")
+    source.particle = "back_to_back"
+    source.energy.mono = 511 * keV
+    source.position.type = "cylinder"
+    source.position.radius = 8 * cm
+    source.position.dz = 30 * cm
+    source.direction.type = "iso"
+    # activity such that the number of primaries is n in 1 second
+    source.activity = n * Bq / sim.number_of_threads
+    sim.run_timing_intervals = [[0, 1 * sec]]
+
+    filename = "benchmark_pet.root"
+    hc = sim.add_actor("DigitizerHitsCollectionActor", "hits")
+    hc.attached_to = crystal
+    hc.authorize_repeated_volumes = True
+    hc.attributes = [
+        "EventID",
+        "PostPosition",
+        "TotalEnergyDeposit",
+        "PreStepUniqueVolumeID",
+        "GlobalTime",
+    ]
+    hc.root_output.write_to_disk = False
+
+    sc = sim.add_actor("DigitizerAdderActor", "singles")
+    sc.attached_to = crystal
+    sc.authorize_repeated_volumes = True
+    sc.input_digi_collection = hc.name
+    sc.policy = "EnergyWeightedCentroidPosition"
+    sc.group_volume = crystal.name
+    sc.root_output.write_to_disk = False
+
+    bc = sim.add_actor("DigitizerBlurringActor", "singles_blurred")
+    bc.attached_to = crystal
+    bc.authorize_repeated_volumes = True
+    bc.input_digi_collection = sc.name
+    bc.blur_attribute = "TotalEnergyDeposit"
+    bc.blur_method = "InverseSquare"
+    bc.blur_resolution = 0.11
+    bc.blur_reference_value = 511 * keV
+    bc.root_output.write_to_disk = False
+
+    ew = sim.add_actor("DigitizerEnergyWindowsActor", "energy_window")
+    ew.attached_to = crystal
+    ew.authorize_repeated_volumes = True
+    ew.input_digi_collection = bc.name
+    ew.channels = [{"name": "peak", "min": 449 * keV, "max": 613 * keV}]
+    ew.output_filename = filename
+
+    cc = sim.add_actor("CoincidenceSorterActor", "coincidences")
+    cc.input_digi_collection = "peak"
+    cc.window = 1e-9 * sec
+    cc.output_filename = filename
+
+
+def phsp_source(sim, n):
+    """Replay of a phase space file (linac) in a water box, dose."""
+    data = get_data_path()
+    sim.world.size = [2 * m, 2 * m, 2 * m]
+    sim.world.material = "G4_AIR"
+    waterbox = sim.add_volume("Box", "waterbox")
+    waterbox.size = [30 * cm, 30 * cm, 30 * cm]
+    waterbox.translation = [0, 0, 50 * cm]
+    waterbox.material = "G4_WATER"
+
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
+    sim.physics_manager.set_production_cut("world", "all", 1 * mm)
+
+    source = sim.add_source("PhaseSpaceSource", "phsp")
+    source.phsp_file = data / "output_ref" / "test019" / "test019_hits.root"
+    source.position_key = "PrePosition"
+    source.direction_key = "PreDirection"
+    source.weight_key = "Weight"
+    source.global_flag = True
+    source.particle = "gamma"
+    source.batch_size = 100000
+    source.n = n_per_thread(sim, n)
+
+    dose = sim.add_actor("DoseActor", "dose")
+    dose.attached_to = waterbox
+    dose.size = [75, 75, 75]
+    dose.spacing = [4 * mm, 4 * mm, 4 * mm]
+    dose.output_filename = "benchmark_phsp_dose.mhd"
+
+
+def gan_source(sim, n):
+    """GAN source (linac phase space) in a water box, dose."""
+    data = get_data_path()
+    sim.world.size = [2 * m, 2 * m, 2 * m]
+    sim.world.material = "G4_AIR"
+    waterbox = sim.add_volume("Box", "waterbox")
+    waterbox.size = [30 * cm, 30 * cm, 30 * cm]
+    waterbox.translation = [0, 0, 52.2 * cm]
+    waterbox.material = "G4_WATER"
+    plane = sim.add_volume("Box", "phsp_plane")
+    plane.size = [3 * cm, 4 * cm, 5 * cm]
+    plane.material = "G4_AIR"
+
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
+    sim.physics_manager.set_production_cut("world", "all", 1000 * m)
+    sim.physics_manager.set_production_cut("waterbox", "all", 1 * mm)
+
+    gsource = sim.add_source("GANSource", "gaga")
+    gsource.particle = "gamma"
+    gsource.attached_to = plane
+    gsource.n = n_per_thread(sim, n)
+    gsource.pth_filename = data / "003_v3_40k.pth"
+    gsource.position_keys = ["X", "Y", 271.1 * mm]
+    gsource.direction_keys = ["dX", "dY", "dZ"]
+    gsource.energy_key = "Ekine"
+    gsource.weight_key = None
+    gsource.time_key = None
+    gsource.batch_size = 1e5
+    gsource.gpu_mode = "auto"
+
+    dose = sim.add_actor("DoseActor", "dose")
+    dose.attached_to = waterbox
+    dose.size = [75, 75, 75]
+    dose.spacing = [4 * mm, 4 * mm, 4 * mm]
+    dose.output_filename = "benchmark_gan_dose.mhd"
+
+
+# name: (function, default number of primaries, requires torch)
+available_workloads = Box(
+    {
+        "ct_dose": Box(create=ct_dose, primaries=20000, torch=False),
+        "proton_pbs_let": Box(create=proton_pbs_let, primaries=20000, torch=False),
+        "spect_arf": Box(create=spect_arf, primaries=1000000, torch=True),
+        "pet_digitizer": Box(create=pet_digitizer, primaries=200000, torch=False),
+        "phsp_source": Box(create=phsp_source, primaries=200000, torch=False),
+        "gan_source": Box(create=gan_source, primaries=200000, torch=True),
+    }
+)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import click
+
+from opengate.benchmarks.workloads import available_workloads
+from opengate.benchmarks.runner import (
+    run_benchmarks,
+    compare_to_baseline,
+    write_results,
+    read_results,
+    get_default_numbers_of_threads,
+)
+
+CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
+
+
+@click.command(context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--workload",
+    "-w",
+    multiple=True,
+    type=click.Choice(list(available_workloads.keys())),
+    help="Workload to run (can be repeated), default: all",
+)
+@click.option(
+    "--threads",
+    "-t",
+    multiple=True,
+    type=int,
+    help=f"Number of threads (can be repeated), default: {get_default_numbers_of_threads()}",
+)
+@click.option(
+    "--scale",
+    "-s",
+    default=1.0,
+    help="Factor applied to the default number of primaries of each workload",
+)
+@click.option("--output", "-o", default="benchmarks.json", help="Output JSON file")
+@click.option(
+    "--output_folder",
+    default="benchmarks_output",
+    help="Folder for the outputs of the simulations",
+)
+@click.option(
+    "--baseline",
+    "-b",
+    default=None,
+    help="Compare with this baseline JSON file (written by a previous run)",
+)
+@click.option(
+    "--compare_only",
+    "-c",
+    default=None,
+    help="Do not run, only compare this JSON result file with the baseline",
+)
+@click.option(
+    "--tolerance",
+    default=10.0,
+    help="Tolerance (in percent) before a difference with the baseline is a regression",
+)
+@click.option("--list", "list_workloads", is_flag=True, help="List the workloads")
+def go(
+    workload,
+    threads,
+    scale,
+    output,
+    output_folder,
+    baseline,
+    compare_only,
+    tolerance,
+    list_workloads,
+):
+    """
+    Run fixed-seed representative workloads (CT dose, proton PBS with LET,
+    SPECT with ARF, PET digitizer with coincidences, phase space source, GAN
+    source) with several numbers of threads. For each, the throughput
+    (primaries/s), initialisation time and peak RSS are written in a JSON file.
+
+    With --baseline, the results are compared with a previous JSON file and
+    the exit code is 1 if a regression is found.
+    Workloads with data (SPECT ARF, phsp, GAN, CT) need the test data, see opengate_tests.
+    """
+    if list_workloads:
+        for name, w in available_workloads.items():
+            doc = w.create.__doc__.split("\n")[0]
+            print(f"{name:<16} {w.primaries:>9} primaries  {doc}")
+        return
+
+    if compare_only is not None:
+        results = read_results(compare_only)
+    else:
+        results = run_benchmarks(
+            workloads=list(workload) if len(workload) > 0 else None,
+            numbers_of_threads=list(threads) if len(threads) > 0 else None,
+            scale=scale,
+            output_dir=output_folder,
+        )
+        write_results(results, output)
+        print(f"Results written in {output}")
+
+    if baseline is None:
+        return
+    comparisons, regressions = compare_to_baseline(
+        results, read_results(baseline), tolerance
+    )
+    for c in comparisons:
+        s = f"{c['workload']:<16} {c['threads']:>3} threads "
+        for k in ["primaries_per_s", "init_time_s", "peak_rss_mb"]:
+            if k in c:
+                s += f"  {k} {c[k]['diff_percent']:+6.1f}%"
+        print(s)
+    for key, k, diff in regressions:
+        print(f"Regression: {key[0]} ({key[1]} threads) {k} {diff:+.1f}%")
+    if len(regressions) > 0:
+        sys.exit(1)
+    print(f"No regression (tolerance {tolerance}%)")
+
+
+if __name__ == "__main__":
+    go()
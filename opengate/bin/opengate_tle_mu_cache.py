@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import click
+from opengate import g4_units
+from opengate.contrib.dose.tle_mu_cache_helpers import precompute_tle_mu_tables
+
+CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
+
+
+@click.command(context_settings=CONTEXT_SETTINGS)
+@click.option("--material", "-m", multiple=True, help="Material name (can be repeated)")
+@click.option("--image", "-i", default=None, help="Label or CT image filename")
+@click.option("--labels", "-l", default=None, help="Input label to material (json)")
+@click.option(
+    "--material_database",
+    "--mdb",
+    default=None,
+    help="Gate material database (if needed)",
+)
+@click.option(
+    "--cache_directory",
+    "-o",
+    default=None,
+    help="Cache directory (default: $OPENGATE_MU_CACHE_DIR or ~/.cache/opengate/mu_tables)",
+)
+@click.option(
+    "--physics_list", default="QGSP_BERT_EMV", help="Physics list of the simulations"
+)
+@click.option(
+    "--gamma_cut", default=None, type=float, help="Gamma production cut in mm"
+)
+@click.option(
+    "--tle_threshold_type",
+    default="None",
+    type=click.Choice(["None", "energy", "max range", "average range"]),
+    help="TLE threshold type of the simulations",
+)
+@click.option(
+    "--tle_threshold",
+    default=None,
+    type=float,
+    help="TLE threshold of the simulations, in MeV (energy) or mm (range)",
+)
+@click.option("--verbose", "-v", is_flag=True, default=False, help="Verbose output")
+def go(
+    material,
+    image,
+    labels,
+    material_database,
+    cache_directory,
+    physics_list,
+    gamma_cut,
+    tle_threshold_type,
+    tle_threshold,
+    verbose,
+):
+    """
+    Precompute the mu/mu_en tables of the TLEDoseActor ('simulated' database)
+    and store them in the persistent cache, so that the simulations using the
+    same materials load them instead of simulating them at startup.
+
+    The physics list, gamma cut and TLE threshold must be the same as the ones
+    of the simulations that will use the cache.
+    """
+    kwargs = {}
+    if gamma_cut is not None:
+        kwargs["gamma_cut"] = gamma_cut * g4_units.mm
+    if tle_threshold is not None:
+        unit = g4_units.MeV if tle_threshold_type == "energy" else g4_units.mm
+        kwargs["tle_threshold"] = tle_threshold * unit
+    created = precompute_tle_mu_tables(
+        materials=list(material) if len(material) > 0 else None,
+        image_filename=image,
+        labels_filename=labels,
+        material_database=material_database,
+        cache_directory=cache_directory,
+        physics_list_name=physics_list,
+        tle_threshold_type=tle_threshold_type,
+        verbose=verbose,
+        **kwargs,
+    )
+    for f in created:
+        print(f)
+
+
+if __name__ == "__main__":
+    go()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate.sources.phidsources as phid
+import click
+import shutil
+
+CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
+
+
+@click.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("rad_names", nargs=-1)
+@click.option("--clear", is_flag=True, default=False, help="remove the cache first")
+@click.option(
+    "--cache_dir",
+    default=None,
+    help="Cache directory (default: $OPENGATE_PHID_CACHE_DIR or ~/.cache/opengate/phid)",
+)
+def go(rad_names, clear, cache_dir):
+    """
+    Store in the cache the decay data (progeny, gamma lines) needed by the
+    PhotonFromIonDecaySource for the given radionuclides (ac225, lu177, etc.)
+    """
+    phid.phid_cache_directory = cache_dir
+    folder = phid.phid_cache_get_folder()
+    if folder is None:
+        print(f"Cannot write in {phid.phid_cache_get_root_folder()}, no cache")
+        return
+    if clear and folder.exists():
+        print(f"Remove cache folder {folder}")
+        shutil.rmtree(folder)
+    for rad_name in rad_names:
+        nuclide = phid.get_nuclide_from_name(rad_name)
+        daughters = phid.phid_cache_warm_up(nuclide)
+        print(f"{nuclide.nuclide}: {len(daughters)} nuclides in the decay chain")
+    print(f"Cache folder is {folder}")
+
+
+# --------------------------------------------------------------------------
+if __name__ == "__main__":
+    go()
@@ -1 +1,24 @@
-from . import dose, linacs, pet, phantoms, spect, tps, beamlines, optical
+import importlib
+
+# The subpackages are only imported on first access (PEP 562): some of them
+# need heavy modules (torch, pytomography, pydicom, matplotlib, etc.)
+_subpackages = (
+    "dose",
+    "linacs",
+    "pet",
+    "phantoms",
+    "spect",
+    "tps",
+    "beamlines",
+    "optical",
+)
+
+
+def __getattr__(name):
+    if name in _subpackages:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_subpackages))
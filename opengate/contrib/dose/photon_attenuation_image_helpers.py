@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import opengate as gate
+import json
+import re
+from functools import lru_cache
 from pathlib import Path
 
+import itk
+import numpy as np
+
+import opengate as gate
+from opengate.definitions import elements_name_symbol
+from opengate.exception import fatal
+from opengate.utility import g4_units
+
 
 def create_photon_attenuation_image(
     image_filename,
@@ -14,7 +24,28 @@ def create_photon_attenuation_image(
     verbose=False,
     density_tol=None,
     progress_bar=False,
+    method="simulation",
 ):
+    """Compute the attenuation map (cm^-1) of a label (or CT) image.
+
+    With method="simulation", µ is computed by Geant4 (AttenuationImageActor) in
+    a separate process. With method="numpy", the NIST tables are used directly,
+    without Geant4 (see create_photon_attenuation_image_numpy).
+    """
+    if method == "numpy":
+        if database != "NIST":
+            fatal(f"The 'numpy' method only uses the NIST database, not {database}")
+        return create_photon_attenuation_image_numpy(
+            image_filename,
+            labels_filename,
+            energy,
+            material_database=material_database,
+            verbose=verbose,
+            density_tol=density_tol,
+        )
+    if method != "simulation":
+        fatal(f"Unknown method '{method}', must be 'simulation' or 'numpy'")
+
     # create a temporary simulation
     sim = gate.Simulation()
     sim.verbose_level = gate.logger.NONE
@@ -63,3 +94,250 @@ def create_photon_attenuation_image(
     # retrieve the created image
     im = mumap.attenuation_image.merged_data.image
     return im
+
+
+# Composition of the most common Geant4 NIST materials, as named in the NIST
+# tables of opengate/data/PhotonAttenuation.py (elemental G4_XX materials are
+# handled directly)
+nist_material_to_photon_attenuation_mixture = {
+    "G4_WATER": "WATER, LIQUID",
+    "G4_AIR": "AIR, DRY (NEAR SEA LEVEL)",
+    "G4_LUNG_ICRP": "LUNG (ICRP)",
+    "G4_BONE_COMPACT_ICRU": "BONE, COMPACT (ICRU)",
+    "G4_BONE_CORTICAL_ICRP": "BONE, CORTICAL (ICRP)",
+    "G4_B-100_BONE": "B-100 BONE-EQUIVALENT PLASTIC",
+    "G4_A-150_TISSUE": "A-150 TISSUE-EQUIVALENT PLASTIC",
+    "G4_ADIPOSE_TISSUE_ICRP": "ADIPOSE TISSUE (ICRP)",
+    "G4_TISSUE_SOFT_ICRP": "TISSUE, SOFT (ICRP)",
+    "G4_MUSCLE_SKELETAL_ICRP": "MUSCLE, SKELETAL (ICRP)",
+    "G4_MUSCLE_STRIATED_ICRU": "MUSCLE, STRIATED (ICRU)",
+    "G4_BLOOD_ICRP": "BLOOD (ICRP)",
+    "G4_BRAIN_ICRP": "BRAIN (ICRP)",
+    "G4_SKIN_ICRP": "SKIN (ICRP)",
+    "G4_EYE_LENS_ICRP": "EYE LENS (ICRP)",
+    "G4_TESTIS_ICRP": "TESTES (ICRP)",
+    "G4_PLEXIGLASS": "POLYMETHYL METHACRALATE (LUCITE, PERSPEX, PLEXIGLASS)",
+    "G4_POLYETHYLENE": "POLYETHYLENE",
+    "G4_POLYSTYRENE": "POLYSTYRENE",
+    "G4_TEFLON": "POLYTETRAFLUOROETHYLENE (TEFLON)",
+    "G4_KAPTON": "KAPTON POLYIMIDE FILM",
+    "G4_MYLAR": "POLYETHYLENE TEREPHTHALATE (MYLAR)",
+    "G4_PARAFFIN": "PARAFFIN WAX",
+    "G4_CONCRETE": "CONCRETE, PORTLAND",
+    "G4_GLASS_LEAD": "GLASS, LEAD",
+    "G4_GLASS_PLATE": "GLASS, PLATE",
+    "G4_PYREX_GLASS": "Glass, Borosilicate",
+    "G4_SODIUM_IODIDE": "SODIUM IODIDE",
+    "G4_CESIUM_IODIDE": "CESIUM IODIDE",
+    "G4_BGO": "BISMUTH GERMANIUM OXIDE",
+    "G4_CADMIUM_TELLURIDE": "CADMIUM TELLURIDE",
+}
+
+# linear attenuation coefficients (cm^-1) already computed,
+# keyed by (material database, energy)
+_mu_cache = {}
+
+
+def _parse_photon_attenuation_formula(formula):
+    """Parse 'H(0.119)O(0.881)' (fractions by weight) or 'C3H6O' (numbers of atoms)
+    and return the element symbols and the fractions by weight."""
+    from opengate.data import PhotonAttenuation as pa
+
+    if "(" in formula:
+        items = re.findall(r"([A-Z][a-z]?)\(([-+0-9.eE]+)\)", formula)
+        symbols = [s for s, _ in items]
+        weights = np.array([float(w) for _, w in items])
+    else:
+        items = re.findall(r"([A-Z][a-z]?)(\d*)", formula)
+        symbols = [s for s, _ in items]
+        n = np.array([int(c) if c != "" else 1 for _, c in items], dtype=float)
+        # atomic mass A = Z / (Z/A)
+        z = np.array([_get_atomic_number(s) for s in symbols], dtype=float)
+        z_over_a = np.array([float(pa.PropsEl[int(i) - 1, 0]) for i in z])
+        weights = n * z / z_over_a
+    return symbols, weights / weights.sum()
+
+
+def _get_atomic_number(symbol):
+    from opengate.data import PhotonAttenuation as pa
+
+    z = np.where(pa.PropsEl[:, 2] == symbol)[0]
+    if len(z) == 0:
+        fatal(f"Unknown element symbol '{symbol}' in the NIST attenuation tables")
+    return int(z[0]) + 1
+
+
+def _get_element_symbol(element_name, material_database):
+    if element_name in material_database.element_builders:
+        return material_database.element_builders[element_name].symbol
+    if element_name in elements_name_symbol:
+        return elements_name_symbol[element_name]
+    # NIST elements, e.g. 'H' or 'G4_H'
+    return element_name.replace("G4_", "")
+
+
+def get_material_composition(material_name, material_database):
+    """Return the element symbols, fractions by weight and density (in g/cm3) of a material.
+
+    The material is searched in the user materials of the database (text files
+    or materials created with add_material_weights, e.g. the Schneider materials)
+    and in a table of common NIST materials. Geant4 is not used.
+    """
+    from opengate.data import PhotonAttenuation as pa
+
+    gcm3 = g4_units.g_cm3
+    # materials created with weights (e.g. Schneider HU to materials)
+    if material_name in material_database.new_materials_weights:
+        _, symbols, weights, density = material_database.new_materials_weights[
+            material_name
+        ]
+        weights = np.asarray(weights, dtype=float)
+        return list(symbols), weights / weights.sum(), density / gcm3
+
+    # materials read from a database file
+    if material_name in material_database.material_builders:
+        mat = material_database.material_builders[material_name]
+        symbols = []
+        weights = []
+        for comp in mat.components.values():
+            if comp.type == "material":
+                s, w, _ = get_material_composition(comp.name, material_database)
+                symbols.extend(s)
+                weights.extend(w * comp.f)
+                continue
+            symbol = _get_element_symbol(comp.name, material_database)
+            if comp.f is None:
+                # by number of atoms, A = Z / (Z/A)
+                z = _get_atomic_number(symbol)
+                w = comp.n * z / float(pa.PropsEl[z - 1, 0])
+            else:
+                w = comp.f
+            symbols.append(symbol)
+            weights.append(w)
+        weights = np.asarray(weights, dtype=float)
+        return symbols, weights / weights.sum(), mat.density / gcm3
+
+    # vacuum
+    if material_name == "G4_Galactic":
+        return ["H"], np.array([1.0]), 1e-25
+
+    # NIST elemental materials, e.g. G4_Pb
+    symbol = material_name.replace("G4_", "")
+    if material_name.startswith("G4_") and symbol in pa.PropsEl[:, 2]:
+        z = _get_atomic_number(symbol)
+        return [symbol], np.array([1.0]), float(pa.PropsEl[z - 1, 1])
+
+    # other NIST materials
+    mixture = nist_material_to_photon_attenuation_mixture.get(material_name, None)
+    if mixture is not None:
+        row = pa.PropsMix[pa.PropsMix[:, 3] == mixture][0]
+        symbols, weights = _parse_photon_attenuation_formula(str(row[4]))
+        return symbols, weights, float(row[1])
+
+    fatal(
+        f"Cannot find the composition of the material '{material_name}' without Geant4. "
+        f"Use a material database or the 'simulation' method."
+    )
+
+
+@lru_cache(maxsize=None)
+def get_element_mass_attenuation(symbol, energy_MeV):
+    """NIST mass attenuation coefficient (cm2/g) of an element."""
+    from opengate.data.PhotonAttenuation import PhotonAttenuationEl
+
+    z = _get_atomic_number(symbol)
+    return float(np.squeeze(PhotonAttenuationEl(z, energy_MeV, 1)[0]))
+
+
+def get_linear_attenuation_coefficient(material_name, energy, material_database):
+    """Linear attenuation coefficient (cm^-1) of the material at the energy,
+    from the mixture rule: mu = rho * sum_i w_i (mu/rho)_i"""
+    symbols, weights, density = get_material_composition(
+        material_name, material_database
+    )
+    e = energy / g4_units.MeV
+    mac = np.array([get_element_mass_attenuation(s, e) for s in symbols])
+    return float(density * np.dot(weights, mac))
+
+
+def _get_material_database_key(material_database, extra_key=None):
+    files = tuple(
+        (str(Path(f).resolve()), Path(f).stat().st_mtime)
+        for f in material_database.filenames
+        if Path(f).is_file()
+    )
+    return files, extra_key
+
+
+def create_photon_attenuation_image_numpy(
+    image_filename,
+    labels_filename,
+    energy,
+    material_database=None,
+    default_material="G4_AIR",
+    verbose=False,
+    density_tol=None,
+):
+    """Compute the attenuation map (cm^-1) of a label (or CT) image without Geant4.
+
+    µ is computed for each material from its composition (elements and fractions
+    by weight) and the NIST mass attenuation tables (data/PhotonAttenuation.py),
+    then mapped onto the image with a single look-up pass. The µ values are
+    cached per material database and energy.
+
+    If 'energy' is a list, one image per energy is returned.
+    If labels_filename is None, the image is a CT and the Schneider method is used.
+    """
+    # composition of the materials
+    sim = gate.Simulation()
+    db = sim.volume_manager.material_database
+    extra_key = None
+    if labels_filename is None:
+        if density_tol is None:
+            density_tol = 0.05 * gate.g4_units.g_cm3
+        f1 = gate.utility.get_data_folder() / "Schneider2000MaterialsTable.txt"
+        f2 = gate.utility.get_data_folder() / "Schneider2000DensitiesTable.txt"
+        voxel_materials, _ = gate.geometry.materials.HounsfieldUnit_to_material(
+            sim, density_tol, f1, f2
+        )
+        extra_key = ("Schneider", density_tol)
+    else:
+        with open(labels_filename, "r") as infile:
+            voxel_materials = json.load(infile)
+    if material_database is not None:
+        db.read_from_file(str(material_database))
+    db_key = _get_material_database_key(db, extra_key)
+
+    # look-up table: intervals [v0, v1[ -> material
+    voxel_materials = sorted(voxel_materials, key=lambda x: x[0])
+    lower = np.array([v[0] for v in voxel_materials], dtype=float)
+    upper = np.array([v[1] for v in voxel_materials], dtype=float)
+    materials = [v[2] for v in voxel_materials] + [default_material]
+
+    image = itk.imread(str(image_filename))
+    arr = itk.array_view_from_image(image)
+    # index of the interval of each voxel, the last index is the default material
+    index = np.searchsorted(lower, arr, side="right") - 1
+    outside = (index < 0) | (arr >= upper[np.clip(index, 0, None)])
+    index[outside] = len(materials) - 1
+
+    single_energy = not isinstance(energy, (list, tuple, np.ndarray))
+    energies = [energy] if single_energy else energy
+    images = []
+    for e in energies:
+        cache = _mu_cache.setdefault((db_key, float(e)), {})
+        mu = np.zeros(len(materials), dtype=np.float32)
+        for i, m in enumerate(materials):
+            if m not in cache:
+                cache[m] = get_linear_attenuation_coefficient(m, e, db)
+            mu[i] = cache[m]
+        verbose and print(
+            f"Energy {e / gate.g4_units.keV} keV: µ of {len(set(materials))} materials"
+        )
+        mu_img = itk.image_from_array(mu[index])
+        mu_img.CopyInformation(image)
+        images.append(mu_img)
+
+    if single_energy:
+        return images[0]
+    return images
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+
+import numpy as np
+
+import opengate as gate
+from opengate.actors.doseactors import get_default_mu_cache_directory
+from opengate.exception import fatal
+
+
+def precompute_tle_mu_tables(
+    materials=None,
+    image_filename=None,
+    labels_filename=None,
+    material_database=None,
+    cache_directory=None,
+    physics_list_name="QGSP_BERT_EMV",
+    gamma_cut=None,
+    tle_threshold_type="None",
+    tle_threshold=np.inf,
+    density_tol=None,
+    verbose=False,
+):
+    """Fill the persistent cache of the mu/mu_en tables used by the
+    TLEDoseActor with the 'simulated' database.
+
+    A minimal simulation (one gamma) is run in a separate process with the
+    given materials (or the materials of a label/CT image). The tables only
+    depend on the materials, the physics list, the gamma production cut, the
+    TLE threshold and the Geant4 version: these options must be the same as
+    the ones of the simulations that will use the cache (tables computed with
+    other gamma models are not reused).
+
+    Return the list of the cache files created.
+    """
+    if materials is None and image_filename is None:
+        fatal("Provide a list of materials or an image to precompute mu tables")
+    if cache_directory is None:
+        cache_directory = get_default_mu_cache_directory()
+    cache_directory = Path(cache_directory).expanduser()
+    before = set(cache_directory.glob("mu_*.txt"))
+
+    # create a temporary simulation
+    sim = gate.Simulation()
+    sim.verbose_level = gate.logger.NONE
+    sim.progress_bar = False
+    sim.physics_manager.physics_list_name = physics_list_name
+    if gamma_cut is not None:
+        sim.physics_manager.global_production_cuts.gamma = gamma_cut
+    if material_database is not None:
+        sim.volume_manager.add_material_database(material_database)
+    sim.world.material = "G4_AIR"
+
+    # one small box per material, or the image
+    volumes = []
+    if materials is not None:
+        cm = gate.g4_units.cm
+        for i, material in enumerate(materials):
+            box = sim.add_volume("Box", f"box_{i}")
+            box.size = [1 * cm, 1 * cm, 1 * cm]
+            box.translation = [2 * i * cm, 0, 0]
+            box.material = material
+            volumes.append(box)
+    if image_filename is not None:
+        image_volume = sim.add_volume("Image", "image")
+        image_volume.image = image_filename
+        image_volume.material = "G4_AIR"
+        if labels_filename is None:
+            if density_tol is None:
+                density_tol = 0.05 * gate.g4_units.g_cm3
+            f1 = gate.utility.get_data_folder() / "Schneider2000MaterialsTable.txt"
+            f2 = gate.utility.get_data_folder() / "Schneider2000DensitiesTable.txt"
+            vm, _ = gate.geometry.materials.HounsfieldUnit_to_material(
+                sim, density_tol, f1, f2
+            )
+            image_volume.voxel_materials = vm
+        else:
+            image_volume.read_label_to_material(labels_filename)
+        volumes.append(image_volume)
+
+    # the tables are built at the first event
+    tle = sim.add_actor("TLEDoseActor", "tle")
+    tle.attached_to = volumes[0]
+    tle.size = [1, 1, 1]
+    tle.database = "simulated"
+    tle.mu_cache_directory = str(cache_directory)
+    tle.tle_threshold_type = tle_threshold_type
+    tle.tle_threshold = tle_threshold
+    tle.write_to_disk = False
+    source = sim.add_source("GenericSource", "gamma")
+    source.particle = "gamma"
+    source.energy.mono = 100 * gate.g4_units.keV
+    source.n = 1
+
+    verbose and print(f"Computing the mu/mu_en tables in {cache_directory} ...")
+    sim.run(start_new_process=True)
+
+    created = sorted(set(cache_directory.glob("mu_*.txt")) - before)
+    verbose and print(f"{len(created)} new table(s) in the cache")
+    return created
@@ -2,7 +2,10 @@ import time
 import random
 import sys
 import os
+import hashlib
+import shutil
 import weakref
+from pathlib import Path
 from box import Box
 from anytree import PreOrderIter
 
@@ -21,6 +24,10 @@ from .physics import (
 )
 from .base import GateSingletonFatal
 from .logger import logger
+from .serialization import dump_json, dumps_json
+
+# written at the end of the storage, marks a complete set of physics tables
+physics_tables_cache_info_file = "opengate_physics_tables.json"
 
 
 def _translate_track_structure_em_physics_to_geant4(track_structure_em_physics):
@@ -290,6 +297,10 @@ class PhysicsEngine(EngineBase):
 
         self.optical_surfaces_properties_dict = {}
 
+        # physics tables cache (see PhysicsManager.physics_tables_cache_directory)
+        self.physics_tables_directory = None
+        self.physics_tables_to_be_stored = False
+
     def close(self):
         if self.verbose_close:
             warning("Closing PhysicsEngine")
@@ -616,6 +627,81 @@ class PhysicsEngine(EngineBase):
             ionisation = mat.GetIonisation()
             ionisation.SetMeanExcitationEnergy(val)
 
+    def get_physics_tables_hash(self):
+        """Hash identifying the physics tables built by Geant4 for this simulation.
+        It depends on the Geant4 version, the physics configuration
+        (physics list, cuts, EM parameters, regions, ...)
+        and the full description of all materials.
+        Must be called after the geometry has been constructed.
+        """
+        d = self.physics_manager.to_dictionary()
+        # the location of the cache does not change the tables
+        d["user_info"].pop("physics_tables_cache_directory", None)
+        h = hashlib.sha256()
+        h.update(str(g4.GateInfo.get_G4Version()).encode())
+        h.update(dumps_json(d, sort_keys=True).encode())
+        for mat in g4.G4Material.GetMaterialTable:
+            # the G4 stream output describes density, elements, I, state, ...
+            h.update(repr(mat).encode())
+        return h.hexdigest()
+
+    def initialize_physics_tables_cache(self):
+        """If a cache directory is set, retrieve the physics tables from it if they
+        have already been stored for the same configuration. Otherwise, the tables
+        will be stored at the end of the simulation, see store_physics_tables_if_needed.
+        Must be called after G4RunManager.Initialize() and before the first BeamOn.
+        """
+        self.physics_tables_directory = None
+        self.physics_tables_to_be_stored = False
+        cache_dir = self.physics_manager.physics_tables_cache_directory
+        if cache_dir is None:
+            return
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.physics_tables_directory = cache_dir / self.get_physics_tables_hash()
+        if (self.physics_tables_directory / physics_tables_cache_info_file).is_file():
+            logger.info(
+                f"Simulation: retrieve physics tables from {self.physics_tables_directory}"
+            )
+            self.simulation_engine.add_g4_command_after_init(
+                f"/run/particle/retrievePhysicsTable {self.physics_tables_directory}"
+            )
+        else:
+            self.physics_tables_to_be_stored = True
+
+    def store_physics_tables_if_needed(self):
+        if not self.physics_tables_to_be_stored:
+            return
+        # Store into a temporary folder first and rename it at the end,
+        # so that concurrent simulations never read partially written tables
+        tmp_directory = self.physics_tables_directory.with_name(
+            f"{self.physics_tables_directory.name}.tmp-{os.getpid()}"
+        )
+        logger.info(
+            f"Simulation: store physics tables in {self.physics_tables_directory}"
+        )
+        tmp_directory.mkdir(parents=True, exist_ok=True)
+        self.simulation_engine.add_g4_command_after_init(
+            f"/run/particle/storePhysicsTable {tmp_directory}"
+        )
+        with open(tmp_directory / physics_tables_cache_info_file, "w") as f:
+            dump_json(
+                {
+                    "geant4_version": str(g4.GateInfo.get_G4Version()),
+                    "physics_list_name": self.physics_manager.physics_list_name,
+                    "materials": [
+                        str(m.GetName()) for m in g4.G4Material.GetMaterialTable
+                    ],
+                },
+                f,
+            )
+        try:
+            os.rename(tmp_directory, self.physics_tables_directory)
+        except OSError:
+            # another simulation stored the same tables in the meantime
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+        self.physics_tables_to_be_stored = False
+
 
 class ChemistryEngine(EngineBase):
     """
@@ -1657,6 +1743,9 @@ class SimulationEngine(GateSingletonFatal):
         self.source_engine.start()
         end = time.time()
 
+        # the physics tables are built now, we can store them if requested
+        self.physics_engine.store_physics_tables_if_needed()
+
         # actor: stop simulation (only the master thread)
         self.actor_engine.stop_simulation()
 
@@ -1831,6 +1920,10 @@ class SimulationEngine(GateSingletonFatal):
         logger.info("Simulation: initialize Chemistry")
         self.chemistry_engine.initialize_after_runmanager()
 
+        # must be done before the physics tables are built,
+        # i.e. before the first (fake) BeamOn
+        self.physics_engine.initialize_physics_tables_cache()
+
         # G4's MT RunManager needs an empty run to initialise workers
         if self.simulation.multithreaded is True:
             logger.info("Simulation: initialize the worker threads (MT mode)")
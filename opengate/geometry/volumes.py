@@ -15,11 +15,12 @@ from . import solids
 from ..utility import ensure_filename_is_str
 from ..exception import fatal, warning
 from ..image import write_itk_image
-from ..image import update_image_py_to_cpp
+from ..image import itk_image_from_array, read_itk_image, update_image_py_to_cpp
 from .utility import (
     vec_np_as_g4,
     rot_np_as_g4,
     ensure_is_g4_transform,
+    is_rotation_matrix,
 )
 from ..decorators import requires_fatal, requires_attribute_fatal
 from ..definitions import __world_name__, __gate_list_objects__
@@ -581,6 +582,48 @@ class VolumeBase(DynamicGateObject, NodeMixin):
 
 
 class RepeatableVolume(VolumeBase):
+    user_info_defaults = {
+        "repetition_mode": (
+            "placement",
+            {
+                "doc": "How the repetitions (several translations and/or rotations) are placed. "
+                "'placement': one G4PVPlacement per repetition, named <name>_rep_<i>. "
+                "'parameterised': a single G4PVParameterised for all repetitions, "
+                "much faster to build for a large number of repetitions (e.g. PET crystals). "
+                "In both cases, the copy number of the repetition i is i and the repetition "
+                "is named <name>_rep_<i> in the UniqueVolumeID, so the digitizers group the "
+                "hits the same way. "
+                "With 'parameterised', the volume must be the only daughter of its mother, "
+                "the repetitions cannot be dynamic, and the actors or surfaces that need the "
+                "physical volume of one repetition (e.g. repeated_volume_index) cannot be used.",
+                "allowed_values": ("placement", "parameterised"),
+            },
+        ),
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.g4_transforms_parameterisation = None
+
+    def release_g4_references(self):
+        super().release_g4_references()
+        self.g4_transforms_parameterisation = None
+
+    def __getstate__(self):
+        return_dict = super().__getstate__()
+        return_dict["g4_transforms_parameterisation"] = None
+        return return_dict
+
+    def get_g4_physical_volume(self, index):
+        if self.repetition_mode == "parameterised" and len(self.translation_list) > 1:
+            fatal(
+                f"The volume {self.name} uses repetition_mode='parameterised': "
+                f"its repetitions share a single physical volume, so the physical "
+                f"volume of repetition {index} cannot be used. "
+                f"Use repetition_mode='placement' instead."
+            )
+        return super().get_g4_physical_volume(index)
+
     def get_repetition_name_from_index(self, index):
         return f"{self.name}_rep_{index}"
 
@@ -596,6 +639,9 @@ class RepeatableVolume(VolumeBase):
         return int(suffix.lstrip("rep_"))
 
     def construct_physical_volume(self):
+        if self.repetition_mode == "parameterised" and len(self.translation_list) > 1:
+            self.construct_parameterised_physical_volume()
+            return
         g4_transform = self.g4_transform
         if len(g4_transform) > 1:
             self.g4_physical_volumes = []  # reset list to empty
@@ -610,6 +656,48 @@ class RepeatableVolume(VolumeBase):
         else:
             super().construct_physical_volume()
 
+    def construct_parameterised_physical_volume(self):
+        # no G4 object per repetition: all transforms are given at once to the C++ side
+        translations = np.asarray(self.translation_list, dtype=float)
+        rotations = np.asarray(self.rotation_list, dtype=float)
+        if len(translations) != len(rotations):
+            fatal(
+                f"The number of translation vectors and rotation matrices in volume '{self.name}' does not match. "
+                f"I found {len(translations)} translations and {len(rotations)} rotations. "
+            )
+        for r in rotations:
+            if not is_rotation_matrix(r):
+                fatal(
+                    f"Unable to create G4 rotation matrix in volume {self.name}. "
+                    f"This matrix is not a rotation matrix (not orthogonal): \n{r}"
+                )
+        # G4 requirement for parameterised volumes
+        siblings = [v.name for v in self.mother_volume.children if v is not self]
+        if len(siblings) > 0:
+            fatal(
+                f"The volume {self.name} uses repetition_mode='parameterised', "
+                f"so it must be the only daughter of its mother '{self.mother}', "
+                f"but the mother also contains: {siblings}"
+            )
+        if self.is_dynamic:
+            fatal(
+                f"The volume {self.name} uses repetition_mode='parameterised', "
+                f"its repetitions cannot be dynamic."
+            )
+        self.g4_transforms_parameterisation = g4.GateTransformsParameterisation()
+        self.g4_transforms_parameterisation.SetTransforms(translations, rotations)
+        self.g4_physical_volumes = [
+            g4.G4PVParameterised(
+                self.name,
+                self.g4_logical_volume,
+                self.mother_g4_logical_volume,
+                g4.EAxis.kUndefined,
+                len(translations),
+                self.g4_transforms_parameterisation,
+                self.volume_manager.simulation.check_volumes_overlap,
+            )
+        ]
+
     def add_dynamic_parametrisation(self, repetition_index=0, **params):
         super().add_dynamic_parametrisation(repetition_index=repetition_index, **params)
 
@@ -1161,11 +1249,12 @@ class ImageVolume(VolumeBase, solids.ImageSolid):
         return material_to_label_lut
 
     def load_input_image(self, path=None):
+        # raw-backed images are memory-mapped, not read
         if path is None:
-            itk_image = itk.imread(ensure_filename_is_str(self.image))
+            itk_image = read_itk_image(ensure_filename_is_str(self.image))
             self.itk_image = itk_image
         else:
-            itk_image = itk.imread(ensure_filename_is_str(path))
+            itk_image = read_itk_image(ensure_filename_is_str(path))
         return itk_image
 
     def create_attenuation_image(self, database, energy):
@@ -1227,11 +1316,17 @@ class ImageVolume(VolumeBase, solids.ImageSolid):
         # get numpy array view of input itk image
         input_image = itk.array_view_from_image(itk_image)
 
-        label_image_arr = np.array(labels_sorted, dtype=np.ushort)[
-            np.digitize(input_image, bins=bins_sorted)
-        ]
+        # the labels are computed by slabs of slices to limit the size of the
+        # temporary arrays, and the label image is a view on the labels array
+        labels_sorted = np.array(labels_sorted, dtype=np.ushort)
+        label_image_arr = np.empty(input_image.shape, dtype=np.ushort)
+        n = max(1, 2**22 // max(1, input_image[0].size))
+        for i in range(0, input_image.shape[0], n):
+            label_image_arr[i : i + n] = labels_sorted[
+                np.digitize(input_image[i : i + n], bins=bins_sorted)
+            ]
 
-        label_image = itk.image_from_array(label_image_arr)
+        label_image = itk_image_from_array(label_image_arr, view=True)
         label_image.CopyInformation(itk_image)
         return label_image
 
@@ -1243,8 +1338,11 @@ class ImageVolume(VolumeBase, solids.ImageSolid):
         # initialize parametrisation
         g4_voxel_param = g4.GateImageNestedParameterisation()
 
-        # send image to cpp size
-        update_image_py_to_cpp(label_image, g4_voxel_param.cpp_edep_image, True)
+        # send image to cpp size (no copy, the label image is kept alive)
+        self.label_image = label_image
+        update_image_py_to_cpp(
+            label_image, g4_voxel_param.cpp_edep_image, share_data=True
+        )
         g4_voxel_param.initialize_image()
         g4_voxel_param.initialize_material(list(self.material_to_label_lut.keys()))
 
@@ -1252,8 +1350,11 @@ class ImageVolume(VolumeBase, solids.ImageSolid):
 
     def update_label_image(self, label_image):
         """Needed for dynamic image parametrisation."""
-        # send image to cpp size
-        update_image_py_to_cpp(label_image, self.g4_voxel_param.cpp_edep_image, True)
+        # send image to cpp size (no copy, the label image is kept alive)
+        self.label_image = label_image
+        update_image_py_to_cpp(
+            label_image, self.g4_voxel_param.cpp_edep_image, share_data=True
+        )
         self.g4_voxel_param.initialize_image()
 
     def save_label_image(self, path=None):
@@ -3,16 +3,30 @@ import numpy as np
 from box import Box
 from scipy.spatial.transform import Rotation
 import math
-import SimpleITK as sitk
+import json
+import os
+import shutil
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+from pathlib import Path
 from .exception import fatal
+from .utility import LazyModuleLoader
 from .geometry.utility import (
     get_transform_world_to_local,
     vec_g4_as_np,
 )
 from .definitions import __gate_list_objects__
 
+# only needed to read image headers, loaded on first use
+sitk = LazyModuleLoader("SimpleITK")
 
-def update_image_py_to_cpp(py_img, cpp_img, copy_data=False):
+
+def update_image_py_to_cpp(py_img, cpp_img, copy_data=False, share_data=False):
+    """Copy the image information (and the pixels if copy_data) to the cpp image.
+    With share_data, the cpp image uses the pixel buffer of py_img without copy:
+    py_img must then be kept alive as long as the cpp image is used.
+    """
     cpp_img.set_size(py_img.GetLargestPossibleRegion().GetSize())
     cpp_img.set_spacing(py_img.GetSpacing())
     cpp_img.set_origin(py_img.GetOrigin())
@@ -26,7 +40,9 @@ def update_image_py_to_cpp(py_img, cpp_img, copy_data=False):
     d = py_img.GetDirection().GetVnlMatrix().as_matrix()
     rotation = itk.GetArrayFromVnlMatrix(d)
     cpp_img.set_direction(rotation)
-    if copy_data:
+    if share_data:
+        cpp_img.view_pyarray(itk.array_view_from_image(py_img))
+    elif copy_data:
         # FIXME: do we need to return arr to keep reference ?
         # (on cpp side, a copy is made while it should not be needed)
         arr = itk.array_view_from_image(py_img)
@@ -149,6 +165,138 @@ def read_image_info(path_to_image):
     return info
 
 
+# numpy types of the pixels of the raw (uncompressed) image formats
+metaimage_element_types = {
+    "MET_CHAR": np.int8,
+    "MET_UCHAR": np.uint8,
+    "MET_SHORT": np.int16,
+    "MET_USHORT": np.uint16,
+    "MET_INT": np.int32,
+    "MET_UINT": np.uint32,
+    "MET_LONG_LONG": np.int64,
+    "MET_ULONG_LONG": np.uint64,
+    "MET_FLOAT": np.float32,
+    "MET_DOUBLE": np.float64,
+}
+
+nifti_datatypes = {
+    2: np.uint8,
+    4: np.int16,
+    8: np.int32,
+    16: np.float32,
+    64: np.float64,
+    256: np.int8,
+    512: np.uint16,
+    768: np.uint32,
+    1024: np.int64,
+    1280: np.uint64,
+}
+
+
+def _read_metaimage_header(path):
+    """Fields of a .mhd/.mha header, up to ElementDataFile (the last one),
+    and the size in bytes of the header."""
+    header = {}
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            offset += len(line)
+            key, _, value = line.decode(errors="replace").partition("=")
+            header[key.strip()] = value.strip()
+            if key.strip() == "ElementDataFile":
+                break
+    return header, offset
+
+
+def _get_metaimage_buffer_info(path):
+    header, offset = _read_metaimage_header(path)
+    data_file = header.get("ElementDataFile", "")
+    dtype = metaimage_element_types.get(header.get("ElementType"))
+    if (
+        dtype is None
+        or header.get("BinaryData", "True") != "True"
+        or header.get("CompressedData", "False") != "False"
+        or header.get("ElementNumberOfChannels", "1") != "1"
+        or "True"
+        in (header.get(k) for k in ["ElementByteOrderMSB", "BinaryDataByteOrderMSB"])
+        or data_file in ("", "LIST")
+        or " " in data_file
+    ):
+        return None
+    header_size = int(header.get("HeaderSize", 0))
+    if data_file != "LOCAL":
+        path = Path(path).parent / data_file
+        offset = header_size
+    if header_size == -1:
+        # the pixels are at the end of the file
+        n = int(np.prod([int(s) for s in header["DimSize"].split()]))
+        offset = os.path.getsize(path) - n * np.dtype(dtype).itemsize
+    return str(path), offset, dtype
+
+
+def _get_nifti_buffer_info(path):
+    with open(path, "rb") as f:
+        header = f.read(348)
+    if len(header) < 348 or header[344:348] != b"n+1\0":
+        return None
+    # only little endian files (the header size is 348)
+    if np.frombuffer(header, "<i4", 1, 0)[0] != 348:
+        return None
+    dtype = nifti_datatypes.get(int(np.frombuffer(header, "<i2", 1, 70)[0]))
+    vox_offset, scl_slope, scl_inter = np.frombuffer(header, "<f4", 3, 108)
+    # ITK rescales the pixels (to float) when a slope is given
+    if dtype is None or scl_slope not in (0, 1) or scl_inter != 0:
+        return None
+    return str(path), int(vox_offset), dtype
+
+
+def get_raw_image_buffer_info(path):
+    """Location of the pixels of an uncompressed raw-backed image, as a tuple
+    (data file, offset in bytes, numpy dtype). Return None if the pixels cannot
+    be memory-mapped (compressed, big endian, multichannel or unknown format).
+    """
+    path = str(path)
+    if path.endswith((".mhd", ".mha")):
+        return _get_metaimage_buffer_info(path)
+    if path.endswith(".nii"):
+        return _get_nifti_buffer_info(path)
+    return None
+
+
+def get_metaimage_data_file(path):
+    """Path of the file with the pixels of a .mhd header (ElementDataFile).
+    Return None if the pixels are in the header file itself (LOCAL), or are
+    split into several files (LIST or file name pattern).
+    """
+    header, _ = _read_metaimage_header(path)
+    data_file = header.get("ElementDataFile", "")
+    if data_file in ("", "LOCAL", "LIST") or " " in data_file:
+        return None
+    return Path(path).parent / data_file
+
+
+def read_itk_image(path, memory_map=True):
+    """Read an ITK image. With memory_map, uncompressed raw-backed images
+    (.mhd/.raw, .mha, .nii) are not read: the image is a view on a (copy on
+    write) memory map of the file, so the pixels are loaded by the system
+    when they are used, and are never copied. Other images are read with
+    itk.imread.
+    """
+    path = str(path)
+    buffer_info = get_raw_image_buffer_info(path) if memory_map else None
+    if buffer_info is None:
+        return itk.imread(path)
+    info = read_image_info(path)
+    data_file, offset, dtype = buffer_info
+    shape = tuple(int(s) for s in info.size[::-1])
+    arr = np.memmap(data_file, dtype=dtype, mode="c", offset=offset, shape=shape)
+    img = itk_image_from_array(arr, view=True)
+    img.SetSpacing(info.spacing)
+    img.SetOrigin(info.origin)
+    img.SetDirection(info.dir)
+    return img
+
+
 def get_translation_between_images_center(img_name1, img_name2):
     """
     The two images are considered in the same physical space (coordinate system).
@@ -228,19 +376,21 @@ def get_py_image_from_cpp_image(cpp_image, view=True):
     return image
 
 
-def itk_image_from_array(arr, view=True):
+def itk_image_from_array(arr, view=True, is_vector=False):
     """
     When the input numpy array is of shape [1,1,x], the conversion to itk image fails:
     the output image size is with the wrong dimensions.
     We thus 'patch' itk.image_view_from_array to correct the size.
 
     Not fully sure if this is the way to go.
+
+    If is_vector is True, the last dimension of the array holds the pixel components.
     """
     if view is True:
-        image = itk.image_view_from_array(arr)
+        image = itk.image_view_from_array(arr, is_vector=is_vector)
     else:
-        image = itk.image_from_array(arr)
-    if len(arr.shape) == 3 and arr.shape[1] == arr.shape[2] == 1:
+        image = itk.image_from_array(arr, is_vector=is_vector)
+    if not is_vector and len(arr.shape) == 3 and arr.shape[1] == arr.shape[2] == 1:
         new_region = itk.ImageRegion[3]()
         new_region.SetSize([1, 1, arr.shape[0]])
         image.SetRegions(new_region)
@@ -271,6 +421,7 @@ def align_image_with_physical_volume(
 
 def create_image_with_extent(extent, spacing=(1, 1, 1), margin=0):
     # define the new size and spacing
+    extent = np.asarray(extent, dtype=float)
     spacing = np.array(spacing).astype(float)
     size = np.ceil((extent[1] - extent[0]) / spacing).astype(int) + 2 * margin
 
@@ -503,6 +654,343 @@ def write_itk_image(img, file_path):
     itk.imwrite(img, str(file_path))
 
 
+# Chunked image format: a directory following the zarr (v2) layout, i.e. a json
+# header (.zarray), the image information (.zattrs) and one zlib-compressed file
+# per chunk. Chunks are compressed and written in parallel (zlib releases the GIL)
+# and can be read back individually. Chunks containing only zeros are not written.
+chunked_image_suffix = "zarr"
+
+
+def get_default_chunk_shape(shape, itemsize, target_bytes=2**20):
+    """Chunk shape of about target_bytes, split along the slowest axes first
+    (i.e. the first axes of the numpy array, z for a 3D image)."""
+    chunks = list(shape)
+    for axis in range(len(chunks)):
+        if np.prod(chunks) * itemsize <= target_bytes:
+            break
+        inner = int(np.prod(chunks[axis + 1 :])) * itemsize
+        chunks[axis] = int(max(1, min(shape[axis], target_bytes // max(inner, 1))))
+    return tuple(int(c) for c in chunks)
+
+
+def write_itk_image_chunked(
+    img, file_path, chunk_shape=None, compression_level=4, number_of_threads=4
+):
+    """Write an ITK image as a directory of compressed chunks (zarr v2 layout)."""
+    arr = np.ascontiguousarray(itk.array_view_from_image(img))
+    if chunk_shape is None:
+        chunk_shape = get_default_chunk_shape(arr.shape, arr.itemsize)
+    if len(chunk_shape) != arr.ndim:
+        fatal(
+            f"The chunk shape {chunk_shape} must have {arr.ndim} dimensions "
+            f"(numpy order) for the image {file_path}"
+        )
+    chunk_shape = tuple(int(min(c, s)) for c, s in zip(chunk_shape, arr.shape))
+    file_path = Path(file_path)
+    if file_path.exists():
+        shutil.rmtree(file_path)
+    file_path.mkdir(parents=True)
+
+    header = {
+        "zarr_format": 2,
+        "shape": list(arr.shape),
+        "chunks": list(chunk_shape),
+        "dtype": arr.dtype.str,
+        "compressor": (
+            {"id": "zlib", "level": int(compression_level)}
+            if compression_level > 0
+            else None
+        ),
+        "fill_value": 0,
+        "order": "C",
+        "filters": None,
+        "dimension_separator": ".",
+    }
+    info = get_info_from_image(img)
+    attributes = {
+        "spacing": [float(v) for v in info.spacing],
+        "origin": [float(v) for v in info.origin],
+        "direction": np.asarray(info.dir).tolist(),
+    }
+    with open(file_path / ".zarray", "w") as f:
+        json.dump(header, f, indent=4)
+    with open(file_path / ".zattrs", "w") as f:
+        json.dump(attributes, f, indent=4)
+
+    def write_chunk(chunk_index):
+        sl = tuple(
+            slice(i * c, min((i + 1) * c, n))
+            for i, c, n in zip(chunk_index, chunk_shape, arr.shape)
+        )
+        block = arr[sl]
+        if not block.any():
+            # missing chunks are read as fill_value
+            return
+        if block.shape != chunk_shape:
+            # edge chunks are padded to the full chunk shape
+            padded = np.zeros(chunk_shape, dtype=arr.dtype)
+            padded[tuple(slice(0, n) for n in block.shape)] = block
+            block = padded
+        data = np.ascontiguousarray(block).tobytes()
+        if compression_level > 0:
+            data = zlib.compress(data, int(compression_level))
+        name = ".".join(str(i) for i in chunk_index)
+        with open(file_path / name, "wb") as f:
+            f.write(data)
+
+    number_of_chunks = [int(math.ceil(n / c)) for n, c in zip(arr.shape, chunk_shape)]
+    indices = list(product(*[range(n) for n in number_of_chunks]))
+    if number_of_threads > 1 and len(indices) > 1:
+        with ThreadPoolExecutor(max_workers=number_of_threads) as executor:
+            # list() to raise the exceptions of the threads, if any
+            list(executor.map(write_chunk, indices))
+    else:
+        for index in indices:
+            write_chunk(index)
+
+
+class ChunkedImageReader:
+    """Lazy reader of an image written with write_itk_image_chunked.
+    Only the header is read at creation; slicing (numpy order) reads only the
+    needed chunks. Use to_itk_image() or np.asarray() to load the full image."""
+
+    def __init__(self, file_path):
+        self.file_path = Path(file_path)
+        try:
+            with open(self.file_path / ".zarray") as f:
+                header = json.load(f)
+        except FileNotFoundError:
+            fatal(f"Cannot read the chunked image {self.file_path}: no header found")
+        attributes = {}
+        if (self.file_path / ".zattrs").exists():
+            with open(self.file_path / ".zattrs") as f:
+                attributes = json.load(f)
+        self.shape = tuple(header["shape"])
+        self.chunks = tuple(header["chunks"])
+        self.dtype = np.dtype(header["dtype"])
+        self.fill_value = header.get("fill_value", 0) or 0
+        self.compressed = header.get("compressor", None) is not None
+        self.spacing = attributes.get("spacing", [1.0] * len(self.shape))
+        self.origin = attributes.get("origin", [0.0] * len(self.shape))
+        self.direction = attributes.get("direction", np.eye(len(self.shape)).tolist())
+
+    def __repr__(self):
+        return (
+            f"ChunkedImageReader('{self.file_path}', shape={self.shape}, "
+            f"dtype={self.dtype}, chunks={self.chunks})"
+        )
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def read_chunk(self, chunk_index):
+        name = ".".join(str(i) for i in chunk_index)
+        try:
+            with open(self.file_path / name, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return np.full(self.chunks, self.fill_value, dtype=self.dtype)
+        if self.compressed:
+            data = zlib.decompress(data)
+        return np.frombuffer(data, dtype=self.dtype).reshape(self.chunks)
+
+    def _normalize_key(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is Ellipsis for k in key):
+            i = key.index(Ellipsis)
+            fill = (slice(None),) * (self.ndim - len(key) + 1)
+            key = key[:i] + fill + key[i + 1 :]
+        return key + (slice(None),) * (self.ndim - len(key))
+
+    def __getitem__(self, key):
+        key = self._normalize_key(key)
+        # indices (along each axis) of the requested voxels
+        indices = [np.arange(n)[k] for n, k in zip(self.shape, key)]
+        squeeze = tuple(a for a, idx in enumerate(indices) if np.ndim(idx) == 0)
+        indices = [np.atleast_1d(idx) for idx in indices]
+        out = np.empty([len(idx) for idx in indices], dtype=self.dtype)
+        chunk_ids = [np.unique(idx // c) for idx, c in zip(indices, self.chunks)]
+        for chunk_index in product(*chunk_ids):
+            positions = []
+            local = []
+            for idx, c, ci in zip(indices, self.chunks, chunk_index):
+                p = np.nonzero(idx // c == ci)[0]
+                positions.append(p)
+                local.append(idx[p] - ci * c)
+            out[np.ix_(*positions)] = self.read_chunk(chunk_index)[np.ix_(*local)]
+        if squeeze:
+            out = out.squeeze(axis=squeeze)
+        return out
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self[...]
+        if dtype is not None:
+            arr = arr.astype(dtype)
+        return arr
+
+    def to_itk_image(self):
+        img = itk_image_from_array(self[...], view=False)
+        img.SetSpacing(self.spacing)
+        img.SetOrigin(self.origin)
+        img.SetDirection(np.asarray(self.direction, dtype=np.float64))
+        return img
+
+
+def read_itk_image_chunked(file_path):
+    return ChunkedImageReader(file_path).to_itk_image()
+
+
+class SparseImageOfHistograms:
+    """3D image of histograms (e.g. voxels x energy bins) where only the
+    non-empty voxels are stored. The histograms are stored as rows of the 2D
+    array 'values' (one row per voxel), the voxels are identified by their
+    linear index x + nx * (y + ny * z) in 'indices' (sorted).
+    Use to_itk_image() to get the corresponding dense 4D image.
+    """
+
+    def __init__(
+        self,
+        size,
+        bins,
+        spacing,
+        origin=None,
+        direction=None,
+        indices=None,
+        values=None,
+    ):
+        self.size = [int(s) for s in size[:3]]
+        self.bins = int(bins)
+        self.spacing = [float(s) for s in spacing[:3]]
+        self.origin = [0.0] * 3 if origin is None else [float(o) for o in origin[:3]]
+        self.direction = (
+            np.eye(3) if direction is None else np.asarray(direction)[:3, :3]
+        )
+        if indices is None:
+            indices = np.zeros(0, dtype=np.int64)
+            values = np.zeros((0, self.bins))
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float64).reshape(-1, self.bins)
+
+    def __repr__(self):
+        return (
+            f"SparseImageOfHistograms(size={self.size}, bins={self.bins}, "
+            f"{self.number_of_voxels} non-empty voxels)"
+        )
+
+    @property
+    def number_of_voxels(self):
+        return len(self.indices)
+
+    @property
+    def nbytes(self):
+        return self.indices.nbytes + self.values.nbytes
+
+    def copy(self):
+        return SparseImageOfHistograms(
+            self.size,
+            self.bins,
+            self.spacing,
+            self.origin,
+            self.direction.copy(),
+            self.indices.copy(),
+            self.values.copy(),
+        )
+
+    def voxel_indices(self):
+        """Return the (x, y, z) index of each stored voxel (3 arrays)."""
+        nx, ny = self.size[0], self.size[1]
+        return self.indices % nx, (self.indices // nx) % ny, self.indices // (nx * ny)
+
+    def get_histogram(self, x, y, z):
+        """Histogram of the voxel (x, y, z), zeros if the voxel is empty."""
+        index = x + self.size[0] * (y + self.size[1] * z)
+        i = np.searchsorted(self.indices, index)
+        if i < len(self.indices) and self.indices[i] == index:
+            return self.values[i].copy()
+        return np.zeros(self.bins)
+
+    def add(self, other):
+        """Add (in place) the histograms of another sparse image with the same size."""
+        if self.size != other.size or self.bins != other.bins:
+            fatal(
+                f"Cannot add sparse images of histograms with different sizes: "
+                f"{self.size} x {self.bins} and {other.size} x {other.bins}"
+            )
+        indices = np.union1d(self.indices, other.indices)
+        values = np.zeros((len(indices), self.bins))
+        values[np.searchsorted(indices, self.indices)] += self.values
+        values[np.searchsorted(indices, other.indices)] += other.values
+        self.indices = indices
+        self.values = values
+        return self
+
+    def scale(self, factor):
+        self.values *= factor
+        return self
+
+    def to_array(self):
+        """Dense numpy array in the ITK 4D numpy order (bins, z, y, x)."""
+        arr = np.zeros((self.bins, self.size[2] * self.size[1] * self.size[0]))
+        arr[:, self.indices] = self.values.T
+        return arr.reshape(self.bins, self.size[2], self.size[1], self.size[0])
+
+    def to_itk_image(self):
+        """Dense 4D ITK image, as created by create_3d_image_of_histogram."""
+        img = itk_image_from_array(self.to_array(), view=False)
+        img.SetSpacing(self.spacing + [1.0])
+        img.SetOrigin(self.origin + [0.0])
+        direction = np.eye(4)
+        direction[:3, :3] = self.direction
+        img.SetDirection(direction)
+        return img
+
+    @classmethod
+    def from_itk_image(cls, img):
+        """Sparse version of a dense 4D image of histograms."""
+        arr = itk.array_view_from_image(img)
+        bins = arr.shape[0]
+        flat = arr.reshape(bins, -1)
+        indices = np.nonzero(np.any(flat != 0, axis=0))[0]
+        info = get_info_from_image(img)
+        return cls(
+            info.size[:3],
+            bins,
+            info.spacing,
+            info.origin,
+            np.asarray(info.dir),
+            indices,
+            flat[:, indices].T,
+        )
+
+    def write(self, file_path):
+        """Write in a compressed numpy file (.npz)."""
+        np.savez_compressed(
+            file_path,
+            size=self.size,
+            bins=self.bins,
+            spacing=self.spacing,
+            origin=self.origin,
+            direction=self.direction,
+            indices=self.indices,
+            values=self.values,
+        )
+
+    @classmethod
+    def read(cls, file_path):
+        with np.load(file_path) as f:
+            return cls(
+                f["size"],
+                int(f["bins"]),
+                f["spacing"],
+                f["origin"],
+                f["direction"],
+                f["indices"],
+                f["values"],
+            )
+
+
 def images_have_same_domain(image1, image2, tolerance=1e-5):
     # Check if the sizes and origins of the images are the same,
     # and if the spacing values are close within the given tolerance
@@ -34,7 +34,14 @@ from .physics import (
     translate_particle_name_gate_to_geant4,
 )
 from .processing import dispatch_to_subprocess
-from .serialization import dump_json, dumps_json, load_json, loads_json
+from .serialization import (
+    dump_json,
+    dump_snapshot,
+    dumps_json,
+    load_json,
+    load_snapshot,
+    loads_json,
+)
 from .sources.base import DebugSource
 from .sources.beamsources import IonPencilBeamSource, TreatmentPlanPBSource
 from .sources.gansources import GANPairsSource, GANSource
@@ -87,6 +94,7 @@ from .actors.digitizers import (
     DigitizerEnergyWindowsActor,
     DigitizerHitsCollectionActor,
     DigitizerPileupActor,
+    DigitizerPipelineActor,
     DigitizerProjectionActor,
     DigitizerReadoutActor,
     DigitizerSpatialBlurringActor,
@@ -114,6 +122,7 @@ from .actors.miscactors import (
     KillNonInteractingParticleActor,
     SimulationStatisticsActor,
     DebugActor,
+    StepRecordActor,
 )
 from .actors.pgactors import (
     VoxelizedPromptGammaAnalogActor,
@@ -174,6 +183,7 @@ actor_types = {
     "ARFActor": ARFActor,
     "ARFTrainingDatasetActor": ARFTrainingDatasetActor,
     "DebugActor": DebugActor,
+    "StepRecordActor": StepRecordActor,
     # digit
     "PhaseSpaceActor": PhaseSpaceActor,
     "DigitizerAdderActor": DigitizerAdderActor,
@@ -185,6 +195,7 @@ actor_types = {
     "DigitizerEnergyWindowsActor": DigitizerEnergyWindowsActor,
     "DigitizerHitsCollectionActor": DigitizerHitsCollectionActor,
     "DigitizerPileupActor": DigitizerPileupActor,
+    "DigitizerPipelineActor": DigitizerPipelineActor,
     "CoincidenceSorterActor": CoincidenceSorterActor,
     "DigiAttributeProcessDefinedStepInVolumeActor": DigiAttributeProcessDefinedStepInVolumeActor,
     "DigiAttributeLastProcessDefinedStepInVolumeActor": DigiAttributeLastProcessDefinedStepInVolumeActor,
@@ -684,6 +695,19 @@ class PhysicsManager(GateObject):
                 "doc": "Dict of material_name:energy_value, such that: sim.physics_manager.material_ionisation_potential['IEC_PLASTIC'] = 5.0 * eV. "
             },
         ),
+        "physics_tables_cache_directory": (
+            None,
+            {
+                "doc": "Directory where the physics tables built by Geant4 are stored "
+                "(/run/particle/storePhysicsTable) and retrieved from in later simulations "
+                "(/run/particle/retrievePhysicsTable). The tables are stored in a sub-folder "
+                "named after a hash of the Geant4 version, the physics configuration "
+                "(physics list, cuts, EM parameters, regions) and the full set of materials, "
+                "so they are only reloaded if all of these are identical. "
+                "Useful for CT simulations with many materials. If None, no cache is used.",
+                "required_type": Path,
+            },
+        ),
         # "processes_to_bias": (
         #     Box(
         #         [
@@ -1626,6 +1650,9 @@ class Simulation(GateObject):
     progress_bar: bool
     dyn_geom_open_close: bool
     dyn_geom_optimise: bool
+    dyn_geom_incremental: bool
+    dyn_geom_cache_size: int
+    subprocess_output_transport: str
 
     user_info_defaults = {
         "verbose_level": (
@@ -1859,6 +1886,36 @@ class Simulation(GateObject):
             True,
             {"doc": "'Optimise' geometry when open/close during dynamic simulation. "},
         ),
+        "dyn_geom_incremental": (
+            True,
+            {
+                "doc": "During dynamic simulation, only optimise again the mother volumes of the "
+                "moved volumes instead of the whole world. Changers that do not only move volumes "
+                "(e.g. image changers) always trigger the optimisation of the whole world."
+            },
+        ),
+        "dyn_geom_cache_size": (
+            0,
+            {
+                "doc": "Number of geometry configurations (positions of the moving volumes) for which "
+                "the navigation voxels are kept in memory, so that a configuration already seen "
+                "(e.g. repeated orbits) is not optimised again. 0 means no cache. "
+                "Only used when dyn_geom_incremental is True."
+            },
+        ),
+        "subprocess_output_transport": (
+            "queue",
+            {
+                "doc": "How the simulation output is sent back to the main process "
+                "when using sim.run(start_new_process=True). "
+                "'queue' pickles the entire output, including all images, through a queue. "
+                "'shared_memory' places large arrays and images in memory-mapped files "
+                "(in /dev/shm if available) and only pickles their metadata. "
+                "The images recovered in the main process are then zero-copy views. "
+                "Recommended for large outputs, e.g. 4D images or dose with uncertainty. ",
+                "allowed_values": ("queue", "shared_memory"),
+            },
+        ),
     }
 
     def __init__(self, name="simulation", **kwargs):
@@ -1997,6 +2054,20 @@ class Simulation(GateObject):
         with open(path, "r") as f:
             self.from_dictionary(load_json(f))
 
+    def to_snapshot_file(self, path, embed_input_files=False):
+        """Write a binary snapshot of the simulation, much faster to load than
+        the json archive. See opengate.serialization.dump_snapshot.
+        """
+        dump_snapshot(self, self.get_output_path(path), embed_input_files)
+
+    @staticmethod
+    def from_snapshot_file(path, input_files_directory=None):
+        """Create a simulation from a binary snapshot written by to_snapshot_file."""
+        sim = load_snapshot(path, input_files_directory)
+        if not isinstance(sim, Simulation):
+            fatal(f"The snapshot {path} does not contain a Simulation.")
+        return sim
+
     def copy_input_files(self, directory=None, dct=None):
         directory = self.get_output_path(directory, is_file_or_directory="d")
         if dct is None:
@@ -2225,30 +2296,41 @@ class Simulation(GateObject):
             """
 
             logger.info("Dispatching simulation to subprocess ...")
-            output = dispatch_to_subprocess(self._run_simulation_engine, True)
-
-            # Recover output from unpickled actors coming from the subprocess queue
-            for actor in self.actor_manager.actors.values():
-                actor.recover_user_output(output.get_actor(actor.name))
-
-            # FIXME: temporary workaround to copy from output the additional
-            # information of the source (such as fTotalSkippedEvents)
-            for source in self.source_manager.sources.values():
-                # WARNING: when multithread, the sources are stored in
-                # simulation_output.sources_by_thread
-                # The sources of thread=0 are also available in simulation_output.sources
-                # and they are retrieved here by get_source
-                try:
-                    s = output.get_source(source.name)
-                except:
-                    continue
-                source.recover_user_output(s)
-
+            output = dispatch_to_subprocess(
+                self._run_simulation_engine,
+                True,
+                output_transport=self.subprocess_output_transport,
+            )
+            self._recover_output_from_subprocess(output)
         else:
             # Nothing special to do if the simulation engine ran in the native python process
             # because everything is already in place.
             output = self._run_simulation_engine(False)
 
+        self._finalize_run(output)
+
+    def _recover_output_from_subprocess(self, output):
+        """Copy the actor and source output computed in a subprocess
+        into the actors and sources of this simulation (main process).
+        """
+        # Recover output from unpickled actors coming from the subprocess queue
+        for actor in self.actor_manager.actors.values():
+            actor.recover_user_output(output.get_actor(actor.name))
+
+        # FIXME: temporary workaround to copy from output the additional
+        # information of the source (such as fTotalSkippedEvents)
+        for source in self.source_manager.sources.values():
+            # WARNING: when multithread, the sources are stored in
+            # simulation_output.sources_by_thread
+            # The sources of thread=0 are also available in simulation_output.sources
+            # and they are retrieved here by get_source
+            try:
+                s = output.get_source(source.name)
+            except:
+                continue
+            source.recover_user_output(s)
+
+    def _finalize_run(self, output):
         # replace warnings by the one of the subprocess
         self._user_warnings = output.warnings
 
@@ -2295,8 +2377,19 @@ class Simulation(GateObject):
         margin=0,
         filename=None,
         return_path=False,
+        number_of_threads=1,
+        use_cache=True,
     ):
-        return voxelize_geometry(self, extent, spacing, margin, filename, return_path)
+        return voxelize_geometry(
+            self,
+            extent,
+            spacing,
+            margin,
+            filename,
+            return_path,
+            number_of_threads=number_of_threads,
+            use_cache=use_cache,
+        )
 
     def initialize_source_before_g4_engine(self):
         """
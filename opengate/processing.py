@@ -1,16 +1,181 @@
+import atexit
+import io
 import multiprocessing
+import pickle
 import queue
+import shutil
+import tempfile
+from pathlib import Path
 from .exception import fatal
 import os
 import sys
 
+# arrays smaller than this are simply pickled together with the rest of the output
+shared_array_min_nbytes = 1024 * 1024
+
+
+def get_shared_array_directory():
+    """Directory in which large arrays are placed when they are sent back
+    from a subprocess. On Linux, /dev/shm is a RAM-backed file system,
+    so the memory-mapped files effectively are shared memory.
+    """
+    p = Path("/dev/shm")
+    if p.is_dir() and os.access(p, os.W_OK):
+        return p
+    return Path(tempfile.gettempdir())
+
+
+def _is_itk_image(obj):
+    return type(obj).__name__.startswith("itkImage") and hasattr(
+        obj, "GetLargestPossibleRegion"
+    )
+
+
+class ArrayPersistentIdPickler(pickle.Pickler):
+    """Base of the picklers which do not serialize large numpy arrays and ITK
+    images, but only a reference to their pixel buffer (and the image
+    information). Subclasses define where the buffer is stored (_store_array).
+    """
+
+    def __init__(self, file, min_nbytes):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.min_nbytes = min_nbytes
+
+    def _store_array(self, arr):
+        """Store the array and return the reference used to load it again."""
+        raise NotImplementedError
+
+    def persistent_id(self, obj):
+        # avoid importing numpy/itk for each object: only check the type name
+        type_name = type(obj).__name__
+        if type_name == "ndarray" or type_name == "memmap":
+            if obj.dtype.hasobject or obj.nbytes < self.min_nbytes:
+                return None
+            return "ndarray", self._store_array(obj)
+        if _is_itk_image(obj):
+            import itk
+
+            arr = itk.array_view_from_image(obj)
+            if arr.dtype.hasobject or arr.nbytes < self.min_nbytes:
+                return None
+            return (
+                "itk_image",
+                self._store_array(arr),
+                tuple(obj.GetSpacing()),
+                tuple(obj.GetOrigin()),
+                itk.array_from_matrix(obj.GetDirection()),
+                obj.GetNumberOfComponentsPerPixel() > 1,
+            )
+        return None
+
+
+class ArrayPersistentIdUnpickler(pickle.Unpickler):
+    """Counterpart of ArrayPersistentIdPickler. Subclasses define how an array
+    is loaded from its reference (_load_array); ITK images are created as
+    views on these arrays.
+    """
+
+    def _load_array(self, ref):
+        raise NotImplementedError
+
+    def persistent_load(self, pid):
+        kind = pid[0]
+        if kind == "ndarray":
+            return self._load_array(pid[1])
+        if kind == "itk_image":
+            import itk
+            from .image import itk_image_from_array
+
+            image = itk_image_from_array(
+                self._load_array(pid[1]), view=True, is_vector=pid[5]
+            )
+            image.SetSpacing(pid[2])
+            image.SetOrigin(pid[3])
+            image.SetDirection(itk.matrix_from_array(pid[4]))
+            return image
+        raise pickle.UnpicklingError(f"Unknown persistent id {kind}")
+
+
+class SharedArrayPickler(ArrayPersistentIdPickler):
+    """Pickler which does not serialize large numpy arrays and ITK images.
+    Instead, their pixel buffer is written into a memory-mapped file
+    and only a reference (path, dtype, shape, image information) is pickled.
+    """
+
+    def __init__(self, file, directory, min_nbytes=None):
+        if min_nbytes is None:
+            min_nbytes = shared_array_min_nbytes
+        super().__init__(file, min_nbytes)
+        self.directory = Path(directory)
+        self.counter = 0
+
+    def _store_array(self, arr):
+        import numpy as np
+
+        path = self.directory / f"array_{self.counter}.npy"
+        self.counter += 1
+        mm = np.lib.format.open_memmap(
+            path, mode="w+", dtype=arr.dtype, shape=arr.shape
+        )
+        mm[...] = arr
+        mm.flush()
+        del mm
+        return str(path)
+
+
+class SharedArrayUnpickler(ArrayPersistentIdUnpickler):
+    """Counterpart of SharedArrayPickler. The arrays are memory-mapped,
+    i.e. not copied, and ITK images are created as views on these arrays.
+    """
+
+    def _load_array(self, ref):
+        import numpy as np
+
+        return np.load(ref, mmap_mode="r+")
+
+
+def dumps_with_shared_arrays(obj, directory, min_nbytes=None):
+    f = io.BytesIO()
+    SharedArrayPickler(f, directory, min_nbytes).dump(obj)
+    return f.getvalue()
+
+
+def loads_with_shared_arrays(data):
+    return SharedArrayUnpickler(io.BytesIO(data)).load()
+
+
+def _remove_directory(directory):
+    # On posix systems, the mapped files remain valid after being removed.
+    # Otherwise (Windows), removing fails while the files are still mapped,
+    # so we try again when python exits.
+    shutil.rmtree(directory, ignore_errors=True)
+    if Path(directory).exists():
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
+
 
 # define a thin wrapper function to handle the queue
 def target_func(q, f, *args, **kwargs):
     q.put(f(*args, **kwargs))
 
 
-def dispatch_to_subprocess(func, *args, **kwargs):
+def target_func_shared_memory(q, directory, f, *args, **kwargs):
+    q.put(dumps_with_shared_arrays(f(*args, **kwargs), directory))
+
+
+def dispatch_to_subprocess(func, *args, output_transport="queue", **kwargs):
+    """Run func(*args, **kwargs) in a new process and return its result.
+
+    With output_transport='queue', the entire result is pickled and sent
+    through the queue. With output_transport='shared_memory', large numpy arrays
+    and ITK images are placed in memory-mapped files and only their metadata
+    is pickled. The returned arrays and images are zero-copy views on these files.
+    """
+    if output_transport not in ("queue", "shared_memory"):
+        fatal(
+            f"Unknown output_transport '{output_transport}'. "
+            f"Use 'queue' or 'shared_memory'."
+        )
+
     # 1. Determine the start method
     # macOS ('darwin') and Windows ('nt') MUST use spawn for GUI safety
     # otherwise, it crashs with qt visualization
@@ -45,9 +210,21 @@ def dispatch_to_subprocess(func, *args, **kwargs):
     q = multiprocessing.Manager().Queue()
 
     # 4. Create and start the process
-    p = multiprocessing.Process(
-        target=target_func, args=(q, func, *args), kwargs=kwargs
-    )
+    directory = None
+    if output_transport == "shared_memory":
+        # one directory per call so that nothing is left behind if the child crashes
+        directory = tempfile.mkdtemp(
+            prefix="opengate_", dir=get_shared_array_directory()
+        )
+        p = multiprocessing.Process(
+            target=target_func_shared_memory,
+            args=(q, directory, func, *args),
+            kwargs=kwargs,
+        )
+    else:
+        p = multiprocessing.Process(
+            target=target_func, args=(q, func, *args), kwargs=kwargs
+        )
     p.start()
     p.join()
 
@@ -55,7 +232,174 @@ def dispatch_to_subprocess(func, *args, **kwargs):
     try:
         # We can usually block=True here because p.join() has finished,
         # but if the child crashed without putting data, block=False catches it.
-        return q.get(block=False)
+        result = q.get(block=False)
     except queue.Empty:
+        if directory is not None:
+            _remove_directory(directory)
         fatal("The queue is empty. The spawned process probably died or crashed.")
         return None
+
+    if directory is not None:
+        result = loads_with_shared_arrays(result)
+        _remove_directory(directory)
+    return result
+
+
+def _pool_target_func(q, job_index, output_transport, directory, simulation):
+    output = simulation._run_simulation_engine(True)
+    if output_transport == "shared_memory":
+        output = dumps_with_shared_arrays(output, directory)
+    q.put((job_index, output))
+
+
+class SimulationWorkerPool:
+    """Run many simulations in worker processes which are started from a warm server.
+
+    A Geant4 engine can only be created once per process, so each simulation still
+    runs in its own process. However, the processes are forked from a long-lived
+    server process (multiprocessing 'forkserver') which has already imported
+    opengate_core and opengate. Process start-up and imports are therefore paid once
+    per pool instead of once per simulation. Each job is a complete Simulation
+    object, so geometry, sources, actors and run parameters may differ between jobs.
+
+    Usage::
+
+        with SimulationWorkerPool(number_of_workers=4) as pool:
+            pool.run([sim1, sim2, sim3])
+        print(sim1.get_actor("dose").dose.image)
+
+    The output of each job is recovered into the corresponding simulation object,
+    exactly as with sim.run(start_new_process=True).
+
+    On platforms without 'forkserver' (Windows), workers are spawned.
+    """
+
+    default_preload = ["opengate_core", "opengate"]
+
+    def __init__(self, number_of_workers=None, preload=None):
+        if number_of_workers is None:
+            number_of_workers = os.cpu_count()
+        if number_of_workers < 1:
+            fatal(f"number_of_workers must be at least 1, not {number_of_workers}.")
+        self.number_of_workers = number_of_workers
+        if preload is None:
+            preload = self.default_preload
+        self.preload = list(preload)
+        self._context = None
+        self._manager = None
+        self._queue = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, _type, value, traceback):
+        self.close()
+
+    @property
+    def is_started(self):
+        return self._context is not None
+
+    def start(self):
+        if self.is_started:
+            return
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self._context = multiprocessing.get_context("forkserver")
+            # the server process imports these modules once,
+            # all workers are forked from it afterward
+            self._context.set_forkserver_preload(self.preload)
+        else:
+            self._context = multiprocessing.get_context("spawn")
+        # see dispatch_to_subprocess: Manager.Queue is slower, but safer
+        self._manager = self._context.Manager()
+        self._queue = self._manager.Queue()
+
+    def close(self):
+        if self._manager is not None:
+            self._manager.shutdown()
+        self._manager = None
+        self._queue = None
+        self._context = None
+
+    def run(self, simulations):
+        """Run all simulations, at most number_of_workers at the same time.
+        The output is recovered into each simulation object.
+        Returns the list of simulations.
+        """
+        from multiprocessing.connection import wait
+
+        simulations = list(simulations)
+        # same restriction as Simulation.run
+        for sim in simulations:
+            if os.name == "nt" and sim.multithreaded:
+                fatal(
+                    "Error, the multi-thread option is not available for Windows now. "
+                    f"Run the simulation {sim.name} with one thread."
+                )
+        self.start()
+        directories = {}
+        running = {}
+        results = {}
+        next_job = 0
+        try:
+            while next_job < len(simulations) or len(running) > 0:
+                # start new jobs as long as workers are available
+                while next_job < len(simulations) and len(running) < (
+                    self.number_of_workers
+                ):
+                    sim = simulations[next_job]
+                    sim.freeze_config()
+                    directory = None
+                    if sim.subprocess_output_transport == "shared_memory":
+                        directory = tempfile.mkdtemp(
+                            prefix="opengate_", dir=get_shared_array_directory()
+                        )
+                        directories[next_job] = directory
+                    p = self._context.Process(
+                        target=_pool_target_func,
+                        args=(
+                            self._queue,
+                            next_job,
+                            sim.subprocess_output_transport,
+                            directory,
+                            sim,
+                        ),
+                    )
+                    p.start()
+                    running[p.sentinel] = (next_job, p)
+                    next_job += 1
+                # wait for at least one job to finish
+                for sentinel in wait(list(running.keys())):
+                    job_index, p = running.pop(sentinel)
+                    p.join()
+                    self._collect_results(results)
+                    if job_index not in results:
+                        fatal(
+                            f"The worker process for simulation {job_index} "
+                            f"(name: {simulations[job_index].name}) "
+                            f"probably died or crashed (exit code {p.exitcode})."
+                        )
+        finally:
+            # if a job failed, do not leave the other workers running
+            for _, p in running.values():
+                if p.is_alive():
+                    p.terminate()
+                p.join()
+            for directory in directories.values():
+                _remove_directory(directory)
+
+        for job_index, sim in enumerate(simulations):
+            output = results[job_index]
+            sim._recover_output_from_subprocess(output)
+            sim._finalize_run(output)
+        return simulations
+
+    def _collect_results(self, results):
+        while True:
+            try:
+                job_index, output = self._queue.get(block=False)
+            except queue.Empty:
+                return
+            if isinstance(output, bytes):
+                output = loads_with_shared_arrays(output)
+            results[job_index] = output
@@ -1,8 +1,16 @@
+import io
 import json
+import pickle
+import platform
+import shutil
+import struct
+from importlib.metadata import PackageNotFoundError, version
 import numpy as np
 from pathlib import Path, PurePath
 
-from .exception import fatal
+from .base import find_all_gate_objects, find_paths_in_gate_object_dictionary
+from .exception import fatal, warning
+from .processing import ArrayPersistentIdPickler, ArrayPersistentIdUnpickler
 
 import opengate_core as g4
 
@@ -69,3 +77,229 @@ def dump_json(*args, **kwargs):
 def load_json(*args, **kwargs):
     kwargs.setdefault("object_hook", json_obj_hook)
     return json.load(*args, **kwargs)
+
+
+# Binary snapshot of GATE objects (e.g. a complete Simulation).
+# Layout of the file:
+#   magic (8 bytes), uint32 format version, uint64 length + json header,
+#   uint64 length + pickle payload, then the data blocks (aligned), i.e. the
+#   large numpy arrays and ITK images, and the embedded input files.
+# The objects are pickled (like for the subprocesses) but the arrays are not:
+# they are stored as raw data blocks and memory-mapped when the snapshot is loaded.
+snapshot_magic = b"GATESNAP"
+snapshot_format_version = 1
+snapshot_alignment = 64
+# arrays smaller than this are simply pickled together with the objects
+snapshot_array_min_nbytes = 64 * 1024
+
+
+def _get_opengate_version():
+    try:
+        return version("opengate")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _get_input_files_to_embed(obj):
+    """Input files (e.g. images) of all GATE objects of a Simulation,
+    grouped with the files they depend on (the ElementDataFile of a .mhd header)."""
+    if not hasattr(obj, "to_dictionary"):
+        return []
+    groups = []
+    for go_dict in find_all_gate_objects(obj.to_dictionary()):
+        for p in find_paths_in_gate_object_dictionary(go_dict, only_input_files=True):
+            if not p.is_file():
+                continue
+            group = [p.absolute()]
+            if p.suffix == ".mhd":
+                from .image import get_metaimage_data_file
+
+                data_file = get_metaimage_data_file(p)
+                if data_file is not None and data_file.is_file():
+                    group.append(data_file.absolute())
+            if group not in groups:
+                groups.append(group)
+    return groups
+
+
+class SnapshotPickler(ArrayPersistentIdPickler):
+    """Pickler which stores the large numpy arrays and ITK images as data blocks
+    (see dump_snapshot), and the paths of the embedded input files as references.
+    """
+
+    def __init__(self, file, input_files, min_nbytes=None):
+        if min_nbytes is None:
+            min_nbytes = snapshot_array_min_nbytes
+        super().__init__(file, min_nbytes)
+        self.arrays = []
+        self.input_files = {}
+        for i, group in enumerate(input_files):
+            for j, p in enumerate(group):
+                self.input_files[str(p)] = (i, j)
+
+    def _store_array(self, arr):
+        self.arrays.append(np.ascontiguousarray(arr))
+        return len(self.arrays) - 1
+
+    def persistent_id(self, obj):
+        if isinstance(obj, PurePath) and len(self.input_files) > 0:
+            key = str(Path(obj).absolute())
+            if key in self.input_files:
+                return "input_file", *self.input_files[key]
+            return None
+        return super().persistent_id(obj)
+
+
+class SnapshotUnpickler(ArrayPersistentIdUnpickler):
+    """Counterpart of SnapshotPickler: the arrays are memory-mapped
+    (copy on write) from the snapshot file."""
+
+    def __init__(self, file, path, header, data_offset, input_files):
+        super().__init__(file)
+        self.path = path
+        self.header = header
+        self.data_offset = data_offset
+        self.input_files = input_files
+
+    def _load_array(self, index):
+        a = self.header["arrays"][index]
+        if a["nbytes"] == 0:
+            return np.zeros(a["shape"], dtype=a["dtype"])
+        return np.memmap(
+            self.path,
+            dtype=a["dtype"],
+            mode="c",
+            offset=self.data_offset + a["offset"],
+            shape=tuple(a["shape"]),
+        )
+
+    def persistent_load(self, pid):
+        if pid[0] == "input_file":
+            return self.input_files[pid[1]][pid[2]]
+        return super().persistent_load(pid)
+
+
+def _aligned(n):
+    return (n + snapshot_alignment - 1) // snapshot_alignment * snapshot_alignment
+
+
+def dump_snapshot(obj, path, embed_input_files=False, min_nbytes=None):
+    """Write a binary snapshot of obj (typically a Simulation) in a file.
+    Numpy arrays and ITK images are embedded as raw data blocks.
+    Input files (e.g. CT or activity images) are referenced by their path,
+    or embedded in the snapshot if embed_input_files is True.
+    """
+    input_files = _get_input_files_to_embed(obj) if embed_input_files else []
+    f = io.BytesIO()
+    pickler = SnapshotPickler(f, input_files, min_nbytes)
+    pickler.dump(obj)
+    payload = f.getvalue()
+
+    # table of the data blocks
+    offset = 0
+    arrays = []
+    for arr in pickler.arrays:
+        arrays.append(
+            {
+                "offset": offset,
+                "nbytes": arr.nbytes,
+                "dtype": arr.dtype.str,
+                "shape": list(arr.shape),
+            }
+        )
+        offset = _aligned(offset + arr.nbytes)
+    files = []
+    for group in input_files:
+        files.append([])
+        for p in group:
+            size = p.stat().st_size
+            files[-1].append({"name": p.name, "offset": offset, "nbytes": size})
+            offset = _aligned(offset + size)
+    header = {
+        "format_version": snapshot_format_version,
+        "opengate_version": _get_opengate_version(),
+        "python_version": platform.python_version(),
+        "object_type": type(obj).__name__,
+        "arrays": arrays,
+        "input_files": files,
+    }
+    header = json.dumps(header).encode()
+
+    with open(path, "wb") as out:
+        out.write(snapshot_magic)
+        out.write(struct.pack("<IQ", snapshot_format_version, len(header)))
+        out.write(header)
+        out.write(struct.pack("<Q", len(payload)))
+        out.write(payload)
+        # the data blocks start at an aligned position
+        start = _aligned(out.tell())
+        for arr, a in zip(pickler.arrays, arrays):
+            out.seek(start + a["offset"])
+            out.write(arr.reshape(-1).view(np.uint8).data)
+        for group, group_info in zip(input_files, files):
+            for p, fi in zip(group, group_info):
+                out.seek(start + fi["offset"])
+                with open(p, "rb") as inp:
+                    shutil.copyfileobj(inp, out)
+        out.truncate(start + offset)
+
+
+def read_snapshot_header(path):
+    """Return (header, position of the pickle payload) of a snapshot file."""
+    with open(path, "rb") as f:
+        if f.read(len(snapshot_magic)) != snapshot_magic:
+            fatal(f"The file {path} is not a GATE snapshot.")
+        file_version, n = struct.unpack("<IQ", f.read(12))
+        if file_version > snapshot_format_version:
+            fatal(
+                f"The snapshot {path} has the format version {file_version}, "
+                f"but this version of GATE can only read versions "
+                f"<= {snapshot_format_version}. "
+            )
+        header = json.loads(f.read(n))
+        return header, f.tell()
+
+
+def load_snapshot(path, input_files_directory=None):
+    """Load an object written with dump_snapshot. The arrays and images are
+    memory-mapped from the snapshot file (they are copied on write only).
+    The embedded input files, if any, are extracted in input_files_directory
+    (default: a folder next to the snapshot) and the paths are updated.
+    """
+    path = Path(path)
+    header, position = read_snapshot_header(path)
+    if header["opengate_version"] != _get_opengate_version():
+        warning(
+            f"The snapshot {path} was written with opengate "
+            f"{header['opengate_version']}, not {_get_opengate_version()}."
+        )
+    with open(path, "rb") as f:
+        f.seek(position)
+        (n,) = struct.unpack("<Q", f.read(8))
+        payload = f.read(n)
+        data_offset = _aligned(f.tell())
+
+        # extract the embedded input files
+        input_files = []
+        if len(header["input_files"]) > 0:
+            if input_files_directory is None:
+                input_files_directory = path.parent / f"{path.stem}_input_files"
+            for i, group in enumerate(header["input_files"]):
+                directory = Path(input_files_directory) / str(i)
+                directory.mkdir(parents=True, exist_ok=True)
+                input_files.append([])
+                for fi in group:
+                    p = directory / fi["name"]
+                    f.seek(data_offset + fi["offset"])
+                    with open(p, "wb") as out:
+                        remaining = fi["nbytes"]
+                        while remaining > 0:
+                            chunk = f.read(min(remaining, 2**24))
+                            out.write(chunk)
+                            remaining -= len(chunk)
+                    input_files[-1].append(p)
+
+    unpickler = SnapshotUnpickler(
+        io.BytesIO(payload), path, header, data_offset, input_files
+    )
+    return unpickler.load()
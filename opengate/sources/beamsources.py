@@ -9,11 +9,6 @@ from .generic import (
     DirectionValidator,
     _direction_parameters,
 )
-from ..contrib.tps.ionbeamtherapy import (
-    get_spots_from_beamset_beam,
-    spots_info_from_txt,
-    BeamsetInfo,
-)
 from ..base import process_cls
 from ..exception import fatal
 
@@ -289,6 +284,13 @@ class TreatmentPlanPBSource(SourceBase):
 
         # get data from plan if provided
         if plan_path:
+            # imported here because it requires pydicom
+            from ..contrib.tps.ionbeamtherapy import (
+                get_spots_from_beamset_beam,
+                spots_info_from_txt,
+                BeamsetInfo,
+            )
+
             if str(plan_path).endswith(".txt"):
                 beam_data = spots_info_from_txt(plan_path, self.particle, beam_nr)
                 self.spots = beam_data["spots"]
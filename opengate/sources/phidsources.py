@@ -11,12 +11,24 @@ import urllib
 import copy
 import os
 import inspect
+import functools
 from ..base import process_cls
 
 # the following packages seems to take a bit of time to load
 rd = LazyModuleLoader("radioactivedecay")
 pandas = LazyModuleLoader("pandas")
 
+# version of the format of the files in the phid cache folder
+# (increase it when the content of the cached data changes)
+phid_cache_version = 1
+
+# set to False to always parse the data files
+phid_cache_enabled = True
+
+# folder of the phid cache; if None, the OPENGATE_PHID_CACHE_DIR environment
+# variable is used, otherwise ~/.cache/opengate/phid
+phid_cache_directory = None
+
 
 class PhotonFromIonDecaySource(GenericSource):
     """
@@ -26,6 +38,10 @@ class PhotonFromIonDecaySource(GenericSource):
     - spectrum energy line for isomeric transition
     - spectrum energy line for atomic relaxation (fluo)
     - particle forced to gammas
+
+    With single_source_flag, all the gamma lines of all daughters are merged
+    into one single sub_source. The lines are then sampled with an alias table
+    whose weights follow, at each time, the TAC of their daughter.
     """
 
     # hints for IDE
@@ -34,6 +50,7 @@ class PhotonFromIonDecaySource(GenericSource):
     dump_log: str
     atomic_relaxation_flag: bool
     isomeric_transition_flag: bool
+    single_source_flag: bool
 
     user_info_defaults = {
         "verbose": (False, {"doc": "Verbose for debug"}),
@@ -47,6 +64,14 @@ class PhotonFromIonDecaySource(GenericSource):
             True,
             {"doc": "Consider gammas from isomeric transition"},
         ),
+        "single_source_flag": (
+            False,
+            {
+                "doc": "Merge all gamma lines of all daughters into a single source "
+                "(instead of one source per daughter and per gamma type). "
+                "The lines are sampled according to the TAC of their daughter."
+            },
+        ),
     }
 
     def __init__(self, *args, **kwargs):
@@ -90,6 +115,11 @@ class PhotonFromIonDecaySource(GenericSource):
 
             # get tac from decay
             p = Box(sub_source.tac_from_decay_parameters)
+            if "daughters" in p:
+                self.add_merged_sub_source_to_source_manager(
+                    sub_source, p, source_manager
+                )
+                continue
             tac_times, tac_activities = get_tac_from_decay(
                 p.ion_name,
                 p.daughter,
@@ -120,6 +150,46 @@ class PhotonFromIonDecaySource(GenericSource):
             with open(self.user_info.dump_log, "w") as outfile:
                 outfile.write(self.log)
 
+    def add_merged_sub_source_to_source_manager(self, sub_source, p, source_manager):
+        tac_times, lines_weights = get_lines_tac_from_decay(
+            p.ion_name,
+            p.daughters,
+            p.lines_per_daughter,
+            sub_source.energy.spectrum_weights,
+            sub_source.activity,
+            sub_source.start_time,
+            sub_source.end_time,
+            p.bins,
+        )
+        tac_activities = lines_weights.sum(axis=1)
+        g4_src = sub_source.get_next_g4_source()
+        update_sub_source_start_time(sub_source, tac_times, tac_activities)
+        self.check_ui_activity(sub_source)
+        self.check_confine(sub_source)
+        if g4_src is None:
+            return
+
+        # the energy distribution is created during the initialisation,
+        # so the lines TAC must be set after
+        sub_source.initialize_g4_source(g4_src, self.run_timing_intervals)
+        if np.any(tac_activities > 0):
+            # the weights already contain the activity, no scaling needed
+            g4_src.SetTAC(tac_times, tac_activities)
+            g4_src.SetSpectrumLinesTAC(
+                tac_times, sub_source.energy.spectrum_energies, lines_weights.ravel()
+            )
+        source_manager.AddSource(g4_src)
+
+        if sub_source.verbose:
+            Bq = g4_units.Bq
+            print(
+                f"GammaFromIon source {sub_source.name}"
+                f" daughters = {len(p.daughters)}"
+                f" gammas lines = {len(sub_source.energy.spectrum_weights)}"
+                f" first activity = {tac_activities[0] / Bq:5.2f}"
+                f" last activity = {tac_activities[-1] / Bq:5.2f}"
+            )
+
     def prepare_output(self):
         for sub_source in self.sub_sources:
             sub_source.prepare_output()
@@ -150,19 +220,11 @@ def update_sub_source_tac_activity(sub_source, g4_source, tac_times, tac_activit
 
     # scale the activity if energy_spectrum is given (because total may not be 100%)
     total = sum(sub_source.energy.spectrum_weights)
-    sec = g4_units.s
     Bq = g4_units.Bq
 
     # it is important to set the starting time for this source as the tac
     # may start later than the simulation timing
-    i = 0
-    while i < len(tac_activities) and tac_activities[i] <= 0:
-        i += 1
-    if i >= len(tac_activities):
-        # gate.warning(f"Source '{sub_source.name}' TAC with zero activity.")
-        sub_source.start_time = sub_source.end_time + 1 * sec
-    else:
-        sub_source.start_time = tac_times[i]
+    if update_sub_source_start_time(sub_source, tac_times, tac_activities):
         # IMPORTANT : activities must be x by total here
         # (not before, because it can be called several times in MT mode)
         if g4_source is not None:
@@ -178,6 +240,22 @@ def update_sub_source_tac_activity(sub_source, g4_source, tac_times, tac_activit
         )
 
 
+def update_sub_source_start_time(sub_source, tac_times, tac_activities):
+    """
+    Set the start time of the sub_source to the first non-zero activity of the TAC.
+    Return False if the TAC has no activity at all (the source is then disabled).
+    """
+    i = 0
+    while i < len(tac_activities) and tac_activities[i] <= 0:
+        i += 1
+    if i >= len(tac_activities):
+        # gate.warning(f"Source '{sub_source.name}' TAC with zero activity.")
+        sub_source.start_time = sub_source.end_time + 1 * g4_units.s
+        return False
+    sub_source.start_time = tac_times[i]
+    return True
+
+
 def print_phid_info(rad_name, br=1.0, tab=""):
     nuclide = get_nuclide_from_name(rad_name)
     print(
@@ -210,6 +288,18 @@ def get_nuclide_and_direct_progeny(z, a):
 
 
 def get_nuclide_progeny(nuclide, intensity=1.0, parent=None):
+    # only the full chain (first call of the recursion) is cached
+    if parent is None and intensity == 1.0:
+        data = phid_cache_load(nuclide.nuclide, "progeny")
+        if data is not None:
+            return phid_progeny_from_arrays(data)
+        p = get_nuclide_progeny_no_cache(nuclide)
+        phid_cache_store(nuclide.nuclide, "progeny", phid_progeny_to_arrays(p))
+        return p
+    return get_nuclide_progeny_no_cache(nuclide, intensity, parent)
+
+
+def get_nuclide_progeny_no_cache(nuclide, intensity=1.0, parent=None):
     # insert current nuclide
     p = []
     if parent is None:
@@ -238,7 +328,9 @@ def get_nuclide_progeny(nuclide, intensity=1.0, parent=None):
         a.parent = [nuclide]
         a.intensity = intensity * br
         p.append(a)
-        aa = get_nuclide_progeny(a.nuclide, intensity=a.intensity, parent=nuclide)
+        aa = get_nuclide_progeny_no_cache(
+            a.nuclide, intensity=a.intensity, parent=nuclide
+        )
         nuc_to_add += aa
         i = i + 1
 
@@ -262,7 +354,15 @@ def get_nuclide_progeny(nuclide, intensity=1.0, parent=None):
 def atomic_relaxation_load(nuclide, load_type="local"):
     ene_ar, w_ar = None, None
     if load_type == "local":
+        data = phid_cache_load(nuclide.nuclide, "atomic_relaxation")
+        if data is not None:
+            return data["energies"], data["weights"]
         ene_ar, w_ar = atomic_relaxation_load_from_file(nuclide.nuclide)
+        phid_cache_store(
+            nuclide.nuclide,
+            "atomic_relaxation",
+            {"energies": ene_ar, "weights": w_ar},
+        )
     elif load_type == "iaea":
         filename = atomic_relaxation_get_filename(nuclide.nuclide)
         warning(
@@ -432,6 +532,20 @@ def isomeric_transition_get_filename(nuclide_name):
 
 
 def isomeric_transition_load(nuclide, filename=None, half_life=None):
+    # only the default data (file and half life) is cached
+    if filename is None and half_life is None:
+        data = phid_cache_load(nuclide.nuclide, "isomeric_transition")
+        if data is not None:
+            return data["energies"], data["weights"]
+        ene, w = isomeric_transition_load_no_cache(nuclide)
+        phid_cache_store(
+            nuclide.nuclide, "isomeric_transition", {"energies": ene, "weights": w}
+        )
+        return ene, w
+    return isomeric_transition_load_no_cache(nuclide, filename, half_life)
+
+
+def isomeric_transition_load_no_cache(nuclide, filename=None, half_life=None):
     if filename is None:
         filename = isomeric_transition_get_filename(nuclide.nuclide)
     if half_life is None:
@@ -575,6 +689,17 @@ def isomeric_transition_load_all_gammas(nuclide, half_life=None):
 
 
 def isomeric_transition_read_g4_data(z, a, ignore_zero_deex=True):
+    name = f"z{z}.a{a}"
+    item = "g4_levels" if ignore_zero_deex else "g4_all_levels"
+    data = phid_cache_load(name, item)
+    if data is not None:
+        return phid_g4_levels_from_arrays(data)
+    levels = isomeric_transition_read_g4_data_no_cache(z, a, ignore_zero_deex)
+    phid_cache_store(name, item, phid_g4_levels_to_arrays(levels))
+    return levels
+
+
+def isomeric_transition_read_g4_data_no_cache(z, a, ignore_zero_deex=True):
     # get folder
     data_paths = g4.get_g4_data_paths()
     folder = pathlib.Path(data_paths["G4LEVELGAMMADATA"])
@@ -655,18 +780,56 @@ def get_tac_from_decay(ion_name, daughter, start_activity, start_time, end_time,
 
     - run_timing_intervals: is the list of time range from the Simulation
     """
+    times, relative_activities = get_relative_activities_from_decay(
+        getattr(ion_name, "nuclide", ion_name), start_time, end_time, bins
+    )
+    activities = list(relative_activities[daughter.nuclide.nuclide] * start_activity)
+    return times, activities
+
+
+@functools.lru_cache(maxsize=64)
+def get_relative_activities_from_decay(ion_name, start_time, end_time, bins):
+    """
+    Activities of all nuclides in the decay chain of ion_name (1 Bq at time zero)
+    at the bins times between start_time and end_time. The results are kept in memory
+    because they are needed by all sub sources, for all threads.
+    Return the times and a dict nuclide name -> activities (must not be modified).
+    """
     ion = rd.Inventory({ion_name: 1.0}, "Bq")
     sec = g4_units.s
     times = np.linspace(start_time, end_time, num=bins, endpoint=True)
-    activities = []
-
-    for t in times:
-        x = ion.decay(t / sec, "s")
-        intensity = x.activities()[daughter.nuclide.nuclide]
-        a = intensity * start_activity
-        activities.append(a)
-
-    return times, activities
+    activities = [ion.decay(t / sec, "s").activities() for t in times]
+    relative_activities = {
+        name: np.array([a[name] for a in activities]) for name in activities[0]
+    }
+    return times, relative_activities
+
+
+def get_lines_tac_from_decay(
+    ion_name,
+    daughters,
+    lines_per_daughter,
+    lines_weights,
+    start_activity,
+    start_time,
+    end_time,
+    bins,
+):
+    """
+    Same as get_tac_from_decay, for all daughters at once. The lines of each
+    daughter are consecutive in lines_weights (lines_per_daughter gives their number).
+    Return the times and a (bins x lines) array: the activity of each line at each time.
+    """
+    times, relative_activities = get_relative_activities_from_decay(
+        getattr(ion_name, "nuclide", ion_name), start_time, end_time, bins
+    )
+    daughter_activities = np.column_stack(
+        [relative_activities[daughter.nuclide.nuclide] for daughter in daughters]
+    )
+    # one column per line, with the activity of its daughter
+    line_activities = np.repeat(daughter_activities, lines_per_daughter, axis=1)
+    weights = line_activities * np.asarray(lines_weights) * start_activity
+    return times, weights
 
 
 class NumpyArrayHandler(jsonpickle.handlers.BaseHandler):
@@ -706,6 +869,35 @@ def phid_build_all_sub_sources(source):
             f"must be True for the source {source.name}"
         )
 
+    if source.single_source_flag:
+        phid_merge_all_sub_sources(source)
+
+
+def phid_merge_all_sub_sources(source):
+    """
+    Replace all sub_sources by a single one, with all gamma lines of all daughters.
+    The lines weights will be modulated by the TAC of their daughter.
+    """
+    if len(source.sub_sources) == 0:
+        return
+    daughters = [s.tac_from_decay_parameters["daughter"] for s in source.sub_sources]
+    lines_per_daughter = [len(s.energy.spectrum_energies) for s in source.sub_sources]
+    ene = np.concatenate([s.energy.spectrum_energies for s in source.sub_sources])
+    w = np.concatenate([s.energy.spectrum_weights for s in source.sub_sources])
+    first = source.sub_sources[0]
+    s = phid_new_sub_source(source, f"{source.name}__all_lines", ene, w)
+    s.ion_gamma_mother = first.ion_gamma_mother
+    s.tac_from_decay_parameters = {
+        "ion_name": first.tac_from_decay_parameters["ion_name"],
+        "daughters": daughters,
+        "lines_per_daughter": lines_per_daughter,
+        "bins": source.tac_bins,
+    }
+    source.log += (
+        f"Single source with {len(ene)} gammas from {len(daughters)} sub sources\n"
+    )
+    source.sub_sources = [s]
+
 
 def phid_build_all_sub_sources_atomic_relaxation(
     source, z, a, debug_first_daughter_only=False
@@ -757,6 +949,21 @@ def phid_build_one_sub_source(stype, source, daughter, ene, w, first_nuclide):
         return None
     source.log += f" {len(ene)} gammas, with total weights = {np.sum(w) * 100:.2f}%\n"
     name = f"{source.name}__{stype}_of_{daughter.nuclide.nuclide}"
+    s = phid_new_sub_source(source, name, ene, w)
+    s.ion_gamma_mother = Box({"z": first_nuclide.Z, "a": first_nuclide.A})
+    s.ion_gamma_daughter = ion_gamma_daughter
+
+    # prepare times and activities that will be set during initialisation
+    s.tac_from_decay_parameters = {
+        "ion_name": first_nuclide,
+        "daughter": daughter,
+        "bins": source.tac_bins,
+    }
+
+    return s
+
+
+def phid_new_sub_source(source, name, ene, w):
     s = PhotonFromIonDecaySource(name=name)
     s.is_a_sub_source = True
     s.sub_sources = []
@@ -766,21 +973,212 @@ def phid_build_one_sub_source(stype, source, daughter, ene, w, first_nuclide):
     s.verbose = source.verbose
     s.particle = "gamma"
     s.energy.type = "spectrum_discrete"
-    s.ion_gamma_mother = Box({"z": first_nuclide.Z, "a": first_nuclide.A})
-    s.ion_gamma_daughter = ion_gamma_daughter
     s.energy.spectrum_weights = w
     s.energy.spectrum_energies = ene
     s.activity = source.activity
     s.n = source.n
+    return s
 
-    # prepare times and activities that will be set during initialisation
-    s.tac_from_decay_parameters = {
-        "ion_name": first_nuclide,
-        "daughter": daughter,
-        "bins": source.tac_bins,
+
+def phid_cache_get_root_folder():
+    """
+    Root folder of the phid cache: phid_cache_directory if set, otherwise the
+    OPENGATE_PHID_CACHE_DIR environment variable if set, otherwise
+    ~/.cache/opengate/phid.
+    """
+    if phid_cache_directory is not None:
+        return pathlib.Path(phid_cache_directory).expanduser()
+    if "OPENGATE_PHID_CACHE_DIR" in os.environ:
+        return pathlib.Path(os.environ["OPENGATE_PHID_CACHE_DIR"]).expanduser()
+    return pathlib.Path.home() / ".cache" / "opengate" / "phid"
+
+
+@functools.lru_cache(maxsize=None)
+def _phid_cache_sub_folder_name():
+    data_paths = g4.get_g4_data_paths()
+    g4_data = pathlib.Path(data_paths["G4LEVELGAMMADATA"]).name
+    return f"v{phid_cache_version}_{g4_data}_rd{rd.__version__}"
+
+
+@functools.lru_cache(maxsize=None)
+def _phid_cache_check_folder(folder):
+    # the folder is created once; if it is not writable, there is no cache
+    try:
+        folder.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        warning(f"Cannot create the phid cache folder {folder}, no cache is used: {e}")
+        return False
+    if not os.access(folder, os.W_OK):
+        warning(f"The phid cache folder {folder} is not writable, no cache is used.")
+        return False
+    return True
+
+
+def phid_cache_get_folder():
+    """
+    The cache is stored in a sub folder of phid_cache_get_root_folder() that
+    depends on the version of the cache format, of the G4 gamma levels data and
+    of the radioactivedecay module. A change of any of them leads to a new
+    (empty) cache. Return None if the folder cannot be created or written.
+    """
+    folder = phid_cache_get_root_folder() / _phid_cache_sub_folder_name()
+    if not _phid_cache_check_folder(folder):
+        return None
+    return folder
+
+
+def phid_cache_get_filename(name, item):
+    folder = phid_cache_get_folder()
+    if folder is None:
+        return None
+    return folder / f"{name.lower()}_{item}.npz"
+
+
+def phid_cache_load(name, item):
+    if not phid_cache_enabled:
+        return None
+    filename = phid_cache_get_filename(name, item)
+    if filename is None:
+        return None
+    try:
+        with np.load(filename, allow_pickle=False) as f:
+            return {k: f[k] for k in f.files}
+    except (OSError, ValueError):
+        return None
+
+
+def phid_cache_store(name, item, data):
+    if not phid_cache_enabled:
+        return
+    filename = phid_cache_get_filename(name, item)
+    if filename is None:
+        return
+    # write in a temporary file first: several processes may store the same data
+    tmp_filename = filename.with_suffix(f".tmp-{os.getpid()}.npz")
+    try:
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(tmp_filename, **{k: np.asarray(v) for k, v in data.items()})
+        os.replace(tmp_filename, filename)
+    except OSError as e:
+        warning(f"Cannot store phid data in the cache {filename}: {e}")
+
+
+def phid_cache_warm_up(nuclide):
+    """
+    Parse and store in the cache all data needed by a PhotonFromIonDecaySource
+    of the given nuclide (progeny, isomeric transition and atomic relaxation
+    gammas of all daughters, G4 gamma levels).
+    """
+    daughters = get_nuclide_progeny(nuclide)
+    for d in daughters:
+        isomeric_transition_load(d.nuclide)
+        atomic_relaxation_load(d.nuclide)
+        try:
+            isomeric_transition_read_g4_data(d.nuclide.Z, d.nuclide.A)
+        except FileNotFoundError:
+            # no G4 gamma levels for this nuclide
+            pass
+    return daughters
+
+
+def phid_progeny_to_arrays(progeny):
+    return {
+        "names": [p.nuclide.nuclide for p in progeny],
+        "intensities": [p.intensity for p in progeny],
+        "parents": [
+            ";".join(pp.nuclide for pp in p.parent if pp is not None) for p in progeny
+        ],
     }
 
-    return s
+
+def phid_progeny_from_arrays(data):
+    nuclides = {}
+
+    def get_nuclide(name):
+        if name not in nuclides:
+            nuclides[name] = rd.Nuclide(name)
+        return nuclides[name]
+
+    progeny = []
+    for name, intensity, parents in zip(
+        data["names"], data["intensities"], data["parents"]
+    ):
+        a = Box()
+        a.nuclide = get_nuclide(str(name))
+        a.hl = a.nuclide.half_life()
+        if parents == "":
+            a.parent = [None]
+        else:
+            a.parent = [get_nuclide(pp) for pp in str(parents).split(";")]
+        a.intensity = float(intensity)
+        progeny.append(a)
+    return progeny
+
+
+def phid_g4_levels_to_arrays(levels):
+    data = {
+        "order_level": [],
+        "floating_level": [],
+        "excitation_energy": [],
+        "half_life": [],
+        "n_gammas": [],
+        "gamma_level": [],
+        "gamma_daughter_order": [],
+        "gamma_transition_energy": [],
+        "gamma_intensity": [],
+        "gamma_alpha": [],
+    }
+    for i, l in enumerate(levels.values()):
+        data["order_level"].append(l.order_level)
+        data["floating_level"].append(l.floating_level)
+        data["excitation_energy"].append(l.excitation_energy)
+        data["half_life"].append(l.half_life)
+        data["n_gammas"].append(l.n_gammas)
+        for g in l.daugthers.values():
+            data["gamma_level"].append(i)
+            data["gamma_daughter_order"].append(g.daughter_order)
+            data["gamma_transition_energy"].append(g.transition_energy)
+            data["gamma_intensity"].append(g.intensity)
+            data["gamma_alpha"].append(g.alpha)
+    # keep the types of the empty arrays
+    data["gamma_level"] = np.array(data["gamma_level"], dtype=int)
+    data["gamma_daughter_order"] = np.array(data["gamma_daughter_order"], dtype=int)
+    return data
+
+
+def phid_g4_levels_from_arrays(data):
+    levels = Box()
+    all_levels = []
+    for order_level, floating_level, excitation_energy, half_life, n_gammas in zip(
+        data["order_level"],
+        data["floating_level"],
+        data["excitation_energy"],
+        data["half_life"],
+        data["n_gammas"],
+    ):
+        l = Box()
+        l.order_level = str(order_level)
+        l.floating_level = str(floating_level)
+        l.excitation_energy = float(excitation_energy)
+        l.half_life = str(half_life)
+        l.n_gammas = int(n_gammas)
+        l.daugthers = Box()
+        levels[l.order_level] = l
+        all_levels.append(l)
+    for i, daughter_order, transition_energy, intensity, alpha in zip(
+        data["gamma_level"],
+        data["gamma_daughter_order"],
+        data["gamma_transition_energy"],
+        data["gamma_intensity"],
+        data["gamma_alpha"],
+    ):
+        g = Box()
+        g.daughter_order = int(daughter_order)
+        g.transition_energy = float(transition_energy)
+        g.intensity = float(intensity)
+        g.alpha = float(alpha)
+        all_levels[i].daugthers[g.daughter_order] = g
+    return levels
 
 
 process_cls(PhotonFromIonDecaySource)
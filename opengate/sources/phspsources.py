@@ -1,4 +1,3 @@
-import uproot
 import numpy as np
 import numbers
 from scipy.spatial.transform import Rotation
@@ -9,6 +8,9 @@ import opengate_core as g4
 from ..exception import fatal, warning
 from .generic import SourceBase
 from ..base import process_cls
+from ..utility import LazyModuleLoader
+
+uproot = LazyModuleLoader("uproot")
 
 
 class PhaseSpaceSourceGenerator:
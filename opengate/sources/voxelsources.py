@@ -4,8 +4,8 @@ import opengate_core as g4
 from .generic import GenericSource
 from ..image import (
     get_info_from_image,
+    read_itk_image,
     update_image_py_to_cpp,
-    compute_image_3D_CDF,
 )
 from ..utility import ensure_filename_is_str, warning
 from ..base import process_cls
@@ -15,7 +15,7 @@ from ..actors.dynamicactors import SourceActivityImageChanger
 class VoxelSource(GenericSource):
     """
     VoxelSource = 3D activity distribution.
-    Sampled with cumulative distribution functions.
+    Sampled with an alias table of the non-zero voxels.
     """
 
     # hints for IDE
@@ -37,10 +37,8 @@ class VoxelSource(GenericSource):
         GenericSource.__init__(self, *args, **kwargs)
         # the loaded image
         self._current_itk_image = None
-        # cached CDFs
-        self._cdf_x = None
-        self._cdf_y = None
-        self._cdf_z = None
+        # cached alias table (shared by all threads)
+        self._g4_position_sampler = None
 
     def create_changers(self):
         changers = super().create_changers()
@@ -77,44 +75,43 @@ class VoxelSource(GenericSource):
         )
         pg.cpp_edep_image.set_origin(c)
 
-    def cumulative_distribution_functions(self, g4_source):
+    def set_position_sampler(self, g4_source):
         """
-        Compute the Cumulative Distribution Function of the image
-        Composed of: CDF_Z = 1D, CDF_Y = 2D, CDF_X = 3D
+        Build the alias table of the image (once), and give it to the
+        position generator. The same table is used by all threads.
         """
-        if self._cdf_x is None or self._cdf_y is None or self._cdf_z is None:
-            self._cdf_x, self._cdf_y, self._cdf_z = compute_image_3D_CDF(
-                self._current_itk_image
-            )
+        if self._g4_position_sampler is None:
+            # the array is only read (in place) while the table is built
+            array = itk.array_view_from_image(self._current_itk_image)
+            self._g4_position_sampler = g4.GateVoxelAliasSampler(array)
+            del array
 
-        # set CDF to the position generator
+        # set the sampler to the position generator
         pg = g4_source.GetSPSVoxelPosDistribution()
-        pg.SetCumulativeDistributionFunction(self._cdf_z, self._cdf_y, self._cdf_x)
+        pg.SetAliasSampler(self._g4_position_sampler)
 
     def update_activity_image(self, filename):
-        # read source image
-        self._current_itk_image = itk.imread(ensure_filename_is_str(filename))
+        # read source image (memory-mapped if possible)
+        self._current_itk_image = read_itk_image(ensure_filename_is_str(filename))
 
-        # Reset CDF cache
-        self._cdf_x = None
-        self._cdf_y = None
-        self._cdf_z = None
+        # Reset the alias table cache
+        self._g4_position_sampler = None
 
         # update all thread-local sources
         for g4_source in self.g4_thread_sources:
             # compute position
             self.set_transform_from_user_info(g4_source)
-            # create Cumulative Distribution Function
-            self.cumulative_distribution_functions(g4_source)
+            # create the alias table
+            self.set_position_sampler(g4_source)
 
     def create_g4_source(self):
         return g4.GateVoxelSource()
 
     def initialize_g4_source(self, g4_source, run_timing_intervals):
         if self._current_itk_image is None:
-            self._current_itk_image = itk.imread(ensure_filename_is_str(self.image))
+            self._current_itk_image = read_itk_image(ensure_filename_is_str(self.image))
         self.set_transform_from_user_info(g4_source)
-        self.cumulative_distribution_functions(g4_source)
+        self.set_position_sampler(g4_source)
         # initialise standard options (particle energy, etc.)
         GenericSource.initialize_g4_source(self, g4_source, run_timing_intervals)
 
@@ -122,7 +119,7 @@ class VoxelSource(GenericSource):
 class VoxelizedPromptGammaTLESource(VoxelSource):
     """
     VoxelizedPromptGammaTLESource = 3D PG distribution.
-    Sampled with cumulative distribution functions.
+    Sampled with an alias table of the non-zero voxels.
     """
 
     def create_g4_source(self):
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import uproot
+import numpy as np
+import opengate as gate
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test113")
+
+    """
+    Compare a chain of digitizer actors (Blurring -> SpatialBlurring ->
+    EnergyWindows -> Efficiency) with the same chain executed as stages of a
+    single DigitizerPipelineActor.
+    """
+
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.visu = False
+    sim.number_of_threads = 2
+    sim.check_volumes_overlap = False
+    sim.random_seed = 321654
+    sim.output_dir = paths.output
+
+    # units
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    keV = gate.g4_units.keV
+    mm = gate.g4_units.mm
+    Bq = gate.g4_units.Bq
+
+    # world size
+    world = sim.world
+    world.size = [2 * m, 2 * m, 2 * m]
+
+    # material
+    sim.volume_manager.add_material_database(paths.data / "GateMaterials.db")
+
+    # fake spect head
+    head = sim.add_volume("Box", "SPECThead")
+    head.size = [55 * cm, 42 * cm, 18 * cm]
+    head.material = "G4_AIR"
+
+    # crystal
+    crystal = sim.add_volume("Box", "crystal")
+    crystal.mother = head.name
+    crystal.size = [1.0 * cm, 1.0 * cm, 1.0 * cm]
+    crystal.material = "NaITl"
+    start = [-25 * cm, -20 * cm, 4 * cm]
+    size = [100, 40, 1]
+    tr = [0.5 * cm, 0.5 * cm, 0]
+    crystal.translation = gate.geometry.utility.get_grid_repetition(
+        size, tr, start=start
+    )
+
+    # physic list
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
+    sim.physics_manager.global_production_cuts.all = 0.1 * mm
+
+    # source
+    source = sim.add_source("GenericSource", "Default")
+    source.particle = "gamma"
+    source.energy.mono = 140.5 * keV
+    source.position.type = "sphere"
+    source.position.radius = 4 * cm
+    source.position.translation = [0, 0, -15 * cm]
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.activity = 100000 * Bq / sim.number_of_threads
+
+    # add stat actor
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+
+    # hits and singles
+    hc = sim.add_actor("DigitizerHitsCollectionActor", "Hits")
+    hc.attached_to = crystal.name
+    hc.output_filename = "test113_digitizer.root"
+    hc.attributes = [
+        "TotalEnergyDeposit",
+        "PostPosition",
+        "PreStepUniqueVolumeID",
+        "GlobalTime",
+    ]
+    sc = sim.add_actor("DigitizerAdderActor", "Singles")
+    sc.attached_to = hc.attached_to
+    sc.input_digi_collection = hc.name
+    sc.policy = "EnergyWeightedCentroidPosition"
+    sc.output_filename = hc.output_filename
+
+    # parameters of the chain
+    resolution = 0.10
+    reference_energy = 140.5 * keV
+    spatial_sigma = [2 * mm, 2 * mm, 0]
+    e_min = 126.45 * keV
+    e_max = 154.55 * keV
+    efficiency = 0.8
+
+    # 1) chain of separate actors
+    bc = sim.add_actor("DigitizerBlurringActor", "Chain_blur")
+    bc.attached_to = hc.attached_to
+    bc.input_digi_collection = sc.name
+    bc.blur_attribute = "TotalEnergyDeposit"
+    bc.blur_method = "InverseSquare"
+    bc.blur_resolution = resolution
+    bc.blur_reference_value = reference_energy
+    bc.output_filename = hc.output_filename
+    bc.root_output.write_to_disk = False
+
+    sb = sim.add_actor("DigitizerSpatialBlurringActor", "Chain_spatial")
+    sb.attached_to = hc.attached_to
+    sb.input_digi_collection = bc.name
+    sb.blur_attribute = "PostPosition"
+    sb.blur_sigma = spatial_sigma
+    sb.keep_in_solid_limits = True
+    sb.output_filename = hc.output_filename
+    sb.root_output.write_to_disk = False
+
+    ew = sim.add_actor("DigitizerEnergyWindowsActor", "Chain_energy_windows")
+    ew.attached_to = hc.attached_to
+    ew.input_digi_collection = sb.name
+    ew.channels = [{"name": "Chain_peak", "min": e_min, "max": e_max}]
+    ew.output_filename = hc.output_filename
+
+    ea = sim.add_actor("DigitizerEfficiencyActor", "Chain")
+    ea.attached_to = hc.attached_to
+    ea.input_digi_collection = "Chain_peak"
+    ea.efficiency = efficiency
+    ea.output_filename = hc.output_filename
+
+    # 2) same chain in a single pass
+    pipe = sim.add_actor("DigitizerPipelineActor", "Pipeline")
+    pipe.attached_to = hc.attached_to
+    pipe.input_digi_collection = sc.name
+    pipe.output_filename = hc.output_filename
+    pipe.add_stage(
+        "blurring",
+        blur_attribute="TotalEnergyDeposit",
+        blur_method="InverseSquare",
+        blur_resolution=resolution,
+        blur_reference_value=reference_energy,
+    )
+    pipe.add_stage(
+        "spatial_blurring",
+        blur_attribute="PostPosition",
+        blur_sigma=spatial_sigma,
+        keep_in_solid_limits=True,
+    )
+    pipe.add_stage("energy_window", name="peak", write=True, min=e_min, max=e_max)
+    pipe.add_stage("efficiency", efficiency=efficiency)
+
+    # go
+    sim.run()
+    print(stats)
+    print(f"Rejected digis per stage: {pipe.get_number_of_rejected_digis()}")
+
+    # compare the trees
+    f = uproot.open(hc.get_output_path())
+    is_ok = True
+    for ref_name, name in [("Chain_peak", "Pipeline_peak"), ("Chain", "Pipeline")]:
+        ref = f[ref_name].arrays(library="numpy")
+        tree = f[name].arrays(library="numpy")
+        n_ref = len(ref["TotalEnergyDeposit"])
+        n = len(tree["TotalEnergyDeposit"])
+        diff = utility.rel_diff(float(n_ref), float(n))
+        is_ok = (
+            utility.print_test(
+                np.fabs(diff) < 3.0,
+                f"Number of digis {ref_name} = {n_ref} vs {name} = {n}: {diff:.2f}%",
+            )
+            and is_ok
+        )
+        for key in ["TotalEnergyDeposit", "PostPosition_X", "PostPosition_Y"]:
+            m_ref = np.mean(ref[key])
+            s_ref = np.std(ref[key])
+            mean = np.mean(tree[key])
+            std = np.std(tree[key])
+            ok = (
+                np.fabs(m_ref - mean) < 0.05 * s_ref
+                and np.fabs(s_ref - std) < 0.05 * s_ref
+            )
+            is_ok = (
+                utility.print_test(
+                    ok,
+                    f"{key:<20} {ref_name}: {m_ref:.3f} ± {s_ref:.3f}   "
+                    f"{name}: {mean:.3f} ± {std:.3f}",
+                )
+                and is_ok
+            )
+
+    # attributes that are not buffered are copied as is
+    ref = f["Chain"].arrays(library="numpy")
+    tree = f["Pipeline"].arrays(library="numpy")
+    is_ok = (
+        utility.print_test(
+            set(ref.keys()) == set(tree.keys()),
+            f"Same attributes {sorted(tree.keys())}",
+        )
+        and is_ok
+    )
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+import opengate as gate
+from opengate.image import ChunkedImageReader, read_itk_image_chunked
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test114")
+
+    """
+    Two identical dose actors, one writing mhd images, the other one chunked
+    (compressed, parallel) images. The images must be identical and the
+    chunked ones must be readable lazily.
+    """
+
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.visu = False
+    sim.number_of_threads = 2
+    sim.random_seed = 123456
+    sim.output_dir = paths.output
+
+    # units
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    mm = gate.g4_units.mm
+    MeV = gate.g4_units.MeV
+    Bq = gate.g4_units.Bq
+
+    # world and waterbox
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+    waterbox = sim.add_volume("Box", "waterbox")
+    waterbox.size = [10 * cm, 10 * cm, 10 * cm]
+    waterbox.material = "G4_WATER"
+
+    # physics
+    sim.physics_manager.physics_list_name = "QGSP_BERT_EMV"
+
+    # source
+    source = sim.add_source("GenericSource", "mysource")
+    source.particle = "proton"
+    source.energy.mono = 100 * MeV
+    source.position.type = "disc"
+    source.position.radius = 5 * mm
+    source.position.translation = [0, 0, -20 * cm]
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.activity = 5000 * Bq / sim.number_of_threads
+
+    # stats
+    stats = sim.add_actor("SimulationStatisticsActor", "stats")
+
+    # two identical dose actors
+    dose_actors = []
+    for name in ["dose_mhd", "dose_chunked"]:
+        dose = sim.add_actor("DoseActor", name)
+        dose.attached_to = waterbox
+        dose.size = [50, 60, 70]
+        dose.spacing = [2 * mm, 2 * mm, 2 * mm]
+        dose.edep_uncertainty.active = True
+        # counts has no explicit interface (default image interface)
+        dose.counts.active = True
+        dose.output_filename = f"test114_{name}.mhd"
+        dose_actors.append(dose)
+    dose_mhd, dose_chunked = dose_actors
+    for output in [
+        dose_chunked.edep,
+        dose_chunked.edep_uncertainty,
+        dose_chunked.counts,
+    ]:
+        output.output_format = "chunked"
+        output.chunk_shape = (16, 16, 16)
+        output.compression_level = 4
+        output.number_of_writer_threads = 4
+
+    # go
+    sim.run()
+    print(stats)
+
+    # the options set via the interface reach the actor output
+    is_ok = True
+    for output in [
+        dose_chunked.edep,
+        dose_chunked.edep_uncertainty,
+        dose_chunked.counts,
+    ]:
+        user_output = dose_chunked.user_output[output.user_output_name]
+        is_ok = (
+            utility.print_test(
+                user_output.output_format == "chunked"
+                and tuple(user_output.chunk_shape) == (16, 16, 16)
+                and user_output.compression_level == 4
+                and user_output.number_of_writer_threads == 4,
+                f"{output.user_output_name}: {user_output.number_of_writer_threads} "
+                f"writer threads",
+            )
+            and is_ok
+        )
+
+    # the counts image is available via the default image interface
+    is_ok = (
+        utility.print_test(
+            itk.array_view_from_image(dose_mhd.counts.image).sum() > 0,
+            f"Counts image via the default interface: {dose_mhd.counts.image.GetLargestPossibleRegion().GetSize()}",
+        )
+        and is_ok
+    )
+
+    for name in ["edep", "edep_uncertainty", "counts"]:
+        path_mhd = getattr(dose_mhd, name).get_output_path()
+        path_chunked = getattr(dose_chunked, name).get_output_path()
+        print(f"{path_mhd}  vs  {path_chunked}")
+        is_ok = (
+            utility.print_test(
+                path_chunked.suffix == ".zarr" and path_chunked.is_dir(),
+                f"Chunked output written in {path_chunked}",
+            )
+            and is_ok
+        )
+
+        # full image
+        img_mhd = itk.imread(str(path_mhd))
+        img_chunked = read_itk_image_chunked(path_chunked)
+        arr_mhd = itk.array_view_from_image(img_mhd)
+        arr_chunked = itk.array_view_from_image(img_chunked)
+        is_ok = (
+            utility.print_test(
+                np.array_equal(arr_mhd, arr_chunked),
+                f"Same {name} values, shape {arr_chunked.shape}",
+            )
+            and is_ok
+        )
+        is_ok = (
+            utility.print_test(
+                np.allclose(img_mhd.GetSpacing(), img_chunked.GetSpacing())
+                and np.allclose(img_mhd.GetOrigin(), img_chunked.GetOrigin()),
+                f"Same spacing {img_chunked.GetSpacing()} and origin {img_chunked.GetOrigin()}",
+            )
+            and is_ok
+        )
+
+        # lazy reading of a sub region (across several chunks)
+        reader = ChunkedImageReader(path_chunked)
+        print(reader)
+        sub = reader[20:40, 5, ::3]
+        is_ok = (
+            utility.print_test(
+                np.array_equal(sub, arr_mhd[20:40, 5, ::3]),
+                f"Lazy read of a sub region {sub.shape}",
+            )
+            and is_ok
+        )
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+import opengate as gate
+from opengate.image import SparseImageOfHistograms
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test115")
+
+    """
+    Two identical VoxelizedPromptGammaAnalogActor, one with dense 4D images,
+    the other one with the sparse output. The sparse histograms, converted to
+    dense images, must be identical to the dense ones.
+    """
+
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.visu = False
+    sim.random_seed = 123456
+    sim.output_dir = paths.output
+    sim.number_of_threads = 1
+    sim.progress_bar = False
+
+    # units
+    mm = gate.g4_units.mm
+    cm = gate.g4_units.cm
+    m = gate.g4_units.m
+    MeV = gate.g4_units.MeV
+    ns = gate.g4_units.ns
+
+    # world and phantom
+    world = sim.world
+    world.size = [1 * m, 1 * m, 1 * m]
+    world.material = "G4_Galactic"
+    phantom = sim.add_volume("Box", "phantom")
+    phantom.size = [20 * cm, 20 * cm, 30 * cm]
+    phantom.material = "G4_WATER"
+
+    # physics
+    sim.physics_manager.physics_list_name = "QGSP_BIC_HP_EMY"
+
+    # pencil beam of protons
+    source = sim.add_source("GenericSource", "beam")
+    source.particle = "proton"
+    source.energy.mono = 130 * MeV
+    source.position.type = "point"
+    source.position.translation = [0, 0, -40 * cm]
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.n = 2000
+
+    # dense and sparse actors
+    actors = []
+    for name, sparse in [("dense", False), ("sparse", True)]:
+        vpg = sim.add_actor("VoxelizedPromptGammaAnalogActor", f"vpg_{name}")
+        vpg.attached_to = phantom
+        vpg.output_filename = f"test115_vpg_{name}.nii.gz"
+        vpg.size = [40, 40, 60]
+        vpg.spacing = [5 * mm, 5 * mm, 5 * mm]
+        vpg.timebins = 100
+        vpg.timerange = 5 * ns
+        vpg.energybins = 100
+        vpg.energyrange = 10 * MeV
+        vpg.prot_E.active = True
+        vpg.prot_tof.active = True
+        vpg.sparse_output = sparse
+        actors.append(vpg)
+    vpg_dense, vpg_sparse = actors
+
+    stats = sim.add_actor("SimulationStatisticsActor", "stats")
+
+    sim.run()
+    print(stats)
+
+    is_ok = True
+    for output in ["prot_E", "prot_tof"]:
+        dense = getattr(vpg_dense, output).image
+        sparse = getattr(vpg_sparse, output).image
+        print(sparse)
+        arr_dense = itk.array_view_from_image(dense)
+        arr_sparse = itk.array_view_from_image(sparse.to_itk_image())
+
+        n_voxels = np.prod(sparse.size)
+        is_ok = (
+            utility.print_test(
+                sparse.number_of_voxels < n_voxels,
+                f"{output}: {sparse.number_of_voxels} / {n_voxels} voxels stored, "
+                f"{sparse.nbytes / 1e6:.2f} MB vs {arr_dense.nbytes / 1e6:.2f} MB",
+            )
+            and is_ok
+        )
+        is_ok = (
+            utility.print_test(
+                arr_dense.shape == arr_sparse.shape
+                and np.allclose(arr_dense, arr_sparse),
+                f"{output}: same histograms as the dense image {arr_dense.shape}",
+            )
+            and is_ok
+        )
+        is_ok = (
+            utility.print_test(
+                np.allclose(dense.GetOrigin(), sparse.to_itk_image().GetOrigin()),
+                f"{output}: same origin {dense.GetOrigin()}",
+            )
+            and is_ok
+        )
+
+        # written file
+        path = getattr(vpg_sparse, output).get_output_path()
+        read = SparseImageOfHistograms.read(path)
+        is_ok = (
+            utility.print_test(
+                np.array_equal(read.indices, sparse.indices)
+                and np.allclose(read.values, sparse.values),
+                f"{output}: written in {path}",
+            )
+            and is_ok
+        )
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+import opengate as gate
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test115_mt")
+
+    """
+    Same as test115 in multithread mode: the dense images and the sparse
+    histograms (both filled per thread, merged at the end of the run) must be
+    scaled the same way, by the number of events of the run
+    over all threads, and be identical.
+    """
+
+    sim = gate.Simulation()
+
+    # main options
+    sim.g4_verbose = False
+    sim.visu = False
+    sim.random_seed = 654987
+    sim.output_dir = paths.output
+    sim.number_of_threads = 4
+    sim.progress_bar = False
+
+    # units
+    mm = gate.g4_units.mm
+    cm = gate.g4_units.cm
+    m = gate.g4_units.m
+    MeV = gate.g4_units.MeV
+    ns = gate.g4_units.ns
+
+    # world and phantom
+    world = sim.world
+    world.size = [1 * m, 1 * m, 1 * m]
+    world.material = "G4_Galactic"
+    phantom = sim.add_volume("Box", "phantom")
+    phantom.size = [20 * cm, 20 * cm, 30 * cm]
+    phantom.material = "G4_WATER"
+
+    # physics
+    sim.physics_manager.physics_list_name = "QGSP_BIC_HP_EMY"
+
+    # pencil beam of protons
+    source = sim.add_source("GenericSource", "beam")
+    source.particle = "proton"
+    source.energy.mono = 130 * MeV
+    source.position.type = "point"
+    source.position.translation = [0, 0, -40 * cm]
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.n = 500
+
+    # dense and sparse actors
+    actors = []
+    for name, sparse in [("dense", False), ("sparse", True)]:
+        vpg = sim.add_actor("VoxelizedPromptGammaAnalogActor", f"vpg_{name}")
+        vpg.attached_to = phantom
+        vpg.output_filename = f"test115_mt_vpg_{name}.nii.gz"
+        vpg.size = [40, 40, 60]
+        vpg.spacing = [5 * mm, 5 * mm, 5 * mm]
+        vpg.timebins = 100
+        vpg.timerange = 5 * ns
+        vpg.energybins = 100
+        vpg.energyrange = 10 * MeV
+        vpg.prot_E.active = True
+        vpg.prot_tof.active = True
+        vpg.sparse_output = sparse
+        actors.append(vpg)
+    vpg_dense, vpg_sparse = actors
+
+    stats = sim.add_actor("SimulationStatisticsActor", "stats")
+
+    sim.run()
+    print(stats)
+    n_events = stats.counts.events
+
+    is_ok = True
+    for output in ["prot_E", "prot_tof"]:
+        arr_dense = itk.array_view_from_image(getattr(vpg_dense, output).image)
+        arr_sparse = itk.array_view_from_image(
+            getattr(vpg_sparse, output).image.to_itk_image()
+        )
+        is_ok = (
+            utility.print_test(
+                arr_dense.shape == arr_sparse.shape
+                and np.allclose(arr_dense, arr_sparse),
+                f"{output}: same histograms for the dense and sparse outputs",
+            )
+            and is_ok
+        )
+
+        # the histograms count the prompt gammas, scaled once by the number
+        # of events of all threads
+        for name, arr in [("dense", arr_dense), ("sparse", arr_sparse)]:
+            n_gammas = arr.sum() * n_events
+            is_ok = (
+                utility.print_test(
+                    n_gammas > 0 and np.isclose(n_gammas, np.round(n_gammas)),
+                    f"{output} {name}: {arr.sum():.6f} gamma per event, "
+                    f"{n_gammas:.3f} gammas for {n_events} events",
+                )
+                and is_ok
+            )
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+import opengate as gate
+from scipy.spatial.transform import Rotation
+from opengate.tests import utility
+
+
+def collect_optimiser_counts(simulation_engine):
+    actor = simulation_engine.simulation.actor_manager.get_actor(
+        "dynamic_geometry_actor"
+    )
+    optimiser = actor.g4_geometry_optimiser
+    simulation_engine.user_hook_log.append(
+        {
+            "builds": optimiser.fNumberOfBuilds,
+            "cache_hits": optimiser.fNumberOfCacheHits,
+        }
+    )
+
+
+def create_simulation(paths, name, incremental, cache_size):
+    sim = gate.Simulation()
+    sim.user_hook_after_run = collect_optimiser_counts
+    sim.g4_verbose = False
+    sim.visu = False
+    sim.random_seed = 983456
+    sim.number_of_threads = 1
+    sim.output_dir = paths.output
+    sim.dyn_geom_incremental = incremental
+    sim.dyn_geom_cache_size = cache_size
+
+    m = gate.g4_units.m
+    mm = gate.g4_units.mm
+    cm = gate.g4_units.cm
+    MeV = gate.g4_units.MeV
+    Bq = gate.g4_units.Bq
+    sec = gate.g4_units.second
+
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+
+    # several volumes in the world, only one of them moves
+    fake = sim.add_volume("Box", "fake")
+    fake.size = [40 * cm, 40 * cm, 40 * cm]
+    fake.translation = [1 * cm, 2 * cm, 3 * cm]
+    fake.material = "G4_AIR"
+    for i in range(4):
+        b = sim.add_volume("Box", f"fixed_{i}")
+        b.size = [5 * cm, 5 * cm, 5 * cm]
+        b.translation = [-40 * cm + i * 6 * cm, 40 * cm, 0]
+        b.material = "G4_WATER"
+
+    waterbox = sim.add_volume("Box", "waterbox")
+    waterbox.mother = fake
+    waterbox.size = [20 * cm, 20 * cm, 20 * cm]
+    waterbox.translation = [-3 * cm, -2 * cm, -1 * cm]
+    waterbox.rotation = Rotation.from_euler("y", -20, degrees=True).as_matrix()
+    waterbox.material = "G4_WATER"
+
+    source = sim.add_source("GenericSource", "mysource")
+    source.energy.mono = 150 * MeV
+    source.particle = "proton"
+    source.position.type = "disc"
+    source.position.radius = 5 * mm
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.activity = 3000 * Bq
+
+    dose = sim.add_actor("DoseActor", "dose")
+    dose.output_filename = f"test118-{name}.mhd"
+    dose.attached_to = waterbox
+    dose.size = [50, 50, 50]
+    dose.spacing = [4 * mm, 4 * mm, 4 * mm]
+
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+    stats.output_filename = f"test118-stats-{name}.txt"
+
+    # repeated motion: 3 angles, twice
+    n = 6
+    interval_length = 1 * sec / n
+    sim.run_timing_intervals = [
+        (i * interval_length, (i + 1) * interval_length) for i in range(n)
+    ]
+    gantry_angles_deg = [[(i % 3) * 20] for i in range(n)]
+    translations, rotations = gate.geometry.utility.get_transform_orbiting(
+        initial_position=fake.translation, axis="Y", angle_deg=gantry_angles_deg
+    )
+    fake.add_dynamic_parametrisation(translation=translations, rotation=rotations)
+    return sim, dose, stats
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test118")
+
+    """
+    The navigation voxels are only rebuilt for the mother of the moving volume
+    (and reused for the repeated positions). The results must be the same as
+    when the whole world is optimised again at each run.
+    """
+
+    results = {}
+    counts = {}
+    for name, incremental, cache_size in [
+        ("full", False, 0),
+        ("incremental", True, 0),
+        ("cached", True, 8),
+    ]:
+        sim, dose, stats = create_simulation(paths, name, incremental, cache_size)
+        sim.run(start_new_process=True)
+        print(f"{name}: {stats}")
+        img = itk.imread(str(dose.edep.get_output_path()))
+        results[name] = (itk.array_from_image(img), stats)
+        counts[name] = sim.user_hook_log[0]
+        print(f"{name}: {counts[name]}")
+
+    # 6 runs with 3 different positions of the moving volume (one mother):
+    # - full: the optimiser is not used, the whole world is optimised
+    # - incremental: the mother is rebuilt at each run
+    # - cached: the 3 positions are built once, then reused
+    expected_counts = {
+        "full": {"builds": 0, "cache_hits": 0},
+        "incremental": {"builds": 6, "cache_hits": 0},
+        "cached": {"builds": 3, "cache_hits": 3},
+    }
+    is_ok = True
+    for name, expected in expected_counts.items():
+        is_ok = (
+            utility.print_test(
+                counts[name] == expected,
+                f"{name}: {counts[name]['builds']} builds and "
+                f"{counts[name]['cache_hits']} cache hits (expected {expected})",
+            )
+            and is_ok
+        )
+
+    arr_ref, stats_ref = results["full"]
+    for name in ["incremental", "cached"]:
+        arr, stats = results[name]
+        is_ok = utility.assert_stats(stats, stats_ref, 0.01) and is_ok
+        is_ok = (
+            utility.print_test(
+                np.allclose(arr, arr_ref),
+                f"{name}: same edep as the full optimisation ({np.sum(arr):.3f} vs {np.sum(arr_ref):.3f})",
+            )
+            and is_ok
+        )
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import shutil
+import itk
+import numpy as np
+import opengate as gate
+from opengate.contrib.dose.tle_mu_cache_helpers import precompute_tle_mu_tables
+from opengate.tests import utility
+from opengate.tests.src.actors.test081_tle_helpers import add_waterbox, add_source
+
+
+def collect_mu_table_counts(simulation_engine):
+    actor = simulation_engine.simulation.actor_manager.get_actor("tle")
+    simulation_engine.user_hook_log.append(
+        {
+            "cached": actor.GetNumberOfCachedMuTables(),
+            "simulated": actor.GetNumberOfSimulatedMuTables(),
+        }
+    )
+
+
+def run_tle_simulation(paths, name, cache):
+    sim = gate.Simulation()
+    sim.random_seed = 654321
+    sim.output_dir = paths.output
+    sim.progress_bar = False
+    sim.user_hook_after_run = collect_mu_table_counts
+
+    m = gate.g4_units.m
+    mm = gate.g4_units.mm
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+    waterbox = add_waterbox(sim)
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option3"
+    sim.physics_manager.global_production_cuts.all = 1 * mm
+    add_source(sim, n=2e4)
+
+    tle = sim.add_actor("TLEDoseActor", "tle")
+    tle.output_filename = f"test119_{name}.mhd"
+    tle.attached_to = waterbox
+    tle.size = [1, 1, 100]
+    tle.spacing = [x / y for x, y in zip(waterbox.size, tle.size)]
+    tle.database = "simulated"
+    tle.mu_cache_directory = cache
+
+    sim.run(start_new_process=True)
+    counts = sim.user_hook_log[0]
+    edep = itk.array_view_from_image(itk.imread(tle.edep.get_output_path())).ravel()
+    return counts, edep
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test119")
+
+    """
+    The mu/mu_en tables of the TLEDoseActor with the 'simulated' database are
+    stored in a persistent cache: the first run simulates and writes them, the
+    second one only loads them. The dose computed with the cached tables must
+    be the same as the one computed with freshly simulated tables.
+    """
+
+    cache = paths.output / "mu_cache"
+    shutil.rmtree(cache, ignore_errors=True)
+    materials = ["G4_WATER", "G4_BONE_COMPACT_ICRU"]
+
+    # first run: G4_AIR (world) + the two materials are simulated
+    created = precompute_tle_mu_tables(
+        materials=materials, cache_directory=cache, verbose=True
+    )
+    is_ok = utility.print_test(
+        len(created) == len(materials) + 1,
+        f"First run: {len(created)} tables written in {cache}",
+    )
+
+    # the cache files contain the key and the tables
+    for f in created:
+        with open(f) as fi:
+            key = fi.readline()
+            n = int(fi.readline())
+            rows = [line.split() for line in fi]
+        is_ok = (
+            utility.print_test(
+                "geant4=" in key and n > 0 and len(rows) == n,
+                f"{f.name}: {n} energies, key {key.strip()[:60]}...",
+            )
+            and is_ok
+        )
+
+    # second run: everything is loaded from the cache
+    created = precompute_tle_mu_tables(
+        materials=materials, cache_directory=cache, verbose=True
+    )
+    is_ok = (
+        utility.print_test(
+            len(created) == 0,
+            f"Second run: {len(created)} new tables (all loaded from the cache)",
+        )
+        and is_ok
+    )
+
+    # another physics list (other gamma models): the cached tables of the
+    # first physics list must not be reused
+    def read_keys(files):
+        with_models = {}
+        for f in files:
+            with open(f) as fi:
+                key = fi.readline().strip()
+            without_models = key.split(";models=")[0]
+            with_models[without_models] = key
+        return with_models
+
+    keys_emv = read_keys(sorted(cache.glob("mu_*.txt")))
+    created = precompute_tle_mu_tables(
+        materials=materials,
+        cache_directory=cache,
+        physics_list_name="G4EmStandardPhysics_option4",
+        verbose=True,
+    )
+    keys_opt4 = read_keys(created)
+    is_ok = (
+        utility.print_test(
+            len(created) == len(materials) + 1,
+            f"Other physics list: {len(created)} new tables",
+        )
+        and is_ok
+    )
+    common = set(keys_emv) & set(keys_opt4)
+    is_ok = (
+        utility.print_test(
+            len(common) > 0 and all(keys_emv[k] != keys_opt4[k] for k in common),
+            (
+                f"Keys of the same {len(common)} materials differ by the gamma models, "
+                f"e.g. {keys_opt4[next(iter(common))].split(';models=')[1][:80]}..."
+                if len(common) > 0
+                else "No common material keys"
+            ),
+        )
+        and is_ok
+    )
+
+    # TLE dose with freshly simulated tables, then with the cached ones
+    cache = paths.output / "mu_cache_dose"
+    shutil.rmtree(cache, ignore_errors=True)
+    counts_fresh, edep_fresh = run_tle_simulation(paths, "fresh", cache)
+    counts_cached, edep_cached = run_tle_simulation(paths, "cached", cache)
+    print(f"Fresh tables: {counts_fresh}")
+    print(f"Cached tables: {counts_cached}")
+    is_ok = (
+        utility.print_test(
+            counts_fresh["simulated"] > 0 and counts_fresh["cached"] == 0,
+            f"Fresh run: {counts_fresh['simulated']} simulated tables, "
+            f"{counts_fresh['cached']} cached",
+        )
+        and is_ok
+    )
+    is_ok = (
+        utility.print_test(
+            counts_cached["simulated"] == 0
+            and counts_cached["cached"] == counts_fresh["simulated"],
+            f"Cached run: {counts_cached['simulated']} simulated tables, "
+            f"{counts_cached['cached']} cached",
+        )
+        and is_ok
+    )
+
+    # the tables are the same, only the random sequence differs (the table
+    # simulation consumes random numbers): statistical comparison
+    diff = utility.rel_diff(float(edep_fresh.sum()), float(edep_cached.sum()))
+    is_ok = (
+        utility.print_test(
+            np.fabs(diff) < 3.0,
+            f"Total edep fresh = {edep_fresh.sum():.2f} MeV, "
+            f"cached = {edep_cached.sum():.2f} MeV: {diff:.2f}%",
+        )
+        and is_ok
+    )
+    mask = edep_fresh > 0.1 * edep_fresh.max()
+    mad = np.mean(np.fabs(edep_cached[mask] - edep_fresh[mask]) / edep_fresh[mask])
+    is_ok = (
+        utility.print_test(
+            mad < 0.05,
+            f"Depth edep profile fresh vs cached: mean relative diff {mad * 100:.2f}%",
+        )
+        and is_ok
+    )
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+import opengate as gate
+from opengate.tests import utility
+from opengate.tests.src.actors.test081_tle_helpers import (
+    add_waterbox,
+    add_source,
+    plot_pdd,
+    compare_pdd,
+)
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test120")
+
+    """
+    TLEDoseActor in multithread mode with a range threshold: the TLE deposits
+    are accumulated per thread and the electron CSDA ranges are read from
+    per-thread tables. The PDD must be the same as the one of a conventional
+    DoseActor (as in test081_tle_1_geom).
+    """
+
+    sim = gate.Simulation()
+
+    # main options
+    sim.random_seed = 12356654
+    sim.output_dir = paths.output
+    sim.progress_bar = False
+    sim.number_of_threads = 4
+
+    # units
+    m = gate.g4_units.m
+    mm = gate.g4_units.mm
+
+    # world and waterbox with a low and a high density slab
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+    waterbox = add_waterbox(sim)
+
+    # physics
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option3"
+    sim.physics_manager.global_production_cuts.all = 1 * mm
+    sim.physics_manager.set_max_step_size("waterbox", 1 * mm)
+    sim.physics_manager.set_user_limits_particles("gamma")
+    sim.g4_commands_before_init.append("/process/eLoss/CSDARange true")
+
+    # source
+    source = add_source(sim, n=2e5 / sim.number_of_threads)
+
+    # TLE and conventional dose actors
+    tle_dose_actor = sim.add_actor("TLEDoseActor", "tle_dose_actor")
+    tle_dose_actor.output_filename = "test120_tle.mhd"
+    tle_dose_actor.attached_to = waterbox
+    tle_dose_actor.dose.active = True
+    tle_dose_actor.size = [200, 200, 200]
+    tle_dose_actor.spacing = [x / y for x, y in zip(waterbox.size, tle_dose_actor.size)]
+    tle_dose_actor.tle_threshold_type = "max range"
+    tle_dose_actor.tle_threshold = 10 * mm
+
+    dose_actor = sim.add_actor("DoseActor", "dose_actor")
+    dose_actor.output_filename = "test120.mhd"
+    dose_actor.attached_to = waterbox
+    dose_actor.dose.active = True
+    dose_actor.size = tle_dose_actor.size
+    dose_actor.spacing = tle_dose_actor.spacing
+
+    stats = sim.add_actor("SimulationStatisticsActor", "stats")
+
+    # go
+    sim.run()
+    print(stats)
+
+    # total deposited energy
+    edep_tle = itk.array_view_from_image(tle_dose_actor.edep.image).sum()
+    edep = itk.array_view_from_image(dose_actor.edep.image).sum()
+    diff = utility.rel_diff(float(edep), float(edep_tle))
+    is_ok = utility.print_test(
+        np.fabs(diff) < 5.0,
+        f"Total edep DoseActor = {edep:.2f} MeV, TLEDoseActor = {edep_tle:.2f} MeV: {diff:.2f}%",
+    )
+
+    # pdd
+    ax, plt = plot_pdd(dose_actor, tle_dose_actor)
+    f1 = dose_actor.edep.get_output_path()
+    f2 = tle_dose_actor.edep.get_output_path()
+    is_ok = compare_pdd(f1, f2, dose_actor.spacing[2], ax[0], tol=0.25) and is_ok
+    f1 = dose_actor.dose.get_output_path()
+    f2 = tle_dose_actor.dose.get_output_path()
+    is_ok = compare_pdd(f1, f2, dose_actor.spacing[2], ax[1], tol=0.25) and is_ok
+    f = paths.output / "pdd_mt.png"
+    plt.savefig(f)
+    print(f"PDD image saved in {f}")
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+import opengate as gate
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test122")
+
+    """
+    FluenceActor with score_by_process in multithread mode: the images are
+    accumulated per thread and merged at the end of the run. The components
+    must be consistent with the total images (same geometry as test099).
+    """
+
+    sim = gate.Simulation()
+
+    # main options
+    sim.random_seed = 123456
+    sim.output_dir = paths.output
+    sim.progress_bar = False
+    sim.number_of_threads = 4
+
+    # units
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    mm = gate.g4_units.mm
+    nm = gate.g4_units.nm
+    MeV = gate.g4_units.MeV
+
+    # world
+    world = sim.world
+    world.material = "G4_Galactic"
+    world.size = [0.5 * m, 0.5 * m, 0.5 * m]
+
+    # fluence plane and scattering waterbox
+    fluence_plane = sim.add_volume("Box", "air_plane")
+    fluence_plane.size = [10 * cm, 10 * cm, 1 * nm]
+    fluence_plane.material = "G4_Galactic"
+
+    water_box = sim.add_volume("Box", "water")
+    water_box.size = [15 * cm, 15 * cm, 5 * cm]
+    water_box.material = "G4_WATER"
+    water_box.translation = [0, 0, -30 * mm]
+
+    # physics
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option3"
+    sim.physics_manager.global_production_cuts.all = 1000 * m
+
+    # source
+    source = sim.add_source("GenericSource", "mysource")
+    source.energy.type = "gauss"
+    source.energy.mono = 0.5 * MeV
+    source.energy.sigma_gauss = 0.2 * MeV
+    source.particle = "gamma"
+    source.position.type = "disc"
+    source.position.radius = 1 * cm
+    source.position.translation = [0, 0, -80 * mm]
+    source.direction.type = "iso"
+    source.n = 200000 / sim.number_of_threads
+
+    # fluence actor
+    fluence_actor = sim.add_actor("FluenceActor", "fluence_actor")
+    fluence_actor.score_by_process = True
+    fluence_actor.energy.active = True
+    fluence_actor.output_filename = "test122_processes.mhd"
+    fluence_actor.attached_to = fluence_plane
+    fluence_actor.size = [10, 10, 1]
+    fluence_actor.spacing = [
+        x / y for x, y in zip(fluence_plane.size, fluence_actor.size)
+    ]
+
+    stats = sim.add_actor("SimulationStatisticsActor", "Stats")
+
+    # go
+    sim.run()
+    print(stats)
+
+    def read(t, process=None):
+        s = f"_{process}" if process is not None else ""
+        f = paths.output / f"test122_processes_{t}{s}.mhd"
+        return itk.array_from_image(itk.imread(f)).astype(np.float64)
+
+    is_ok = True
+    for t in ["counts", "energy"]:
+        total = read(t)
+        comp = {p: read(t, p) for p in ["compton", "rayleigh"]}
+        sec = read(t, "secondaries")
+        prim = read(t, "primaries")
+        # primaries + secondaries are the gammas, the total also counts the
+        # (few) electrons escaping the water box
+        gammas = prim + sec
+        ok = np.all(gammas <= total * (1 + 1e-5) + 1e-6)
+        ratio = gammas.sum() / total.sum()
+        is_ok = (
+            utility.print_test(
+                ok and ratio > 0.95 and prim.sum() > 0 and sec.sum() > 0,
+                f"{t}: primaries = {prim.sum():.1f}, secondaries = {sec.sum():.1f}, "
+                f"(primaries + secondaries) / total = {ratio:.4f}",
+            )
+            and is_ok
+        )
+        # each secondary has been scattered by (at least) one process
+        ok = np.all(comp["compton"] + comp["rayleigh"] >= sec * (1 - 1e-5))
+        is_ok = (
+            utility.print_test(
+                ok,
+                f"{t}: compton = {comp['compton'].sum():.1f}, "
+                f"rayleigh = {comp['rayleigh'].sum():.1f}",
+            )
+            and is_ok
+        )
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import opengate as gate
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test123")
+
+    """
+    SimulationStatisticsActor: the steps counted by the global stepping action
+    (fast_step_count, default) must be the same as the steps counted by the
+    actor itself, and the track types must be the same.
+    """
+
+    sim = gate.Simulation()
+
+    # main options
+    sim.random_seed = 321654
+    sim.output_dir = paths.output
+    sim.progress_bar = False
+    sim.number_of_threads = 2
+
+    # units
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    mm = gate.g4_units.mm
+    MeV = gate.g4_units.MeV
+
+    # world and waterbox
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+    waterbox = sim.add_volume("Box", "waterbox")
+    waterbox.size = [20 * cm, 20 * cm, 20 * cm]
+    waterbox.material = "G4_WATER"
+
+    # physics
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
+    sim.physics_manager.global_production_cuts.all = 1 * mm
+
+    # source
+    source = sim.add_source("GenericSource", "source")
+    source.particle = "proton"
+    source.energy.mono = 150 * MeV
+    source.position.type = "disc"
+    source.position.radius = 1 * cm
+    source.position.translation = [0, 0, -40 * cm]
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.n = 500
+
+    # statistics counted with and without the global stepping action
+    stats_fast = sim.add_actor("SimulationStatisticsActor", "stats_fast")
+    stats_fast.track_types_flag = True
+    stats = sim.add_actor("SimulationStatisticsActor", "stats")
+    stats.track_types_flag = True
+    stats.fast_step_count = False
+
+    # go
+    sim.run()
+    print(stats_fast)
+
+    c1 = stats_fast.counts
+    c2 = stats.counts
+    is_ok = utility.print_test(
+        stats_fast.use_global_step_count() and not stats.use_global_step_count(),
+        "Only the first actor uses the global step count",
+    )
+    for k in ["runs", "events", "tracks", "steps"]:
+        is_ok = utility.print_test(c1[k] == c2[k], f"{k}: {c1[k]} vs {c2[k]}") and is_ok
+    is_ok = (
+        utility.print_test(
+            dict(c1.track_types) == dict(c2.track_types),
+            f"Track types: {dict(c1.track_types)}",
+        )
+        and is_ok
+    )
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import uproot
+import opengate as gate
+from opengate.actors.digitizers import read_phsp_binary
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test124")
+
+    """
+    PhaseSpaceActor with the columnar output modes: the same phsp is stored
+    in a ROOT file, in memory (numpy arrays) and in a binary file. The three
+    outputs must contain the same entries (the order may differ in MT).
+    """
+
+    sim = gate.Simulation()
+
+    # main options
+    sim.random_seed = 321456
+    sim.output_dir = paths.output
+    sim.progress_bar = False
+    sim.number_of_threads = 2
+
+    # units
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    mm = gate.g4_units.mm
+    nm = gate.g4_units.nm
+    MeV = gate.g4_units.MeV
+
+    # world, waterbox and phsp plane
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+    sim.world.material = "G4_AIR"
+    waterbox = sim.add_volume("Box", "waterbox")
+    waterbox.size = [20 * cm, 20 * cm, 10 * cm]
+    waterbox.material = "G4_WATER"
+    plane = sim.add_volume("Box", "plane")
+    plane.size = [50 * cm, 50 * cm, 1 * nm]
+    plane.material = "G4_AIR"
+    plane.translation = [0, 0, 10 * cm]
+
+    # physics
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
+    sim.physics_manager.global_production_cuts.all = 1 * mm
+
+    # source
+    source = sim.add_source("GenericSource", "source")
+    source.particle = "gamma"
+    source.energy.mono = 2 * MeV
+    source.position.type = "disc"
+    source.position.radius = 2 * cm
+    source.position.translation = [0, 0, -20 * cm]
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.n = 20000
+
+    # the same phsp, three output modes
+    attributes = [
+        "EventID",
+        "KineticEnergy",
+        "PrePosition",
+        "ParticleName",
+        "ProcessDefinedStep",
+        "PDGCode",
+    ]
+    phsps = {}
+    for mode in ["root", "memory", "binary"]:
+        phsp = sim.add_actor("PhaseSpaceActor", f"phsp_{mode}")
+        phsp.attached_to = plane
+        phsp.attributes = attributes
+        phsp.output_filename = f"test124_{mode}.root"
+        phsp.output_mode = mode
+        phsp.chunk_size = 500
+        phsps[mode] = phsp
+
+    # go
+    sim.run()
+
+    root = uproot.open(phsps["root"].get_output_path())["phsp_root"]
+    data = {
+        "root": root.arrays(library="np"),
+        "memory": phsps["memory"].root_output.get_data(),
+        "binary": read_phsp_binary(paths.output / "test124_binary.phsp"),
+    }
+    n = len(data["root"]["EventID"])
+    is_ok = utility.print_test(
+        n > 0 and phsps["memory"].total_number_of_entries == n,
+        f"{n} entries in the ROOT phsp, "
+        f"{phsps['memory'].total_number_of_entries} in memory",
+    )
+
+    def sorted_columns(d):
+        order = np.lexsort((d["KineticEnergy"], d["EventID"]))
+        return {k: np.asarray(d[k])[order] for k in d.keys()}
+
+    ref = sorted_columns(data["root"])
+    for mode in ["memory", "binary"]:
+        d = sorted_columns(data[mode])
+        is_ok = (
+            utility.print_test(
+                set(d.keys()) == set(ref.keys()),
+                f"{mode}: columns {sorted(d.keys())}",
+            )
+            and is_ok
+        )
+        for k in ref.keys():
+            if ref[k].dtype.kind in "OUS":
+                ok = np.all(d[k].astype(str) == ref[k].astype(str))
+            else:
+                ok = np.array_equal(d[k], ref[k])
+            is_ok = utility.print_test(ok, f"{mode}: {k} {d[k].dtype}") and is_ok
+
+    # dictionary-encoded strings
+    codes = phsps["memory"].root_output.get_data(decode_strings=False)
+    dictionaries = phsps["memory"].user_output.root_output.dictionaries
+    is_ok = (
+        utility.print_test(
+            codes["ParticleName"].dtype == np.int32
+            and set(dictionaries["ParticleName"]) == set(ref["ParticleName"]),
+            f"Particle names dictionary: {dictionaries['ParticleName']}",
+        )
+        and is_ok
+    )
+
+    utility.test_ok(is_ok)
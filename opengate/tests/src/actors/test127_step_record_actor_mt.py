@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+import opengate as gate
+from opengate.tests import utility
+
+# filled by the callbacks (same process: the simulation is not run in a
+# subprocess)
+depth_edep = np.zeros(100)
+batches = {"steps": 0, "batches": 0, "particles": set(), "events": []}
+
+
+def score_depth(actor, batch):
+    h, _ = np.histogram(
+        batch["PostPosition_Z"],
+        bins=len(depth_edep),
+        range=(-50, 50),
+        weights=batch["TotalEnergyDeposit"],
+    )
+    depth_edep[:] += h
+    batches["steps"] += len(batch["TotalEnergyDeposit"])
+    batches["batches"] += 1
+    batches["particles"].update(np.unique(batch["ParticleName"]))
+
+
+def check_events(actor, batch):
+    batches["events"].append(np.unique(batch["EventID"]))
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test127")
+
+    """
+    StepRecordActor: the steps are recorded in a per-thread cpp buffer and a
+    python callback is called for every batch of steps with numpy arrays.
+    The energy deposited scored in python must be the same as the one of a
+    DoseActor.
+    """
+
+    sim = gate.Simulation()
+
+    # main options
+    sim.random_seed = 987654
+    sim.output_dir = paths.output
+    sim.progress_bar = False
+    sim.number_of_threads = 2
+
+    # units
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    mm = gate.g4_units.mm
+    MeV = gate.g4_units.MeV
+
+    # world and waterbox
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+    sim.world.material = "G4_AIR"
+    waterbox = sim.add_volume("Box", "waterbox")
+    waterbox.size = [20 * cm, 20 * cm, 10 * cm]
+    waterbox.material = "G4_WATER"
+
+    # physics
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
+    sim.physics_manager.global_production_cuts.all = 1 * mm
+
+    # source
+    source = sim.add_source("GenericSource", "source")
+    source.particle = "proton"
+    source.energy.mono = 80 * MeV
+    source.position.type = "disc"
+    source.position.radius = 1 * cm
+    source.position.translation = [0, 0, -20 * cm]
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.n = 2000
+
+    # reference dose actor
+    dose = sim.add_actor("DoseActor", "dose")
+    dose.attached_to = waterbox
+    dose.size = [1, 1, 100]
+    dose.spacing = [20 * cm, 20 * cm, 1 * mm]
+    dose.output_filename = "test127_dose.mhd"
+
+    # steps recorded by batches
+    rec = sim.add_actor("StepRecordActor", "rec")
+    rec.attached_to = waterbox
+    rec.attributes = ["TotalEnergyDeposit", "PostPosition", "ParticleName"]
+    rec.batch_size = 5000
+    rec.callback = score_depth
+
+    # steps recorded by events
+    rec_event = sim.add_actor("StepRecordActor", "rec_event")
+    rec_event.attached_to = waterbox
+    rec_event.attributes = ["EventID"]
+    rec_event.batch_per_event = True
+    rec_event.callback = check_events
+
+    # go
+    sim.run()
+
+    print(rec)
+    print(rec_event)
+    is_ok = utility.print_test(
+        rec.number_of_steps > 0
+        and rec.number_of_steps == batches["steps"]
+        and rec.number_of_batches == batches["batches"]
+        and rec.number_of_batches > 1,
+        f"{batches['steps']} steps in {batches['batches']} batches",
+    )
+    is_ok = (
+        utility.print_test(
+            "proton" in batches["particles"],
+            f"Particles: {batches['particles']}",
+        )
+        and is_ok
+    )
+    is_ok = (
+        utility.print_test(
+            rec_event.number_of_batches == len(batches["events"])
+            and all(len(e) == 1 for e in batches["events"])
+            and rec_event.number_of_steps == rec.number_of_steps,
+            f"{rec_event.number_of_batches} batches, one event per batch",
+        )
+        and is_ok
+    )
+
+    # same edep as the dose actor
+    edep = itk.array_view_from_image(dose.edep.image).ravel()
+    is_ok = (
+        utility.print_test(
+            np.isclose(edep.sum(), depth_edep.sum(), rtol=1e-6),
+            f"Total edep: {edep.sum() / MeV:.3f} MeV (dose actor) vs "
+            f"{depth_edep.sum() / MeV:.3f} MeV (step record)",
+        )
+        and is_ok
+    )
+
+    utility.test_ok(is_ok)
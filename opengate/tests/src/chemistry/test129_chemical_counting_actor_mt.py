@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import opengate as gate
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(
+        __file__, None, output_folder="test129_chem_mt"
+    )
+
+    """
+    ChemicalCountingActor in multithread mode: the counters, the species at
+    the recorded times and the configured species series are accumulated per
+    thread and merged at the end of the run.
+    """
+
+    sim = gate.Simulation()
+
+    sim.random_engine = "MersenneTwister"
+    sim.random_seed = 654321
+    sim.number_of_threads = 2
+    sim.output_dir = paths.output
+
+    km = gate.g4_units.km
+    um = gate.g4_units.um
+    keV = gate.g4_units.keV
+
+    sim.world.size = [1 * km, 1 * km, 1 * km]
+    sim.world.material = "G4_WATER"
+
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics"
+    sim.chemistry_manager.chemistry_list_name = "G4EmDNAChemistry_option3"
+    sim.chemistry_manager.time_step_model = "IRT"
+
+    target = sim.add_volume("Box", "chem_box")
+    target.size = [10 * um, 10 * um, 10 * um]
+    target.material = "G4_WATER"
+    sim.chemistry_manager.confine_chemistry_to_volume = target
+
+    source = sim.add_source("GenericSource", "source")
+    source.particle = "e-"
+    source.energy.mono = 2 * keV
+    source.position.type = "point"
+    source.direction.type = "momentum"
+    source.direction.momentum = [0, 0, 1]
+    source.n = 2
+
+    stats = sim.add_actor("SimulationStatisticsActor", "stats")
+
+    chem_actor = sim.add_actor("ChemicalCountingActor", "chem_actor")
+    chem_actor.attached_to = target
+    chem_actor.number_of_time_bins = 20
+    chem_actor.track_structure_em_physics = "G4EmDNAPhysics_option2"
+    chem_actor.counters.configured_species_counter.tracked_species = ["e_aq", "H2"]
+    chem_actor.counters.configured_species_counter.active = True
+
+    sim.run()
+
+    results = chem_actor.results.get_data()
+    print(chem_actor.results)
+    n = stats.counts.events
+    is_ok = utility.print_test(
+        results.chemistry_starts == n and results.recorded_events == n,
+        f"{n} events, {results.chemistry_starts} chemistry starts, "
+        f"{results.recorded_events} recorded events",
+    )
+    is_ok = (
+        utility.print_test(
+            len(results.times_to_record) == 20
+            and len(results.species) == 20
+            and results.total_energy_deposit > 0,
+            f"{len(results.species)} recorded times, "
+            f"edep = {results.total_energy_deposit} keV",
+        )
+        and is_ok
+    )
+
+    # the merged series are cumulative counts
+    series = chem_actor.configured_species_counter.get_data()
+    for name, s in series.items():
+        counts = np.asarray(s["count"])
+        is_ok = (
+            utility.print_test(
+                len(counts) > 1 and np.all(np.diff(counts) > 0),
+                f"Species {name}: {counts[-1]} appearances in {len(counts)} points",
+            )
+            and is_ok
+        )
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import uproot
+import numpy as np
+import opengate as gate
+from opengate.tests import utility
+
+
+def run_simulation(repetition_mode, particle="gamma"):
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    mm = gate.g4_units.mm
+    keV = gate.g4_units.keV
+    Bq = gate.g4_units.Bq
+
+    sim = gate.Simulation()
+    sim.g4_verbose = False
+    sim.number_of_threads = 1
+    sim.check_volumes_overlap = False
+    sim.random_seed = 123654
+    sim.output_dir = paths.output
+
+    sim.world.size = [2 * m, 2 * m, 2 * m]
+
+    # a ring of blocks, each containing a grid of crystals
+    ring = sim.add_volume("Tubs", "ring")
+    ring.rmin = 30 * cm
+    ring.rmax = 40 * cm
+    ring.dz = 10 * cm
+    ring.material = "G4_AIR"
+
+    block = sim.add_volume("Box", "block")
+    block.mother = ring.name
+    block.size = [4 * cm, 8 * cm, 16 * cm]
+    block.material = "G4_AIR"
+    t, r = gate.geometry.utility.get_circular_repetition(
+        24, [35 * cm, 0, 0], start_angle_deg=5
+    )
+    block.translation = t
+    block.rotation = r
+    block.repetition_mode = repetition_mode
+
+    crystal = sim.add_volume("Box", "crystal")
+    crystal.mother = block.name
+    crystal.size = [3 * cm, 4 * mm, 4 * mm]
+    crystal.material = "G4_BGO"
+    crystal.translation = gate.geometry.utility.get_grid_repetition(
+        [1, 16, 32], [0, 5 * mm, 5 * mm]
+    )
+    crystal.repetition_mode = repetition_mode
+
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
+    sim.physics_manager.global_production_cuts.all = 1 * mm
+
+    source = sim.add_source("GenericSource", "source")
+    source.particle = particle
+    source.energy.mono = 511 * keV
+    source.position.type = "sphere"
+    source.position.radius = 5 * cm
+    source.direction.type = "iso"
+    source.activity = 20000 * Bq if particle == "gamma" else 2000 * Bq
+
+    stats = sim.add_actor("SimulationStatisticsActor", "stats")
+
+    hc = sim.add_actor("DigitizerHitsCollectionActor", "hits")
+    hc.attached_to = crystal.name
+    hc.output_filename = f"test112_hits_{particle}_{repetition_mode}.root"
+    hc.attributes = [
+        "EventID",
+        "PreStepUniqueVolumeID",
+        "PreStepUniqueVolumeIDAsInt",
+        "TrackVolumeName",
+        "TotalEnergyDeposit",
+    ]
+    # geantinos do not deposit energy
+    hc.keep_zero_edep = particle == "geantino"
+
+    t = time.time()
+    sim.run(start_new_process=True)
+    print(f"Mode {repetition_mode}: {time.time() - t:.2f} s")
+    print(stats)
+
+    return hc.get_output_path()
+
+
+def edep_per_copy(root_filename):
+    tree = uproot.open(root_filename)["hits"]
+    ids = tree["PreStepUniqueVolumeID"].array(library="np")
+    edep = tree["TotalEnergyDeposit"].array(library="np")
+    u, inv = np.unique(ids, return_inverse=True)
+    return dict(zip(u, np.bincount(inv, weights=edep)))
+
+
+def read_hits(root_filename):
+    tree = uproot.open(root_filename)["hits"]
+    return {
+        k: tree[k].array(library="np")
+        for k in [
+            "EventID",
+            "PreStepUniqueVolumeID",
+            "PreStepUniqueVolumeIDAsInt",
+            "TrackVolumeName",
+        ]
+    }
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, None, "test112")
+
+    """
+    The repetitions placed with one G4PVParameterised must have the same
+    UniqueVolumeID (names and copy numbers) as the ones placed with one
+    G4PVPlacement each. With geantinos, the tracks are the same in both modes:
+    the volume IDs of all hits must be identical.
+    """
+
+    # exact comparison of the volume IDs
+    ref = read_hits(run_simulation("placement", "geantino"))
+    param = read_hits(run_simulation("parameterised", "geantino"))
+    is_ok = True
+    for k in ref:
+        b = len(ref[k]) > 0 and np.array_equal(ref[k], param[k])
+        utility.print_test(b, f"Same {k} for all {len(ref[k])} geantino hits")
+        is_ok = is_ok and b
+    ids = ref["PreStepUniqueVolumeID"]
+    b = all(i.startswith("crystal_rep_") for i in ids)
+    utility.print_test(b, f"Repetition names in the IDs, e.g. {ids[0]}")
+    is_ok = is_ok and b
+
+    # gammas: statistical comparison of the deposited energy
+    ref = edep_per_copy(run_simulation("placement"))
+    param = edep_per_copy(run_simulation("parameterised"))
+
+    # total edep
+    t_ref = sum(ref.values())
+    t_param = sum(param.values())
+    d = abs(t_ref - t_param) / t_ref
+    b = d < 0.03
+    utility.print_test(
+        b, f"Total edep {t_ref:.2f} vs {t_param:.2f} MeV: {d * 100:.2f}%"
+    )
+    is_ok = is_ok and b
+
+    # edep per block (all crystals of the same block)
+    def per_block(d):
+        r = {}
+        for k, v in d.items():
+            # copy numbers up to the block: <name>-0_0_<block>_<crystal>
+            block = k.split("-")[-1].rsplit("_", 1)[0]
+            r[block] = r.get(block, 0) + v
+        return r
+
+    b_ref = per_block(ref)
+    b_param = per_block(param)
+    b = set(b_ref.keys()) == set(b_param.keys())
+    utility.print_test(b, f"Same hit blocks: {len(b_ref)} vs {len(b_param)}")
+    is_ok = is_ok and b
+    if b:
+        keys = sorted(b_ref.keys())
+        x = np.array([b_ref[k] for k in keys])
+        y = np.array([b_param[k] for k in keys])
+        diff = np.abs(x - y).sum() / x.sum()
+        b = diff < 0.15
+        utility.print_test(b, f"Edep per block: relative difference {diff:.3f}")
+        is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
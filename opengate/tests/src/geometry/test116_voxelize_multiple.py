@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+import opengate as gate
+import opengate.contrib.phantoms.nemaiec as gate_iec
+import opengate.voxelize
+from opengate.voxelize import voxelize_geometry_multiple
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, "", output_folder="test116")
+
+    """
+    Voxelize the IEC phantom at several spacings in a single subprocess
+    (multithreaded) and compare with the images computed one by one.
+    """
+
+    sim = gate.Simulation()
+    sim.output_dir = paths.output
+    sim.verbose_level = gate.logger.NONE
+
+    m = gate.g4_units.m
+    mm = gate.g4_units.mm
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+    iec = gate_iec.add_iec_phantom(sim)
+
+    spacings = [(4 * mm, 4 * mm, 4 * mm), (2 * mm, 2 * mm, 3 * mm)]
+    results = voxelize_geometry_multiple(
+        sim, spacings, extent=iec, margin=1, number_of_threads=4, use_cache=False
+    )
+
+    is_ok = True
+    for spacing, (labels_mt, image_mt) in zip(spacings, results):
+        labels, image = sim.voxelize_geometry(
+            iec, spacing=spacing, margin=1, use_cache=False
+        )
+        arr = itk.array_view_from_image(image)
+        arr_mt = itk.array_view_from_image(image_mt)
+        is_ok = (
+            utility.print_test(
+                labels == labels_mt and np.array_equal(arr, arr_mt),
+                f"Spacing {spacing}: same labels and image {arr.shape}",
+            )
+            and is_ok
+        )
+
+    # second call: from the cache, no subprocess
+    labels_cache, image_cache = sim.voxelize_geometry(
+        iec, spacing=spacings[0], margin=1
+    )
+    labels_cache2, image_cache2 = sim.voxelize_geometry(
+        iec, spacing=spacings[0], margin=1
+    )
+    is_ok = (
+        utility.print_test(
+            labels_cache == labels_cache2
+            and np.array_equal(
+                itk.array_view_from_image(image_cache),
+                itk.array_view_from_image(image_cache2),
+            ),
+            "Cached voxelization",
+        )
+        and is_ok
+    )
+
+    # a single box extent (two 3-vectors) shared by two spacings, and one
+    # extent per spacing
+    cm = gate.g4_units.cm
+    box = ((-10 * cm, -10 * cm, -5 * cm), (10 * cm, 10 * cm, 5 * cm))
+    results = voxelize_geometry_multiple(sim, spacings, extent=box)
+    for spacing, (_, image) in zip(spacings, results):
+        size = np.array(itk.size(image))
+        expected = np.ceil((np.array(box[1]) - np.array(box[0])) / spacing)
+        is_ok = (
+            utility.print_test(
+                np.array_equal(size, expected),
+                f"Box extent, spacing {spacing}: size {size}",
+            )
+            and is_ok
+        )
+    results = voxelize_geometry_multiple(sim, spacings, extents=[iec, box], margin=1)
+    is_ok = (
+        utility.print_test(
+            np.array_equal(
+                itk.array_view_from_image(results[0][1]),
+                itk.array_view_from_image(image_cache),
+            )
+            and np.array_equal(itk.size(results[1][1]), expected + 2),
+            "One extent per spacing",
+        )
+        and is_ok
+    )
+
+    # the cache only keeps the most recently used results
+    opengate.voxelize.voxelization_cache_max_size = 2
+    sim.voxelize_geometry(iec, spacing=spacings[1], margin=1)
+    is_ok = (
+        utility.print_test(
+            len(opengate.voxelize._voxelization_cache) == 2,
+            f"Cache size {len(opengate.voxelize._voxelization_cache)}",
+        )
+        and is_ok
+    )
+    opengate.voxelize.clear_voxelization_cache()
+
+    utility.test_ok(is_ok)
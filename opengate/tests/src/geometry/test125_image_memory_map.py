@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+import opengate as gate
+from opengate.image import (
+    get_raw_image_buffer_info,
+    read_itk_image,
+    itk_image_from_array,
+)
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test125")
+
+    """
+    Memory-mapped reading of raw-backed images (.mhd/.raw, .mha, .nii): the
+    images must be the same as the ones read by itk.imread, and the label
+    image of an ImageVolume must be the same whatever the reading.
+    """
+
+    # a small CT-like image with a non-trivial geometry
+    rng = np.random.default_rng(42)
+    arr = rng.integers(-1000, 1500, size=(7, 6, 5)).astype(np.int16)
+    img = itk_image_from_array(arr, view=False)
+    img.SetSpacing([1.5, 2.0, 2.5])
+    img.SetOrigin([-10.0, 3.0, 7.5])
+    direction = np.array([[0.0, 1.0, 0.0], [-1.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
+    img.SetDirection(direction)
+
+    is_ok = True
+    for suffix in ["mhd", "mha", "nii"]:
+        path = paths.output / f"test125.{suffix}"
+        itk.imwrite(img, str(path))
+        info = get_raw_image_buffer_info(path)
+        ref = itk.imread(str(path))
+        mm = read_itk_image(path)
+        ok = (
+            info is not None
+            and np.array_equal(itk.array_view_from_image(mm), arr)
+            and np.array_equal(itk.array_view_from_image(ref), arr)
+            and np.allclose(mm.GetSpacing(), ref.GetSpacing())
+            and np.allclose(mm.GetOrigin(), ref.GetOrigin())
+            and np.allclose(
+                itk.array_from_matrix(mm.GetDirection()),
+                itk.array_from_matrix(ref.GetDirection()),
+            )
+        )
+        is_ok = utility.print_test(ok, f"{suffix}: memory-mapped with {info}") and is_ok
+
+    # compressed images are read with itk
+    path = paths.output / "test125_compressed.mhd"
+    itk.imwrite(img, str(path), compression=True)
+    mm = read_itk_image(path)
+    is_ok = (
+        utility.print_test(
+            get_raw_image_buffer_info(path) is None
+            and np.array_equal(itk.array_view_from_image(mm), arr),
+            "Compressed mhd: read with itk",
+        )
+        and is_ok
+    )
+
+    # label image of an image volume (memory-mapped input)
+    sim = gate.Simulation()
+    ct = sim.add_volume("Image", "ct")
+    ct.image = paths.output / "test125.mhd"
+    ct.material = "G4_AIR"
+    ct.voxel_materials = [[-2000, 0, "G4_LUNG_ICRP"], [0, 2000, "G4_WATER"]]
+    labels = itk.array_view_from_image(ct.create_label_image())
+    expected = np.where(arr < 0, 1, 2)
+    is_ok = (
+        utility.print_test(
+            np.array_equal(labels, expected) and labels.dtype == np.uint16,
+            f"Label image: {np.bincount(labels.ravel())} voxels per label",
+        )
+        and is_ok
+    )
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import tempfile
+import numpy as np
+import itk
+
+import opengate as gate
+from opengate.image import itk_image_from_array
+from opengate.processing import dumps_with_shared_arrays, loads_with_shared_arrays
+from opengate.tests import utility
+
+
+def create_simulation(sim, transport):
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    mm = gate.g4_units.mm
+    MeV = gate.g4_units.MeV
+    Bq = gate.g4_units.Bq
+
+    sim.g4_verbose = False
+    sim.random_seed = 123456
+    sim.output_dir = paths.output / "test108" / transport
+    sim.subprocess_output_transport = transport
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+
+    waterbox = sim.add_volume("Box", "waterbox")
+    waterbox.size = [10 * cm, 10 * cm, 10 * cm]
+    waterbox.material = "G4_WATER"
+
+    source = sim.add_source("GenericSource", "mysource")
+    source.particle = "proton"
+    source.energy.mono = 120 * MeV
+    source.position.type = "disc"
+    source.position.radius = 5 * mm
+    source.direction.momentum = [0, 0, 1]
+    source.activity = 5000 * Bq
+
+    # a large enough image so that it goes through the memory-mapped files
+    dose = sim.add_actor("DoseActor", "dose")
+    dose.attached_to = "waterbox"
+    dose.size = [100, 100, 100]
+    dose.spacing = [1 * mm, 1 * mm, 1 * mm]
+    dose.edep_uncertainty.active = True
+    dose.dose.active = True
+
+    stats = sim.add_actor("SimulationStatisticsActor", "stats")
+    return dose, stats
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test108")
+
+    sim1 = gate.Simulation()
+    dose1, stats1 = create_simulation(sim1, "queue")
+    sim1.run(start_new_process=True)
+
+    sim2 = gate.Simulation()
+    dose2, stats2 = create_simulation(sim2, "shared_memory")
+    sim2.run(start_new_process=True)
+
+    print(stats1)
+    print(stats2)
+
+    is_ok = stats1.counts.events == stats2.counts.events
+    utility.print_test(is_ok, f"Same number of events: {stats1.counts.events}")
+
+    # the outputs must be identical, only the transport differs
+    for name in ("edep", "edep_uncertainty", "dose"):
+        img1 = getattr(dose1, name).image
+        img2 = getattr(dose2, name).image
+        b = np.array_equal(
+            itk.array_view_from_image(img1), itk.array_view_from_image(img2)
+        )
+        b = b and np.allclose(img1.GetSpacing(), img2.GetSpacing())
+        b = b and np.allclose(img1.GetOrigin(), img2.GetOrigin())
+        utility.print_test(b, f"Identical {name} image with both transports")
+        is_ok = is_ok and b
+
+    # round trip of a vector (multi-component) image
+    arr = np.random.default_rng(1).random((10, 20, 30, 3)).astype(np.float32)
+    vimg = itk_image_from_array(arr, view=False, is_vector=True)
+    vimg.SetSpacing([1.0, 2.0, 3.0])
+    vimg.SetOrigin([-1.0, 0.5, 4.0])
+    with tempfile.TemporaryDirectory() as directory:
+        vimg2 = loads_with_shared_arrays(
+            dumps_with_shared_arrays({"image": vimg}, directory, min_nbytes=1024)
+        )["image"]
+        b = (
+            vimg2.GetNumberOfComponentsPerPixel() == 3
+            and tuple(vimg2.GetLargestPossibleRegion().GetSize()) == (30, 20, 10)
+            and np.array_equal(itk.array_view_from_image(vimg2), arr)
+            and np.allclose(vimg2.GetSpacing(), vimg.GetSpacing())
+            and np.allclose(vimg2.GetOrigin(), vimg.GetOrigin())
+        )
+        del vimg2
+    utility.print_test(b, "Vector image round trip through the shared arrays")
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
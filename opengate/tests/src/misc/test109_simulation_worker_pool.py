@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itk
+import numpy as np
+
+import opengate as gate
+from opengate.tests import utility
+
+
+def create_simulation(energy, seed):
+    sim = gate.Simulation()
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    mm = gate.g4_units.mm
+    Bq = gate.g4_units.Bq
+
+    sim.g4_verbose = False
+    sim.random_seed = seed
+    sim.output_dir = paths.output
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+
+    waterbox = sim.add_volume("Box", "waterbox")
+    waterbox.size = [10 * cm, 10 * cm, 10 * cm]
+    waterbox.material = "G4_WATER"
+
+    # the source changes from one job to the other
+    source = sim.add_source("GenericSource", "mysource")
+    source.particle = "proton"
+    source.energy.mono = energy
+    source.position.type = "disc"
+    source.position.radius = 2 * mm
+    source.direction.momentum = [0, 0, 1]
+    source.activity = 2000 * Bq
+
+    dose = sim.add_actor("DoseActor", "dose")
+    dose.attached_to = "waterbox"
+    dose.size = [1, 1, 100]
+    dose.spacing = [10 * cm, 10 * cm, 1 * mm]
+    dose.output_filename = f"dose_{int(energy)}.mhd"
+
+    stats = sim.add_actor("SimulationStatisticsActor", "stats")
+    return sim, dose, stats
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test109")
+    MeV = gate.g4_units.MeV
+
+    energies = [80 * MeV, 100 * MeV, 120 * MeV]
+    jobs = [create_simulation(e, 123 + i) for i, e in enumerate(energies)]
+
+    with gate.SimulationWorkerPool(number_of_workers=2) as pool:
+        pool.run([j[0] for j in jobs])
+
+    # reference: same simulation as the last job, run as usual
+    sim_ref, dose_ref, stats_ref = create_simulation(energies[-1], 123 + 2)
+    sim_ref.run(start_new_process=True)
+
+    is_ok = True
+    previous_max = 0
+    for (sim, dose, stats), e in zip(jobs, energies):
+        print(stats)
+        arr = itk.array_view_from_image(dose.edep.image)
+        b = stats.counts.events > 0 and arr.sum() > 0
+        # the Bragg peak moves deeper with the energy
+        b = b and np.argmax(arr.ravel()) > previous_max
+        previous_max = np.argmax(arr.ravel())
+        utility.print_test(b, f"Job at {e / MeV} MeV recovered its output")
+        is_ok = is_ok and b
+
+    b = np.array_equal(
+        itk.array_view_from_image(jobs[-1][1].edep.image),
+        itk.array_view_from_image(dose_ref.edep.image),
+    )
+    utility.print_test(b, "Pool job and sim.run() give identical results")
+    is_ok = is_ok and b
+
+    utility.test_ok(is_ok)
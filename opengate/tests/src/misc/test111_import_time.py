@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import subprocess
+import sys
+
+from opengate.tests import utility
+
+# modules that must not be loaded by a plain 'import opengate'
+heavy_modules = [
+    "opengate.contrib",
+    "torch",
+    "pytomography",
+    "matplotlib",
+    "SimpleITK",
+    "pandas",
+    "uproot",
+    "awkward",
+    "pydicom",
+]
+
+# measured in a new interpreter each time (as a worker process would)
+script = """
+import json, sys, time
+t = time.perf_counter()
+import opengate
+t = time.perf_counter() - t
+print(json.dumps({"time": t, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure_import():
+    r = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    return json.loads(r.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, None, "test111")
+
+    # the first import fills the file system caches, keep the best of the next ones
+    measure_import()
+    results = [measure_import() for _ in range(3)]
+    t = min(r["time"] for r in results)
+    modules = results[0]["modules"]
+
+    is_ok = True
+    for m in heavy_modules:
+        b = m not in modules
+        utility.print_test(b, f"Module {m} not imported by 'import opengate'")
+        is_ok = is_ok and b
+
+    # regression threshold, generous to be robust on slow CI machines
+    max_time = 10.0
+    b = t < max_time
+    utility.print_test(b, f"Import time {t:.2f} s (max {max_time} s)")
+    is_ok = is_ok and b
+
+    # contrib is still available on demand
+    import opengate as gate
+
+    b = gate.contrib.spect.__name__ == "opengate.contrib.spect"
+    utility.print_test(b, "Lazy access to gate.contrib.spect")
+    is_ok = is_ok and b
+
+    # store the time to follow its evolution
+    output = paths.output / "test111_import_time.json"
+    with open(output, "w") as f:
+        json.dump({"import_time": t, "number_of_modules": len(modules)}, f)
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import shutil
+import time
+import itk
+import numpy as np
+
+import opengate as gate
+from opengate.image import itk_image_from_array
+from opengate.serialization import (
+    dump_snapshot,
+    load_snapshot,
+    read_snapshot_header,
+    _get_input_files_to_embed,
+)
+from opengate.tests import utility
+
+
+def create_simulation(ct_path):
+    sim = gate.Simulation()
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    mm = gate.g4_units.mm
+    MeV = gate.g4_units.MeV
+
+    sim.random_seed = 123456
+    sim.output_dir = paths.output
+    sim.progress_bar = False
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+
+    ct = sim.add_volume("Image", "ct")
+    ct.image = ct_path
+    ct.material = "G4_AIR"
+    ct.voxel_materials = [[-2000, 0, "G4_LUNG_ICRP"], [0, 2000, "G4_WATER"]]
+
+    # many repeated volumes
+    crystal = sim.add_volume("Box", "crystal")
+    crystal.size = [2 * mm, 2 * mm, 2 * mm]
+    crystal.material = "G4_WATER"
+    crystal.translation = gate.geometry.utility.get_grid_repetition(
+        [20, 20, 1], [3 * mm, 3 * mm, 0], start=[-30 * mm, -30 * mm, 30 * cm]
+    )
+
+    source = sim.add_source("GenericSource", "source")
+    source.particle = "proton"
+    source.energy.mono = 100 * MeV
+    source.position.type = "disc"
+    source.position.radius = 5 * mm
+    source.position.translation = [0, 0, -30 * cm]
+    source.direction.momentum = [0, 0, 1]
+    source.n = 500
+
+    dose = sim.add_actor("DoseActor", "dose")
+    dose.attached_to = ct
+    dose.size = [1, 1, 50]
+    dose.spacing = [100 * mm, 100 * mm, 2 * mm]
+    dose.output_filename = "dose.mhd"
+    return sim
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test126")
+
+    """
+    Binary snapshot of a Simulation: the snapshot (with the input image
+    embedded) is loaded and run, the results must be the same as the ones of
+    the original simulation. Large arrays and images are stored as raw blocks.
+    """
+
+    # a small CT
+    rng = np.random.default_rng(1)
+    ct_arr = rng.integers(-1000, 1000, size=(20, 20, 20)).astype(np.int16)
+    ct_img = itk_image_from_array(ct_arr, view=False)
+    ct_img.SetSpacing([5.0, 5.0, 5.0])
+    ct_path = paths.output / "ct.mhd"
+    itk.imwrite(ct_img, str(ct_path))
+
+    sim = create_simulation(ct_path)
+    snapshot = paths.output / "sim.gsnap"
+    t = time.time()
+    sim.to_snapshot_file(snapshot, embed_input_files=True)
+    t_dump = time.time() - t
+    t = time.time()
+    sim2 = gate.Simulation.from_snapshot_file(snapshot)
+    t_load = time.time() - t
+    header, _ = read_snapshot_header(snapshot)
+    print(f"Snapshot written in {t_dump:.3f} s, loaded in {t_load:.3f} s")
+    print(f"Header: {header}")
+
+    ct2 = sim2.volume_manager.get_volume("ct")
+    crystal2 = sim2.volume_manager.get_volume("crystal")
+    is_ok = utility.print_test(
+        len(header["input_files"]) == 1
+        and ct2.image != sim.volume_manager.get_volume("ct").image
+        and ct2.image.is_file()
+        and len(crystal2.translation) == 400,
+        f"Loaded simulation: image {ct2.image}, {len(crystal2.translation)} crystals",
+    )
+
+    # both simulations give the same dose
+    sim2.output_dir = paths.output / "from_snapshot"
+    sim.run(start_new_process=True)
+    sim2.run(start_new_process=True)
+    d1 = itk.array_view_from_image(sim.get_actor("dose").edep.image)
+    d2 = itk.array_view_from_image(sim2.get_actor("dose").edep.image)
+    is_ok = (
+        utility.print_test(
+            d1.sum() > 0 and np.array_equal(d1, d2),
+            f"Same dose from the snapshot: {d1.sum()} vs {d2.sum()}",
+        )
+        and is_ok
+    )
+
+    # the pixels of a .mhd header are embedded with it, whatever the name of
+    # the data file (ElementDataFile)
+    other_header = paths.output / "ct_other_header.mhd"
+    shutil.copy(ct_path, other_header)
+    groups = _get_input_files_to_embed(create_simulation(other_header))
+    print(f"Embedded files: {groups}")
+    is_ok = (
+        utility.print_test(
+            len(header["input_files"][0]) == 2
+            and groups
+            == [[other_header.absolute(), (paths.output / "ct.raw").absolute()]],
+            f"The data file of {other_header.name} is embedded with it",
+        )
+        and is_ok
+    )
+
+    # arrays and images are stored as raw (memory-mapped) blocks
+    big = rng.random((200, 300))
+    varr = rng.random((10, 20, 30, 3)).astype(np.float32)
+    vector_img = itk_image_from_array(varr, view=False, is_vector=True)
+    data = {
+        "big": big,
+        "small": np.arange(3),
+        "image": ct_img,
+        "vector_image": vector_img,
+        "name": "test",
+    }
+    dump_snapshot(data, paths.output / "data.gsnap", min_nbytes=1024)
+    data2 = load_snapshot(paths.output / "data.gsnap")
+    header, _ = read_snapshot_header(paths.output / "data.gsnap")
+    is_ok = (
+        utility.print_test(
+            len(header["arrays"]) == 3
+            and isinstance(data2["big"], np.memmap)
+            and np.array_equal(data2["big"], big)
+            and np.array_equal(data2["small"], data["small"])
+            and np.array_equal(itk.array_view_from_image(data2["image"]), ct_arr)
+            and np.allclose(data2["image"].GetSpacing(), ct_img.GetSpacing())
+            and data2["vector_image"].GetNumberOfComponentsPerPixel() == 3
+            and np.array_equal(itk.array_view_from_image(data2["vector_image"]), varr)
+            and data2["name"] == "test",
+            f"{len(header['arrays'])} arrays stored as raw blocks",
+        )
+        and is_ok
+    )
+
+    utility.test_ok(is_ok)
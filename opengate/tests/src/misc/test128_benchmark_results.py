@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from opengate.benchmarks.runner import (
+    benchmark_format_version,
+    compare_to_baseline,
+    read_results,
+    write_results,
+)
+from opengate.tests import utility
+
+
+def result(workload, threads, pps, init, rss):
+    return {
+        "workload": workload,
+        "threads": threads,
+        "primaries": 1000,
+        "tracks": 2000,
+        "steps": 30000,
+        "init_time_s": init,
+        "run_time_s": 1000 / pps,
+        "wall_time_s": init + 1000 / pps,
+        "primaries_per_s": pps,
+        "peak_rss_mb": rss,
+    }
+
+
+def results_file(results):
+    return {
+        "format_version": benchmark_format_version,
+        "machine": {"hostname": "test"},
+        "scale": 1.0,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test128")
+
+    """
+    Result format and regression comparison of the benchmark runner, on
+    synthetic results (no simulation is run).
+    """
+
+    baseline = results_file(
+        [
+            result("ct_dose", 1, 100.0, 2.0, 500.0),
+            result("ct_dose", 4, 380.0, 2.0, 600.0),
+            result("pet", 1, 50.0, 3.0, 400.0),
+        ]
+    )
+    current = results_file(
+        [
+            # 5% slower: within the tolerance
+            result("ct_dose", 1, 95.0, 2.0, 500.0),
+            # 20% slower and init time 50% longer: two regressions
+            result("ct_dose", 4, 304.0, 3.0, 600.0),
+            # faster and less memory: no regression
+            result("pet", 1, 60.0, 3.0, 300.0),
+            # not in the baseline: ignored
+            result("gan", 1, 10.0, 1.0, 100.0),
+        ]
+    )
+
+    # write/read round trip
+    filename = paths.output / "test128_baseline.json"
+    write_results(baseline, filename)
+    is_ok = utility.print_test(
+        read_results(filename) == baseline, f"Results written and read in {filename}"
+    )
+
+    # a file with another format version is rejected
+    filename_old = paths.output / "test128_old.json"
+    write_results(
+        dict(baseline, format_version=benchmark_format_version - 1), filename_old
+    )
+    try:
+        read_results(filename_old)
+        ok = False
+    except Exception:
+        ok = True
+    is_ok = utility.print_test(ok, "Other format version rejected") and is_ok
+
+    # comparison
+    comparisons, regressions = compare_to_baseline(current, baseline, tolerance=10)
+    for c in comparisons:
+        print(c)
+    is_ok = (
+        utility.print_test(
+            [(c["workload"], c["threads"]) for c in comparisons]
+            == [("ct_dose", 1), ("ct_dose", 4), ("pet", 1)],
+            f"{len(comparisons)} comparisons (workloads not in the baseline ignored)",
+        )
+        and is_ok
+    )
+    c = comparisons[0]["primaries_per_s"]
+    is_ok = (
+        utility.print_test(
+            c["baseline"] == 100.0 and c["value"] == 95.0 and c["diff_percent"] == -5.0,
+            f"Throughput difference {c['diff_percent']} %",
+        )
+        and is_ok
+    )
+    expected = [
+        (("ct_dose", 4), "primaries_per_s", -20.0),
+        (("ct_dose", 4), "init_time_s", 50.0),
+    ]
+    is_ok = (
+        utility.print_test(
+            [(k, n, round(d, 6)) for k, n, d in regressions] == expected,
+            f"Regressions: {regressions}",
+        )
+        and is_ok
+    )
+
+    # with a larger tolerance, only the init time is a regression
+    _, regressions = compare_to_baseline(current, baseline, tolerance=25)
+    is_ok = (
+        utility.print_test(
+            [(k, n, round(d, 6)) for k, n, d in regressions]
+            == [(("ct_dose", 4), "init_time_s", 50.0)],
+            f"Regressions with 25 % tolerance: {regressions}",
+        )
+        and is_ok
+    )
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import shutil
+
+import opengate as gate
+from opengate.tests import utility
+from opengate.engines import physics_tables_cache_info_file
+
+
+def create_simulation(sim, cache_directory):
+    m = gate.g4_units.m
+    cm = gate.g4_units.cm
+    mm = gate.g4_units.mm
+    MeV = gate.g4_units.MeV
+    Bq = gate.g4_units.Bq
+
+    sim.g4_verbose = False
+    sim.random_seed = 654321
+    sim.output_dir = paths.output
+    sim.world.size = [1 * m, 1 * m, 1 * m]
+
+    waterbox = sim.add_volume("Box", "waterbox")
+    waterbox.size = [10 * cm, 10 * cm, 10 * cm]
+    waterbox.material = "G4_WATER"
+    bone = sim.add_volume("Box", "bone")
+    bone.mother = waterbox
+    bone.size = [10 * cm, 10 * cm, 2 * cm]
+    bone.material = "G4_BONE_COMPACT_ICRU"
+
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
+    sim.physics_manager.set_production_cut("world", "all", 1 * mm)
+    sim.physics_manager.physics_tables_cache_directory = cache_directory
+
+    source = sim.add_source("GenericSource", "mysource")
+    source.particle = "e-"
+    source.energy.mono = 10 * MeV
+    source.direction.momentum = [0, 0, 1]
+    source.activity = 2000 * Bq
+
+    stats = sim.add_actor("SimulationStatisticsActor", "stats")
+    return stats
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test110")
+    cache_directory = paths.output / "physics_tables_cache"
+    shutil.rmtree(cache_directory, ignore_errors=True)
+
+    # first simulation: the tables are built and stored
+    sim1 = gate.Simulation()
+    stats1 = create_simulation(sim1, cache_directory)
+    sim1.run(start_new_process=True)
+    stored = list(cache_directory.glob(f"*/{physics_tables_cache_info_file}"))
+    is_ok = len(stored) == 1
+    utility.print_test(is_ok, f"Physics tables stored in {cache_directory}")
+
+    # second simulation: identical configuration, the tables are retrieved
+    sim2 = gate.Simulation()
+    stats2 = create_simulation(sim2, cache_directory)
+    sim2.run(start_new_process=True)
+    b = len(list(cache_directory.glob(f"*/{physics_tables_cache_info_file}"))) == 1
+    utility.print_test(b, f"No new physics tables stored")
+    is_ok = is_ok and b
+
+    # third simulation: different cuts, new tables
+    sim3 = gate.Simulation()
+    stats3 = create_simulation(sim3, cache_directory)
+    sim3.physics_manager.set_production_cut("world", "all", 2 * gate.g4_units.mm)
+    sim3.run(start_new_process=True)
+    b = len(list(cache_directory.glob(f"*/{physics_tables_cache_info_file}"))) == 2
+    utility.print_test(b, f"New physics tables stored for other cuts")
+    is_ok = is_ok and b
+
+    print(stats1)
+    print(stats2)
+    is_ok = utility.assert_stats(stats1, stats2, tolerance=0.05) and is_ok
+
+    utility.test_ok(is_ok)
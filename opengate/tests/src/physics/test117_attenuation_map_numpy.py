@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import itk
+import numpy as np
+import opengate as gate
+from opengate.contrib.dose.photon_attenuation_image_helpers import (
+    create_photon_attenuation_image,
+)
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, "", output_folder="test117")
+
+    """
+    Same attenuation map as test084_attenuation_map1 but computed without
+    Geant4, from the NIST tables. Compared with the reference map of test084.
+    """
+
+    keV = gate.g4_units.keV
+
+    # labels
+    voxel_materials = [
+        [-2000, -900, "G4_AIR"],
+        [-900, -100, "Lung"],
+        [-100, 0, "G4_ADIPOSE_TISSUE_ICRP"],
+        [0, 300, "G4_TISSUE_SOFT_ICRP"],
+        [300, 800, "G4_B-100_BONE"],
+        [800, 6000, "G4_BONE_COMPACT_ICRU"],
+    ]
+    labels_filename = paths.output / "test117_labels.json"
+    with open(labels_filename, "w") as f:
+        json.dump(voxel_materials, f)
+
+    # mu map
+    t = time.time()
+    mumap = create_photon_attenuation_image(
+        paths.data / "patient-4mm.mhd",
+        labels_filename,
+        140.511 * keV,
+        material_database=paths.data / "GateMaterials.db",
+        database="NIST",
+        method="numpy",
+    )
+    print(f"Computation time: {time.time() - t:.3f} s")
+    output = paths.output / "mumap_numpy.mhd"
+    itk.imwrite(mumap, str(output))
+
+    # compare with the map computed by Geant4 (NIST tables vs G4 cross sections)
+    is_ok = utility.assert_images(
+        paths.output_ref.parent / "test084" / "mumap.mhd",
+        output,
+        tolerance=2,
+        fig_name=paths.output / "mumap_numpy.png",
+        sum_tolerance=2,
+    )
+
+    # several energies at once (the first one is cached)
+    t = time.time()
+    mumaps = create_photon_attenuation_image(
+        paths.data / "patient-4mm.mhd",
+        labels_filename,
+        [140.511 * keV, 208 * keV, 364 * keV],
+        material_database=paths.data / "GateMaterials.db",
+        method="numpy",
+    )
+    print(f"Computation time (3 energies): {time.time() - t:.3f} s")
+    arr = [itk.array_view_from_image(m) for m in mumaps]
+    is_ok = (
+        utility.print_test(
+            np.array_equal(arr[0], itk.array_view_from_image(mumap))
+            and np.all(arr[1] <= arr[0])
+            and np.all(arr[2] <= arr[1]),
+            f"Several energies: mean mu {[float(np.mean(a)) for a in arr]}",
+        )
+        and is_ok
+    )
+
+    utility.test_ok(is_ok)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from test053_phid_helpers2 import *
+import opengate as gate
+
+
+def run_model(z, a, sim_name, single_source_flag, start_time, end_time):
+    sim = gate.Simulation()
+    create_sim_test053(sim, sim_name)
+
+    # sources
+    activity_in_Bq = 500
+    s = add_source_model(sim, z, a, activity_in_Bq)
+    s.atomic_relaxation_flag = True
+    s.isomeric_transition_flag = True
+    s.single_source_flag = single_source_flag
+    s.verbose = False
+
+    sim.run_timing_intervals = [[start_time, end_time]]
+    sim.run(start_new_process=True)
+
+    stats = sim.get_actor("stats")
+    print(stats)
+    return sim.get_actor("phsp").get_output_path()
+
+
+def main():
+    # ac225 89 225
+    z = 89
+    a = 225
+    nuclide, _ = get_nuclide_and_direct_progeny(z, a)
+    print(nuclide)
+
+    sec = g4_units.second
+    min = g4_units.minute
+    start_time = 15 * min
+    end_time = start_time + 2 * min
+
+    # one sub source per daughter and per gamma type
+    root_sub_sources = run_model(
+        z, a, f"{nuclide.nuclide}_13_sub_sources", False, start_time, end_time
+    )
+
+    # all gamma lines in a single source
+    root_single = run_model(
+        z, a, f"{nuclide.nuclide}_13_single_source", True, start_time, end_time
+    )
+
+    # compare
+    warning(f"check root files")
+    is_ok = compare_root_energy(
+        root_sub_sources,
+        root_single,
+        start_time,
+        end_time,
+        model_index=-1,
+        tol=0.05,
+        erange=[50, 500],
+        n_tol=0.05,
+    )
+
+    test_ok(is_ok)
+
+
+if __name__ == "__main__":
+    main()
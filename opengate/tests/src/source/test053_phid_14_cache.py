@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import shutil
+import numpy as np
+import opengate.sources.phidsources as phid
+from opengate.tests import utility
+
+
+def load_all(nuclide):
+    r = {}
+    for d in phid.get_nuclide_progeny(nuclide):
+        n = d.nuclide.nuclide
+        r[n] = {
+            "intensity": d.intensity,
+            "parent": [p.nuclide if p is not None else None for p in d.parent],
+            "it": phid.isomeric_transition_load(d.nuclide),
+            "ar": phid.atomic_relaxation_load(d.nuclide),
+        }
+    levels = phid.isomeric_transition_read_g4_data(nuclide.Z, nuclide.A)
+    return r, levels
+
+
+def compare(ref, r, ref_levels, levels):
+    is_ok = list(ref.keys()) == list(r.keys())
+    utility.print_test(is_ok, f"Same progeny: {list(r.keys())}")
+    for n in ref:
+        a = ref[n]
+        b = r[n]
+        ok = abs(a["intensity"] - b["intensity"]) < 1e-12
+        ok = ok and sorted(a["parent"], key=str) == sorted(b["parent"], key=str)
+        for k in ["it", "ar"]:
+            ok = ok and np.allclose(a[k][0], b[k][0]) and np.allclose(a[k][1], b[k][1])
+        utility.print_test(ok, f"{n}: same intensity, parents and gamma lines")
+        is_ok = is_ok and ok
+    ok = ref_levels.to_dict() == levels.to_dict()
+    utility.print_test(ok, f"Same G4 gamma levels ({len(levels)} levels)")
+    return is_ok and ok
+
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, "", output_folder="test053")
+
+    nuclide = phid.get_nuclide_from_name("ac225")
+
+    # reference: data parsed without cache
+    phid.phid_cache_enabled = False
+    ref, ref_levels = load_all(nuclide)
+
+    # start from an empty cache (in the output folder of the test)
+    phid.phid_cache_enabled = True
+    phid.phid_cache_directory = paths.output / "phid_cache"
+    shutil.rmtree(phid.phid_cache_directory, ignore_errors=True)
+    folder = phid.phid_cache_get_folder()
+    print(f"Cache folder is {folder}")
+    shutil.rmtree(folder, ignore_errors=True)
+
+    # first call: parse and store, second call: read from the cache
+    phid.phid_cache_warm_up(nuclide)
+    is_ok = folder.is_dir()
+    utility.print_test(
+        is_ok, f"Cache folder created with {len(list(folder.iterdir()))} files"
+    )
+    r, levels = load_all(nuclide)
+    is_ok = compare(ref, r, ref_levels, levels) and is_ok
+
+    # a cache folder that cannot be created: no cache, same data
+    not_a_folder = paths.output / "phid_cache_not_a_folder"
+    not_a_folder.write_text("")
+    phid.phid_cache_directory = not_a_folder / "phid_cache"
+    ok = phid.phid_cache_get_folder() is None
+    utility.print_test(ok, f"No cache in {phid.phid_cache_directory}")
+    r, levels = load_all(nuclide)
+    is_ok = compare(ref, r, ref_levels, levels) and ok and is_ok
+
+    utility.test_ok(is_ok)
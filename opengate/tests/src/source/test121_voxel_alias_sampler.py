@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import opengate_core as g4
+from opengate.tests import utility
+
+if __name__ == "__main__":
+    paths = utility.get_default_test_paths(__file__, output_folder="test121")
+
+    """
+    Alias table used by the VoxelSource to sample the voxels: only the
+    non-zero voxels are stored, and the sampled voxels follow the image
+    values (float32 and float64 images).
+    """
+
+    rng = np.random.default_rng(123)
+    shape = (6, 5, 4)  # Z Y X
+    weights = rng.random(shape)
+    weights[weights < 0.4] = 0
+    weights[2, 3, 1] = 5  # a hot voxel
+    nz = np.count_nonzero(weights)
+    p = (weights / weights.sum()).ravel()
+
+    is_ok = True
+    n = 200000
+    for dtype in [np.float32, np.float64]:
+        sampler = g4.GateVoxelAliasSampler(weights.astype(dtype))
+        is_ok = (
+            utility.print_test(
+                sampler.GetNumberOfNonZeroVoxels() == nz
+                and sampler.GetNumberOfVoxels() == weights.size
+                and sampler.GetMemorySize() == 12 * nz,
+                f"{np.dtype(dtype).name}: {sampler.GetNumberOfNonZeroVoxels()} "
+                f"non-zero voxels out of {sampler.GetNumberOfVoxels()}, "
+                f"{sampler.GetMemorySize()} bytes",
+            )
+            and is_ok
+        )
+
+        # histogram of the sampled voxels
+        u = rng.random(n)
+        indices = np.array([sampler.Sample(x) for x in u])
+        h = np.bincount(indices, minlength=weights.size) / n
+        is_ok = (
+            utility.print_test(
+                np.all(h[p == 0] == 0),
+                "No sample in the zero voxels",
+            )
+            and is_ok
+        )
+        # 5 sigma of the binomial distribution
+        sigma = np.sqrt(p * (1 - p) / n)
+        diff = np.abs(h - p)
+        is_ok = (
+            utility.print_test(
+                np.all(diff <= 5 * sigma + 1e-12),
+                f"Sampled frequencies follow the image: max diff = "
+                f"{np.max(diff / np.maximum(sigma, 1e-12)):.2f} sigma",
+            )
+            and is_ok
+        )
+
+    utility.test_ok(is_ok)
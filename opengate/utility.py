@@ -419,6 +419,15 @@ def insert_suffix_before_extension(file_path, suffix, suffix_separator="-"):
     return new_path
 
 
+def replace_extension(file_path, extension):
+    """Replace the extension of the file, including nested extensions like '.nii.gz'."""
+    path = Path(file_path)
+    extension = "." + extension.lstrip(".")
+    if path.name.endswith(".nii.gz"):
+        return path.with_name(path.name[: -len(".nii.gz")] + extension)
+    return path.with_suffix(extension)
+
+
 def get_random_folder_name(size=8, create=True):
     r = "".join(random.choices(string.ascii_lowercase + string.digits, k=size))
     r = "run." + r
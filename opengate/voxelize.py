@@ -1,4 +1,6 @@
 from pathlib import Path
+import copy
+import hashlib
 import json
 import random
 import string
@@ -16,9 +18,10 @@ from .image import (
     update_image_py_to_cpp,
     get_py_image_from_cpp_image,
     get_info_from_image,
+    copy_itk_image,
 )
 from .processing import dispatch_to_subprocess
-from .serialization import dump_json
+from .serialization import dump_json, dumps_json
 from .utility import ensure_filename_is_str
 from .definitions import __gate_list_objects__
 from . import logger
@@ -28,6 +31,59 @@ def generate_random_string(length=10):
     return "".join(random.choices(string.ascii_letters + string.digits, k=length))
 
 
+# voxelized geometries already computed in this process,
+# keyed by geometry hash, extent, spacing and margin.
+# Only the most recently used ones are kept (the images can be large).
+_voxelization_cache = {}
+voxelization_cache_max_size = 8
+
+
+def get_geometry_hash(sim):
+    """Hash of the geometry description (volumes, parallel worlds, fields) of the simulation.
+    Note: the content of external files (e.g. images of image volumes) is not considered,
+    only their paths.
+    """
+    d = sim.volume_manager.to_dictionary()
+    return hashlib.sha1(dumps_json(d, sort_keys=True).encode()).hexdigest()
+
+
+def _resolve_extent(sim, extent):
+    # collect volumes which are directly underneath the world/parallel worlds
+    if isinstance(extent, str) and extent in ("auto", "Auto"):
+        sim.volume_manager.update_volume_tree_if_needed()
+        extent = list(sim.volume_manager.world_volume.children)
+        for pw in sim.volume_manager.parallel_world_volumes.values():
+            extent.extend(list(pw.children))
+    return extent
+
+
+def _get_cache_key(geometry_hash, extent, spacing, margin):
+    if isinstance(extent, VolumeBase):
+        extent = [extent]
+    extent_key = tuple(
+        e.name if isinstance(e, VolumeBase) else tuple(float(v) for v in e)
+        for e in extent
+    )
+    return (
+        geometry_hash,
+        extent_key,
+        tuple(float(s) for s in spacing),
+        float(margin),
+    )
+
+
+def clear_voxelization_cache():
+    _voxelization_cache.clear()
+
+
+def _store_in_voxelization_cache(key, result):
+    _voxelization_cache.pop(key, None)
+    _voxelization_cache[key] = result
+    # dict keeps the insertion order: the first items are the least recently used
+    while len(_voxelization_cache) > max(voxelization_cache_max_size, 0):
+        del _voxelization_cache[next(iter(_voxelization_cache))]
+
+
 def voxelize_geometry(
     sim,
     extent="auto",
@@ -35,6 +91,8 @@ def voxelize_geometry(
     margin=0,
     filename=None,
     return_path=False,
+    number_of_threads=1,
+    use_cache=True,
 ):
     """Create a voxelized three-dimensional representation of the simulation geometry.
 
@@ -53,21 +111,23 @@ def voxelize_geometry(
         filename (str, optional): The filename/path to which the voxelized image and labels are written.
             Suffix added automatically. Path can be relative to the global output directory of the simulation.
         return_path (bool): Return the absolute path where the voxelized image was written?
+        number_of_threads (int): Number of threads used to locate the voxels in the geometry.
+        use_cache (bool): Reuse the result of a previous call with the same geometry, extent,
+            spacing and margin (in this process). Only the last `voxelization_cache_max_size`
+            results are kept; use clear_voxelization_cache() to release them.
 
     Returns:
         dict, itk image, (path): A dictionary containing the label to volume LUT; the voxelized geometry;
             optionally: the absolute path where the image was written, if applicable.
     """
-    # collect volumes which are directly underneath the world/parallel worlds
-    if extent in ("auto", "Auto"):
-        sim.volume_manager.update_volume_tree_if_needed()
-        extent = list(sim.volume_manager.world_volume.children)
-        for pw in sim.volume_manager.parallel_world_volumes.values():
-            extent.extend(list(pw.children))
-
-    labels, image = dispatch_to_subprocess(
-        compute_voxelized_geometry, sim, extent, spacing, margin
-    )
+    labels, image = voxelize_geometry_multiple(
+        sim,
+        [spacing],
+        extent=extent,
+        margin=margin,
+        number_of_threads=number_of_threads,
+        use_cache=use_cache,
+    )[0]
 
     if filename is not None:
         outpath = sim.get_output_path(filename)
@@ -89,6 +149,63 @@ def voxelize_geometry(
         return labels, image
 
 
+def voxelize_geometry_multiple(
+    sim,
+    spacings,
+    extent="auto",
+    margin=0,
+    number_of_threads=1,
+    use_cache=True,
+    extents=None,
+):
+    """Voxelize the geometry for several spacings (and/or extents).
+
+    The geometry is initialized once, in a single subprocess, for all the requests.
+    'extent' is a single extent (see voxelize_geometry) used for all spacings.
+    To use a different extent for each spacing, set 'extents' to a list with
+    one extent per spacing ('extent' is then ignored).
+
+    Returns:
+        list of (dict, itk image): labels and image for each spacing.
+    """
+    if extents is not None:
+        if len(extents) != len(spacings):
+            fatal(
+                f"voxelize_geometry_multiple: 'extents' must contain one extent per "
+                f"spacing, but {len(extents)} extents and {len(spacings)} spacings "
+                f"were given."
+            )
+        extents = [_resolve_extent(sim, e) for e in extents]
+    else:
+        extents = [_resolve_extent(sim, extent)] * len(spacings)
+    requests = [(e, s, margin) for e, s in zip(extents, spacings)]
+
+    geometry_hash = get_geometry_hash(sim)
+    keys = [_get_cache_key(geometry_hash, *r) for r in requests]
+    missing = [
+        (k, r)
+        for k, r in zip(keys, requests)
+        if not use_cache or k not in _voxelization_cache
+    ]
+    if len(missing) > 0:
+        results = dispatch_to_subprocess(
+            compute_voxelized_geometries,
+            sim,
+            [r for _, r in missing],
+            number_of_threads,
+        )
+    else:
+        results = []
+    computed = {k: result for (k, _), result in zip(missing, results)}
+    found = {k: computed[k] if k in computed else _voxelization_cache[k] for k in keys}
+    # store (or mark as recently used) once all results are collected
+    for k in keys:
+        _store_in_voxelization_cache(k, found[k])
+
+    # return copies, the cached images must not be modified
+    return [(copy.deepcopy(found[k][0]), copy_itk_image(found[k][1])) for k in keys]
+
+
 def write_voxelized_geometry(
     self,
     labels,
@@ -135,14 +252,7 @@ def write_voxelized_geometry(
     }
 
 
-def compute_voxelized_geometry(sim, extent, spacing, margin):
-    """Method which returns a voxelized image of the simulation geometry
-    given the extent, spacing and margin.
-    The voxelization does not check which volume is voxelized.
-    Every voxel will be assigned an ID corresponding to the material at this position
-    in the world.
-    """
-
+def create_image_for_voxelization(extent, spacing, margin):
     if isinstance(extent, VolumeBase):
         image = create_image_with_volume_extent(extent, spacing, margin)
     elif isinstance(extent, __gate_list_objects__) and all(
@@ -158,22 +268,104 @@ def compute_voxelized_geometry(sim, extent, spacing, margin):
             f"The input variable `extent` needs to be a tuple of 3-vectors, or a volume, "
             f"or a list of volumes. Found: {extent}."
         )
+        image = None  # avoid IDE warning
+    return image
 
-    vl = sim.verbose_level
-    sim.verbose_level = logger.NONE
-    with SimulationEngine(sim) as se:
-        se.initialize()
-        vox = g4.GateVolumeVoxelizer()
+
+class GeometryVoxelizer:
+    """Voxelize the geometry of a simulation in the current process.
+
+    The Geant4 geometry is built once (at initialize) and the navigators are
+    reused, so several images (spacings, extents) and batches of points can be
+    processed without building the geometry again.
+    Warning: Geant4 can only be initialized once per process, so the simulation
+    cannot be run afterwards in the same process. Use voxelize_geometry() or
+    voxelize_geometry_multiple() to do this in a subprocess.
+
+        with GeometryVoxelizer(sim, number_of_threads=4) as gv:
+            labels, image = gv.voxelize(iec, spacing=(2, 2, 2))
+            labels, image = gv.voxelize(iec, spacing=(4, 4, 4))
+            labels, point_labels = gv.classify_points(points)
+    """
+
+    def __init__(self, simulation, number_of_threads=1):
+        self.simulation = simulation
+        self.number_of_threads = number_of_threads
+        self.simulation_engine = None
+        self.g4_voxelizer = None
+        self._verbose_level = None
+
+    def __enter__(self):
+        self.initialize()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def initialize(self):
+        if self.simulation_engine is not None:
+            return
+        self._verbose_level = self.simulation.verbose_level
+        self.simulation.verbose_level = logger.NONE
+        self.simulation_engine = SimulationEngine(self.simulation)
+        self.simulation_engine.__enter__()
+        self.simulation_engine.initialize()
+        self.g4_voxelizer = g4.GateVolumeVoxelizer()
+        self.g4_voxelizer.fNumberOfThreads = int(self.number_of_threads)
+
+    def close(self):
+        if self.simulation_engine is None:
+            return
+        self.g4_voxelizer = None
+        self.simulation_engine.__exit__(None, None, None)
+        self.simulation_engine = None
+        self.simulation.verbose_level = self._verbose_level
+
+    def _labels_with_materials(self, g4_labels):
+        vm = self.simulation_engine.simulation.volume_manager
+        labels = {}
+        for key, label in g4_labels.items():
+            vol = vm.get_volume(key)
+            labels[key] = {"label": label, "material": vol.material}
+        return labels
+
+    def voxelize(self, extent, spacing=(3, 3, 3), margin=0):
+        """Return the labels and the label image of the geometry in the extent."""
+        self.initialize()
+        image = create_image_for_voxelization(extent, spacing, margin)
+        vox = self.g4_voxelizer
         update_image_py_to_cpp(image, vox.fImage, False)
         vox.Voxelize()
         image = get_py_image_from_cpp_image(vox.fImage)
-        labels = vox.fLabels
-        for key in labels.keys():
-            vol = se.simulation.volume_manager.get_volume(key)
-            labels[key] = {"label": labels[key], "material": vol.material}
+        return self._labels_with_materials(vox.fLabels), image
+
+    def classify_points(self, points):
+        """Label of the volume at each point ((n, 3) array, global coordinates).
+        Returns the labels dictionary and the (n,) array of labels.
+        """
+        self.initialize()
+        points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 3)
+        point_labels = np.asarray(self.g4_voxelizer.ClassifyPoints(points))
+        return self._labels_with_materials(self.g4_voxelizer.fLabels), point_labels
+
 
-    sim.verbose_level = vl
-    return labels, image
+def compute_voxelized_geometries(sim, requests, number_of_threads=1):
+    """Voxelize the geometry for each (extent, spacing, margin) request,
+    with a single initialization of the geometry."""
+    with GeometryVoxelizer(sim, number_of_threads=number_of_threads) as gv:
+        return [gv.voxelize(*r) for r in requests]
+
+
+def compute_voxelized_geometry(sim, extent, spacing, margin, number_of_threads=1):
+    """Method which returns a voxelized image of the simulation geometry
+    given the extent, spacing and margin.
+    The voxelization does not check which volume is voxelized.
+    Every voxel will be assigned an ID corresponding to the material at this position
+    in the world.
+    """
+    return compute_voxelized_geometries(
+        sim, [(extent, spacing, margin)], number_of_threads
+    )[0]
 
 
 def voxelized_source(itk_image, volumes_labels, activities):